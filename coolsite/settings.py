@@ -74,6 +74,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'django.template.context_processors.media',
+                'vibemusic.context_processors.site_chrome_context',  # Жанры меню и SiteSettings из кэша (services/site_chrome.py)
             ],
         },
     },
@@ -146,14 +147,53 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [                                 # Классы разрешений: кто что может делать
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',     # Любой может читать, но изменять (POST, PUT, DELETE) только авторизованные пользователи
     ],
-    'DEFAULT_PAGINATION_CLASS': [                                   # Класс пагинации — делим список объектов на страницы
-       'rest_framework.pagination.PageNumberPagination',            # Пагинация по номерам страниц
-    ],
+    'DEFAULT_PAGINATION_CLASS': 'vibemusic.api.v1.pagination.KeysetPagination',  # Курсорная пагинация по (created_at, id): без OFFSET и COUNT(*)
     'PAGE_SIZE': 10                                                 # Размер страницы по умолчанию — 10 объектов
 }
 
 
 
+# Кэш: Redis, если задан REDIS_URL (общий для всех воркеров gunicorn), иначе локальная память процесса
+REDIS_URL = os.getenv("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'vibemusic-default',
+        }
+    }
+
+# Общий ли кэш для всех процессов (воркеры gunicorn, run_jobs). От этого зависит, видят ли другие процессы
+# инвалидации обвязки сайта, версий тегов (ETag/304) и дельт автодополнения; в docker-compose - Redis
+CACHE_SHARED = bool(REDIS_URL)
+SITE_CHROME_LOCAL_TTL = 60                                            # Без общего кэша: через сколько секунд воркер перечитает жанры меню и настройки
+AUTOCOMPLETE_LOCAL_TTL = 300                                          # Без общего кэша: через сколько секунд воркер перестроит свой индекс автодополнения
+
+# Результаты поиска Spotify - на диске: переживают рестарт и не вытесняют из общего кэша горячие ключи
+CACHES['spotify'] = {
+    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    'LOCATION': os.getenv("SPOTIFY_CACHE_DIR", str(BASE_DIR / 'cache' / 'spotify')),
+    'TIMEOUT': None,                                                  # TTL задаётся при записи (SPOTIFY_SEARCH_TTL / SPOTIFY_NEGATIVE_TTL)
+    'OPTIONS': {'MAX_ENTRIES': 100_000},
+}
+
+# Денормализованные счётчики: как часто (сек) сбрасывать буфер инкрементов из кэша в БД; 0 - сразу
+COUNTER_FLUSH_INTERVAL = int(os.getenv("COUNTER_FLUSH_INTERVAL", "5"))
+
+# Очередь фоновых задач (services/jobs.py, воркер: python manage.py run_jobs)
+JOBS_POLL_INTERVAL = float(os.getenv("JOBS_POLL_INTERVAL", "1"))      # Пауза воркера, когда очередь пуста (сек)
+JOBS_LOCK_TIMEOUT = int(os.getenv("JOBS_LOCK_TIMEOUT", "600"))        # Через сколько секунд «выполняющаяся» задача считается брошенной
+JOBS_BACKOFF_BASE = 30                                                # Задержка перед первым повтором (сек), дальше удваивается
+JOBS_BACKOFF_MAX = 3600                                               # Потолок задержки между повторами (сек)
+
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 STATIC_URL = '/static/'
@@ -164,7 +204,7 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 
 # Media files
 MEDIA_URL = '/media/'
-MEDIA_ROOT = BASE_DIR / 'media'
+MEDIA_ROOT = os.getenv("MEDIA_ROOT", str(BASE_DIR / 'media'))            # В docker-compose - общий том web и worker
 
 # Или 'bootstrap4', если используете старую версию
 CRISPY_TEMPLATE_PACK = 'bootstrap5'
@@ -195,6 +235,30 @@ SECRET_KEY = os.getenv("DJANGO_SECRET_KEY", SECRET_KEY)
 # Spotify API
 SPOTIFY_CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID")
 SPOTIFY_CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
+SPOTIFY_BACKEND = os.getenv("SPOTIFY_BACKEND", "vibemusic.spotify_utils.SpotipyBackend")   # FakeSpotifyBackend - офлайн для тестов/бенчмарков
+SPOTIFY_TIMEOUT = 5                                               # Таймаут запросов к Spotify API (сек)
+SPOTIFY_SEARCH_TTL = 30 * 24 * 3600                               # Сколько хранить найденный результат поиска
+SPOTIFY_NEGATIVE_TTL = 24 * 3600                                  # Сколько помнить «не найдено»
+
+# Скачивание обложек (vibemusic/utils/image_download.py)
+IMAGE_DOWNLOAD_TIMEOUT = (3.05, 10)                               # (соединение, чтение) в секундах
+IMAGE_DOWNLOAD_MAX_BYTES = 10 * 1024 * 1024                       # Больше - не сохраняем
+IMAGE_DOWNLOAD_POOL_SIZE = 10                                     # Соединений в пуле на хост
+
+# Telegram бот
+TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
+TELEGRAM_BOT_USERNAME = os.getenv("TELEGRAM_BOT_USERNAME")
+TELEGRAM_GROUP_CHAT_ID = os.getenv("TELEGRAM_GROUP_CHAT_ID")
+TELEGRAM_API_BASE = os.getenv("TELEGRAM_API_BASE", "https://api.telegram.org")   # Для нагрузочного теста: python manage.py telegram_standin
+# Очередь исходящих (services/telegram_outbox.py, диспетчер: python manage.py run_telegram_outbox)
+TELEGRAM_OUTBOX_WORKERS = int(os.getenv("TELEGRAM_OUTBOX_WORKERS", "8"))   # Потоков отправки (и соединений в пуле)
+TELEGRAM_GLOBAL_RATE = 30                                         # Сообщений в секунду на бота (лимит Bot API)
+TELEGRAM_CHAT_RATE = 1.0                                          # Сообщений в секунду в один личный чат
+TELEGRAM_GROUP_RATE = 20 / 60                                     # В группу/канал - 20 в минуту
+TELEGRAM_OUTBOX_MAX_ATTEMPTS = 8                                  # После стольких неудач сообщение помечается failed
+TELEGRAM_OUTBOX_BACKOFF_MAX = 600                                 # Потолок задержки между повторами (сек)
+TELEGRAM_OUTBOX_LOCK_TIMEOUT = 300                                # «Отправляется» дольше - вернуть в очередь
+TELEGRAM_OUTBOX_POLL_INTERVAL = 1.0                               # Пауза диспетчера, когда отправлять нечего (сек)
 
 # EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'        # Отправка в консоль для сообщения 
 
@@ -250,6 +314,13 @@ else:
 IP_CHANGE_WINDOW_HOURS = int(os.getenv("IP_CHANGE_WINDOW_HOURS", "1"))   # окно для подсчёта уникальных IP (часы)
 IP_CHANGE_THRESHOLD = int(os.getenv("IP_CHANGE_THRESHOLD", "3"))       # порог уник. IP в окне -> триггер
 IP_CHANGE_RESTRICTION_SECONDS = int(os.getenv("IP_CHANGE_RESTRICTION_SECONDS", str(5*3600)))  # 5 часов по умолчанию
+IP_CHANGE_BUCKETS = 12                                                   # На сколько корзин делится окно (точность скользящего окна)
+UPLOAD_WINDOW_MAX_BYTES = int(os.getenv("UPLOAD_WINDOW_MAX_BYTES", "0"))   # Лимит загруженных байт за окно; 0 - без лимита
+
+# Журнал IP загрузок (services/ip_log.py): пишется пачками в фоне, не на пути запроса
+IP_LOG_BATCH_SIZE = 500                                                  # Сбросить, как только набралось столько событий
+IP_LOG_FLUSH_INTERVAL = float(os.getenv("IP_LOG_FLUSH_INTERVAL", "2"))   # ...или раз в столько секунд
+IP_LOG_MAX_BUFFER = 50_000                                               # Потолок очереди в памяти процесса (если БД недоступна)
 
 
 # Ограничения по размеру загружаемых файлов и тела запроса
@@ -258,5 +329,41 @@ MAX_UPLOAD_MB = int(os.getenv("MAX_UPLOAD_MB", "300")) * 1024 * 1024  # 25 МБ
 # Максимальный размер тела запроса (JSON, формы, API)
 DATA_UPLOAD_MAX_MEMORY_SIZE = MAX_UPLOAD_MB
 
-# Максимальный размер файлов, хранимых в памяти
-FILE_UPLOAD_MAX_MEMORY_SIZE = MAX_UPLOAD_MB
+# Файлы не держим в памяти воркера: пишем кусками во временный файл, по ходу считаем sha256 и проверяем тип/лимит
+FILE_UPLOAD_HANDLERS = ['vibemusic.utils.upload_handlers.StreamingHashUploadHandler']
+FILE_UPLOAD_MAX_MEMORY_SIZE = 2_621_440                                  # 2.5 МБ (значение Django); обработчик выше всё равно пишет на диск
+FILE_UPLOAD_TEMP_DIR = os.getenv("FILE_UPLOAD_TEMP_DIR")                 # На одном диске с MEDIA_ROOT сохранение файла - это rename, без копирования
+
+# Докачиваемая загрузка кусками (API v1 uploads/, services/chunked_uploads.py)
+UPLOAD_API_PREFIX = '/api/v1/uploads'                                    # Запросы сюда с сессией учитывает LogIPMiddleware, с JWT/Basic - UploadAccountingMixin (IPChangeLog, ограничения по IP)
+UPLOAD_SESSION_ROOT = os.getenv("UPLOAD_SESSION_ROOT", str(BASE_DIR / 'cache' / 'uploads'))   # Куски до склейки; лучше на одном диске с MEDIA_ROOT
+UPLOAD_CHUNK_SIZE = 5 * 1024 * 1024                                      # Размер куска по умолчанию
+UPLOAD_CHUNK_MIN = 256 * 1024
+UPLOAD_CHUNK_MAX = 32 * 1024 * 1024
+UPLOAD_SESSION_TTL = 24 * 3600                                           # Незавершённые сессии старше - удаляет cleanup_upload_sessions
+
+# Отдача аудио треков (track/<pk>/stream/, services/track_streaming.py)
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv("MEDIA_ACCEL_REDIRECT_PREFIX", "")   # '/protected-media/' за nginx: байты отдаёт nginx; пусто - sendfile из Django
+TRACK_STREAM_LOGIN_REQUIRED = False                                       # True - треки слушают только вошедшие пользователи
+
+# Превью треков (track/<pk>/preview/, services/track_previews.py)
+TRACK_PREVIEW_OFFSET = 30                                                 # С какой секунды начинается фрагмент
+TRACK_PREVIEW_SECONDS = 30
+TRACK_PREVIEW_MAX_AGE = 30 * 24 * 3600                                    # Cache-Control для превью: файл меняется только со звуком или настройками
+
+# Волна треков (services/track_waveform.py)
+WAVEFORM_RESOLUTIONS = (64, 256, 1024)                                    # Корзин min/max; каждое делит наибольшее
+WAVEFORM_DECODER = os.getenv("WAVEFORM_DECODER")                          # Путь к ffmpeg для MP3/OGG/FLAC; по умолчанию ищется в PATH
+
+# Миниатюры изображений (services/thumbnails.py, {{ image|thumbnail:"card" }})
+THUMBNAIL_FORMAT = 'webp'                                                 # 'webp' или 'jpeg' (если Pillow собран без WebP - всё равно JPEG)
+THUMBNAIL_QUALITY = 82
+
+# Общий поиск (api/v1/search/, services/search.py)
+SEARCH_MAX_MATCHES = 1000                                                 # Сколько лучших по тексту документов ранжируется и попадает в фасеты
+SEARCH_RANK_WEIGHTS = {'text': 0.6, 'likes': 0.25, 'recency': 0.15}       # Вклад релевантности, лайков и свежести в итоговый ранг
+SEARCH_RECENCY_HALF_LIFE_DAYS = 30                                        # Через столько дней вклад свежести падает вдвое
+
+# Кэш ответов API для анонимных GET (services/api_cache.py)
+API_CACHE_ENABLED = os.getenv("API_CACHE_ENABLED", "1") == "1"
+API_CACHE_TTL = 300                                                       # Потолок жизни записи (сек); обычно её раньше снимает смена версии тега
@@ -0,0 +1,31 @@
+# docker/gunicorn.conf.py
+# Конфигурация Gunicorn: gunicorn coolsite.wsgi:application -c gunicorn.conf.py
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+accesslog = "-"
+
+
+def post_worker_init(worker):
+    """
+    Приложение Django уже загружено - прогреваем кэш обвязки сайта и индекс автодополнения, чтобы первый запрос не ходил в БД;
+    запускаем периодический сброс буфера счётчиков.
+    """
+    from vibemusic.services import autocomplete, counters, site_chrome
+    site_chrome.warm()
+    autocomplete.warm()
+    counters.start_flusher()
+
+
+def worker_exit(server, worker):
+    """Воркер останавливается - дописываем накопленный журнал IP загрузок и буфер счётчиков (с LocMemCache он пропал бы с процессом)."""
+    from vibemusic.services import counters, ip_log
+    ip_log.flush()
+    counters.stop_flusher()
+    try:
+        counters.flush_counters()
+    except Exception as e:                                  # БД недоступна - остановку воркера не задерживаем
+        worker.log.warning(f"Не удалось сбросить буфер счётчиков: {e}")
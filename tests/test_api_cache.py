@@ -0,0 +1,90 @@
+# test_api_cache.py
+import pytest
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from vibemusic.models import Artist, Genre, Post, Track
+from vibemusic.services import api_cache, counters
+
+
+@pytest.fixture(autouse=True)
+def setup(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.COUNTER_FLUSH_INTERVAL = 0
+    settings.CACHE_SHARED = True                            # Версии тегов общие, как с Redis - ETag и 304 включены
+    cache.clear()
+
+
+@pytest.fixture
+def post(user):
+    genre = Genre.objects.create(name="Рок", slug="rock")
+    artist = Artist.objects.create(name="Кино", slug="kino")
+    return Post.objects.create(title="Пост", slug="post", content="...", author=user, genre=genre, artist=artist)
+
+
+def fetch(client, url, params=None):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, params or {})
+    assert response.status_code == 200
+    return response.json(), len(queries)
+
+
+def test_repeat_request_is_served_from_cache(post):
+    client = APIClient()
+    first, queries = fetch(client, "/api/v1/posts/", {"page_size": "", "ordering": "-created_at"})
+    assert queries > 0
+    again, queries = fetch(client, "/api/v1/posts/", {"ordering": "-created_at"})   # Пустые параметры не меняют ключ
+    assert queries == 0 and again == first
+    assert fetch(client, "/api/v1/posts/post/")[1] > 0
+
+
+def test_changes_invalidate_tagged_entries(post, user):
+    client = APIClient()
+    fetch(client, "/api/v1/posts/post/")
+    post.artist.name = "Кино и немцы"
+    post.artist.save()                                        # Тег artist:<id> - запись поста устарела
+    assert fetch(client, "/api/v1/posts/post/")[1] > 0
+
+    fetch(client, "/api/v1/posts/")
+    Post.objects.create(title="Новый", slug="new", content="...", author=user)
+    data, queries = fetch(client, "/api/v1/posts/")           # post:list - новый пост в списке
+    assert queries > 0 and len(data["results"]) == 2
+
+    post.liked_by.add(user)                                   # Счётчик обновляется UPDATE'ом при сбросе буфера
+    counters.flush_counters()
+    assert fetch(client, "/api/v1/posts/post/")[0]["like_count"] == 1
+
+
+def test_tracks_and_authenticated_requests(post, user):
+    track = Track.objects.create(title="Группа крови", artist=post.artist, audio_file=SimpleUploadedFile("a.mp3", b"x"))
+    client = APIClient()
+    fetch(client, f"/api/v1/tracks/{track.pk}/")
+    assert fetch(client, f"/api/v1/tracks/{track.pk}/")[1] == 1                # Только строка для ETag (services/conditional.py)
+    Artist.objects.filter(pk=post.artist_id).delete()         # SET_NULL мимо сигналов трека - ловит тег artist:<id>
+    assert fetch(client, f"/api/v1/tracks/{track.pk}/")[0]["artist"] is None
+
+    client.force_authenticate(user)
+    fetch(client, f"/api/v1/tracks/{track.pk}/")
+    assert fetch(client, f"/api/v1/tracks/{track.pk}/")[1] > 0               # liked у каждого своё - мимо кэша
+
+
+def test_invalidate_only_touches_tagged_entries(rf, db):
+    versions = api_cache.tag_versions({"post:1", "post:2"})
+    key = api_cache.cache_key(rf.get("/api/v1/posts/", {"b": "2", "a": "1"}), "anon", "application/json")
+    assert key == api_cache.cache_key(rf.get("/api/v1/posts/", {"a": "1", "b": "2"}), "anon", "application/json")
+    api_cache.store(key, b"{}", "application/json", 200, versions)
+    api_cache.invalidate({"post:3"})
+    assert api_cache.get(key) is not None
+    api_cache.invalidate({"post:2"})
+    assert api_cache.get(key) is None
+
+
+def test_foreign_tag_values_count_as_missing(db):
+    from vibemusic.services import conditional
+    cache.set(api_cache.TAG_KEY.format(tag="post:1"), "3f2a9c0d5b7e4e1a", None)   # Не int - остаток старого формата
+    versions = api_cache.tag_versions({"post:1"})
+    assert isinstance(versions["post:1"], int)
+    assert conditional.compute({"pk": 1}, {"post:1"}).last_modified is not None
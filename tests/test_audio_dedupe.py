@@ -0,0 +1,62 @@
+# test_audio_dedupe.py
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from vibemusic.models import Artist, Job, Track
+from vibemusic.services import audio_dedupe
+from vibemusic.utils.audio_hash import AudioFingerprint, fingerprint_chunks
+
+
+AUDIO = b"\xff\xfb\x90\x64" + bytes(range(256)) * 50        # "MPEG-кадры" без тегов
+
+
+def id3v2(payload: bytes, footer: bool = False) -> bytes:
+    size = len(payload)
+    synchsafe = bytes([(size >> 21) & 0x7F, (size >> 14) & 0x7F, (size >> 7) & 0x7F, size & 0x7F])
+    flags = 0x10 if footer else 0
+    return b"ID3\x04\x00" + bytes([flags]) + synchsafe + payload + (b"3DI\x04\x00" + bytes([flags]) + synchsafe if footer else b"")
+
+
+def id3v1(title: bytes) -> bytes:
+    return (b"TAG" + title).ljust(128, b"\x00")
+
+
+@pytest.fixture(autouse=True)
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+
+
+def test_fingerprint_ignores_tags_and_chunking():
+    plain = fingerprint_chunks([AUDIO])
+    tagged = id3v2(b"TIT2 First" * 30) + id3v2(b"APIC" + b"\x01" * 900, footer=True) + AUDIO + (b"TAG+" + b"x" * 223) + id3v1(b"Other")
+    assert fingerprint_chunks([tagged]) == plain
+    for size in (1, 7, 64, 1000):
+        assert fingerprint_chunks(tagged[i:i + size] for i in range(0, len(tagged), size)) == plain
+    assert fingerprint_chunks([AUDIO[:-1]]) != plain
+    assert AudioFingerprint().hexdigest() == fingerprint_chunks([b""])
+
+
+def test_same_audio_reuses_file_and_enrichment(db):
+    artist = Artist.objects.create(name="Band", slug="band")
+    first = Track.objects.create(title="Song", audio_file=SimpleUploadedFile("a.mp3", id3v2(b"TIT2 A") + AUDIO))
+    Track.objects.filter(pk=first.pk).update(artist=artist, album_name="LP", album_image="images/lp.jpg",
+                                             enrichment_status=Track.EnrichmentStatus.DONE)
+
+    second = Track.objects.create(title="Song (copy)", audio_file=SimpleUploadedFile("b.mp3", AUDIO + id3v1(b"B")))
+    assert second.audio_hash == first.audio_hash
+    assert second.audio_file.name == first.audio_file.name  # Вторая копия в media/ не записана
+    assert (second.artist_id, second.album_name, second.album_image.name) == (artist.pk, "LP", "images/lp.jpg")
+    assert second.enrichment_status == Track.EnrichmentStatus.DONE
+    assert not Job.objects.filter(kind="track.enrich", payload__track_id=second.pk).exists()
+
+    other = Track.objects.create(title="Other", audio_file=SimpleUploadedFile("c.mp3", AUDIO[::-1]))
+    assert other.audio_file.name != first.audio_file.name
+    assert Job.objects.filter(kind="track.enrich", payload__track_id=other.pk).exists()
+
+
+def test_backfill_hashes_existing_tracks(db):
+    track = Track.objects.create(title="Old", audio_file=SimpleUploadedFile("old.mp3", id3v2(b"TIT2 Old") + AUDIO))
+    Track.objects.filter(pk=track.pk).update(audio_hash="")
+    assert audio_dedupe.backfill_hashes(workers=2, batch_size=1) == (1, 0)
+    track.refresh_from_db()
+    assert track.audio_hash == fingerprint_chunks([AUDIO])
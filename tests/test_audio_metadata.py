@@ -0,0 +1,68 @@
+# test_audio_metadata.py
+import io
+import struct
+import wave
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from mutagen.flac import FLAC
+
+from vibemusic.core_utils import extract_metadata
+from vibemusic.models import Track
+
+
+MP3_FRAME = b"\xff\xfb\x90\x00" + b"\x00" * 413            # MPEG-1 Layer III, 128 кбит/с, 44.1 кГц
+
+
+def flac(tmp_path, seconds: int = 3, title: str = "Flac Song") -> bytes:
+    rate, channels, bits = 48000, 2, 16
+    info = struct.pack(">HH", 4096, 4096) + b"\x00" * 6
+    info += ((rate << 44) | ((channels - 1) << 41) | ((bits - 1) << 36) | rate * seconds).to_bytes(8, "big") + b"\x00" * 16
+    path = tmp_path / "song.flac"
+    path.write_bytes(b"fLaC" + bytes([0x80]) + len(info).to_bytes(3, "big") + info)
+    audio = FLAC(str(path))
+    audio["title"], audio["artist"] = title, "Flac Band"
+    audio.save()
+    return path.read_bytes()
+
+
+def wav(seconds: int = 2) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(8000)
+        out.writeframes(b"\x00\x00" * 8000 * seconds)
+    return buffer.getvalue()
+
+
+@pytest.fixture(autouse=True)
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path / "media")
+
+
+def test_flac_tags_and_stream_info(tmp_path):
+    path = tmp_path / "copy.flac"
+    path.write_bytes(flac(tmp_path))
+    meta = extract_metadata(str(path))
+    assert (meta["title"], meta["artist"], meta["codec"]) == ("Flac Song", "Flac Band", "flac")
+    assert (meta["duration"], meta["sample_rate"], meta["channels"]) == (3.0, 48000, 2)
+
+
+def test_info_read_once_at_upload(db, tmp_path):
+    track = Track.objects.create(title="F", audio_file=SimpleUploadedFile("song.flac", flac(tmp_path)))
+    assert (track.codec, track.duration, track.sample_rate) == ("flac", 3.0, 48000)
+    assert track.duration_display == "0:03"
+
+    mp3 = Track.objects.create(title="M", audio_file=SimpleUploadedFile("a.mp3", MP3_FRAME * 500))
+    assert mp3.codec == "mp3" and mp3.bitrate == 128000 and mp3.sample_rate == 44100
+    assert mp3.duration == pytest.approx(500 * 1152 / 44100, abs=0.05)
+    assert open(mp3.audio_file.path, "rb").read() == MP3_FRAME * 500    # Чтение заголовка не сдвинуло позицию файла загрузки
+
+    pcm = Track.objects.create(title="W", audio_file=SimpleUploadedFile("a.wav", wav()))
+    assert (pcm.codec, pcm.duration, pcm.channels) == ("pcm", 2.0, 1)
+
+
+def test_unreadable_file_leaves_fields_empty(db):
+    track = Track.objects.create(title="X", audio_file=SimpleUploadedFile("x.mp3", b"not really mp3"))
+    assert track.duration is None and track.codec == "" and track.duration_display == ""
@@ -0,0 +1,131 @@
+# test_autocomplete.py
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from vibemusic.models import Artist, Genre
+from vibemusic.services import autocomplete, jobs
+from vibemusic.utils.prefix_index import Entry, PrefixIndex
+from vibemusic.utils.translit import variants
+
+
+@pytest.fixture(autouse=True)
+def clean_index():
+    cache.clear()
+    autocomplete.reset()
+    yield
+    autocomplete.reset()
+
+
+@pytest.fixture
+def shared_cache(settings):
+    settings.CACHE_SHARED = True                            # Как с Redis: дельты и снимки через задачи run_jobs
+
+
+def wait_for_local_build():
+    thread = autocomplete._builder["thread"]
+    if thread is not None:
+        thread.join(5)
+    autocomplete.reset()
+
+
+def labels(entries):
+    return [entry.label for entry in entries]
+
+
+def test_translit_and_normalization():
+    assert variants("Сектор Газа!") == ("сектор газа", "sektor gaza")
+    assert variants("Ёлка") == ("елка", "elka")
+    assert variants("Café del Mar") == ("cafe del mar",)
+
+
+def test_prefix_index_ranks_by_popularity_then_length():
+    entries = [Entry(0, 1, "Кино", 50), Entry(2, 2, "Кинолента", 50), Entry(2, 3, "Звезда по имени Солнце", 10),
+               Entry(0, 4, "Kinks", 900), Entry(1, 5, "Synthwave", 0)]
+    index = PrefixIndex.build(entries, top_k=2)
+    assert labels(index.search("kin", 3)) == ["Kinks", "Кино", "Кинолента"]      # Транслитерация: kin -> Кино
+    assert labels(index.search("к", 5)) == ["Кино", "Кинолента"]                 # Заготовка top_k=2 кончилась - дочитали отрезок
+    assert labels(index.search("имени солн", 5)) == ["Звезда по имени Солнце"]    # С начала любого слова
+    assert labels(index.search("k", 5, kinds={2})) == ["Кинолента"]
+    assert index.search("", 5) == [] and index.search("zzz", 5) == []
+
+
+def test_wide_prefix_keeps_popular_entry_at_end_of_range():
+    """Диапазон длиннее MAX_SCAN не обрезается по алфавиту: популярная запись в его конце находится."""
+    entries = [Entry(1, i, f"love{i:05d}", 1) for i in range(60_000)] + [Entry(2, 60_000, "lovezzzz", 10 ** 6)]
+    index = PrefixIndex.build(entries)
+    assert labels(index.search("lov", 2)) == ["lovezzzz", "love00000"]
+    assert labels(index.search("love", 2)) == ["lovezzzz", "love00000"]
+    assert labels(index.search("love", 2, kinds={2})) == ["lovezzzz"]          # Фильтр отсеял заготовку - читаем отрезок целиком
+
+
+def test_endpoint_and_incremental_updates(db, shared_cache):
+    Artist.objects.create(name="Кино", slug="kino")
+    Genre.objects.create(name="Киберпанк", slug="cyberpunk")
+    jobs.run_pending(kinds=["autocomplete.update"])           # Снимка ещё нет - первая задача строит его целиком
+
+    client = APIClient()
+    response = client.get("/api/v1/autocomplete/", {"q": "ki"})
+    assert response.status_code == 200
+    assert {item["label"] for item in response.json()["results"]} == {"Кино", "Киберпанк"}
+    assert client.get("/api/v1/autocomplete/", {"q": "ки", "types": "genre"}).json()["results"] == [
+        {"type": "genre", "id": Genre.objects.get().pk, "label": "Киберпанк"}]
+    assert client.get("/api/v1/autocomplete/", {"q": "ки", "types": "user"}).status_code == 400
+
+    version = cache.get(autocomplete.STATE_KEY)["version"]
+    kino = Artist.objects.get()
+    kino.name = "Кино и немцы"
+    kino.save()
+    Artist.objects.create(name="Кипелов", slug="kipelov")
+    Genre.objects.get().delete()
+    jobs.run_pending(kinds=["autocomplete.update"])
+    state = cache.get(autocomplete.STATE_KEY)
+    assert state["version"] == version and len(state["delta"]) == 3        # Изменения легли в дельту, снимок прежний
+
+    autocomplete.reset()                                     # Другой воркер: снимок из кэша + дельта
+    assert labels(autocomplete.search("ки")) == ["Кипелов", "Кино и немцы"]
+    assert labels(autocomplete.search("немц")) == ["Кино и немцы"]
+
+
+def test_large_delta_publishes_new_snapshot(db, monkeypatch, shared_cache):
+    monkeypatch.setattr(autocomplete, "COMPACT_AT", 2)
+    autocomplete.publish()
+    version = cache.get(autocomplete.STATE_KEY)["version"]
+    Artist.objects.create(name="Ария", slug="aria")
+    Artist.objects.create(name="Алиса", slug="alisa")
+    jobs.run_pending(kinds=["autocomplete.update"])
+    state = cache.get(autocomplete.STATE_KEY)
+    assert state["version"] != version and state["delta"] == {}
+    assert labels(autocomplete.search("a")) == ["Ария", "Алиса"]                  # Популярность равна - короче выше
+
+
+def test_cold_cache_is_rebuilt_by_a_job_not_the_request(db, shared_cache):
+    Artist.objects.create(name="Кино", slug="kino")
+    jobs.Job.objects.all().delete()
+    assert autocomplete.search("ки") == []                  # Снимка нет - пусто, а не сборка из БД в запросе
+    autocomplete.reset()
+    autocomplete.search("ки")
+    assert jobs.Job.objects.filter(kind="autocomplete.rebuild").count() == 1
+    jobs.run_pending(kinds=["autocomplete.rebuild"])
+    autocomplete.reset()
+    assert labels(autocomplete.search("ки")) == ["Кино"]
+
+
+def test_local_cache_builds_in_process_and_applies_after_commit(transactional_db, settings):
+    settings.CACHE_SHARED = False
+    Artist.objects.create(name="Кино", slug="kino")
+    assert not jobs.Job.objects.filter(kind__startswith="autocomplete.").exists()   # Задача run_jobs писала бы в чужой LocMemCache
+    assert autocomplete.search("ки") == []
+    wait_for_local_build()
+    assert labels(autocomplete.search("ки")) == ["Кино"]
+
+    Artist.objects.create(name="Кипелов", slug="kipelov")   # Дельта - в кэше этого процесса, после коммита
+    autocomplete.reset()
+    assert labels(autocomplete.search("ки")) == ["Кино", "Кипелов"]
+
+    settings.AUTOCOMPLETE_LOCAL_TTL = 0                     # Снимок устарел - отвечаем им же и перестраиваем в фоне
+    Artist.objects.filter(name="Кино").update(name="Кино и немцы")
+    autocomplete.reset()
+    assert labels(autocomplete.search("немц")) == []
+    wait_for_local_build()
+    assert labels(autocomplete.search("немц")) == ["Кино и немцы"]
@@ -0,0 +1,105 @@
+# test_chunked_upload.py
+import os
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+from vibemusic.models import IPChangeLog, Job, Track, UploadSession
+from vibemusic.services import ip_log
+from vibemusic.utils import ip_restriction
+
+
+MP3 = b"ID3\x04\x00" + bytes(range(256)) * 40             # 10245 байт
+CHUNK = 4096
+
+
+@pytest.fixture(autouse=True)
+def storage(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path / "media")
+    settings.UPLOAD_SESSION_ROOT = str(tmp_path / "sessions")
+    settings.UPLOAD_CHUNK_MIN = 1024
+    ip_log.buffer.events.clear()
+    yield
+    ip_log.buffer.events.clear()
+
+
+@pytest.fixture
+def api(client, user):
+    client.force_login(user)
+    return client
+
+
+def put_chunk(api, session_id, offset, data):
+    return api.put(f"/api/v1/uploads/{session_id}/chunks/{offset}/", data=data, content_type="application/octet-stream")
+
+
+def test_out_of_order_chunks_assemble_into_track(api, tmp_path):
+    response = api.post("/api/v1/uploads/", {"filename": "song.mp3", "size": len(MP3), "chunk_size": CHUNK}, content_type="application/json")
+    assert response.status_code == 201
+    session = response.json()
+    assert session["chunk_count"] == 3
+
+    for offset in (8192, 0):
+        assert put_chunk(api, session["id"], offset, MP3[offset:offset + CHUNK]).status_code == 200
+    assert put_chunk(api, session["id"], 0, MP3[:CHUNK]).status_code == 200            # Повтор куска после обрыва - безопасен
+    assert api.get(f"/api/v1/uploads/{session['id']}/").json()["received"] == [0, 8192]
+    assert api.post(f"/api/v1/uploads/{session['id']}/complete/").status_code == 409     # Не хватает куска 4096
+
+    assert put_chunk(api, session["id"], 4096, MP3[4096:8192]).status_code == 200
+    response = api.post(f"/api/v1/uploads/{session['id']}/complete/")
+    assert response.status_code == 201
+
+    track = Track.objects.get(pk=response.json()["id"])
+    assert track.title == "song"
+    assert open(track.audio_file.path, "rb").read() == MP3
+    assert Job.objects.filter(kind="track.enrich", payload__track_id=track.pk).exists()   # Обычный конвейер метаданных
+    assert not os.path.exists(tmp_path / "sessions" / session["id"])
+    assert api.post(f"/api/v1/uploads/{session['id']}/complete/").json()["id"] == track.pk   # Повторный complete идемпотентен
+
+    ip_log.flush()
+    assert sum(IPChangeLog.objects.values_list("bytes_uploaded", flat=True)) >= len(MP3)   # Байты кусков учтены в журнале
+
+
+def test_chunk_validation(api):
+    session = api.post("/api/v1/uploads/", {"filename": "song.mp3", "size": len(MP3), "chunk_size": CHUNK}, content_type="application/json").json()
+    assert put_chunk(api, session["id"], 100, b"x" * CHUNK).status_code == 400           # offset не кратен куску
+    assert put_chunk(api, session["id"], 4096, b"x" * 10).status_code == 400             # Неверная длина
+    assert put_chunk(api, session["id"], 0, b"<html>" + b"x" * (CHUNK - 6)).status_code == 400   # Не аудио
+    assert api.get(f"/api/v1/uploads/{session['id']}/").json()["received"] == []
+
+    assert api.post("/api/v1/uploads/", {"filename": "a.exe", "size": 10}, content_type="application/json").status_code == 400
+
+
+def test_sessions_are_private(api, client):
+    session = api.post("/api/v1/uploads/", {"filename": "song.mp3", "size": len(MP3), "chunk_size": CHUNK}, content_type="application/json").json()
+    other = User.objects.create_user(username="other", password="123456789")
+    client.force_login(other)
+    assert client.get(f"/api/v1/uploads/{session['id']}/").status_code == 404
+    assert client.delete(f"/api/v1/uploads/{session['id']}/").status_code == 404
+    assert UploadSession.objects.get(pk=session["id"]).status == UploadSession.Status.OPEN
+
+
+def test_jwt_upload_is_accounted_after_drf_auth(client, user):
+    """LogIPMiddleware видит JWT-клиента анонимом - байты и IP учитывает сама вьюха."""
+    cache.clear()
+    token = client.post("/api/v1/token/", {"username": "artemtester", "password": "123456789"}).json()["access"]
+    auth = {"HTTP_AUTHORIZATION": f"Bearer {token}", "REMOTE_ADDR": "10.0.0.9"}
+
+    session = client.post("/api/v1/uploads/", {"filename": "song.mp3", "size": len(MP3), "chunk_size": CHUNK},
+                          content_type="application/json", **auth).json()
+    response = client.put(f"/api/v1/uploads/{session['id']}/chunks/0/", data=MP3[:CHUNK],
+                          content_type="application/octet-stream", **auth)
+    assert response.status_code == 200
+
+    ips, uploaded = ip_restriction.window_stats(user)
+    assert ips == {"10.0.0.9"} and uploaded >= CHUNK
+    assert ip_log.flush() == 2
+    assert IPChangeLog.objects.filter(user=user, ip="10.0.0.9", bytes_uploaded=CHUNK).exists()
+
+    ip_restriction.restrict(user, 120)
+    response = client.put(f"/api/v1/uploads/{session['id']}/chunks/4096/", data=MP3[4096:8192],
+                          content_type="application/octet-stream", **auth)
+    assert response.status_code == 429
+    assert 0 < int(response["Retry-After"]) <= 120
+    assert client.get(f"/api/v1/uploads/{session['id']}/", **auth).json()["received"] == [0]
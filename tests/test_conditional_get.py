@@ -0,0 +1,91 @@
+# test_conditional_get.py
+import pytest
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from vibemusic.models import Artist, Comment, Genre, Post, Track
+from vibemusic.services import counters
+
+
+@pytest.fixture(autouse=True)
+def setup(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.COUNTER_FLUSH_INTERVAL = 0
+    settings.CACHE_SHARED = True                            # Версии тегов общие, как с Redis - ETag и 304 включены
+    cache.clear()
+
+
+@pytest.fixture
+def post(user):
+    genre = Genre.objects.create(name="Рок", slug="rock")
+    artist = Artist.objects.create(name="Кино", slug="kino")
+    return Post.objects.create(title="Пост", slug="post", content="...", author=user, genre=genre, artist=artist)
+
+
+def revalidate(client, url, response):
+    with CaptureQueriesContext(connection) as queries:
+        again = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    return again, len(queries)
+
+
+def test_api_detail_answers_304_until_something_changes(post, user):
+    client = APIClient()
+    response = client.get("/api/v1/posts/post/")
+    assert response.status_code == 200 and response["ETag"].startswith('W/"')
+    assert "no-cache" in response["Cache-Control"]
+
+    again, queries = revalidate(client, "/api/v1/posts/post/", response)
+    assert again.status_code == 304 and queries == 1          # Одна выборка по slug, без сериализации
+    assert client.get("/api/v1/posts/post/", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]).status_code == 304
+
+    post.liked_by.add(user)                                   # Счётчик - UPDATE при сбросе буфера, updated_at прежний
+    counters.flush_counters()
+    changed, _ = revalidate(client, "/api/v1/posts/post/", response)
+    assert changed.status_code == 200 and changed.json()["like_count"] == 1
+    assert changed["ETag"] != response["ETag"]
+
+
+def test_api_validators_depend_on_user_and_related_objects(post, user):
+    track = Track.objects.create(title="Группа крови", artist=post.artist, audio_file=SimpleUploadedFile("a.mp3", b"x"))
+    client = APIClient()
+    response = client.get(f"/api/v1/tracks/{track.pk}/")
+    post.artist.name = "Кино и немцы"
+    post.artist.save()
+    assert revalidate(client, f"/api/v1/tracks/{track.pk}/", response)[0].status_code == 200
+
+    client.force_authenticate(user)
+    anonymous = client.get(f"/api/v1/tracks/{track.pk}/", HTTP_IF_NONE_MATCH=response["ETag"])
+    assert anonymous.status_code == 200 and "private" in anonymous["Cache-Control"]
+    assert client.get("/api/v1/tracks/abc/").status_code == 404
+
+
+def test_html_pages_for_anonymous_visitors(post, user):
+    client = Client()
+    response = client.get("/post/post/")
+    assert response.status_code == 200
+    again, queries = revalidate(client, "/post/post/", response)
+    assert again.status_code == 304 and queries == 1
+
+    Comment.objects.create(post=post, user=user, content="Класс")
+    assert revalidate(client, "/post/post/", response)[0].status_code == 200
+
+    genre_page = client.get(f"/genre/{post.genre_id}/")      # Жанр и по id, и по slug
+    assert revalidate(client, "/genre/rock/", genre_page)[0].status_code == 304
+    artist_page = client.get("/artist/kino/")
+    Track.objects.create(title="Кукушка", artist=post.artist, audio_file=SimpleUploadedFile("b.mp3", b"x"))
+    assert revalidate(client, "/artist/kino/", artist_page)[0].status_code == 200
+
+    client.force_login(user)                                  # Своя обвязка и лайки - страница без валидаторов
+    assert not client.get("/post/post/").has_header("ETag")
+
+
+def test_no_validators_without_shared_cache(post, settings):
+    settings.CACHE_SHARED = False                           # LocMemCache: смену версии в другом процессе не увидим
+    api = APIClient().get("/api/v1/posts/post/")
+    page = Client().get("/post/post/")
+    assert not api.has_header("ETag") and not page.has_header("ETag")
+    assert Client().get("/post/post/", HTTP_IF_MODIFIED_SINCE="Sun, 01 Jan 2040 00:00:00 GMT").status_code == 200
@@ -0,0 +1,112 @@
+# test_counters.py
+import pytest
+from django.core.cache import cache
+from django.db import DatabaseError
+from rest_framework.test import APIClient
+
+from vibemusic.models import Post, Reaction
+from vibemusic.services import counters
+
+
+@pytest.fixture
+def post(user):
+    return Post.objects.create(title="Тестовый пост", content="...", author=user)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_reaction_bumps_buffer_and_flush_writes_column(post, user, settings):
+    """Лайк копится в буфере и попадает в колонку только после flush."""
+    settings.COUNTER_FLUSH_INTERVAL = 3600
+    cache.add(counters.FLUSH_LOCK_KEY, 1, 3600)                 # Сброс по времени ещё не наступил
+    Reaction.objects.create(user=user, post=post)
+
+    post.refresh_from_db()
+    assert post.like_count == 0
+    assert counters.current(post, 'like_count') == 1
+
+    counters.flush_counters()
+    post.refresh_from_db()
+    assert post.like_count == 1
+    assert counters.current(post, 'like_count') == 1
+
+
+def test_failed_flush_keeps_deltas_for_next_flush(post, user, settings, monkeypatch):
+    """Упавший UPDATE не съедает дельту: следующий сброс её применяет."""
+    settings.COUNTER_FLUSH_INTERVAL = 3600
+    cache.add(counters.FLUSH_LOCK_KEY, 1, 3600)
+    Reaction.objects.create(user=user, post=post)
+
+    def broken(*args, **kwargs):
+        raise DatabaseError("connection lost")
+
+    monkeypatch.setattr(counters.search, 'bump_like_count', broken)
+    with pytest.raises(DatabaseError):
+        counters.flush_counters()
+    post.refresh_from_db()
+    assert post.like_count == 0                                 # UPDATE откатился вместе с транзакцией
+    assert counters.current(post, 'like_count') == 1
+
+    monkeypatch.undo()
+    assert counters.flush_counters() == 1
+    post.refresh_from_db()
+    assert post.like_count == 1
+    assert counters.pending(Post, [post.pk], 'like_count') == {}
+
+
+def test_liked_by_add_and_remove_keep_counter(post, user, settings):
+    settings.COUNTER_FLUSH_INTERVAL = 0                          # Сбрасываем сразу
+    post.liked_by.add(user)
+    post.refresh_from_db()
+    assert post.like_count == 1
+
+    post.liked_by.remove(user)
+    post.refresh_from_db()
+    assert post.like_count == 0
+
+
+def test_reconcile_fixes_drift(post, user):
+    Reaction.objects.create(user=user, post=post)
+    Post.objects.filter(pk=post.pk).update(like_count=42)
+
+    report = counters.reconcile_counters()
+    post.refresh_from_db()
+    assert post.like_count == 1
+    assert report['Post.like_count'] == 1
+
+
+def test_like_toggle_api_returns_buffered_count(post, user):
+    client = APIClient()
+    client.force_authenticate(user)
+
+    response = client.post('/api/v1/like/post/', {'post_id': post.id}, format='json')
+    assert response.json() == {'liked': True, 'count': 1}
+
+    response = client.post('/api/v1/like/post/', {'post_id': post.id}, format='json')
+    assert response.json() == {'liked': False, 'count': 0}
+
+
+def test_background_flusher_drains_quiet_worker(settings, monkeypatch):
+    """Без новых лайков буфер всё равно сбрасывается потоком воркера."""
+    import threading
+    flushed = threading.Event()
+    monkeypatch.setattr(counters, 'maybe_flush', flushed.set)
+    monkeypatch.setattr(counters, '_flusher', {'thread': None, 'stop': None})
+    settings.COUNTER_FLUSH_INTERVAL = 0
+    counters.start_flusher()
+    assert counters._flusher['thread'] is None                  # Сброс и так сразу - поток не нужен
+
+    settings.COUNTER_FLUSH_INTERVAL = 1
+    counters.start_flusher()
+    thread = counters._flusher['thread']
+    counters.start_flusher()
+    assert counters._flusher['thread'] is thread and thread.daemon
+    assert flushed.wait(5)
+    counters.stop_flusher()
+    thread.join(5)
+    assert not thread.is_alive()
@@ -0,0 +1,73 @@
+# test_image_download.py
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from vibemusic.utils import image_download
+
+
+JPEG = b"\xff\xd8\xff\xe0" + b"x" * 2048
+
+ROUTES = {
+    "/cover.jpg": ("image/jpeg", JPEG),
+    "/same-cover.jpg": ("image/jpeg", JPEG),
+    "/page.html": ("text/html", b"<html></html>"),
+    "/fake.jpg": ("image/jpeg", b"<html>not an image</html>"),
+    "/huge.jpg": ("image/jpeg", b"\xff\xd8\xff" + b"x" * 5000),
+    "/cover.png": ("image/png", b"\x89PNG\r\n\x1a\n" + b"x" * 100),
+    "/fake.png": ("image/png", b"\x89PNG\r\nXX" + b"x" * 100),
+    "/short.png": ("image/png", b"\x89PN"),
+}
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        content_type, body = ROUTES[self.path]
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.end_headers()                                      # Без Content-Length - лимит должен сработать при чтении
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.IMAGE_DOWNLOAD_MAX_BYTES = 4096
+
+
+def test_download_hashed_layout_and_dedupe(server, tmp_path):
+    first = image_download.download(f"{server}/cover.jpg")
+    second = image_download.download(f"{server}/same-cover.jpg")
+    assert first == second
+    parts = first.split(os.sep)
+    assert parts[0] == "images" and len(parts[1]) == 2 and len(parts[2]) == 2 and parts[3].endswith(".jpg")
+    assert open(tmp_path / first, "rb").read() == JPEG
+    assert not [n for n in os.listdir(tmp_path / "images") if n.startswith(".download-")]   # Временные файлы убраны
+
+
+@pytest.mark.parametrize("path", ["/page.html", "/fake.jpg", "/huge.jpg"])
+def test_rejected_downloads_leave_nothing(server, tmp_path, path):
+    with pytest.raises(image_download.ImageDownloadError):
+        image_download.download(server + path)
+    assert [f for _, _, files in os.walk(tmp_path) for f in files] == []
+
+
+def test_signature_split_across_chunks(server, monkeypatch):
+    monkeypatch.setattr(image_download, "CHUNK_SIZE", 3)        # Сигнатура PNG - 8 байт, приходит в трёх кусках
+    assert image_download.download(f"{server}/cover.png").endswith(".png")
+    for path in ("/fake.png", "/short.png"):
+        with pytest.raises(image_download.ImageDownloadError, match="не похоже"):
+            image_download.download(server + path)
@@ -0,0 +1,60 @@
+# test_ip_log.py
+import pytest
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import HttpResponse
+from django.urls import path
+from django.views.decorators.csrf import csrf_exempt
+
+from vibemusic.models import IPChangeLog
+from vibemusic.services import ip_log
+
+
+@csrf_exempt
+def upload(request):
+    request.POST                                            # Вьюха разбирает multipart - тело читается из потока
+    return HttpResponse("ok")
+
+
+urlpatterns = [path("api/v1/uploads/", upload)]
+
+
+@pytest.fixture(autouse=True)
+def clean_buffer(settings):
+    settings.IP_LOG_FLUSH_INTERVAL = 60                     # Поток не должен сбросить раньше, чем мы проверим буфер
+    ip_log.buffer.events.clear()
+    cache.clear()                                           # Окно IP (utils/ip_restriction.py) - холодное
+    yield
+    ip_log.buffer.events.clear()
+
+
+@pytest.mark.urls("tests.test_ip_log")
+def test_upload_request_is_buffered_with_real_byte_count(client, user, db, django_assert_num_queries):
+    client.force_login(user)
+    payload = b"x" * 10_000
+    with django_assert_num_queries(3):                      # Сессия, пользователь, прогрев окна IP - INSERT в журнал на пути запроса нет
+        response = client.post("/api/v1/uploads/", {"file": SimpleUploadedFile("a.mp3", payload)}, REMOTE_ADDR="10.0.0.7")
+    assert response.status_code == 200
+    assert not IPChangeLog.objects.exists()
+
+    assert ip_log.flush() == 1
+    entry = IPChangeLog.objects.get()
+    assert entry.user == user and entry.ip == "10.0.0.7"
+    assert entry.bytes_uploaded > len(payload)              # Весь multipart, включая заголовки частей
+
+
+@pytest.mark.urls("tests.test_ip_log")
+def test_get_and_anonymous_requests_are_not_logged(client, db):
+    client.post("/api/v1/uploads/", {"a": "b"})
+    client.get("/api/v1/uploads/")
+    assert not ip_log.buffer.events
+
+
+def test_flush_writes_batch_with_event_time(user, django_assert_num_queries):
+    for i in range(5):
+        ip_log.log_upload(user.pk, f"10.0.0.{i}", i)
+    with django_assert_num_queries(1):
+        assert ip_log.flush() == 5
+    stamps = list(IPChangeLog.objects.order_by("bytes_uploaded").values_list("timestamp", flat=True))
+    assert stamps == sorted(stamps)
+    assert ip_log.flush() == 0
@@ -0,0 +1,62 @@
+# test_ip_restriction.py
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+
+from vibemusic.models import IPChangeLog
+from vibemusic.services import ip_log
+from vibemusic.utils import ip_restriction
+
+
+@pytest.fixture(autouse=True)
+def window(settings):
+    settings.IP_CHANGE_WINDOW_HOURS = 1
+    settings.IP_CHANGE_THRESHOLD = 3
+    settings.IP_CHANGE_RESTRICTION_SECONDS = 600
+    settings.UPLOAD_WINDOW_MAX_BYTES = 0
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_threshold_of_distinct_ips_sets_restriction(user, django_assert_num_queries):
+    assert ip_restriction.check_id_changes_and_maybe_restrict(user, "10.0.0.1") == (False, 0)   # Первый вызов прогревает окно из БД
+    with django_assert_num_queries(0):                      # Дальше - только кэш
+        for _ in range(5):
+            assert ip_restriction.check_id_changes_and_maybe_restrict(user, "10.0.0.1") == (False, 0)
+        assert ip_restriction.check_id_changes_and_maybe_restrict(user, "10.0.0.2") == (False, 0)
+        restricted, ttl = ip_restriction.check_id_changes_and_maybe_restrict(user, "10.0.0.3")
+    assert restricted and ttl == 600
+    assert ip_restriction.user_has_active_restriction(user)[0]
+
+
+def test_cold_cache_falls_back_to_log(user):
+    now = timezone.now()
+    IPChangeLog.objects.create(user=user, ip="10.0.0.1", timestamp=now - timedelta(minutes=10))
+    IPChangeLog.objects.create(user=user, ip="10.0.0.2", timestamp=now - timedelta(minutes=50))
+    IPChangeLog.objects.create(user=user, ip="10.0.0.9", timestamp=now - timedelta(hours=3))     # Вне окна
+
+    ips, _ = ip_restriction.window_stats(user)
+    assert ips == {"10.0.0.1", "10.0.0.2"}
+    assert ip_restriction.check_id_changes_and_maybe_restrict(user, "10.0.0.3")[0]
+
+
+def test_uploaded_bytes_limit(user, settings):
+    settings.UPLOAD_WINDOW_MAX_BYTES = 1000
+    ip_restriction.check_id_changes_and_maybe_restrict(user, "10.0.0.1")
+    ip_restriction.record_upload_bytes(user, 600)
+    assert ip_restriction.window_stats(user)[1] == 600
+    assert not ip_restriction.check_id_changes_and_maybe_restrict(user, "10.0.0.1")[0]
+    ip_restriction.record_upload_bytes(user, 600)
+    assert ip_restriction.check_id_changes_and_maybe_restrict(user, "10.0.0.1")[0]
+
+
+def test_upload_endpoint_answers_429_when_restricted(client, user):
+    client.force_login(user)
+    ip_restriction.restrict(user, 120)
+    response = client.post("/api/v1/uploads/", {"a": "b"}, REMOTE_ADDR="10.0.0.1")
+    assert response.status_code == 429
+    assert 0 < int(response["Retry-After"]) <= 120
+    assert ip_log.flush() == 1                               # Попытка всё равно попала в журнал
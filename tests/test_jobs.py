@@ -0,0 +1,62 @@
+# test_jobs.py
+from datetime import timedelta
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+
+from vibemusic.models import Job, Track
+from vibemusic.services import jobs
+
+
+calls = []
+
+
+@jobs.handler('test.flaky', max_attempts=2)
+def flaky(job):
+    calls.append(job.attempts)
+    if job.payload.get('fail'):
+        raise RuntimeError("boom")
+
+
+@pytest.fixture(autouse=True)
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    calls.clear()
+
+
+def test_retry_with_backoff_then_fail(db):
+    job = jobs.enqueue('test.flaky', {'fail': True})
+
+    assert jobs.run_pending(worker_id='w1') == 1
+    job.refresh_from_db()
+    assert job.status == Job.Status.QUEUED and job.attempts == 1 and 'boom' in job.last_error
+    assert job.run_after > timezone.now()                       # Повтор отложен - сейчас брать нечего
+    assert jobs.claim('w1') is None
+
+    Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+    jobs.run_pending(worker_id='w1')
+    job.refresh_from_db()
+    assert job.status == Job.Status.FAILED and calls == [1, 2]
+
+
+def test_claim_is_exclusive_and_stale_lock_recovered(db, settings):
+    job = jobs.enqueue('test.flaky')
+    assert jobs.claim('w1').pk == job.pk
+    assert jobs.claim('w2') is None                             # Уже захвачена
+
+    Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT + 1))
+    assert jobs.recover_stale() == 1
+    assert jobs.run_pending(worker_id='w2') == 1
+    job.refresh_from_db()
+    assert job.status == Job.Status.DONE and job.attempts == 2
+
+
+def test_track_save_enqueues_enrichment(db):
+    track = Track.objects.create(title="Demo", audio_file=SimpleUploadedFile("demo.mp3", b"not really mp3"))
+    assert track.enrichment_status == Track.EnrichmentStatus.PENDING
+    assert Job.objects.filter(kind='track.enrich', payload__track_id=track.pk).exists()
+
+    jobs.run_pending(kinds=['track.enrich'])
+    track.refresh_from_db()
+    assert track.enrichment_status == Track.EnrichmentStatus.DONE
@@ -0,0 +1,45 @@
+# test_liked.py
+import pytest
+from django.core.cache import cache
+
+from vibemusic.models import Post, Track, Reaction
+from vibemusic.services import liked
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def posts(user):
+    return [Post.objects.create(title=f"Пост {i}", content="...", author=user) for i in range(3)]
+
+
+def test_liked_ids_warm_set_answers_without_queries(user, posts, django_assert_num_queries):
+    Reaction.objects.create(user=user, post=posts[1])
+    ids = [p.pk for p in posts]
+
+    with django_assert_num_queries(2):                          # Холодный кэш: по одному SELECT на тип
+        result = liked.liked_ids(user, {Post: ids, Track: []})
+    assert result == {Post: {posts[1].pk}, Track: set()}
+
+    with django_assert_num_queries(0):                          # Прогретый кэш - ни одного запроса
+        assert liked.liked_ids(user, {Post: ids})[Post] == {posts[1].pk}
+
+
+def test_reaction_signals_update_warm_set(user, posts):
+    liked.liked_ids(user, {Post: [posts[0].pk]})                # Прогреваем
+    reaction = Reaction.objects.create(user=user, post=posts[0])
+    assert liked.liked_ids(user, {Post: [posts[0].pk]})[Post] == {posts[0].pk}
+
+    reaction.delete()
+    assert liked.liked_ids(user, {Post: [posts[0].pk]})[Post] == set()
+
+
+def test_annotate_liked_sets_flag(user, posts):
+    posts[2].liked_by.add(user)
+    liked.annotate_liked(user, posts)
+    assert [p.liked_by_me for p in posts] == [False, False, True]
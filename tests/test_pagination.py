@@ -0,0 +1,61 @@
+# test_pagination.py
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from vibemusic.models import Post
+from vibemusic.utils.keyset import KeysetPaginator, InvalidCursor
+
+
+@pytest.fixture
+def posts(user):
+    created = [Post.objects.create(title=f"Пост {i}", slug=f"post-{i}", content="...", author=user) for i in range(7)]
+    Post.objects.filter(pk__in=[p.pk for p in created[:4]]).update(created_at=timezone.now())   # Одинаковое время - порядок решает id
+    return created
+
+
+def test_keyset_walks_forward_and_back_without_gaps(posts):
+    expected = list(Post.objects.order_by('-created_at', '-id'))
+    paginator = KeysetPaginator(Post.objects.all(), per_page=3)
+
+    seen, page, pages = [], paginator.page(), []
+    while True:
+        pages.append(page)
+        seen.extend(page)
+        if not page.has_next:
+            break
+        page = paginator.page(page.next_cursor)
+    assert seen == expected
+    assert not pages[0].has_previous and pages[-1].has_previous
+
+    back = paginator.page(pages[-1].previous_cursor)
+    assert list(back) == list(pages[-2])
+
+
+def test_keyset_rejects_garbage_cursor(posts):
+    with pytest.raises(InvalidCursor):
+        KeysetPaginator(Post.objects.all(), per_page=3).page("не-курсор")
+
+
+def test_api_posts_cursor_pagination(posts):
+    client = APIClient()
+    response = client.get('/api/v1/posts/', {'page_size': 5, 'count': 1})
+    assert response.status_code == 200
+    assert response.data['count'] == 7
+    assert len(response.data['results']) == 5 and response.data['previous'] is None
+
+    second = client.get(response.data['next'])
+    assert [p['slug'] for p in second.data['results']] == [p.slug for p in Post.objects.order_by('-created_at', '-id')[5:]]
+    assert second.data['next'] is None and second.data['previous']
+
+
+def test_api_composite_ordering(posts):
+    client = APIClient()
+    Post.objects.filter(pk__in=[p.pk for p in posts[::2]]).update(like_count=5)
+    response = client.get('/api/v1/posts/', {'ordering': '-like_count,-created_at', 'page_size': 3})
+    expected = [p.slug for p in Post.objects.order_by('-like_count', '-created_at', '-id')]
+    second = client.get(response.data['next'])
+    assert [p['slug'] for p in response.data['results'] + second.data['results']] == expected[:6]
+
+    mixed = client.get('/api/v1/posts/', {'ordering': '-like_count,created_at'})
+    assert mixed.status_code == 400 and 'ordering' in mixed.data
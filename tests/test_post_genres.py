@@ -0,0 +1,46 @@
+# test_post_genres.py
+import pytest
+
+from vibemusic.models import Artist, Genre, Post, PostGenre
+from vibemusic.services import post_genres
+
+
+@pytest.fixture
+def genres(db):
+    return {name: Genre.objects.create(name=name, slug=name) for name in ("rock", "metal", "jazz")}
+
+
+def links(post):
+    return dict(PostGenre.objects.filter(post=post).values_list("genre__name", "is_direct"))
+
+
+def test_signals_keep_membership_in_sync(user, genres):
+    artist = Artist.objects.create(name="Band", slug="band")
+    post = Post.objects.create(title="Пост", slug="post", content="...", author=user, artist=artist, genre=genres["jazz"])
+    assert links(post) == {"jazz": True}
+
+    artist.genres.add(genres["metal"])
+    genres["rock"].related_genres.add(genres["metal"])          # rock связан с metal → пост попадает в rock косвенно
+    assert links(post) == {"jazz": True, "metal": True, "rock": False}
+
+    genres["rock"].related_genres.clear()
+    genres["metal"].artists.clear()
+    assert links(post) == {"jazz": True}
+
+    genres["jazz"].delete()
+    assert links(post) == {}
+
+
+def test_genre_filter_is_single_join(user, genres):
+    artist = Artist.objects.create(name="Band", slug="band")
+    artist.genres.add(genres["rock"], genres["metal"])
+    post = Post.objects.create(title="Пост", slug="post", content="...", author=user, artist=artist, genre=genres["rock"])
+    genres["jazz"].related_genres.add(genres["rock"], genres["metal"])
+
+    queryset = Post.objects.filter(genre_links__genre=genres["jazz"])
+    assert list(queryset) == [post]                            # Несколько путей к жанру - всё равно одна строка
+    assert "DISTINCT" not in str(queryset.query)
+
+    PostGenre.objects.all().delete()
+    assert post_genres.rebuild_all() == 3
+    assert links(post) == {"rock": True, "metal": True, "jazz": False}
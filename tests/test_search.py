@@ -0,0 +1,74 @@
+# test_search.py
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework.test import APIClient
+
+from vibemusic.models import Artist, Post, SearchDocument, Track
+from vibemusic.services import jobs, search
+
+
+@pytest.fixture(autouse=True)
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+
+
+@pytest.fixture
+def catalog(user):
+    artist = Artist.objects.create(name="Кино", slug="kino")
+    posts = [
+        Post.objects.create(title="Группа крови", slug="gruppa", content="Рок из восьмидесятых", author=user, artist=artist),
+        Post.objects.create(title="Джаз вечером", slug="jazz", content="Спокойный джаз и немного рока", author=user),
+        Post.objects.create(title="Новости", slug="news", content="Ничего про музыку", author=user),
+    ]
+    track = Track.objects.create(title="Звезда по имени Солнце", artist=artist, audio_file=SimpleUploadedFile("a.mp3", b"x"))
+    return artist, posts, track
+
+
+def search_titles(path, query, **params):
+    response = APIClient().get(path, {"search": query, **params})
+    assert response.status_code == 200
+    return [item["title"] for item in response.json()["results"]], response.json()
+
+
+def test_ranked_prefix_search_over_posts(catalog):
+    titles, _ = search_titles("/api/v1/posts/", "рок")
+    assert titles == ["Группа крови", "Джаз вечером"]      # Префикс «рок» находит «рока»; обе статьи - по тексту, первая короче
+    assert search_titles("/api/v1/posts/", "кино группа")[0] == ["Группа крови"]   # Имя исполнителя входит в документ поста
+    assert search_titles("/api/v1/posts/", "ДЖАЗ!")[0] == ["Джаз вечером"]
+    assert search_titles("/api/v1/posts/", "OR \"")[0] == []                 # Операторы FTS не проходят в запрос
+    assert len(search_titles("/api/v1/posts/", "   ")[0]) == 3              # Пустой запрос - обычный список
+
+
+def test_search_pages_by_rank_cursor(user):
+    for i in range(5):
+        Post.objects.create(title=f"Блюз {i}", slug=f"blues-{i}", content="блюз " * (i + 1), author=user)
+    titles, page = search_titles("/api/v1/posts/", "блюз", page_size=2)
+    while page["next"]:
+        page = APIClient().get(page["next"]).json()
+        titles += [item["title"] for item in page["results"]]
+    assert sorted(titles) == [f"Блюз {i}" for i in range(5)]
+    assert len(set(titles)) == 5
+
+
+def test_index_follows_saves_and_deletes(catalog):
+    artist, posts, track = catalog
+    assert search_titles("/api/v1/tracks/", "солнце")[0] == ["Звезда по имени Солнце"]
+
+    artist.name = "Kino Band"
+    artist.save()
+    jobs.run_pending(kinds=["search.reindex"])               # Треки и посты исполнителя переиндексирует задача
+    assert search_titles("/api/v1/tracks/", "kino")[0] == ["Звезда по имени Солнце"]
+    assert search_titles("/api/v1/posts/", "band")[0] == ["Группа крови"]
+
+    track_id, post_id = track.pk, posts[2].pk
+    Track.objects.filter(pk=track_id).delete()                # Удаление через QuerySet тоже шлёт post_delete
+    posts[2].delete()
+    assert not SearchDocument.objects.filter(kind="track", object_id=track_id).exists()
+    assert not SearchDocument.objects.filter(kind="post", object_id=post_id).exists()
+
+
+def test_rebuild_restores_documents(catalog):
+    SearchDocument.objects.all().delete()
+    assert search_titles("/api/v1/posts/", "рок")[0] == []
+    assert search.rebuild_all(batch_size=2) == 5
+    assert search_titles("/api/v1/posts/", "рок")[0] == ["Группа крови", "Джаз вечером"]
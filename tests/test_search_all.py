@@ -0,0 +1,80 @@
+# test_search_all.py
+from datetime import timedelta
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from vibemusic.models import Artist, Genre, Post, SearchDocument, Track
+from vibemusic.services import counters, jobs, search, site_chrome
+
+
+@pytest.fixture(autouse=True)
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.COUNTER_FLUSH_INTERVAL = 0
+
+
+@pytest.fixture
+def catalog(user):
+    rock, jazz = Genre.objects.create(name="Рок", slug="rock"), Genre.objects.create(name="Джаз", slug="jazz")
+    artist = Artist.objects.create(name="Рок-группа Кино", slug="kino")
+    artist.genres.add(rock)
+    old = Post.objects.create(title="Рок вчера", slug="old", content="...", author=user, genre=rock)
+    Post.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=365))
+    search.index("post", [old.pk])
+    fresh = Post.objects.create(title="Рок сегодня", slug="fresh", content="...", author=user, genre=jazz)
+    track = Track.objects.create(title="Рок-н-ролл мёртв", artist=artist, audio_file=SimpleUploadedFile("a.mp3", b"x"))
+    site_chrome.invalidate()
+    return {"rock": rock, "jazz": jazz, "artist": artist, "old": old, "fresh": fresh, "track": track}
+
+
+def get(**params):
+    response = APIClient().get("/api/v1/search/", params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_one_pass_over_all_types_with_facets(catalog):
+    site_chrome.load()
+    with CaptureQueriesContext(connection) as queries:
+        data = get(q="рок")
+    assert len(queries) == 1                                 # Документы, ранг и фасеты - один запрос; жанры - из кэша обвязки
+    assert data["facets"]["type"] == {"post": 2, "track": 1, "artist": 1, "genre": 1}
+    assert {(g["slug"], g["count"]) for g in data["facets"]["genre"]} == {("rock", 4), ("jazz", 1)}
+    urls = {item["url"] for item in data["results"]}
+    assert {"/post/fresh/", "/artist/kino/", "/genre/rock/", f"/track/{catalog['track'].pk}/stream/"} <= urls
+
+
+def test_filters_narrow_results_but_not_their_own_facet(catalog):
+    data = get(q="рок", type="post", genre=catalog["rock"].pk)
+    assert [item["title"] for item in data["results"]] == ["Рок вчера"]
+    assert data["facets"]["type"]["track"] == 1              # Фасет типов учитывает жанр, но не фильтр типов
+    assert {g["slug"]: g["count"] for g in data["facets"]["genre"]} == {"rock": 1, "jazz": 1}
+
+
+def test_likes_and_recency_lift_results(catalog, user):
+    titles = [item["title"] for item in get(q="рок", type="post")["results"]]
+    assert titles == ["Рок сегодня", "Рок вчера"]            # Текст одинаково релевантен - свежий выше
+
+    catalog["old"].liked_by.add(user)
+    counters.flush_counters()
+    assert SearchDocument.objects.get(kind="post", object_id=catalog["old"].pk).like_count == 1
+    assert [item["title"] for item in get(q="рок", type="post")["results"]] == ["Рок вчера", "Рок сегодня"]
+
+
+def test_artist_genre_change_reaches_dependents(catalog):
+    catalog["artist"].genres.set([catalog["jazz"]])
+    jobs.run_pending(kinds=["search.reindex"])
+    track_doc = SearchDocument.objects.get(kind="track", object_id=catalog["track"].pk)
+    assert track_doc.genres == f" {catalog['jazz'].pk} "
+
+
+def test_bad_params(db):
+    client = APIClient()
+    assert client.get("/api/v1/search/", {"q": "x", "type": "user"}).status_code == 400
+    assert client.get("/api/v1/search/", {"q": "x", "limit": "many"}).status_code == 400
+    assert get(q="  ")["results"] == []
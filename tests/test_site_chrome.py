@@ -0,0 +1,31 @@
+# test_site_chrome.py
+import pytest
+from django.core.cache import cache
+from django.test import RequestFactory
+
+from vibemusic.models import Genre, SiteSettings
+from vibemusic.services import site_chrome
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    site_chrome.invalidate()
+    yield
+    cache.clear()
+
+
+def test_chrome_cached_until_genre_or_settings_change(db, django_assert_num_queries):
+    Genre.objects.create(name="rock", slug="rock")
+    site_chrome.warm()
+
+    request = RequestFactory().get('/')
+    with django_assert_num_queries(0):                          # Прогретый процесс - ни одного запроса, в т.ч. повторно в том же request
+        assert [g.name for g in site_chrome.genres(request)] == ["rock"]
+        assert site_chrome.site_settings(request) is None
+
+    Genre.objects.create(name="jazz", slug="jazz")
+    SiteSettings.objects.create()
+    with django_assert_num_queries(2):                          # Версия сменилась - перечитали жанры и настройки
+        chrome = site_chrome.get()
+    assert [g.name for g in chrome.genres] == ["jazz", "rock"] and chrome.site_settings is not None
@@ -0,0 +1,38 @@
+# test_spotify.py
+import pytest
+from django.core.cache import cache, caches
+
+from vibemusic import spotify_utils
+
+
+@pytest.fixture(autouse=True)
+def fake_spotify(settings, tmp_path):
+    settings.CACHES = {
+        **settings.CACHES,
+        'spotify': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': str(tmp_path)},
+    }
+    settings.SPOTIFY_BACKEND = 'vibemusic.spotify_utils.FakeSpotifyBackend'
+    settings.SPOTIFY_FAKE_MISSING = ['Unknown Song']
+    spotify_utils.FakeSpotifyBackend.calls = 0
+    yield
+    caches['spotify'].clear()
+
+
+def test_search_cached_by_normalized_key():
+    first = spotify_utils.search_track("Shape of You", "Ed Sheeran")
+    again = spotify_utils.search_track("  shape OF you ", "ED   SHEERAN")
+    assert again == first and first['album_name'] == "Shape of You (single)"
+    assert spotify_utils.FakeSpotifyBackend.calls == 1
+
+
+def test_not_found_is_cached_too():
+    assert spotify_utils.search_track("Unknown Song", "Nobody") is None
+    assert spotify_utils.search_track("Unknown Song", "Nobody") is None
+    assert spotify_utils.FakeSpotifyBackend.calls == 1
+
+
+def test_token_shared_through_django_cache():
+    handler = spotify_utils.DjangoCacheHandler()
+    handler.save_token_to_cache({'access_token': 'abc', 'expires_in': 3600})
+    assert spotify_utils.DjangoCacheHandler().get_cached_token()['access_token'] == 'abc'
+    cache.delete(spotify_utils.DjangoCacheHandler.key)
@@ -0,0 +1,96 @@
+# test_telegram_outbox.py
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from vibemusic.models import Post, TelegramOutbox
+from vibemusic.services import telegram_outbox
+from vibemusic.utils.telegram import TelegramConnector
+from vibemusic.utils.telegram_standin import TelegramStandin
+
+
+def make_dispatcher(standin, workers=4):
+    connector = TelegramConnector("TEST", api_base=standin.url)
+    return telegram_outbox.OutboxDispatcher(connector=connector, workers=workers)
+
+
+@pytest.fixture
+def standin():
+    server = TelegramStandin(chat_rate=1.0).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def outbox_settings(settings):
+    settings.TELEGRAM_GROUP_CHAT_ID = "-100500"
+    settings.TELEGRAM_OUTBOX_POLL_INTERVAL = 0.01
+
+
+def test_new_post_enqueues_instead_of_sending(user):
+    Post.objects.create(title="Новый пост", slug="new-post", content="...", author=user)
+    message = TelegramOutbox.objects.get()
+    assert message.chat_id == "-100500" and "Новый пост" in message.text
+    assert message.status == TelegramOutbox.Status.QUEUED
+
+
+def test_dispatcher_delivers_one_per_chat_per_tick(transactional_db, standin):
+    for chat in ("1", "2", "3"):
+        telegram_outbox.enqueue(chat, f"hi {chat}")
+    telegram_outbox.enqueue("1", "second to chat 1")
+
+    make_dispatcher(standin).run(once=True)
+
+    assert sorted(standin.delivered) == [("1", "hi 1"), ("2", "hi 2"), ("3", "hi 3")]
+    assert TelegramOutbox.objects.filter(status=TelegramOutbox.Status.SENT).count() == 3
+    assert TelegramOutbox.objects.get(text="second to chat 1").status == TelegramOutbox.Status.QUEUED  # Ждёт токена чата
+
+
+def test_429_reschedules_and_pauses_chat(transactional_db, standin, settings):
+    settings.TELEGRAM_CHAT_RATE = 100                       # Диспетчер «не знает» лимит - второе сообщение получит 429
+    standin.retry_after = 7
+    telegram_outbox.enqueue("42", "first")
+    telegram_outbox.enqueue("42", "second")
+    dispatcher = make_dispatcher(standin)
+    dispatcher.run(once=True)
+
+    assert standin.delivered == [("42", "first")] and standin.stats["429"] == 1
+    second = TelegramOutbox.objects.get(text="second")
+    assert second.status == TelegramOutbox.Status.QUEUED and second.attempts == 1
+    assert (second.next_attempt_at - timezone.now()).total_seconds() > 5
+    assert dispatcher.chat_bucket("42").wait_time() > 5
+
+
+def test_chat_waits_for_its_backing_off_head(transactional_db, standin):
+    first = telegram_outbox.enqueue("5", "first")
+    telegram_outbox.enqueue("5", "second")
+    TelegramOutbox.objects.filter(pk=first.pk).update(attempts=1, next_attempt_at=timezone.now() + timedelta(minutes=1))
+    make_dispatcher(standin).run(once=True)
+    assert standin.delivered == []                          # Второе не обгоняет первое, ждущее повтора
+
+    TelegramOutbox.objects.filter(pk=first.pk).update(next_attempt_at=timezone.now())
+    make_dispatcher(standin).run(once=True)
+    assert standin.delivered == [("5", "first")]
+
+
+def test_5xx_retries_then_fails(transactional_db, standin, settings):
+    settings.TELEGRAM_OUTBOX_MAX_ATTEMPTS = 2
+    standin.fail_rate = 1.0
+    message = telegram_outbox.enqueue("7", "flaky")
+    make_dispatcher(standin).run(once=True)
+    message.refresh_from_db()
+    assert message.status == TelegramOutbox.Status.QUEUED and message.attempts == 1
+
+    TelegramOutbox.objects.filter(pk=message.pk).update(next_attempt_at=timezone.now())
+    make_dispatcher(standin).run(once=True)
+    message.refresh_from_db()
+    assert message.status == TelegramOutbox.Status.FAILED and "502" in message.last_error
+
+
+def test_4xx_fails_without_retry(transactional_db, standin):
+    message = telegram_outbox.enqueue("8", "")              # Bot API ответит 400 - повторять бессмысленно
+    make_dispatcher(standin).run(once=True)
+    message.refresh_from_db()
+    assert message.status == TelegramOutbox.Status.FAILED and message.attempts == 1
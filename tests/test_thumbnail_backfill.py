@@ -0,0 +1,70 @@
+# test_thumbnail_backfill.py
+import io
+import json
+import os
+
+import pytest
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from vibemusic.models import Artist, Job
+from vibemusic.services import thumbnail_backfill, thumbnails
+
+
+def jpeg() -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", (400, 300), (10, 120, 200)).save(out, "JPEG")
+    return out.getvalue()
+
+
+@pytest.fixture
+def artists(db, settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path / "media")
+    created = [Artist.objects.create(name=f"A{i}", slug=f"a{i}", photo=SimpleUploadedFile(f"a{i}.jpg", jpeg())) for i in range(3)]
+    Job.objects.all().delete()
+    return created
+
+
+def variant_path(artist, preset):
+    return default_storage.path(thumbnails.variant_name(artist.photo.name, preset))
+
+
+def test_backfill_writes_then_skips_up_to_date(artists):
+    stats = thumbnail_backfill.regenerate(workers=2, batch_size=2, only_fields={"Artist.photo"})
+    assert (stats.sources, stats.written, stats.skipped, stats.failed) == (3, 9, 0, 0)
+    assert all(os.path.exists(variant_path(a, p)) for a in artists for p in ("avatar", "card", "admin"))
+
+    os.utime(default_storage.path(artists[0].photo.name), (2e9, 2e9))   # Исходник новее копий - только он перестраивается
+    stats = thumbnail_backfill.regenerate(workers=1, only_fields={"Artist.photo"}, only_presets={"avatar"})
+    assert (stats.written, stats.skipped) == (1, 2)
+
+
+def test_resumes_from_checkpoint(artists, tmp_path):
+    checkpoint = tmp_path / "cp.json"
+    full = thumbnail_backfill._checkpoint_key("Artist.photo", ("avatar", "card", "admin"), False)
+    checkpoint.write_text(json.dumps({full: artists[1].pk}))
+    stats = thumbnail_backfill.regenerate(workers=1, only_fields={"Artist.photo"}, checkpoint=str(checkpoint))
+    assert stats.sources == 1 and not os.path.exists(variant_path(artists[0], "card"))
+    assert os.path.exists(variant_path(artists[2], "card"))
+    assert not checkpoint.exists()                          # Проход завершён - чекпойнт удалён
+
+
+def test_filtered_run_keeps_other_selections_progress(artists, tmp_path):
+    checkpoint = tmp_path / "cp.json"
+    full = thumbnail_backfill._checkpoint_key("Artist.photo", ("avatar", "card", "admin"), False)
+    genres = thumbnail_backfill._checkpoint_key("Genre.icon", ("icon",), False)
+    checkpoint.write_text(json.dumps({full: artists[1].pk, genres: 7}))
+    stats = thumbnail_backfill.regenerate(workers=1, only_fields={"Artist.photo"}, only_presets={"avatar"},
+                                          force=True, checkpoint=str(checkpoint))
+    assert stats.sources == 3                               # Прогресс полного прохода не относится к --preset/--force
+    assert json.loads(checkpoint.read_text()) == {full: artists[1].pk, genres: 7}
+
+
+def test_command_reports_missing_sources(artists, tmp_path):
+    os.unlink(default_storage.path(artists[0].photo.name))
+    out, err = io.StringIO(), io.StringIO()
+    call_command("regenerate_thumbnails", "--workers=1", "--field=Artist.photo", "--preset=avatar",
+                 f"--checkpoint={tmp_path / 'cp.json'}", stdout=out, stderr=err)
+    assert "записано 2" in out.getvalue() and "ошибок 1" in out.getvalue()
@@ -0,0 +1,74 @@
+# test_thumbnails.py
+import io
+
+import pytest
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template import Context, Template
+from PIL import Image
+
+from vibemusic.models import Artist, Job
+from vibemusic.services import jobs, thumbnails
+
+
+def image_bytes(size=(1200, 800), fmt="JPEG", mode="RGB") -> bytes:
+    out = io.BytesIO()
+    Image.new(mode, size, (200, 30, 30, 128) if mode == "RGBA" else (200, 30, 30)).save(out, fmt)
+    return out.getvalue()
+
+
+@pytest.fixture(autouse=True)
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.THUMBNAIL_FORMAT = "webp"
+
+
+def test_presets_crop_and_fit(db):
+    name = default_storage.save("artist_photos/wide.jpg", SimpleUploadedFile("wide.jpg", image_bytes()))
+    with default_storage.open(thumbnails.generate(name, "avatar")) as f:
+        assert Image.open(f).size == (128, 128)             # cover: обрезка до квадрата
+    with default_storage.open(thumbnails.generate(name, "admin")) as f:
+        assert Image.open(f).size == (240, 160)             # fit: пропорции сохраняются
+    assert thumbnails.generate(name, "avatar") == thumbnails.variant_name(name, "avatar")   # Повторно не строится
+
+
+def test_jpeg_output_flattens_alpha(settings):
+    settings.THUMBNAIL_FORMAT = "jpeg"
+    data = thumbnails.render(io.BytesIO(image_bytes((100, 100), "PNG", "RGBA")), thumbnails.PRESETS["icon"], "jpeg", 80)
+    assert Image.open(io.BytesIO(data)).mode == "RGB"
+
+
+def test_filter_falls_back_to_view_then_to_file(client, db):
+    artist = Artist.objects.create(name="Band", slug="band", photo=SimpleUploadedFile("band.png", image_bytes(fmt="PNG")))
+    template = Template('{% load thumbnails %}{{ artist.photo|thumbnail:"card" }}')
+    Job.objects.all().delete()                              # Задачу не выполняем - копию построит первый запрос
+
+    url = template.render(Context({"artist": artist}))
+    assert url.startswith(f"/thumbnail/card/{artist.photo.name}?s=")
+    response = client.get(url)
+    assert response.status_code == 302
+    assert template.render(Context({"artist": artist})) == response["Location"] == default_storage.url(thumbnails.variant_name(artist.photo.name, "card"))
+
+    signature = url.split("?s=")[1]
+    assert client.get(f"/thumbnail/card/{artist.photo.name}").status_code == 404          # Без подписи
+    assert client.get(f"/thumbnail/avatar/{artist.photo.name}?s={signature}").status_code == 404   # Подпись другого пресета
+    assert client.get(f"/thumbnail/huge/{artist.photo.name}?s={signature}").status_code == 404
+    assert client.get("/thumbnail/card/../secret.png").status_code == 404
+
+
+def test_variants_are_not_sources(db):
+    name = default_storage.save("artist_photos/a.jpg", SimpleUploadedFile("a.jpg", image_bytes()))
+    variant = thumbnails.generate(name, "card")
+    with pytest.raises(thumbnails.ThumbnailError):
+        thumbnails.generate(variant, "card")
+
+
+def test_save_enqueues_missing_variants(db):
+    artist = Artist.objects.create(name="Band", slug="band", photo=SimpleUploadedFile("band.jpg", image_bytes()))
+    job = Job.objects.get(kind="thumbnails.generate")
+    assert sorted(preset for _, preset in job.payload["variants"]) == ["admin", "avatar", "card"]
+    jobs.run_pending(kinds=["thumbnails.generate"])
+    assert all(default_storage.exists(thumbnails.variant_name(artist.photo.name, p)) for p in ("admin", "avatar", "card"))
+
+    artist.save()                                           # Всё уже построено - новой задачи нет
+    assert Job.objects.filter(kind="thumbnails.generate").count() == 1
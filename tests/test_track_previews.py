@@ -0,0 +1,93 @@
+# test_track_previews.py
+import io
+import os
+
+import pytest
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from vibemusic.models import Job, Track
+from vibemusic.services import api_cache, jobs, track_previews
+from vibemusic.utils import mpeg
+
+
+HEADER = b"\xff\xfb\x90\x00"                                # MPEG-1 Layer III, 128 кбит/с, 44.1 кГц: кадр 417 байт, 1152 сэмпла
+FRAME_SECONDS = 1152 / 44100
+
+
+def mp3(seconds: float, tag: bytes = b"ID3\x04\x00\x00\x00\x00\x00\x05hello") -> bytes:
+    frames = int(seconds / FRAME_SECONDS)
+    return tag + b"".join(HEADER + bytes([i % 251]) * 413 for i in range(frames)) + b"TAG".ljust(128, b"\x00")
+
+
+@pytest.fixture(autouse=True)
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.MEDIA_ACCEL_REDIRECT_PREFIX = ""
+    settings.TRACK_PREVIEW_OFFSET = 30
+    settings.TRACK_PREVIEW_SECONDS = 30
+
+
+def test_parse_header():
+    assert mpeg.parse_header(HEADER) == (417, 1152, 44100)
+    assert mpeg.parse_header(b"\xff\xfb\x92\x00") == (418, 1152, 44100)   # padding
+    assert mpeg.parse_header(b"\xff\xf3\x90\x00") == (261, 576, 22050)    # MPEG-2, 80 кбит/с
+    assert mpeg.parse_header(b"\xff\xfb\xf0\x00") is None                 # bitrate index 15
+    assert mpeg.parse_header(b"ID3\x04") is None
+
+
+def test_slice_is_frame_aligned():
+    source = io.BytesIO(mp3(90))
+    clip = io.BytesIO()
+    seconds = mpeg.slice_clip(source, clip, 30, 30)
+    data = clip.getvalue()
+    assert 30 <= seconds < 30 + FRAME_SECONDS
+    assert len(data) % 417 == 0 and data[:4] == HEADER
+    assert all(data[i:i + 4] == HEADER for i in range(0, len(data), 417))
+    assert data[4] == int(30 / FRAME_SECONDS + 0.999) % 251              # Начинается с кадра на 30-й секунде
+
+    short = io.BytesIO()
+    assert mpeg.slice_clip(io.BytesIO(mp3(10)), short, 30, 30) == pytest.approx(10, abs=FRAME_SECONDS)   # Трек короче - берём целиком
+
+
+def test_preview_job_and_view(client, db):
+    track = Track.objects.create(title="Long", audio_file=SimpleUploadedFile("long.mp3", mp3(75)))
+    assert Job.objects.filter(kind="track.preview", payload__track_id=track.pk).exists()
+    jobs.run_pending(kinds=["track.preview"])
+    track.refresh_from_db()
+    assert track.preview_file.name.startswith("previews/")
+
+    response = client.get(f"/track/{track.pk}/preview/")
+    assert response.status_code == 200
+    assert "public" in response["Cache-Control"]
+    assert int(response["Content-Length"]) == track.preview_file.size < track.audio_file.size / 2
+
+    copy = Track.objects.create(title="Copy", audio_file=SimpleUploadedFile("copy.mp3", mp3(75, tag=b"")))
+    client.get(f"/track/{copy.pk}/preview/")                             # Строится при первом запросе, файл общий по audio_hash
+    copy.refresh_from_db()
+    assert copy.preview_file.name == track.preview_file.name
+
+
+def test_non_mp3_falls_back_to_full_track(client, db):
+    track = Track.objects.create(title="Wav", audio_file=SimpleUploadedFile("a.wav", b"RIFF\x00\x00\x00\x00WAVEfmt " + b"\x00" * 100))
+    response = client.get(f"/track/{track.pk}/preview/")
+    assert response.status_code == 302 and response["Location"] == f"/track/{track.pk}/stream/"
+
+
+def test_concurrent_builds_share_one_file(db, monkeypatch, tmp_path):
+    track = Track.objects.create(title="Race", audio_file=SimpleUploadedFile("race.mp3", mp3(75)))
+    versions = api_cache.tag_versions({f"track:{track.pk}"})
+    monkeypatch.setattr(default_storage, "exists", lambda name: False)   # Оба запроса «не видят» превью друг друга
+    for _ in range(2):
+        track.preview_file.name = ""
+        assert track_previews.build_preview(track)
+    assert track.preview_file.name == track_previews.preview_name(track)
+    assert os.listdir(tmp_path / "previews") == [os.path.basename(track.preview_file.name)]
+    assert api_cache.tag_versions({f"track:{track.pk}"}) != versions
+
+
+def test_missing_audio_file_is_404(client, db):
+    track = Track.objects.create(title="Gone", audio_file=SimpleUploadedFile("gone.mp3", mp3(75)))
+    Track.objects.filter(pk=track.pk).update(preview_file="")
+    os.remove(track.audio_file.path)
+    assert client.get(f"/track/{track.pk}/preview/").status_code == 404
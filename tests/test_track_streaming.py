@@ -0,0 +1,89 @@
+# test_track_streaming.py
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from vibemusic.models import Job, Track
+from vibemusic.services.track_streaming import parse_range
+
+
+AUDIO = b"\xff\xfb\x90\x64" + bytes(range(256)) * 40      # 10244 байт
+
+
+@pytest.fixture
+def track(db, settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.MEDIA_ACCEL_REDIRECT_PREFIX = ""
+    return Track.objects.create(title="Song", audio_file=SimpleUploadedFile("song.mp3", AUDIO))
+
+
+def url(track):
+    return f"/track/{track.pk}/stream/"
+
+
+def body(response):
+    return b"".join(response.streaming_content)
+
+
+def test_parse_range():
+    assert parse_range("bytes=0-99", 1000) == (0, 99)
+    assert parse_range("bytes=900-", 1000) == (900, 999)
+    assert parse_range("bytes=-100", 1000) == (900, 999)
+    assert parse_range("bytes=990-5000", 1000) == (990, 999)
+    assert parse_range("bytes=1000-", 1000) == (1000, 1000)      # За концом файла -> 416
+    assert parse_range("bytes=0-1,5-9", 1000) is None           # Несколько диапазонов - отдаём целиком
+    assert parse_range("items=0-1", 1000) is None
+
+
+def test_full_and_partial_responses(client, track):
+    response = client.get(url(track))
+    assert response.status_code == 200
+    assert response["Accept-Ranges"] == "bytes" and response["Content-Length"] == str(len(AUDIO))
+    assert body(response) == AUDIO
+    etag = response["ETag"]
+
+    response = client.get(url(track), HTTP_RANGE="bytes=100-199")
+    assert response.status_code == 206
+    assert response["Content-Range"] == f"bytes 100-199/{len(AUDIO)}"
+    assert body(response) == AUDIO[100:200]
+
+    assert client.get(url(track), HTTP_RANGE="bytes=100-199", HTTP_IF_RANGE='"stale"').status_code == 200
+    assert client.get(url(track), HTTP_RANGE="bytes=100-199", HTTP_IF_RANGE=etag).status_code == 206
+    assert client.get(url(track), HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    response = client.get(url(track), HTTP_RANGE=f"bytes={len(AUDIO)}-")
+    assert response.status_code == 416 and response["Content-Range"] == f"bytes */{len(AUDIO)}"
+
+
+def test_accel_redirect_offload(client, track, settings):
+    settings.MEDIA_ACCEL_REDIRECT_PREFIX = "/protected-media/"
+    response = client.get(url(track), HTTP_RANGE="bytes=0-10")
+    assert response.status_code == 200                          # Range обработает nginx
+    assert response["X-Accel-Redirect"] == f"/protected-media/{track.audio_file.name}"
+    assert response.content == b""
+
+
+def test_access_check(client, track, settings):
+    settings.TRACK_STREAM_LOGIN_REQUIRED = True
+    assert client.get(url(track)).status_code == 404
+    assert client.get("/track/999999/stream/").status_code == 404
+
+
+def test_replaced_file_gets_new_hash_jobs_and_etag(client, track):
+    """Замена файла в админке: отпечаток, превью, волна и ETag - от нового файла."""
+    etag = client.get(url(track))["ETag"]
+    old_hash = track.audio_hash
+    Track.objects.filter(pk=track.pk).update(preview_file="previews/old.mp3", waveform="waveforms/old.bin", loudness=-9.0)
+    Job.objects.all().delete()
+
+    track.refresh_from_db()
+    track.audio_file = SimpleUploadedFile("other.mp3", AUDIO[::-1])
+    track.save()
+    track.refresh_from_db()
+
+    assert track.audio_hash and track.audio_hash != old_hash
+    assert not track.preview_file and not track.waveform and track.loudness is None
+    assert sorted(Job.objects.values_list("kind", flat=True)) == ["track.preview", "track.waveform"]
+
+    response = client.get(url(track), HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=etag)
+    assert response["ETag"] != etag
+    assert response.status_code == 200 and body(response) == AUDIO[::-1]      # If-Range со старым ETag - файл целиком
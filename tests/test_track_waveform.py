@@ -0,0 +1,106 @@
+# test_track_waveform.py
+import io
+import math
+import sys
+import wave
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from vibemusic.models import Track
+from vibemusic.services import jobs, track_waveform
+
+np = pytest.importorskip("numpy")
+from vibemusic.utils import waveform  # noqa: E402
+
+
+def wav(seconds: float, rate: int = 8000, width: int = 2, channels: int = 2, amplitude: float = 0.5) -> bytes:
+    t = np.arange(int(seconds * rate)) / rate
+    signal = amplitude * np.sin(2 * math.pi * 440 * t) * (t < seconds / 2)          # Вторая половина - тишина
+    ints = np.repeat(np.round(signal * (2 ** (8 * width - 1) - 1)).astype(np.int32), channels)
+    if width == 1:
+        samples = (ints + 128).astype(np.uint8).tobytes()
+    else:
+        samples = (ints << (32 - 8 * width)).astype("<i4").view(np.uint8).reshape(-1, 4)[:, 4 - width:].tobytes()   # Старшие width байт int32
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as out:
+        out.setnchannels(channels)
+        out.setsampwidth(width)
+        out.setframerate(rate)
+        out.writeframes(samples)
+    return buffer.getvalue()
+
+
+@pytest.fixture(autouse=True)
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.WAVEFORM_RESOLUTIONS = (4, 16)
+    settings.WAVEFORM_DECODER = None
+
+
+@pytest.mark.parametrize("width", [1, 2, 3])
+def test_peaks_duration_and_loudness(tmp_path, width):
+    path = tmp_path / "tone.wav"
+    path.write_bytes(wav(2.0, width=width))
+    seconds, loudness, peaks = waveform.analyze(str(path), (4, 16))
+    assert seconds == pytest.approx(2.0)
+    assert loudness == pytest.approx(20 * math.log10(0.5 / math.sqrt(2) / math.sqrt(2)), abs=0.2)   # Синус 0.5 на половине трека
+    assert peaks[4].dtype == np.int8 and peaks[4].shape == (4, 2)
+    assert peaks[4].tolist() == [[-64, 64], [-64, 64], [0, 0], [0, 0]]
+    assert waveform.unpack(waveform.pack(peaks))[16].tolist() == peaks[16].tolist()
+
+
+def test_block_boundaries_do_not_change_result(tmp_path, monkeypatch):
+    path = tmp_path / "tone.wav"
+    path.write_bytes(wav(3.0, rate=11025))
+    whole = waveform.analyze(str(path), (4, 16))
+    monkeypatch.setattr(waveform, "BLOCK_FRAMES", 1000)
+    blocked = waveform.analyze(str(path), (4, 16))
+    assert blocked[0] == whole[0] and blocked[1] == pytest.approx(whole[1])
+    assert blocked[2][16].tolist() == whole[2][16].tolist()
+
+
+def test_decoder_output_is_read_in_blocks(tmp_path, monkeypatch):
+    path = tmp_path / "tone.wav"
+    path.write_bytes(wav(3.0, rate=waveform.DECODE_RATE, channels=1))
+    whole = waveform.analyze(str(path), (4, 16))
+    decoder = tmp_path / "decoder"                          # «ffmpeg»: отдаёт PCM файла (-i <путь>) без заголовка WAV
+    decoder.write_text(f"#!{sys.executable}\nimport sys, wave\n"
+                       "r = wave.open(sys.argv[sys.argv.index('-i') + 1])\n"
+                       "sys.stdout.buffer.write(r.readframes(r.getnframes()))\n")
+    decoder.chmod(0o755)
+
+    def not_wav(f):
+        raise waveform.UnsupportedAudio("как для MP3")
+
+    monkeypatch.setattr(waveform, "_wav_blocks", not_wav)
+    monkeypatch.setattr(waveform, "BLOCK_FRAMES", 1000)
+    updates = []
+    monkeypatch.setattr(waveform.PeakAccumulator, "update",
+                        lambda self, samples, update=waveform.PeakAccumulator.update: updates.append(len(samples)) or update(self, samples))
+    decoded = waveform.analyze(str(path), (4, 16), decoder=str(decoder))
+    assert max(updates) == 1000 and sum(updates) == 3 * waveform.DECODE_RATE
+    assert decoded[0] == whole[0] and decoded[1] == pytest.approx(whole[1])
+    assert decoded[2][16].tolist() == whole[2][16].tolist()
+
+
+def test_job_fills_track_fields(db):
+    track = Track.objects.create(title="Tone", audio_file=SimpleUploadedFile("tone.wav", wav(1.0)))
+    jobs.run_pending(kinds=["track.waveform"])
+    track.refresh_from_db()
+    assert track.duration == pytest.approx(1.0)
+    assert track.loudness < 0
+    assert set(waveform.unpack(track.waveform.read())) == {4, 16}
+
+
+def test_mp3_without_decoder_records_duration_only(db, monkeypatch):
+    monkeypatch.setattr(waveform.shutil, "which", lambda name: None)
+    frame = b"\xff\xfb\x90\x00" + b"\x00" * 413
+    track = Track.objects.create(title="Mp3", audio_file=SimpleUploadedFile("a.mp3", frame * 100))
+    jobs.run_pending(kinds=["track.waveform"])
+    track.refresh_from_db()
+    assert track.duration == pytest.approx(100 * 1152 / 44100, abs=0.01)
+    assert not track.waveform and track.loudness is None
+
+    Track.objects.filter(pk=track.pk).update(duration=None)                       # Заголовок не дал длительность - считаем по кадрам
+    assert track_waveform.build_waveform(Track.objects.get(pk=track.pk)) == ["duration"]
@@ -0,0 +1,79 @@
+# test_upload_handlers.py
+import hashlib
+import os
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.http import JsonResponse
+from django.urls import path
+from django.views.decorators.csrf import csrf_exempt
+
+from vibemusic.forms import CommentForm
+
+
+MP3 = b"ID3\x04\x00" + b"\x00" * 200_000
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 1000
+
+
+@csrf_exempt
+def upload(request):
+    files = {
+        name: [{"sha256": f.sha256, "size": f.size, "type": f.detected_type, "on_disk": isinstance(f, TemporaryUploadedFile),
+                "content_ok": f.read() in (MP3, PNG)} for f in request.FILES.getlist(name)]
+        for name in request.FILES
+    }
+    return JsonResponse({"files": files, "rejections": getattr(request, "upload_rejections", {})})
+
+
+urlpatterns = [
+    path("upload/", upload, name="add_post"),               # Политики полей PostForm
+    path("track/", upload, name="upload_track"),
+    path("admin/upload/", upload, name="admin_upload"),
+]
+pytestmark = pytest.mark.urls("tests.test_upload_handlers")
+
+
+@pytest.fixture(autouse=True)
+def temp_dir(settings, tmp_path):
+    settings.FILE_UPLOAD_TEMP_DIR = str(tmp_path)
+    return tmp_path
+
+
+def test_streams_to_disk_with_hash_and_type(client):
+    data = client.post("/upload/", {"audio_file": SimpleUploadedFile("a.mp3", MP3)}).json()
+    [info] = data["files"]["audio_file"]
+    assert info == {"sha256": hashlib.sha256(MP3).hexdigest(), "size": len(MP3), "type": "audio/mpeg", "on_disk": True, "content_ok": True}
+    assert data["rejections"] == {}
+
+
+def test_wrong_type_rejected_without_touching_other_files(client, temp_dir):
+    data = client.post("/upload/", {
+        "images": [SimpleUploadedFile("ok.png", PNG), SimpleUploadedFile("page.png", b"<html>" * 100)],
+        "tracks": SimpleUploadedFile("a.mp3", MP3),
+    }).json()
+    assert [f["type"] for f in data["files"]["images"]] == ["image/png"]
+    assert data["files"]["images"][0]["content_ok"] and data["files"]["tracks"][0]["content_ok"]   # Ранее принятые файлы не закрыты
+    assert "page.png" in data["rejections"]["images"]
+    assert os.listdir(temp_dir) == []                       # Временные файлы удалены вместе с запросом
+
+
+def test_size_limit_aborts_file(client, settings, temp_dir):
+    settings.UPLOAD_FIELD_POLICIES = {"upload_track": {"audio_file": ("audio", 64 * 1024)}}
+    data = client.post("/track/", {"audio_file": SimpleUploadedFile("a.mp3", MP3)}).json()
+    assert data["files"] == {}
+    assert "больше" in data["rejections"]["audio_file"]
+    assert os.listdir(temp_dir) == []
+
+
+def test_policies_apply_only_to_their_views(client, settings):
+    settings.UPLOAD_FIELD_POLICIES = {"upload_track": {"audio_file": ("audio", 64 * 1024)}}
+    data = client.post("/admin/upload/", {"audio_file": SimpleUploadedFile("a.mp3", MP3),
+                                          "image": SimpleUploadedFile("a.mp3", MP3)}).json()
+    assert data["rejections"] == {}                         # Админка и прочие формы - только общий лимит
+    assert data["files"]["image"][0]["type"] == "audio/mpeg" and data["files"]["audio_file"][0]["content_ok"]
+
+
+def test_form_reports_rejection_on_field():
+    form = CommentForm({"content": "hi"}, {}, upload_rejections={"image": "Файл «x.png» больше 5 МБ."})
+    assert not form.is_valid()
+    assert form.errors["image"] == ["Файл «x.png» больше 5 МБ."]
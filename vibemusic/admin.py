@@ -3,8 +3,10 @@
 # vibemusic/admin.py
 from django.contrib import admin
 from django import forms
+from django.utils import timezone
 from django.utils.html import format_html
-from .models import Genre, Artist, Post, Track, PostImage, Comment, SiteSettings
+from .models import Genre, Artist, Post, Track, PostImage, Comment, SiteSettings, Job, TelegramOutbox, UploadSession
+from .services.thumbnails import thumbnail_url
 
 
 #  Универсальный миксин для предпросмотра изображений (миниатюры)
@@ -17,7 +19,7 @@ class ImagePreviewMixin:
         if image:
             return format_html(
                 '<img src="{}" style="max-height:{}px; border-radius:6px;"/>',
-                image.url,
+                thumbnail_url(image, 'admin'),                      # Уменьшенная копия, а не оригинал в несколько МБ
                 size
             )
         return format_html('<span style="color:#888;">Нет изображения</span>')
@@ -100,10 +102,10 @@ class PostImageAdmin(ImagePreviewMixin, admin.ModelAdmin):
 # -------------------------------
 @admin.register(Track)
 class TrackAdmin(ImagePreviewMixin, admin.ModelAdmin):
-    list_display = ('title', 'artist', 'album_prev', 'created_at')
+    list_display = ('title', 'artist', 'album_prev', 'enrichment_status', 'created_at')
     search_fields = ('title', 'artist__name')
-    list_filter = ('artist', 'created_at')
-    readonly_fields = ('album_prev',)
+    list_filter = ('enrichment_status', 'artist', 'created_at')
+    readonly_fields = ('album_prev', 'enrichment_status', 'audio_hash')
 
     def album_prev(self, obj):
         return self.preview(obj, 'album_image', size=120)
@@ -129,7 +131,7 @@ class TrackInline(admin.TabularInline):
 
 @admin.register(Post)
 class PostAdmin(ImagePreviewMixin, admin.ModelAdmin):
-    list_display = ('title', 'artist', 'genre', 'created_at', 'cover_prev')
+    list_display = ('title', 'artist', 'genre', 'created_at', 'like_count', 'comment_count', 'cover_prev')
     list_filter = ('created_at', 'artist', 'genre')
     search_fields = ('title',)
     prepopulated_fields = {'slug': ('title',)}
@@ -168,6 +170,49 @@ class SiteSettingsAdmin(ImagePreviewMixin, admin.ModelAdmin):
     header_prev.short_description = "Шапка сайта"
 
 
+# -------------------------------
+# JOB ADMIN (очередь фоновых задач)
+# -------------------------------
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'attempts', 'max_attempts', 'run_after', 'locked_by', 'created_at', 'finished_at')
+    list_filter = ('status', 'kind')
+    search_fields = ('kind', 'last_error')
+    readonly_fields = ('attempts', 'locked_by', 'locked_at', 'last_error', 'created_at', 'finished_at')
+    actions = ['requeue']
+
+    @admin.action(description="Повторить выбранные задачи")
+    def requeue(self, request, queryset):
+        updated = queryset.exclude(status=Job.Status.RUNNING).update(
+            status=Job.Status.QUEUED, attempts=0, run_after=timezone.now(), finished_at=None, last_error='',
+        )
+        self.message_user(request, f"Возвращено в очередь: {updated}")
+
+
+@admin.register(TelegramOutbox)
+class TelegramOutboxAdmin(admin.ModelAdmin):
+    list_display = ('id', 'chat_id', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('chat_id', 'text', 'last_error')
+    readonly_fields = ('attempts', 'locked_at', 'last_error', 'created_at', 'sent_at')
+    actions = ['requeue']
+
+    @admin.action(description="Отправить выбранные ещё раз")
+    def requeue(self, request, queryset):
+        updated = queryset.filter(status=TelegramOutbox.Status.FAILED).update(
+            status=TelegramOutbox.Status.QUEUED, attempts=0, next_attempt_at=timezone.now(), last_error='',
+        )
+        self.message_user(request, f"Возвращено в очередь: {updated}")
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'filename', 'size', 'status', 'track', 'created_at')
+    list_filter = ('status',)
+    search_fields = ('filename', 'user__username')
+    readonly_fields = ('id', 'user', 'filename', 'size', 'chunk_size', 'track', 'created_at')
+
+
 # -------------------------------
 # CUSTOMIZATION OF ADMIN PANEL UI
 # -------------------------------
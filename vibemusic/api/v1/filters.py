@@ -0,0 +1,27 @@
+# vibemusic/api/v1/filters.py
+from rest_framework.filters import SearchFilter
+
+from vibemusic.services import search
+
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    ?search= через полнотекстовый индекс (services/search.py) вместо ILIKE по search_fields.
+    Тип документов берётся из атрибута вьюхи search_kind ('post', 'track', 'artist').
+    Результаты сортируются по релевантности; KeysetPagination берёт ключ ('-search_rank', '-id') из keyset_ordering().
+    """
+    search_description = "Полнотекстовый поиск: все слова обязательны, каждое ищется как начало слова"
+
+    def get_query(self, request):
+        return request.query_params.get(self.search_param, '')
+
+    def is_active(self, request):
+        return bool(search.terms(self.get_query(request)))
+
+    def keyset_ordering(self, request):
+        return ('-search_rank', '-id') if self.is_active(request) else None
+
+    def filter_queryset(self, request, queryset, view):
+        if not self.is_active(request):
+            return queryset
+        return search.filter_queryset(queryset, view.search_kind, self.get_query(request))
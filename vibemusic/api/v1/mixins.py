@@ -0,0 +1,145 @@
+# vibemusic/api/v1/mixins.py
+from types import SimpleNamespace
+
+from django.http import HttpResponse
+from rest_framework.exceptions import Throttled
+
+from vibemusic.middleware.ip_logger import CountingStream
+from vibemusic.services import api_cache, conditional, ip_log, liked
+from vibemusic.utils.ip import get_client_ip
+from vibemusic.utils.ip_restriction import check_id_changes_and_maybe_restrict, record_upload_bytes
+
+
+class CachedResponseMixin:
+    """
+    Кэш готовых ответов list/retrieve для анонимных GET в JSON (services/api_cache.py).
+    Попадание - один get_many из кэша, без запросов к БД и сериализации.
+    Теги записи: объекты страницы (get_cache_tags) и тег коллекции "<cache_kind>:list" у списков;
+    версии тегов фиксируются сразу после чтения объектов, запись - после рендеринга ответа.
+    """
+    cache_kind = None                                       # 'post', 'track' - префикс тегов
+
+    def get_cache_tags(self, obj) -> set:
+        return {f"{self.cache_kind}:{obj.pk}"}
+
+    def _response_cache_key(self, request):
+        if request.method != 'GET' or not api_cache.enabled() or request.user.is_authenticated:
+            return None                                     # У авторизованного своё поле liked
+        if getattr(request.accepted_renderer, 'format', None) != 'json':
+            return None                                     # Браузерный API рисует формы и кнопки - не кэшируем
+        auth = type(request.successful_authenticator).__name__ if request.successful_authenticator else 'anon'
+        return api_cache.cache_key(request, auth, request.accepted_media_type)
+
+    def _remember(self, objects, *, collection: bool):
+        if getattr(self, '_cache_key', None) is None:
+            return
+        tags = {f"{self.cache_kind}:list"} if collection else set()
+        for obj in objects:
+            tags |= self.get_cache_tags(obj)
+        self._cache_versions = api_cache.tag_versions(tags)
+
+    def _cached(self, handler, request, *args, **kwargs):
+        self._cache_key = key = self._response_cache_key(request)
+        self._cache_versions = None
+        if key is None:
+            return handler(request, *args, **kwargs)
+        entry = api_cache.get(key)
+        if entry is not None:
+            return HttpResponse(entry.content, content_type=entry.content_type, status=entry.status)
+
+        response = handler(request, *args, **kwargs)
+        versions = self._cache_versions
+        if response.status_code == 200 and versions is not None:
+            response.add_post_render_callback(
+                lambda rendered: api_cache.store(key, rendered.content, rendered['Content-Type'], rendered.status_code, versions))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._cached(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached(super().retrieve, request, *args, **kwargs)
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        self._remember(page if page is not None else queryset, collection=True)
+        return page
+
+    def get_object(self):
+        obj = super().get_object()
+        self._remember([obj], collection=False)
+        return obj
+
+
+class ConditionalRetrieveMixin:
+    """
+    ETag/Last-Modified для retrieve (services/conditional.py): повторный запрос с If-None-Match
+    стоит одной выборки по индексу lookup_field и похода в кэш; ответ 304 без сериализации.
+    Теги - те же, что у кэша ответов (get_cache_tags), по строке из conditional_fields.
+    Только с общим кэшем (conditional.enabled).
+    """
+    conditional_fields = ('pk', 'updated_at')
+
+    def get_validators(self, request):
+        if not conditional.enabled():                       # LocMemCache: версии тегов из других процессов не видны
+            return None
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        model = self.queryset.model
+        row = conditional.lookup(model._default_manager, self.conditional_fields,
+                                 **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        if row is None:
+            return None
+        extra = ()
+        if request.user.is_authenticated:                   # Поле liked - своё у каждого пользователя
+            extra = (request.user.pk, row['pk'] in liked.liked_ids(request.user, {model: [row['pk']]})[model])
+        return conditional.compute(row, self.get_cache_tags(SimpleNamespace(**row)), extra)
+
+    def retrieve(self, request, *args, **kwargs):
+        validators = self.get_validators(request)
+        if validators is None:
+            return super().retrieve(request, *args, **kwargs)
+        response = conditional.not_modified(request, validators)
+        if response is not None:
+            return response
+        response = super().retrieve(request, *args, **kwargs)
+        return conditional.apply(response, validators, private=request.user.is_authenticated)
+
+
+class UploadAccountingMixin:
+    """
+    Учёт загрузок после аутентификации DRF: окно IP/байт (utils/ip_restriction.py) и журнал IPChangeLog.
+    LogIPMiddleware видит только пользователя сессии - клиенты с JWT и Basic для него анонимны.
+    Запросы, которые middleware уже учёл (request.upload_accounted), здесь пропускаются.
+    """
+    accounted_methods = ('POST', 'PUT')
+
+    def initialize_request(self, request, *args, **kwargs):
+        self._upload_counter = self._upload_user = None
+        stream = getattr(request, '_stream', None)
+        if (request.method in self.accounted_methods and not getattr(request, 'upload_accounted', False)
+                and stream is not None and not hasattr(request, '_body')):
+            self._upload_counter = request._stream = CountingStream(stream)     # Тело ещё не прочитано - считаем байты по мере чтения
+        return super().initialize_request(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (request.method not in self.accounted_methods or not request.user.is_authenticated
+                or getattr(request._request, 'upload_accounted', False)):
+            return
+        ip = get_client_ip(request._request)
+        restricted, retry_after = check_id_changes_and_maybe_restrict(request.user, ip)
+        if restricted:                                      # Слишком много разных IP/байт за окно - тело даже не читаем
+            if ip:
+                ip_log.log_upload(request.user.pk, ip, 0)
+            raise Throttled(wait=retry_after, detail="Загрузки временно ограничены из-за частой смены IP.")
+        self._upload_user, self._upload_ip = request.user, ip
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        user = getattr(self, '_upload_user', None)
+        if user is not None:
+            counter = self._upload_counter
+            bytes_uploaded = counter.bytes_read if counter else len(getattr(request._request, '_body', b''))
+            record_upload_bytes(user, bytes_uploaded)
+            if self._upload_ip:
+                ip_log.log_upload(user.pk, self._upload_ip, bytes_uploaded)     # Только в очередь процесса, как в middleware
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,109 @@
+# vibemusic/api/v1/pagination.py
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from vibemusic.utils.keyset import DEFAULT_ORDERING, InvalidCursor, KeysetPaginator, estimate_count
+
+
+class KeysetPagination(BasePagination):
+    """
+    Курсорная пагинация по (created_at, id) для всех списков API v1.
+
+    ?cursor=... - позиция (непрозрачная строка из next/previous),
+    ?page_size=N - размер страницы (не больше max_page_size),
+    ?count=1 - добавить в ответ приблизительное общее число объектов.
+    """
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    ordering = DEFAULT_ORDERING                                             # Переопределяется во вьюхе атрибутом keyset_ordering
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Сортировка из ?ordering= (OrderingFilter), иначе от фильтра с keyset_ordering() (поиск - по рангу),
+        иначе keyset_ordering вьюхи, иначе (created_at, id).
+        К пользовательской сортировке добавляется id - ключ должен быть уникальным.
+        Несколько полей (?ordering=a,b) - составной ключ; разные направления keyset не умеет - 400.
+        """
+        backends = getattr(view, 'filter_backends', [])
+        for backend in backends:
+            if issubclass(backend, OrderingFilter) and request.query_params.get(backend.ordering_param):
+                ordering = tuple(backend().get_ordering(request, queryset, view) or ())
+                if ordering:
+                    descending = {name.startswith('-') for name in ordering}
+                    if len(descending) != 1:
+                        raise ValidationError({backend.ordering_param: "Все поля сортировки должны иметь одно направление."})
+                    fields = tuple(name for name in ordering if name.lstrip('-') != 'id')
+                    return fields + ('-id' if descending.pop() else 'id',)
+        for backend in backends:
+            ordering = backend().keyset_ordering(request) if hasattr(backend, 'keyset_ordering') else None
+            if ordering:
+                return ordering
+        return tuple(getattr(view, 'keyset_ordering', self.ordering))
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_queryset = queryset
+        paginator = KeysetPaginator(queryset, self.get_page_size(request), self.get_ordering(request, queryset, view))
+        try:
+            self.page = paginator.page(request.query_params.get(self.cursor_query_param))
+        except InvalidCursor:
+            raise NotFound("Неверный курсор.")
+        return list(self.page)
+
+    def _link(self, cursor):
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        return self._link(self.page.next_cursor)
+
+    def get_previous_link(self):
+        return self._link(self.page.previous_cursor)
+
+    def get_paginated_response(self, data):
+        payload = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.request.query_params.get(self.count_query_param) in ('1', 'true'):
+            payload = {'count': estimate_count(self.base_queryset), **payload}   # COUNT только по запросу клиента
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'count': {'type': 'integer', 'example': 123, 'description': 'Только с ?count=1, приблизительно'},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {'name': self.cursor_query_param, 'required': False, 'in': 'query',
+             'description': 'Курсор страницы (из next/previous)', 'schema': {'type': 'string'}},
+            {'name': self.page_size_query_param, 'required': False, 'in': 'query',
+             'description': f'Размер страницы (до {self.max_page_size})', 'schema': {'type': 'integer'}},
+            {'name': self.count_query_param, 'required': False, 'in': 'query',
+             'description': '1 - вернуть приблизительное общее число', 'schema': {'type': 'integer'}},
+        ]
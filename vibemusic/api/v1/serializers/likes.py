@@ -0,0 +1,37 @@
+# vibemusic/api/v1/serializers/likes.py
+from rest_framework import serializers
+from django.db.models.manager import BaseManager
+
+from vibemusic.services import liked
+
+
+class LikedListSerializer(serializers.ListSerializer):
+    """
+    ListSerializer, который перед сериализацией страницы одним походом в кэш
+    узнаёт, какие объекты лайкнул текущий пользователь, и кладёт ответ в context['liked_ids'].
+    """
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, BaseManager) else data)     # Менеджер (nested many=True) → список
+        request = self.context.get('request')
+        model = self.child.Meta.model
+        found = liked.liked_ids(getattr(request, 'user', None), {model: [obj.pk for obj in items]})
+        self.context.setdefault('liked_ids', {})[model] = found[model]          # context общий у list- и child-сериализатора
+        return super().to_representation(items)
+
+
+class LikedFieldMixin:
+    """
+    Поле liked для сериализаторов Post/Track/Comment.
+    В списке ответ берётся из заранее собранного множества, для одиночного объекта - одна проверка в кэше.
+    """
+
+    def get_liked(self, obj):
+        request = self.context.get('request')
+        user = getattr(request, 'user', None)
+        if not user or not user.is_authenticated:
+            return False
+        page_liked = self.context.get('liked_ids', {}).get(type(obj))
+        if page_liked is None:
+            page_liked = liked.liked_ids(user, {type(obj): [obj.pk]})[type(obj)]
+        return obj.pk in page_liked
@@ -2,14 +2,16 @@
 from rest_framework import serializers
 from vibemusic.models import Profile
 from .auth import UserSerializer
+from .thumbnails import ThumbnailsField
 
 
 class ProfileSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     following_count = serializers.IntegerField(source='following.count', read_only=True)
     followers_count = serializers.IntegerField(source='followers.count', read_only=True)
+    photo_thumbs = ThumbnailsField(('avatar', 'icon'), source='photo')
 
     class Meta:
         model = Profile
-        fields = ['user', 'photo', 'telegram_username', 'following_count', 'followers_count']
+        fields = ['user', 'photo', 'photo_thumbs', 'telegram_username', 'following_count', 'followers_count']
         read_only_fields = ['following_count', 'followers_count']
\ No newline at end of file
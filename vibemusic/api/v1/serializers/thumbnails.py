@@ -0,0 +1,20 @@
+# vibemusic/api/v1/serializers/thumbnails.py
+from rest_framework import serializers
+
+from vibemusic.services.thumbnails import thumbnail_url
+
+
+class ThumbnailsField(serializers.Field):
+    """{пресет: абсолютный URL уменьшенной копии} для ImageField; None, если изображения нет."""
+
+    def __init__(self, presets, **kwargs):
+        self.presets = tuple(presets)
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, fieldfile):
+        if not fieldfile:
+            return None
+        request = self.context.get('request')
+        urls = {preset: thumbnail_url(fieldfile, preset) for preset in self.presets}
+        return {preset: request.build_absolute_uri(url) if request else url for preset, url in urls.items()}
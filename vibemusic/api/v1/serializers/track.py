@@ -1,21 +1,30 @@
+from django.urls import reverse
 from rest_framework import serializers
 from vibemusic.models import Track, Artist
+from .likes import LikedFieldMixin, LikedListSerializer
+from .thumbnails import ThumbnailsField
 
 
 class ArtistSerializer(serializers.ModelSerializer):
+    photo_thumbs = ThumbnailsField(('avatar', 'card'), source='photo')
+
     class Meta:
         model = Artist
-        fields = ['id', 'name', 'slug', 'photo']                # Не ID, а полный объект артиста - фронтенд получает сразу:
+        fields = ['id', 'name', 'slug', 'photo', 'photo_thumbs']                # Не ID, а полный объект артиста - фронтенд получает сразу:
 
 
-class TrackSerializer(serializers.ModelSerializer):
+class TrackSerializer(LikedFieldMixin, serializers.ModelSerializer):
     artist = ArtistSerializer(read_only=True)                   # Вложенный сериализатор для артиста, только для чтения (не изменяется через TrackSerializer)
-    liked = serializers.SerializerMethodField()                 # Поле для динамического вычисления, лайкнул ли текущий пользователь трек. будет вычисляться методом
+    liked = serializers.SerializerMethodField()                 # Поле для динамического вычисления, лайкнул ли текущий пользователь трек. будет вычисляться методом get_liked из LikedFieldMixin
+    album_thumbs = ThumbnailsField(('cover',), source='album_image')
+    preview_url = serializers.SerializerMethodField()           # 30-секундный фрагмент для карточек ленты вместо полного audio_file
 
     class Meta:
         model = Track
-        fields = ['id', 'title', 'artist', 'audio_file', 'album_image', 'liked']    # Meta просто описывает модель и поля
+        fields = ['id', 'title', 'artist', 'audio_file', 'album_image', 'album_thumbs', 'preview_url', 'waveform', 'duration', 'loudness', 'bitrate', 'sample_rate', 'channels', 'codec', 'like_count', 'liked', 'enrichment_status']    # Meta просто описывает модель и поля; enrichment_status - состояние фоновой задачи track.enrich
+        list_serializer_class = LikedListSerializer             # Лайки всей страницы - одним запросом в кэш
 
-    def get_liked(self, obj):                                   # Метод принадлежит TrackSerializer, вычисляет, лайкнул ли текущий пользователь трек
-        user = self.context['request'].user                     # Берём текущего пользователя, который сделал запрос. Если пользователь авторизован — это объект User, иначе AnonymousUser.
-        return user.is_authenticated and obj.liked_by.filter(id=user.id).exists()   # Возвращает True, если пользователь авторизован и уже лайкнул трек, иначе False.
\ No newline at end of file
+    def get_preview_url(self, obj):
+        url = reverse('vibemusic:track_preview', kwargs={'pk': obj.pk})
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
@@ -0,0 +1,17 @@
+# vibemusic/api/v1/serializers/upload.py
+from rest_framework import serializers
+from vibemusic.models import UploadSession
+from vibemusic.services import chunked_uploads
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    received = serializers.SerializerMethodField()              # Offset'ы уже принятых кусков - клиент докачивает только недостающие
+    chunk_size = serializers.IntegerField(required=False, min_value=1)
+
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'filename', 'title', 'size', 'chunk_size', 'chunk_count', 'status', 'received', 'track', 'created_at']
+        read_only_fields = ['id', 'chunk_count', 'status', 'received', 'track', 'created_at']
+
+    def get_received(self, obj):
+        return chunked_uploads.received_offsets(obj) if obj.status == UploadSession.Status.OPEN else []
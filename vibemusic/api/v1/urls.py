@@ -4,15 +4,21 @@ from rest_framework.routers import DefaultRouter        # Импортируем
 from .views.post import PostViewSet                     # Путь к PostViewSet/api/v1/post.py
 from .views.track import TrackViewSet     
 from .views.like import LikeViewSet       
+from .views.upload import UploadViewSet
+from .views.autocomplete import AutocompleteView
+from .views.search import SearchView
 
 
 router = DefaultRouter()
 router.register(r'posts', PostViewSet)                  # Регистрируем маршрут 'posts' для PostViewSet, чтобы DRF автоматически создавал URL для операций с постами (raw string)
 router.register(r'tracks', TrackViewSet)
 router.register(r'like', LikeViewSet, basename='like')  # Регистрируем маршрут 'like' для LikeViewSet с указанием базового имени 'like'; DRF будет автоматически создавать URL для операций с лайками
+router.register(r'uploads', UploadViewSet, basename='upload')   # Докачиваемая загрузка треков кусками (views/upload.py)
 
 urlpatterns = [
     path('', include(router.urls)),                     # Подключаем все маршруты, созданные DefaultRouter, чтобы они стали доступными по URL текущего приложения
+    path('autocomplete/', AutocompleteView.as_view(), name='autocomplete'),   # Подсказки по префиксу из индекса в памяти (services/autocomplete.py)
+    path('search/', SearchView.as_view(), name='search'),                     # Общий поиск с рангом и фасетами (services/search.py)
 ]
 
 
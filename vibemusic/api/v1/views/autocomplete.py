@@ -0,0 +1,27 @@
+# api/v1/views/autocomplete.py
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from vibemusic.services import autocomplete
+
+
+class AutocompleteView(APIView):
+    """
+    Подсказки по мере ввода: /api/v1/autocomplete/?q=кин&types=artist,genre&limit=8
+    Ответ строится по индексу в памяти воркера (services/autocomplete.py), БД не трогается.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        types = [name for name in request.query_params.get('types', '').split(',') if name]
+        unknown = set(types) - set(autocomplete.KINDS)
+        if unknown:
+            return Response({'error': f"Неизвестные типы: {', '.join(sorted(unknown))}"}, status=400)
+        try:
+            limit = int(request.query_params.get('limit', 10))
+        except ValueError:
+            return Response({'error': 'limit должен быть числом'}, status=400)
+        entries = autocomplete.search(query, kinds=types or None, limit=limit)
+        return Response({'results': [autocomplete.as_dict(entry) for entry in entries]})
@@ -4,21 +4,26 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
-from vibemusic.models import Post, Track, Comment
+from vibemusic.models import Post, Track, Comment, Reaction
+from vibemusic.services import counters
 
 
 class LikeViewSet(viewsets.ViewSet):
     permission_classes = [IsAuthenticated]
 
     def _toggle(self, request, obj):
-        """Универсальная функция переключения лайка"""
+        """
+        Универсальная функция переключения лайка.
+        Reaction создаётся/удаляется напрямую - сигналы Reaction двигают like_count через буфер
+        и обновляют liked-множество пользователя в кэше (services/liked.py),
+        а count в ответе = колонка + ещё не сброшенная дельта (без COUNT(*) по Reaction).
+        """
         user = request.user
-        if obj.liked_by.filter(id=user.id).exists():
-            obj.liked_by.remove(user)
-            return {'liked': False, 'count': obj.liked_by.count()}
-        else:
-            obj.liked_by.add(user)
-            return {'liked': True, 'count': obj.liked_by.count()}
+        target = {obj._meta.model_name: obj}                # {'post': post} / {'track': track} / {'comment': comment}
+        deleted, _ = Reaction.objects.filter(user=user, **target).delete()
+        if not deleted:
+            Reaction.objects.get_or_create(user=user, **target)    # Двойной тап: параллельный запрос уже создал строку - считаем лайкнутым, а не 500
+        return {'liked': not deleted, 'count': counters.current(obj, 'like_count')}
 
     @action(detail=False, methods=['post'])
     def post(self, request):
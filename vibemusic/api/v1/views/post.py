@@ -1,21 +1,31 @@
 # api/v1/views/post.py
 
 
-from rest_framework import viewsets, filters                                # Импортируем базовые классы для ViewSet и фильтры поиска и сортировки
+from rest_framework import viewsets, filters                                # Импортируем базовые классы для ViewSet и фильтр сортировки
 from vibemusic.models import Post
+from vibemusic.services.api_cache import object_tags
+from ..filters import FullTextSearchFilter                                  # ?search= по полнотекстовому индексу
+from ..mixins import CachedResponseMixin, ConditionalRetrieveMixin          # Кэш ответов для анонимов с инвалидацией по тегам; ETag/304 для карточки
 from ..serializers.post import PostSerializer                               # Импорт сериализатора для Post
 from rest_framework.permissions import IsAuthenticatedOrReadOnly            # Импорт права доступа: авторизованный может писать, все могут читать
 
 
-class PostViewSet(viewsets.ReadOnlyModelViewSet):                           # ReadOnlyModelViewSet - только просмотр, нужен queryset; в like.py лайки вручную, queryset не нужен
+class PostViewSet(ConditionalRetrieveMixin, CachedResponseMixin, viewsets.ReadOnlyModelViewSet):                           # ReadOnlyModelViewSet - только просмотр, нужен queryset; в like.py лайки вручную, queryset не нужен
     # Оптимизация: .select_related жадная загрузка связей один-к-одному/многие-к-одному
     # Оптимизация: .prefetch_related жадная загрузка связей многие-ко-многим/обратные связи
     queryset = Post.objects.select_related('author', 'artist', 'genre')\
                           .prefetch_related('images', 'tracks', 'comments')\
-                          .order_by('-created_at')                          # Сортировка постов по дате создания от новых к старым
+                          .order_by('-created_at', '-id')                   # От новых к старым; (created_at, id) - ключ курсорной пагинации
     serializer_class = PostSerializer                                       # Сериализатор, который превращает объекты Post в JSON
     lookup_field = 'slug'                                                   # Позволяет получать пост по slug вместо id в URL
     permission_classes = [IsAuthenticatedOrReadOnly]                        # Права доступа: все могут читать, только авторизованные могут писать (если бы были write-методы)
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]        # Подключаем фильтры поиска и сортировки
-    search_fields = ['title', 'content', 'artist__name']                    # Поля для поиска (через ?search=)
+    filter_backends = [FullTextSearchFilter, filters.OrderingFilter]        # Подключаем фильтры поиска и сортировки
+    search_kind = 'post'                                                    # ?search= ищет по заголовку, тексту и имени исполнителя (services/search.py)
     ordering_fields = ['created_at', 'like_count']                          # Поля, по которым можно сортировать (через ?ordering=)
+    keyset_ordering = ('-created_at', '-id')                               # Курсор KeysetPagination по составному индексу; ?ordering= добавляет id к выбранному полю
+    cache_kind = 'post'                                                     # Теги записей кэша: post:<id>, post:list, artist:<id>, genre:<id>, user:<id>
+    conditional_fields = ('pk', 'updated_at', 'artist_id', 'genre_id', 'author_id', 'like_count', 'comment_count')   # ETag карточки - без JOIN и prefetch
+
+    def get_cache_tags(self, obj):
+        return (super().get_cache_tags(obj) | object_tags('artist', [obj.artist_id])
+                | object_tags('genre', [obj.genre_id]) | object_tags('user', [obj.author_id]))
@@ -0,0 +1,56 @@
+# api/v1/views/search.py
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from vibemusic.services import search, site_chrome
+
+
+class SearchView(APIView):
+    """
+    Общий поиск по постам, трекам, исполнителям и жанрам: /api/v1/search/?q=рок&type=post,track&genre=3
+    Один запрос к индексу (services/search.search_all): ранг по тексту, лайкам и свежести,
+    фасеты по типам и жанрам - из тех же документов, без отдельных COUNT.
+    """
+    permission_classes = [AllowAny]
+    default_limit = 20
+    max_limit = 50
+
+    def _int_param(self, request, name, default):
+        value = request.query_params.get(name)
+        if value in (None, ''):
+            return default
+        return int(value)                                   # ValueError -> 400 в get()
+
+    def get(self, request):
+        kinds = {name for name in request.query_params.get('type', '').split(',') if name}
+        unknown = kinds - set(search.KIND_MODELS)
+        if unknown:
+            return Response({'error': f"Неизвестные типы: {', '.join(sorted(unknown))}"}, status=400)
+        try:
+            genre = self._int_param(request, 'genre', None)
+            limit = min(max(self._int_param(request, 'limit', self.default_limit), 1), self.max_limit)
+            offset = max(self._int_param(request, 'offset', 0), 0)
+        except ValueError:
+            return Response({'error': 'genre, limit и offset должны быть числами'}, status=400)
+
+        query = request.query_params.get('q', '')
+        found = search.search_all(query, kinds=kinds or None, genre=genre, limit=limit, offset=offset)
+        genres = {g.pk: g for g in site_chrome.genres(request)}                 # Названия жанров - из кэша обвязки, без запроса
+        return Response({
+            'query': query,
+            'total': found.total,
+            'truncated': found.truncated,
+            'results': [
+                {'type': hit.kind, 'id': hit.object_id, 'title': hit.title, 'url': hit.url,
+                 'like_count': hit.like_count, 'created_at': hit.created_at, 'score': hit.score}
+                for hit in found.hits
+            ],
+            'facets': {
+                'type': found.type_facets,
+                'genre': [
+                    {'id': pk, 'name': genres[pk].name, 'slug': genres[pk].slug, 'count': count}
+                    for pk, count in found.genre_facets.items() if pk in genres      # Удалённый жанр мог остаться в документе до пересборки
+                ],
+            },
+        })
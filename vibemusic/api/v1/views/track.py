@@ -1,13 +1,22 @@
 # api/v1/views/track.py
 
-from rest_framework import viewsets, filters
+from rest_framework import viewsets
 from vibemusic.models import Track
+from vibemusic.services.api_cache import object_tags
+from ..filters import FullTextSearchFilter
+from ..mixins import CachedResponseMixin, ConditionalRetrieveMixin
 from ..serializers.track import TrackSerializer                 # Импортируем класс TrackSerializer из файла track.py, 
 
 
-class TrackViewSet(viewsets.ReadOnlyModelViewSet):
+class TrackViewSet(ConditionalRetrieveMixin, CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     # делаем один оптимизированный запрос к БД, который получает все треки и связанные с ними данные артистов
     queryset = Track.objects.select_related('artist').all()    # объединяем данные в один SQL-запрос (JOIN) с помощью select_related().
     serializer_class = TrackSerializer                          # Указываем сериализатор, который будет преобразовывать объекты Track в JSON и обратно.
-    filter_backends = [filters.SearchFilter]                    # Подключаем фильтр поиска, чтобы можно было искать объекты через query-параметр ?search= в URL.
-    search_fields = ['title', 'artist__name']                   # Указываем поля для поиска: по названию трека и имени артиста (двойное подчёркивание позволяет искать по связанным моделям).
\ No newline at end of file
+    filter_backends = [FullTextSearchFilter]                    # Подключаем фильтр поиска, чтобы можно было искать объекты через query-параметр ?search= в URL.
+    search_kind = 'track'                                       # Полнотекстовый индекс (services/search.py): название, исполнитель, альбом; результаты по релевантности.
+    keyset_ordering = ('-created_at', '-id')                    # Курсорная пагинация (KeysetPagination) по индексу (created_at, id)
+    cache_kind = 'track'                                        # Анонимные ответы кэшируются (services/api_cache.py): теги track:<id>, track:list, artist:<id>
+    conditional_fields = ('pk', 'updated_at', 'artist_id', 'like_count')   # ETag/Last-Modified карточки (services/conditional.py)
+
+    def get_cache_tags(self, obj):
+        return super().get_cache_tags(obj) | object_tags('artist', [obj.artist_id])   # В ответе вложенный исполнитель
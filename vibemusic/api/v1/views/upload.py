@@ -0,0 +1,70 @@
+# api/v1/views/upload.py
+import io
+
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from django.shortcuts import get_object_or_404
+from vibemusic.models import UploadSession
+from vibemusic.services import chunked_uploads
+from ..mixins import UploadAccountingMixin
+from ..serializers.track import TrackSerializer
+from ..serializers.upload import UploadSessionSerializer
+
+
+class UploadViewSet(UploadAccountingMixin, viewsets.ViewSet):
+    """
+    Докачиваемая загрузка трека:
+      POST   uploads/                        {filename, size[, chunk_size, title]} → сессия
+      PUT    uploads/<id>/chunks/<offset>/   тело - байты куска (любой порядок, параллельно, повторно)
+      GET    uploads/<id>/                   статус и принятые offset'ы
+      POST   uploads/<id>/complete/          склеить и создать трек
+      DELETE uploads/<id>/                   отменить
+    Байты и смена IP учитываются после аутентификации DRF (UploadAccountingMixin) - в том числе для JWT.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def _session(self, request, pk):
+        return get_object_or_404(UploadSession, pk=pk, user=request.user)     # Чужие сессии - 404
+
+    def create(self, request):
+        serializer = UploadSessionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        try:
+            session = chunked_uploads.create_session(
+                request.user, data['filename'], data['size'], data.get('chunk_size'), data.get('title', ''),
+            )
+        except chunked_uploads.ChunkedUploadError as e:
+            raise ValidationError({'detail': str(e)})
+        return Response(UploadSessionSerializer(session).data, status=status.HTTP_201_CREATED)
+
+    def retrieve(self, request, pk=None):
+        return Response(UploadSessionSerializer(self._session(request, pk)).data)
+
+    def destroy(self, request, pk=None):
+        chunked_uploads.abort(self._session(request, pk))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=True, methods=['put'], url_path=r'chunks/(?P<offset>\d+)')
+    def chunk(self, request, pk=None, offset=None):
+        session = self._session(request, pk)
+        length = request.META.get('CONTENT_LENGTH')
+        try:
+            written = chunked_uploads.write_chunk(
+                session, int(offset), request.stream or io.BytesIO(), int(length) if length else None,   # Тело читаем потоком, мимо request.body
+            )
+        except chunked_uploads.ChunkedUploadError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_409_CONFLICT if session.status != UploadSession.Status.OPEN else status.HTTP_400_BAD_REQUEST)
+        return Response({'offset': int(offset), 'size': written})
+
+    @action(detail=True, methods=['post'])
+    def complete(self, request, pk=None):
+        session = self._session(request, pk)
+        try:
+            track = chunked_uploads.complete(session)
+        except chunked_uploads.ChunkedUploadError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_409_CONFLICT)
+        return Response(TrackSerializer(track, context={'request': request}).data, status=status.HTTP_201_CREATED)
@@ -9,3 +9,9 @@ class VibemusicConfig(AppConfig):
     # Импортируем сигналы, чтобы они подхватывались при старте Django
     def ready(self):
         import vibemusic.signals # подключаем сигналы
+        import vibemusic.services.track_enrichment  # регистрируем обработчики фоновых задач (services/jobs.py)
+        import vibemusic.services.track_previews
+        import vibemusic.services.track_waveform
+        import vibemusic.services.thumbnails
+        import vibemusic.services.search
+        import vibemusic.services.autocomplete
@@ -0,0 +1,11 @@
+# vibemusic/context_processors.py
+from vibemusic.services import site_chrome
+
+
+def site_chrome_context(request):
+    """Жанры меню и настройки сайта для любого шаблона (в т.ч. страниц auth и ошибок)."""
+    chrome = site_chrome.get(request)
+    return {
+        'genres': chrome.genres,
+        'site_settings': chrome.site_settings,
+    }
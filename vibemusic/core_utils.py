@@ -9,11 +9,11 @@ from .models import *
 from django.conf import settings
 from django.contrib import messages
 from vibemusic.utils.telegram import TelegramConnector
-# для работы со Spotyfi
-from mutagen.mp3 import MP3
-from mutagen.id3 import ID3
+from vibemusic.utils.audio_metadata import read_metadata
+
 
 import logging
+import os
 import requests
 
 from django.utils import timezone  # Добавлено для current_datetime
@@ -33,10 +33,10 @@ menu = [
 class DataMixin:
 
     def get_context_menu(self, **kwargs):
-        from vibemusic.models import Genre
+        from vibemusic.services import site_chrome
         context = kwargs.copy()
         context['menu'] = menu
-        context['genres'] = Genre.objects.all()               # Cписок всех жанров из модели Genre
+        context['genres'] = site_chrome.genres(getattr(self, 'request', None))   # Cписок всех жанров - из кэша обвязки, без запроса к БД
         return context
 
     def get_paginated_comments(self, comments, request):
@@ -81,6 +81,43 @@ class ProfileContextMixin:
             context['following'] = profile.following.all()                                          # Добавляем подписки, если есть M2M поле
         return context                                                                              # Возвращаем обновлённый контекст
 
+class ConditionalGetMixin:
+    """
+    ETag/Last-Modified и 304 для DetailView (services/conditional.py): повторный визит - одна выборка
+    по уникальному индексу (conditional_fields) и поход в кэш за версиями тегов, без шаблона и связей.
+    Только для анонимов без отложенных сообщений: у авторизованного на странице свой профиль и лайки.
+    Только с общим кэшем (conditional.enabled) - иначе смену версий тегов другим процессом здесь не видно.
+    """
+    conditional_fields = ('pk', 'updated_at')
+
+    def get_validator_filters(self) -> dict:
+        return {self.slug_field: self.kwargs[self.slug_url_kwarg]}
+
+    def get_validator_tags(self, row) -> set:
+        return {f"{self.model._meta.model_name}:{row['pk']}"}
+
+    def get_validators(self):
+        from vibemusic.services import conditional, site_chrome
+        if not conditional.enabled():
+            return None                                                                             # Версии тегов не общие - 304 мог бы быть устаревшим
+        if self.request.user.is_authenticated or len(messages.get_messages(self.request)):
+            return None                                                                             # len() не помечает сообщения прочитанными
+        row = conditional.lookup(self.model._default_manager, self.conditional_fields, **self.get_validator_filters())
+        if row is None:
+            return None
+        return conditional.compute(row, self.get_validator_tags(row), (site_chrome.version(),))   # Меню жанров и настройки - на каждой странице
+
+    def get(self, request, *args, **kwargs):
+        from vibemusic.services import conditional
+        validators = self.get_validators()
+        if validators is None:
+            return super().get(request, *args, **kwargs)
+        response = conditional.not_modified(request, validators)
+        if response is not None:
+            return response
+        return conditional.apply(super().get(request, *args, **kwargs), validators)
+
+
 class UniqueSlugGenerator:
     """Класс для генерации уникальных slug'ов для моделей Django."""
 
@@ -150,22 +187,14 @@ def render_telegram_new_post_message(post, site_url):
 # ------------------------------------------------------------------------------------------------------------------------------
 def extract_metadata(audio_file):
     """
-    Извлечение метаданных из аудиофайла (MP3, FLAC, OGG).
-    Поддерживает работу с путями к файлам или объектами UploadedFile в Django.
+    Извлечение метаданных из аудиофайла (MP3, FLAC, OGG, M4A, WAV) через mutagen.File.
+    Принимает путь к файлу или FieldFile трека. Кроме тегов title/artist/album возвращает
+    duration, bitrate, sample_rate, channels и codec (см. utils/audio_metadata.py).
     """
-    try:
-        audio = MP3(audio_file, ID3=ID3)
-        title = audio.get('TIT2', [''])[0]
-        artist = audio.get('TPE1', [''])[0]
-        album = audio.get('TALB', [''])[0]
-        return {
-            'title': title,
-            'artist': artist,
-            'album': album
-        }
-    except Exception as e:
-        print(f"Ошибка при извлечении метаданных: {e}")
-        return {'title': '', 'artist': '', 'album': ''}
+    if isinstance(audio_file, (str, os.PathLike)):
+        return read_metadata(audio_file)
+    with audio_file.open('rb') as f:                           # Открываем заново: читаются только заголовок и теги
+        return read_metadata(f.file)
 
 
 
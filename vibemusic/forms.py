@@ -1,5 +1,6 @@
 # forms.py
 
+import os
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
 from django.contrib.auth.models import User
 from django import forms
@@ -10,6 +11,23 @@ from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Submit, Layout, Field
 
 
+class UploadRejectionsMixin:
+    """
+    Файлы, отброшенные ещё при приёме (utils/upload_handlers.py: лимит, чужой тип), в request.FILES не попадают.
+    Вьюха передаёт причины (request.upload_rejections) - показываем их ошибками соответствующих полей.
+    """
+
+    def __init__(self, *args, upload_rejections=None, **kwargs):
+        self.upload_rejections = upload_rejections or {}
+        super().__init__(*args, **kwargs)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        for field, message in self.upload_rejections.items():
+            self.add_error(field if field in self.fields else None, message)
+        return cleaned_data
+
+
 
 
 
@@ -127,7 +145,7 @@ class MultipleFileInput(forms.ClearableFileInput):
 
 
 
-class PostForm(forms.ModelForm):
+class PostForm(UploadRejectionsMixin, forms.ModelForm):
     images = forms.FileField(
         widget=MultipleFileInput(attrs={
             'class': 'form-control',  # Класс Bootstrap для стиля
@@ -206,10 +224,9 @@ class PostForm(forms.ModelForm):
             tracks = self.files.getlist('tracks')  # Получаем список треков
             for track in tracks:
                 track_instance = Track.objects.create(
-                    file=track,
-                    user=self.instance.author,  # Устанавливаем автора
-                    title=track.name  # Используем имя файла как заголовок (можно улучшить)
-                )  # Создаём объект Track
+                    audio_file=track,
+                    title=os.path.splitext(track.name)[0]  # Имя файла как заголовок; метаданные и обложку заполнит фоновая задача track.enrich
+                )  # Создаём объект Track (быстро: без Spotify внутри запроса)
                 post.tracks.add(track_instance)  # Добавляем к посту
             self.save_m2m()  # Сохраняем ManyToMany связи (artist, genre)
         return post  # Возвращаем пост
@@ -217,7 +234,7 @@ class PostForm(forms.ModelForm):
 
 
 # Форма для комментариев
-class CommentForm(forms.ModelForm):
+class CommentForm(UploadRejectionsMixin, forms.ModelForm):
     content = forms.CharField(
         widget=forms.Textarea(attrs={
             'class': 'form-control',
@@ -247,7 +264,7 @@ class CommentForm(forms.ModelForm):
 
 
 # Форма для загрузки трека
-class TrackUploadForm(forms.ModelForm):
+class TrackUploadForm(UploadRejectionsMixin, forms.ModelForm):
     class Meta:
         model = Track  # Используем модель Track
         fields = ['title', 'artist', 'audio_file', 'album_name']  # Поля формы трека
@@ -0,0 +1,12 @@
+# vibemusic/management/commands/cleanup_upload_sessions.py
+from django.core.management.base import BaseCommand
+
+from vibemusic.services import chunked_uploads
+
+
+class Command(BaseCommand):
+    help = "Отменить незавершённые загрузки старше UPLOAD_SESSION_TTL и удалить их куски с диска (запускать по cron)."
+
+    def handle(self, *args, **options):
+        expired = chunked_uploads.expire_stale()
+        self.stdout.write(self.style.SUCCESS(f"Удалено брошенных сессий загрузки: {expired}"))
@@ -0,0 +1,18 @@
+# vibemusic/management/commands/hash_tracks.py
+from django.core.management.base import BaseCommand
+
+from vibemusic.services import audio_dedupe
+
+
+class Command(BaseCommand):
+    help = "Посчитать audio_hash (отпечаток без ID3-тегов) у уже загруженных треков, чтобы новые загрузки находили их файлы."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help="Процессов хеширования (по умолчанию - число CPU)")
+        parser.add_argument('--batch-size', type=int, default=500, help="Треков в пачке на bulk_update")
+
+    def handle(self, *args, **options):
+        hashed, missing = audio_dedupe.backfill_hashes(workers=options['workers'], batch_size=options['batch_size'])
+        if missing:
+            self.stdout.write(self.style.WARNING(f"Файл не найден у треков: {missing}"))
+        self.stdout.write(self.style.SUCCESS(f"Посчитано отпечатков: {hashed}"))
@@ -0,0 +1,12 @@
+# vibemusic/management/commands/rebuild_autocomplete.py
+from django.core.management.base import BaseCommand
+
+from vibemusic.services import autocomplete
+
+
+class Command(BaseCommand):
+    help = "Построить снимок индекса автодополнения из БД и опубликовать его в кэше (воркеры подхватят новую версию)."
+
+    def handle(self, *args, **options):
+        version = autocomplete.publish()
+        self.stdout.write(self.style.SUCCESS(f"Индекс автодополнения опубликован, версия {version}"))
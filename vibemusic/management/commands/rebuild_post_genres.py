@@ -0,0 +1,15 @@
+# vibemusic/management/commands/rebuild_post_genres.py
+from django.core.management.base import BaseCommand
+
+from vibemusic.services import post_genres
+
+
+class Command(BaseCommand):
+    help = "Пересобрать таблицу PostGenre (принадлежность постов жанрам с учётом related_genres и жанров исполнителя)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Сколько постов пересобирать за одну транзакцию")
+
+    def handle(self, *args, **options):
+        changed = post_genres.rebuild_all(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"PostGenre пересобрана, изменено строк: {changed}"))
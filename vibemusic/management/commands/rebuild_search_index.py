@@ -0,0 +1,16 @@
+# vibemusic/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+
+from vibemusic.services import search
+
+
+class Command(BaseCommand):
+    help = "Пересобрать полнотекстовый поисковый индекс (SearchDocument) по постам, трекам и исполнителям."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Сколько объектов индексировать за одну транзакцию")
+
+    def handle(self, *args, **options):
+        total = search.rebuild_all(batch_size=options['batch_size'])
+        search.get_engine().optimize()
+        self.stdout.write(self.style.SUCCESS(f"Поисковый индекс пересобран, документов: {total}"))
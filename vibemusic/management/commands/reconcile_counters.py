@@ -0,0 +1,23 @@
+# vibemusic/management/commands/reconcile_counters.py
+from django.core.management.base import BaseCommand
+
+from vibemusic.services import counters
+
+
+class Command(BaseCommand):
+    help = "Сбросить буфер счётчиков в БД и пересчитать like_count/comment_count, исправив дрейф."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--flush-only', action='store_true', help="Только сбросить буфер, без пересчёта")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Размер пачки для bulk_update")
+
+    def handle(self, *args, **options):
+        if options['flush_only']:
+            updated = counters.flush_counters()
+            self.stdout.write(self.style.SUCCESS(f"Сброшено счётчиков: {updated}"))
+            return
+
+        report = counters.reconcile_counters(batch_size=options['batch_size'])
+        for name, fixed in report.items():
+            self.stdout.write(f"{name}: исправлено {fixed}")
+        self.stdout.write(self.style.SUCCESS("Счётчики сверены"))
@@ -0,0 +1,41 @@
+# vibemusic/management/commands/regenerate_thumbnails.py
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from vibemusic.services import thumbnail_backfill
+
+
+class Command(BaseCommand):
+    help = ("Перегенерировать миниатюры всех изображений на всех ядрах (после смены пресетов или для первого заполнения). "
+            "Актуальные копии пропускаются; прерванный запуск продолжается с чекпойнта.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help="Процессов Pillow (по умолчанию - число CPU)")
+        parser.add_argument('--batch-size', type=int, default=500, help="Объектов в пачке между сохранениями чекпойнта")
+        parser.add_argument('--preset', action='append', dest='presets', help="Только этот пресет (можно несколько раз)")
+        parser.add_argument('--field', action='append', dest='fields', help="Только это поле, например Track.album_image")
+        parser.add_argument('--force', action='store_true', help="Перестроить и актуальные копии")
+        parser.add_argument('--checkpoint', default=str(settings.BASE_DIR / 'cache' / 'thumbnails.checkpoint.json'),
+                            help="Файл прогресса для продолжения после остановки")
+        parser.add_argument('--restart', action='store_true', help="Игнорировать сохранённый прогресс")
+
+    def handle(self, *args, **options):
+        if options['restart'] and os.path.exists(options['checkpoint']):
+            os.unlink(options['checkpoint'])
+
+        def progress(key, stats):
+            self.stdout.write(f"{key}: исходников {stats.sources}, записано {stats.written}, актуальных {stats.skipped}, "
+                              f"ошибок {stats.failed} - {stats.rate:.1f} копий/с")
+
+        stats = thumbnail_backfill.regenerate(
+            workers=options['workers'], batch_size=options['batch_size'], force=options['force'],
+            only_presets=set(options['presets'] or ()), only_fields=set(options['fields'] or ()),
+            checkpoint=options['checkpoint'], progress=progress,
+            errors=lambda message: self.stderr.write(message),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Готово за {stats.elapsed:.1f} с: записано {stats.written} ({stats.rate:.1f} копий/с), "
+            f"актуальных {stats.skipped}, ошибок {stats.failed}"
+        ))
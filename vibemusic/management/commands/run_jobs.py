@@ -0,0 +1,43 @@
+# vibemusic/management/commands/run_jobs.py
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from vibemusic.services import jobs
+
+
+class Command(BaseCommand):
+    help = "Воркер очереди фоновых задач (Job). Для параллельности запускайте несколько процессов."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Выполнить готовые задачи и выйти")
+        parser.add_argument('--kind', action='append', dest='kinds', help="Брать только задачи этого типа (можно несколько раз)")
+        parser.add_argument('--worker-id', default=None, help="Имя воркера в Job.locked_by (по умолчанию host:pid)")
+
+    def handle(self, *args, **options):
+        worker_id = options['worker_id'] or jobs.default_worker_id()
+        kinds = options['kinds']
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self._stop)                                  # Докончить текущую задачу и выйти
+        signal.signal(signal.SIGINT, self._stop)
+
+        self.stdout.write(f"Воркер {worker_id} запущен, обработчики: {', '.join(jobs.registered_kinds())}")
+        jobs.recover_stale()
+        while not self.stopping:
+            close_old_connections()                                                # Долгоживущий процесс: не держим протухшие соединения
+            job = jobs.claim(worker_id, kinds)
+            if job is not None:
+                ok = jobs.run(job)
+                self.stdout.write(f"{job.kind} #{job.pk}: {'ok' if ok else 'ошибка'}")
+                continue
+            if options['once']:
+                break
+            jobs.recover_stale()                                                   # Очередь пуста - заодно подбираем задачи упавших воркеров
+            time.sleep(settings.JOBS_POLL_INTERVAL)
+        self.stdout.write(self.style.SUCCESS(f"Воркер {worker_id} остановлен"))
+
+    def _stop(self, signum, frame):
+        self.stopping = True
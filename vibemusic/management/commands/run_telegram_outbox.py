@@ -0,0 +1,23 @@
+# vibemusic/management/commands/run_telegram_outbox.py
+import signal
+
+from django.core.management.base import BaseCommand
+
+from vibemusic.services.telegram_outbox import OutboxDispatcher
+
+
+class Command(BaseCommand):
+    help = "Диспетчер исходящих сообщений Telegram (TelegramOutbox). Запускайте один процесс на бота."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Отправить всё, что готово, и выйти")
+        parser.add_argument('--workers', type=int, default=None, help="Потоков отправки (по умолчанию TELEGRAM_OUTBOX_WORKERS)")
+
+    def handle(self, *args, **options):
+        dispatcher = OutboxDispatcher(workers=options['workers'])
+        signal.signal(signal.SIGTERM, lambda *a: dispatcher.stop())               # Дослать то, что уже в полёте, и выйти
+        signal.signal(signal.SIGINT, lambda *a: dispatcher.stop())
+
+        self.stdout.write(f"Диспетчер Telegram запущен, потоков: {dispatcher.workers}")
+        dispatcher.run(once=options['once'])
+        self.stdout.write(self.style.SUCCESS("Диспетчер Telegram остановлен"))
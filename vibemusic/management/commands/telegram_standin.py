@@ -0,0 +1,33 @@
+# vibemusic/management/commands/telegram_standin.py
+from django.core.management.base import BaseCommand
+
+from vibemusic.utils.telegram_standin import TelegramStandin
+
+
+class Command(BaseCommand):
+    help = (
+        "Локальная замена Telegram Bot API для нагрузочного теста очереди. "
+        "Запустите и укажите TELEGRAM_API_BASE=http://127.0.0.1:<port> диспетчеру."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8081)
+        parser.add_argument('--global-rate', type=float, default=30.0, help="Сообщений в секунду на бота")
+        parser.add_argument('--chat-rate', type=float, default=1.0, help="Сообщений в секунду в личный чат")
+        parser.add_argument('--fail-rate', type=float, default=0.0, help="Доля случайных ответов 502")
+
+    def handle(self, *args, **options):
+        server = TelegramStandin(
+            ("127.0.0.1", options['port']),
+            global_rate=options['global_rate'],
+            chat_rate=options['chat_rate'],
+            fail_rate=options['fail_rate'],
+        )
+        self.stdout.write(f"Bot API stand-in: {server.url} (Ctrl+C - статистика и выход)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"Доставлено: {server.stats['ok']}, 429: {server.stats['429']}, 5xx: {server.stats['5xx']}")
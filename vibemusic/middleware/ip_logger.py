@@ -1,10 +1,35 @@
 from __future__ import annotations
 from typing import Callable
-from django.http import HttpRequest, HttpResponse
+from django.http import HttpRequest, HttpResponse, JsonResponse
 from django.conf import settings
 
 from ..utils.ip import get_client_ip                # Импортируем утилиту извлечения IP клиента из соседнего пакета utils/ip.py
-from ..models import IPChangeLog
+from ..services import ip_log                       # Буфер событий: запись в IPChangeLog пачками в фоне
+from ..utils.ip_restriction import check_id_changes_and_maybe_restrict, record_upload_bytes   # Скользящее окно IP/байт в кэше
+
+
+class CountingStream:
+    """
+    Обёртка над потоком тела запроса (request._stream): считает реально прочитанные байты.
+    Django читает тело через read()/readline() - этого достаточно и для форм, и для multipart.
+    """
+
+    def __init__(self, stream) -> None:
+        self.stream = stream
+        self.bytes_read = 0
+
+    def read(self, *args, **kwargs) -> bytes:
+        data = self.stream.read(*args, **kwargs)
+        self.bytes_read += len(data)
+        return data
+
+    def readline(self, *args, **kwargs) -> bytes:
+        data = self.stream.readline(*args, **kwargs)
+        self.bytes_read += len(data)
+        return data
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
 
 
 class LogIPMiddleware:
@@ -23,20 +48,39 @@ class LogIPMiddleware:
         - Этот префикс далее используется, чтобы применять логику только к путям загрузки.
         """
         self.get_response = get_response
-        self.upload_prefix: str = getattr(settings, "UPLOAD_API_PREFIX", "/api/uploads")    
+        self.upload_prefix: str = getattr(settings, "UPLOAD_API_PREFIX", "/api/uploads")
 
     def __call__(self, request: HttpRequest) -> HttpResponse:           # Принимаем HttpRequest от клиента а возврощаем HttpResponse
         user = getattr(request, "user", None)                           # Безопасно берём request.user; если атрибут отсутствует (например, отключён AuthenticationMiddleware) — получим None вместо исключения
-        if (
+        if not (
             user and getattr(user, "is_authenticated", False)           # есть user и он аутентифицирован
             and request.method in ("POST", "PUT")                       # И метод запроса которые меняются (не логируем GET и т.п.)
             and request.path.startswith(self.upload_prefix)             # путь запроса начинается с префикса загрузок (фильтруем «нужные» эндпоинты)
         ):
-            
-            ip = get_client_ip(request)                                 # Определяем IP клиента из заголовков (X-Forwarded-For → первый IP) или REMOTE_ADDR; вернёт строку IP или None    
+            return self.get_response(request)
+
+        request.upload_accounted = True                             # Вьюхи DRF с UploadAccountingMixin не учтут запрос второй раз
+        ip = get_client_ip(request)                                 # Определяем IP клиента из заголовков (X-Forwarded-For → первый IP) или REMOTE_ADDR; вернёт строку IP или None
+        restricted, retry_after = check_id_changes_and_maybe_restrict(user, ip)
+        if restricted:                                              # Слишком много разных IP/байт за окно - тело даже не читаем
             if ip:
-                # можно логировать «попытку»; финальный размер лучше писать во вью после успешной загрузки
-                IPChangeLog.objects.create(user=user, ip=ip, bytes_uploaded=0)      # Создаём запись в логе: кто (пользователь), откуда (IP), сколько байт загрузил (0)
+                ip_log.log_upload(user.pk, ip, 0)
+            response = JsonResponse(
+                {"detail": "Загрузки временно ограничены из-за частой смены IP.", "retry_after": retry_after},
+                status=429,
+            )
+            response["Retry-After"] = str(retry_after)
+            return response
+
+        stream = getattr(request, "_stream", None)
+        counter = None
+        if stream is not None and not hasattr(request, "_body"):        # Тело ещё не прочитано - считаем байты по мере чтения вьюхой
+            counter = request._stream = CountingStream(stream)
 
         response = self.get_response(request)                       # Передаём управление следующему обработчику (вьюха или следующий middleware) и получаем готовый HttpResponse
-        return response
\ No newline at end of file
+
+        bytes_uploaded = counter.bytes_read if counter else len(getattr(request, "_body", b""))
+        record_upload_bytes(user, bytes_uploaded)                   # Байты - в текущую корзину окна
+        if ip:
+            ip_log.log_upload(user.pk, ip, bytes_uploaded)          # Только в очередь процесса: INSERT сделает фоновый поток пачкой
+        return response
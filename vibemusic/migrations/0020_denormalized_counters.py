@@ -0,0 +1,61 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:58
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value, IntegerField
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    """Заполнить новые счётчики текущими значениями из Reaction/Comment."""
+    Reaction = apps.get_model('vibemusic', 'Reaction')
+    Comment = apps.get_model('vibemusic', 'Comment')
+    sources = [
+        ('Post', 'like_count', Reaction, 'post'),
+        ('Track', 'like_count', Reaction, 'track'),
+        ('Comment', 'like_count', Reaction, 'comment'),
+        ('Artist', 'like_count', Reaction, 'artist'),
+        ('Post', 'comment_count', Comment, 'post'),
+    ]
+    for model_name, field, source, fk in sources:
+        model = apps.get_model('vibemusic', model_name)
+        counted = (
+            source.objects.filter(**{fk: OuterRef('pk')})
+            .order_by().values(fk).annotate(c=Count('pk')).values('c')[:1]
+        )
+        model.objects.update(**{field: Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vibemusic', '0019_alter_activity_options_alter_artist_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artist',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Лайков'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Лайков'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Комментариев'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Лайков'),
+        ),
+        migrations.AddField(
+            model_name='track',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Лайков'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
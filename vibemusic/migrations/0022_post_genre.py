@@ -0,0 +1,92 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+BATCH = 500
+
+
+def _memberships(apps, posts):
+    """
+    {post_id: {genre_id: is_direct}} для пачки (pk, genre_id, artist_id) - копия services/post_genres.py
+    на момент миграции: прямые жанры = post.genre ∪ artist.genres, плюс жанры, у которых прямой - в related_genres.
+    """
+    Artist = apps.get_model("vibemusic", "Artist")
+    Genre = apps.get_model("vibemusic", "Genre")
+
+    artist_genres = {}
+    artist_ids = {artist_id for _, _, artist_id in posts if artist_id}
+    if artist_ids:
+        rows = Artist.genres.through.objects.filter(artist_id__in=artist_ids).values_list("artist_id", "genre_id")
+        for artist_id, genre_id in rows:
+            artist_genres.setdefault(artist_id, set()).add(genre_id)
+
+    direct = {
+        pk: ({genre_id} if genre_id else set()) | artist_genres.get(artist_id, set())
+        for pk, genre_id, artist_id in posts
+    }
+
+    related_to = {}
+    all_direct = set().union(*direct.values()) if direct else set()
+    if all_direct:
+        rows = Genre.related_genres.through.objects.filter(to_genre_id__in=all_direct).values_list("to_genre_id", "from_genre_id")
+        for to_genre, from_genre in rows:
+            related_to.setdefault(to_genre, set()).add(from_genre)
+
+    result = {}
+    for pk, genres in direct.items():
+        membership = {genre_id: False for x in genres for genre_id in related_to.get(x, ())}
+        membership.update({genre_id: True for genre_id in genres})          # Прямая связь важнее связанной
+        result[pk] = membership
+    return result
+
+
+def fill_post_genres(apps, schema_editor):
+    """Заполнить PostGenre для существующих постов (таблица только что создана - только вставки)."""
+    Post = apps.get_model("vibemusic", "Post")
+    PostGenre = apps.get_model("vibemusic", "PostGenre")
+
+    def flush(batch):
+        PostGenre.objects.bulk_create(
+            [
+                PostGenre(post_id=post_id, genre_id=genre_id, is_direct=is_direct)
+                for post_id, genres in _memberships(apps, batch).items()
+                for genre_id, is_direct in genres.items()
+            ],
+            batch_size=BATCH,
+        )
+
+    batch = []
+    for row in Post.objects.order_by("pk").values_list("pk", "genre_id", "artist_id").iterator(chunk_size=BATCH):
+        batch.append(row)
+        if len(batch) >= BATCH:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vibemusic', '0021_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostGenre',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_direct', models.BooleanField(default=True, verbose_name='Прямой жанр')),
+                ('genre', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='post_links', to='vibemusic.genre', verbose_name='Жанр')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='genre_links', to='vibemusic.post', verbose_name='Пост')),
+            ],
+            options={
+                'verbose_name': 'Жанр поста',
+                'verbose_name_plural': 'Жанры постов',
+                'constraints': [models.UniqueConstraint(fields=('genre', 'post'), name='uniq_post_genre')],
+            },
+        ),
+        migrations.RunPython(fill_post_genres, migrations.RunPython.noop),
+    ]
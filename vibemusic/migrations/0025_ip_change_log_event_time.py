@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:17
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vibemusic', '0024_telegram_outbox'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ipchangelog',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
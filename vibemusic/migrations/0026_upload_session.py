@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:23
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vibemusic', '0025_ip_change_log_event_time'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255, verbose_name='Имя файла')),
+                ('title', models.CharField(blank=True, max_length=200, verbose_name='Название трека')),
+                ('size', models.BigIntegerField(verbose_name='Размер, байт')),
+                ('chunk_size', models.PositiveIntegerField(verbose_name='Размер куска, байт')),
+                ('status', models.CharField(choices=[('open', 'Загружается'), ('complete', 'Завершена'), ('aborted', 'Отменена')], default='open', max_length=10, verbose_name='Статус')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('track', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='vibemusic.track', verbose_name='Трек')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Сессия загрузки',
+                'verbose_name_plural': 'Сессии загрузки',
+                'indexes': [models.Index(fields=['status', 'created_at'], name='vibemusic_u_status_6879b7_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vibemusic', '0026_upload_session'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='track',
+            name='audio_hash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64, verbose_name='Отпечаток аудио'),
+        ),
+    ]
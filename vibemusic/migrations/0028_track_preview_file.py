@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vibemusic', '0027_track_audio_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='track',
+            name='preview_file',
+            field=models.FileField(blank=True, editable=False, upload_to='previews/', verbose_name='Превью'),
+        ),
+    ]
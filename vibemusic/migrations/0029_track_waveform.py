@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vibemusic', '0028_track_preview_file'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='track',
+            name='duration',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Длительность, с'),
+        ),
+        migrations.AddField(
+            model_name='track',
+            name='loudness',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Громкость (RMS, dBFS)'),
+        ),
+        migrations.AddField(
+            model_name='track',
+            name='waveform',
+            field=models.FileField(blank=True, editable=False, upload_to='waveforms/', verbose_name='Пики волны'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vibemusic', '0029_track_waveform'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='track',
+            name='bitrate',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Битрейт, бит/с'),
+        ),
+        migrations.AddField(
+            model_name='track',
+            name='channels',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, verbose_name='Каналов'),
+        ),
+        migrations.AddField(
+            model_name='track',
+            name='codec',
+            field=models.CharField(blank=True, editable=False, max_length=16, verbose_name='Кодек'),
+        ),
+        migrations.AddField(
+            model_name='track',
+            name='sample_rate',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Частота, Гц'),
+        ),
+    ]
@@ -0,0 +1,109 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:38
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import migrations, models
+
+
+# DDL индекса на момент миграции - копия, а не вызов services/search.py: код движков дальше меняется,
+# а миграция должна выполняться так же, как в день написания.
+INSTALL_SQL = {
+    "postgresql": [
+        "ALTER TABLE vibemusic_searchdocument ADD COLUMN vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('russian'::regconfig, title), 'A') || setweight(to_tsvector('english'::regconfig, title), 'A') || "
+        "setweight(to_tsvector('russian'::regconfig, body), 'B') || setweight(to_tsvector('english'::regconfig, body), 'B')"
+        ") STORED",
+        "CREATE INDEX vibemusic_searchdocument_vector_gin ON vibemusic_searchdocument USING GIN (vector)",
+    ],
+    "sqlite": [
+        "CREATE VIRTUAL TABLE vibemusic_searchdocument_fts USING fts5(title, body, content='vibemusic_searchdocument', "
+        "content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        "CREATE TRIGGER vibemusic_searchdocument_fts_ai AFTER INSERT ON vibemusic_searchdocument BEGIN "
+        "INSERT INTO vibemusic_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+        "CREATE TRIGGER vibemusic_searchdocument_fts_ad AFTER DELETE ON vibemusic_searchdocument BEGIN "
+        "INSERT INTO vibemusic_searchdocument_fts(vibemusic_searchdocument_fts, rowid, title, body) "
+        "VALUES ('delete', old.id, old.title, old.body); END",
+        "CREATE TRIGGER vibemusic_searchdocument_fts_au AFTER UPDATE ON vibemusic_searchdocument BEGIN "
+        "INSERT INTO vibemusic_searchdocument_fts(vibemusic_searchdocument_fts, rowid, title, body) "
+        "VALUES ('delete', old.id, old.title, old.body); "
+        "INSERT INTO vibemusic_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+        "INSERT INTO vibemusic_searchdocument_fts(vibemusic_searchdocument_fts) VALUES ('rebuild')",
+    ],
+}
+
+UNINSTALL_SQL = {
+    "postgresql": [
+        "ALTER TABLE vibemusic_searchdocument DROP COLUMN IF EXISTS vector",
+    ],
+    "sqlite": [
+        "DROP TRIGGER IF EXISTS vibemusic_searchdocument_fts_ai",
+        "DROP TRIGGER IF EXISTS vibemusic_searchdocument_fts_ad",
+        "DROP TRIGGER IF EXISTS vibemusic_searchdocument_fts_au",
+        "DROP TABLE IF EXISTS vibemusic_searchdocument_fts",
+    ],
+}
+
+
+def _run(statements, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in statements:
+        raise ImproperlyConfigured(f"Полнотекстовый поиск не поддерживается для БД {vendor!r}")
+    for sql in statements[vendor]:
+        schema_editor.execute(sql)
+
+
+def _join(*parts):
+    return "\n".join(part for part in parts if part)
+
+
+def fill_documents(apps, schema_editor):
+    """Документы существующих постов, треков и исполнителей - по состоянию моделей на эту миграцию."""
+    SearchDocument = apps.get_model("vibemusic", "SearchDocument")
+    sources = {
+        "post": apps.get_model("vibemusic", "Post").objects.values_list("pk", "title", "content", "artist__name"),
+        "track": apps.get_model("vibemusic", "Track").objects.values_list("pk", "title", "artist__name", "album_name"),
+        "artist": apps.get_model("vibemusic", "Artist").objects.values_list("pk", "name", "bio"),
+    }
+    for kind, rows in sources.items():
+        batch = []
+        for pk, title, *rest in rows.order_by("pk").iterator(chunk_size=500):
+            batch.append(SearchDocument(kind=kind, object_id=pk, title=(title or "")[:255], body=_join(*rest)))
+            if len(batch) >= 500:
+                SearchDocument.objects.bulk_create(batch)
+                batch = []
+        SearchDocument.objects.bulk_create(batch)
+
+
+def install_index(apps, schema_editor):
+    """Индекс над SearchDocument под текущую БД (tsvector + GIN или FTS5) и документы существующих объектов."""
+    _run(INSTALL_SQL, schema_editor)
+    fill_documents(apps, schema_editor)
+
+
+def uninstall_index(apps, schema_editor):
+    _run(UNINSTALL_SQL, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vibemusic', '0030_track_audio_info'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('post', 'Пост'), ('track', 'Трек'), ('artist', 'Исполнитель')], max_length=16, verbose_name='Тип')),
+                ('object_id', models.PositiveIntegerField(verbose_name='ID объекта')),
+                ('title', models.CharField(max_length=255, verbose_name='Заголовок')),
+                ('body', models.TextField(blank=True, verbose_name='Текст')),
+            ],
+            options={
+                'verbose_name': 'Поисковый документ',
+                'verbose_name_plural': 'Поисковые документы',
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='uniq_search_document')],
+            },
+        ),
+        migrations.RunPython(install_index, uninstall_index),
+    ]
@@ -0,0 +1,168 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:44
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import migrations, models
+
+
+# DDL индекса - копия на момент миграции (как в 0031), а не вызов services/search.py.
+INSTALL_SQL = {
+    "postgresql": [
+        "ALTER TABLE vibemusic_searchdocument ADD COLUMN vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('russian'::regconfig, title), 'A') || setweight(to_tsvector('english'::regconfig, title), 'A') || "
+        "setweight(to_tsvector('russian'::regconfig, body), 'B') || setweight(to_tsvector('english'::regconfig, body), 'B')"
+        ") STORED",
+        "CREATE INDEX vibemusic_searchdocument_vector_gin ON vibemusic_searchdocument USING GIN (vector)",
+    ],
+    "sqlite": [
+        "CREATE VIRTUAL TABLE vibemusic_searchdocument_fts USING fts5(title, body, content='vibemusic_searchdocument', "
+        "content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        "CREATE TRIGGER vibemusic_searchdocument_fts_ai AFTER INSERT ON vibemusic_searchdocument BEGIN "
+        "INSERT INTO vibemusic_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+        "CREATE TRIGGER vibemusic_searchdocument_fts_ad AFTER DELETE ON vibemusic_searchdocument BEGIN "
+        "INSERT INTO vibemusic_searchdocument_fts(vibemusic_searchdocument_fts, rowid, title, body) "
+        "VALUES ('delete', old.id, old.title, old.body); END",
+        "CREATE TRIGGER vibemusic_searchdocument_fts_au AFTER UPDATE ON vibemusic_searchdocument BEGIN "
+        "INSERT INTO vibemusic_searchdocument_fts(vibemusic_searchdocument_fts, rowid, title, body) "
+        "VALUES ('delete', old.id, old.title, old.body); "
+        "INSERT INTO vibemusic_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+        "INSERT INTO vibemusic_searchdocument_fts(vibemusic_searchdocument_fts) VALUES ('rebuild')",
+    ],
+}
+
+UNINSTALL_SQL = {
+    "postgresql": [
+        "ALTER TABLE vibemusic_searchdocument DROP COLUMN IF EXISTS vector",
+    ],
+    "sqlite": [
+        "DROP TRIGGER IF EXISTS vibemusic_searchdocument_fts_ai",
+        "DROP TRIGGER IF EXISTS vibemusic_searchdocument_fts_ad",
+        "DROP TRIGGER IF EXISTS vibemusic_searchdocument_fts_au",
+        "DROP TABLE IF EXISTS vibemusic_searchdocument_fts",
+    ],
+}
+
+BATCH = 500
+
+
+def _run(statements, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in statements:
+        raise ImproperlyConfigured(f"Полнотекстовый поиск не поддерживается для БД {vendor!r}")
+    for sql in statements[vendor]:
+        schema_editor.execute(sql)
+
+
+def uninstall_index(apps, schema_editor):
+    """SQLite пересоздаёт таблицу при добавлении NOT NULL колонки - триггеры FTS5 пропали бы вместе со старой."""
+    _run(UNINSTALL_SQL, schema_editor)
+
+
+def install_index(apps, schema_editor):
+    """Индекс заново - над документами, уже заполненными fill_documents."""
+    _run(INSTALL_SQL, schema_editor)
+
+
+def _join(*parts):
+    return "\n".join(part for part in parts if part)
+
+
+def _pack_genres(genre_ids):
+    packed = f" {' '.join(str(pk) for pk in sorted(genre_ids))} " if genre_ids else ""
+    return packed if len(packed) <= 255 else packed[:packed.rindex(" ", 0, 255) + 1]
+
+
+def _genre_map(queryset, column, ids):
+    result = {}
+    for owner, genre_id in queryset.filter(**{f"{column}__in": list(ids)}).values_list(column, "genre_id"):
+        result.setdefault(owner, set()).add(genre_id)
+    return result
+
+
+def _documents(apps, kind, rows):
+    """[(object_id, поля документа)] для пачки строк - по состоянию моделей на эту миграцию."""
+    artist_genres = apps.get_model("vibemusic", "Artist").genres.through.objects.all()
+    if kind == "genre":
+        return [(pk, dict(title=name, body=description, slug=slug, like_count=0, created_at=None, genres={pk}))
+                for pk, name, description, slug in rows]
+    if kind == "artist":
+        genres = _genre_map(artist_genres, "artist_id", [row[0] for row in rows])
+        return [(pk, dict(title=name, body=bio, slug=slug, like_count=likes, created_at=created, genres=genres.get(pk, set())))
+                for pk, name, bio, slug, likes, created in rows]
+    if kind == "track":
+        genres = _genre_map(artist_genres, "artist_id", {row[-1] for row in rows if row[-1]})
+        return [(pk, dict(title=title, body=_join(artist, album), slug="", like_count=likes, created_at=created,
+                          genres=genres.get(artist_id, set())))
+                for pk, title, artist, album, likes, created, artist_id in rows]
+    direct_genres = apps.get_model("vibemusic", "PostGenre").objects.filter(is_direct=True)
+    genres = _genre_map(direct_genres, "post_id", [row[0] for row in rows])
+    return [(pk, dict(title=title, body=_join(content, artist), slug=slug, like_count=likes, created_at=created,
+                      genres=genres.get(pk, set())))
+            for pk, title, content, artist, slug, likes, created in rows]
+
+
+def fill_documents(apps, schema_editor):
+    """Документы заново - с жанрами, слагом, лайками и датой, плюс документы жанров."""
+    SearchDocument = apps.get_model("vibemusic", "SearchDocument")
+
+    def model(name):
+        return apps.get_model("vibemusic", name).objects.order_by("pk")
+
+    sources = {
+        "post": model("Post").values_list("pk", "title", "content", "artist__name", "slug", "like_count", "created_at"),
+        "track": model("Track").values_list("pk", "title", "artist__name", "album_name", "like_count", "created_at", "artist_id"),
+        "artist": model("Artist").values_list("pk", "name", "bio", "slug", "like_count", "created_at"),
+        "genre": model("Genre").values_list("pk", "name", "description", "slug"),
+    }
+    SearchDocument.objects.all().delete()                   # Индекса сейчас нет - вставка без триггеров, FTS соберёт 'rebuild'
+    for kind, queryset in sources.items():
+        rows = list(queryset[:BATCH])
+        while rows:
+            SearchDocument.objects.bulk_create([
+                SearchDocument(kind=kind, object_id=pk, title=(doc["title"] or "")[:255], body=doc["body"] or "",
+                               slug=doc["slug"] or "", like_count=doc["like_count"], created_at=doc["created_at"],
+                               genres=_pack_genres(doc["genres"]))
+                for pk, doc in _documents(apps, kind, rows)
+            ])
+            rows = list(queryset.filter(pk__gt=rows[-1][0])[:BATCH])
+
+
+def drop_genre_documents(apps, schema_editor):
+    apps.get_model("vibemusic", "SearchDocument").objects.filter(kind="genre").delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vibemusic', '0031_search_document'),
+    ]
+
+    operations = [
+        migrations.RunPython(uninstall_index, install_index),
+        migrations.AddField(
+            model_name='searchdocument',
+            name='created_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Дата создания'),
+        ),
+        migrations.AddField(
+            model_name='searchdocument',
+            name='genres',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Жанры'),
+        ),
+        migrations.AddField(
+            model_name='searchdocument',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Лайков'),
+        ),
+        migrations.AddField(
+            model_name='searchdocument',
+            name='slug',
+            field=models.CharField(blank=True, max_length=255, verbose_name='URL'),
+        ),
+        migrations.AlterField(
+            model_name='searchdocument',
+            name='kind',
+            field=models.CharField(choices=[('post', 'Пост'), ('track', 'Трек'), ('artist', 'Исполнитель'), ('genre', 'Жанр')], max_length=16, verbose_name='Тип'),
+        ),
+        migrations.RunPython(fill_documents, drop_genre_documents),
+        migrations.RunPython(install_index, uninstall_index),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vibemusic', '0033_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='telegramoutbox',
+            index=models.Index(fields=['chat_id', 'status'], name='vibemusic_t_chat_id_35e83f_idx'),
+        ),
+    ]
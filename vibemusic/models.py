@@ -4,9 +4,9 @@ from django.conf import settings
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.utils.text import slugify                                   # только маленькие буквы, цифры, дефисы и без пробелов
-from vibemusic.core_utils import extract_metadata, UniqueSlugGenerator
-from vibemusic.spotify_utils import search_track, download_image
+from vibemusic.core_utils import UniqueSlugGenerator
 import logging
+import uuid
 
 
 logger = logging.getLogger(__name__)
@@ -66,6 +66,7 @@ class Genre(models.Model):
     background_image = models.ImageField(upload_to='genre_backgrounds/', blank=True, null=True, verbose_name="Фоновое изображение")
     description = models.TextField(blank=True, verbose_name="Описание жанра")
     related_genres = models.ManyToManyField('self', blank=True, symmetrical=False, verbose_name="Связанные жанры")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата обновления")              # Last-Modified страницы жанра (services/conditional.py)
 
     class Meta:
         verbose_name = "Жанр"
@@ -87,7 +88,9 @@ class Artist(models.Model):
     photo = models.ImageField(upload_to='artist_photos/', blank=True, null=True, verbose_name="Фото исполнителя")
     genres = models.ManyToManyField(Genre, related_name='artists', verbose_name="Жанры")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата обновления")
     liked_by = models.ManyToManyField(User, through='Reaction', related_name='liked_artists', blank=True)
+    like_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Лайков")                  # Денормализованный счётчик, см. services/counters.py
     
     class Meta:
         verbose_name = "Исполнитель"
@@ -124,55 +127,98 @@ class Track(models.Model):
     album_name = models.CharField(max_length=200, blank=True, verbose_name="Название альбома")
     album_image = models.ImageField(upload_to='images/', null=True, blank=True, verbose_name="Изображение альбома")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата обновления")               # save(update_fields=...) его не трогает - правки фоновых задач видны по версии тега track:<id>
     liked_by = models.ManyToManyField(User, through='Reaction', related_name='liked_tracks', blank=True)
+    like_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Лайков")
+    audio_hash = models.CharField(max_length=64, blank=True, db_index=True, editable=False,
+                                  verbose_name="Отпечаток аудио")                        # sha256 без ID3-тегов (utils/audio_hash.py): одинаковый звук - один файл
+    preview_file = models.FileField(upload_to='previews/', blank=True, editable=False,
+                                    verbose_name="Превью")                               # 30 с MP3 для карточек (services/track_previews.py)
+    waveform = models.FileField(upload_to='waveforms/', blank=True, editable=False,
+                                verbose_name="Пики волны")                               # int8 min/max в нескольких разрешениях (services/track_waveform.py)
+    duration = models.FloatField(null=True, blank=True, editable=False, verbose_name="Длительность, с")
+    loudness = models.FloatField(null=True, blank=True, editable=False, verbose_name="Громкость (RMS, dBFS)")
+    bitrate = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Битрейт, бит/с")   # Технические параметры читаются из заголовка
+    sample_rate = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Частота, Гц")    # один раз при загрузке (utils/audio_metadata.py)
+    channels = models.PositiveSmallIntegerField(null=True, blank=True, editable=False, verbose_name="Каналов")
+    codec = models.CharField(max_length=16, blank=True, editable=False, verbose_name="Кодек")
+
+    class EnrichmentStatus(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        DONE = 'done', 'Готово'
+        FAILED = 'failed', 'Ошибка'
+        SKIPPED = 'skipped', 'Не требуется'
+
+    enrichment_status = models.CharField(max_length=10, choices=EnrichmentStatus.choices, default=EnrichmentStatus.SKIPPED,
+                                         editable=False, verbose_name="Обогащение метаданными")   # Состояние фоновой задачи track.enrich
 
     class Meta:
         verbose_name = "Трек"
         verbose_name_plural = "Треки"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=["-created_at", "-id"]),   # Ключ keyset-пагинации: WHERE (created_at, id) < (...) ORDER BY created_at DESC, id DESC
+        ]
 
     def save(self, *args, **kwargs):                                                    # Переопределяет метод save модели для кастомной логики перед сохранением
-                                                                                        # Извлечение метаданных из аудиофайла
-        if self.audio_file and not self.album_image:                                    # Проверяет наличие аудиофайла и отсутствие обложки альбома
-            logger.debug(f"Извлечение метаданных для трека: {self.title}")                                    
-            metadata = extract_metadata(self.audio_file)                                # Извлекает метаданные из аудиофайла с помощью функции extract_metadata
-            self.title = self.title or metadata.get('title', '')                                # С помощью (get() безопасно) Обновляем название трека метаданными, если поле пустое
-            self.album_name = self.album_name or metadata.get('album', '')                      # Обновляет название альбома метаданными, если поле пустое
-            if metadata.get('artist') and not self.artist:                                  # Проверяет наличие исполнителя в метаданных и отсутствие в модели
-                artist_name = metadata['artist']
-                artist, created = Artist.objects.get_or_create(                               # Получает или создаёт объект Artist по имени
-                    name=artist_name,                                            # Устанавливает имя исполнителя из метаданных
-                    defaults={'slug': slugify(artist_name, allow_unicode=True)}  # Генерирует slug по умолчанию с поддержкой unicode
-                )                                                                       # Завершает get_or_create
-                self.artist = artist                                                    # Присваивает объект Artist полю модели
-                logger.debug(f"Автоматически создан/найден исполнитель: {artist.name}")
-            
-                                                                                        # Поиск обложек в Spotify
-            # Поиск обложки в Spotify
-            if metadata.get('title') and metadata.get('artist'):                                    # Проверяет наличие названия трека и имени исполнителя в метаданных
-                logger.debug(f"Поиск в Spotify: {metadata['title']} - {metadata['artist']}") # Логирует попытку поиска трека в Spotify по названию и исполнителю
-                try:                                                                        # Пытается выполнить запрос к Spotify API
-                    spotify_data = search_track(metadata['title'], metadata['artist'])      # Ищет трек в Spotify по метаданным
-                    if spotify_data and spotify_data.get('album_image_url'):                    # Если найдено и есть URL обложки альбома
-                        filename = f"{slugify(self.artist.slug) if self.artist else 'unknown'}_{slugify(self.title)}.jpg" # Формирует имя файла для сохранения обложки
-                        image_path = download_image(spotify_data['album_image_url'], filename) # Скачивает изображение по ссылке
-                        if image_path:                                                      # Если скачивание прошло успешно
-                            self.album_image = image_path                                   # Сохраняет путь к обложке в модель
-                            self.album_name = self.album_name or spotify_data.get('album_name', '') # Устанавливает название альбома, если поле пустое
-                            logger.debug(f"Обложка из Spotify сохранена: {image_path}")                # Логирует успешное сохранение обложки
-                        else:                                                               # Если не удалось скачать изображение
-                            self.album_image = getattr(settings, 'DEFAULT_ALBUM_IMAGE', None)           # Получает дефолтное изображение альбома из настроек, если не указано, присваивает None
-                            logger.warning(f"Трек не найден в Spotify, используется дефолт: {self.album_image}") # Логирует предупреждение
-                    else:                                                                   # Если трек не найден или нет обложки
-                        self.album_image = getattr(settings, 'DEFAULT_ALBUM_IMAGE', None)                     # Устанавливает дефолтную обложку
-                        logger.warning(f"Трек не найден в Spotify, используется дефолт: {self.album_image}") # Логирует предупреждение
-                except Exception as e:                                                      # Обрабатывает любые ошибки при работе с API
-                    logger.error(f"Ошибка при поиске в Spotify: {e}")                       # Логирует ошибку с описанием
-                    self.album_image = getattr(settings, 'DEFAULT_ALBUM_IMAGE', None)                         # Устанавливает дефолтную обложку
-                    
-
-            super().save(*args, **kwargs)                                                    # Вызывает оригинальный метод save для сохранения объекта
-                    
+        # Быстрое сохранение: метаданные, исполнитель и обложка из Spotify заполняются
+        # фоновой задачей track.enrich (services/track_enrichment.py), а не внутри запроса
+        reused = False
+        new_audio = bool(self.audio_file) and not self.audio_file._committed           # Загрузка нового трека или замена файла (в админке)
+        if new_audio:
+            from vibemusic.services import audio_dedupe                                 # Тот же звук уже загружали - берём его файл и обогащение
+            if not self._state.adding:
+                self._forget_audio_outputs()
+            self.read_audio_info()
+            if self._state.adding:
+                reused = audio_dedupe.reuse_existing(self)
+            else:
+                self.audio_hash = audio_dedupe.hash_upload(self.audio_file.file)      # Метаданные трека правили вручную - обогащение не повторяем
+        needs_enrichment = self._state.adding and self.audio_file and not self.album_image and not reused
+        created_with_audio = self._state.adding and bool(self.audio_file)
+        if needs_enrichment:
+            self.enrichment_status = self.EnrichmentStatus.PENDING
+        update_fields = kwargs.get('update_fields')
+        if new_audio and update_fields is not None and 'audio_file' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'audio_hash', 'preview_file', 'waveform', 'loudness', *self.AUDIO_INFO_FIELDS}
+        super().save(*args, **kwargs)
+        if not (created_with_audio or new_audio):
+            return
+        from vibemusic.services import jobs                                             # Локальный импорт: services импортируют модели
+        if needs_enrichment:
+            jobs.enqueue('track.enrich', {'track_id': self.pk})                        # Задача в той же транзакции - воркер увидит её после коммита
+            logger.debug(f"Трек {self.pk} поставлен в очередь на обогащение")
+        jobs.enqueue('track.preview', {'track_id': self.pk})                           # 30-секундное превью (services/track_previews.py)
+        jobs.enqueue('track.waveform', {'track_id': self.pk})                          # Волна, длительность и громкость (services/track_waveform.py)
+
+    AUDIO_INFO_FIELDS = ('duration', 'bitrate', 'sample_rate', 'channels', 'codec')
+
+    def _forget_audio_outputs(self):
+        """Файл заменён: отпечаток, параметры звука, превью и волна относились к старому - задачи построят заново."""
+        self.audio_hash = ''
+        self.preview_file = ''
+        self.waveform = ''
+        self.loudness = None
+        for field in self.AUDIO_INFO_FIELDS:
+            setattr(self, field, '' if field == 'codec' else None)
+
+    def read_audio_info(self, info=None):
+        """Заполнить AUDIO_INFO_FIELDS (возвращает заполненные): длительность, битрейт, частота, каналы и кодек из заголовка файла (загрузки или сохранённого)."""
+        if info is None:
+            from vibemusic.utils.audio_metadata import read_metadata
+            info = read_metadata(self.audio_file.file)                                  # mutagen читает только заголовок, позиция файла возвращается в начало
+        changed = [field for field in self.AUDIO_INFO_FIELDS if info.get(field)]
+        for field in changed:
+            setattr(self, field, info[field])
+        return changed
+
+    @property
+    def duration_display(self):
+        """Длительность в виде м:сс для шаблонов (без открытия файла)."""
+        if not self.duration:
+            return ""
+        minutes, seconds = divmod(int(round(self.duration)), 60)
+        return f"{minutes}:{seconds:02d}"
 
     def __str__(self):
         return f"{self.title} - {self.artist.name if self.artist else 'Unknown'}"
@@ -190,11 +236,16 @@ class Post(models.Model):
     images = models.ManyToManyField(PostImage, blank=True, related_name='posts', verbose_name="Фотографии")                                 # Связи многие-ко-многим
     tracks = models.ManyToManyField(Track, blank=True, related_name='related_posts', verbose_name="Треки")
     liked_by = models.ManyToManyField(User, through='Reaction', related_name='liked_posts', blank=True)
+    like_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Лайков")                                               # Денормализованные счётчики: обновляются буфером services/counters.py,
+    comment_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Комментариев")                                      # вместо annotate(Count(...)) на каждой странице
 
     class Meta:
         verbose_name = "Пост"
         verbose_name_plural = "Посты"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=["-created_at", "-id"]),   # Ключ keyset-пагинации: WHERE (created_at, id) < (...) ORDER BY created_at DESC, id DESC
+        ]
 
     def save(self, *args, **kwargs):
         UniqueSlugGenerator(self, 'slug', 'title').generate()  # Генерируем slug на основе поля title
@@ -204,6 +255,60 @@ class Post(models.Model):
         return f"{self.title} - ({self.artist.name if self.artist else 'No Artist'})"
 
 
+class PostGenre(models.Model):
+    """
+    Материализованная принадлежность поста жанру (обслуживается services/post_genres.py).
+    Прямые жанры поста: post.genre и жанры исполнителя; плюс жанры, у которых один из прямых - в related_genres.
+    """
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='genre_links', verbose_name="Пост")
+    genre = models.ForeignKey(Genre, on_delete=models.CASCADE, related_name='post_links', verbose_name="Жанр")
+    is_direct = models.BooleanField(default=True, verbose_name="Прямой жанр")                     # False - попал через Genre.related_genres
+
+    class Meta:
+        verbose_name = "Жанр поста"
+        verbose_name_plural = "Жанры постов"
+        constraints = [
+            models.UniqueConstraint(fields=["genre", "post"], name="uniq_post_genre"),          # Одна строка на пару - джойн без DISTINCT; индекс (genre, post) для выборки по жанру
+        ]
+
+    def __str__(self):
+        return f"{self.post_id} → {self.genre_id}{'' if self.is_direct else ' (связанный)'}"
+
+
+class SearchDocument(models.Model):
+    """
+    Строка полнотекстового индекса (обслуживается services/search.py): один документ на пост, трек, исполнителя или жанр.
+    Сам индекс - вне ORM и зависит от БД: в PostgreSQL генерируемая колонка vector (tsvector) с GIN,
+    в SQLite - FTS5-таблица vibemusic_searchdocument_fts, которую ведут триггеры (миграция 0031).
+    Популярность, дата и жанры лежат здесь же - общий поиск ранжирует и считает фасеты без обращения к исходным таблицам.
+    """
+    KIND_CHOICES = [
+        ('post', 'Пост'),
+        ('track', 'Трек'),
+        ('artist', 'Исполнитель'),
+        ('genre', 'Жанр'),
+    ]
+
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES, verbose_name="Тип")
+    object_id = models.PositiveIntegerField(verbose_name="ID объекта")
+    title = models.CharField(max_length=255, verbose_name="Заголовок")                             # Вес выше, чем у body
+    body = models.TextField(blank=True, verbose_name="Текст")
+    slug = models.CharField(max_length=255, blank=True, verbose_name="URL")                         # Ссылка в выдаче без обращения к исходной таблице
+    like_count = models.PositiveIntegerField(default=0, verbose_name="Лайков")                      # Копия счётчика: обновляется при сохранении и сбросе буфера counters
+    created_at = models.DateTimeField(null=True, blank=True, verbose_name="Дата создания")         # У жанров даты нет
+    genres = models.CharField(max_length=255, blank=True, verbose_name="Жанры")                     # " 3 7 " - прямые жанры объекта для фасетов
+
+    class Meta:
+        verbose_name = "Поисковый документ"
+        verbose_name_plural = "Поисковые документы"
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "object_id"], name="uniq_search_document"),  # Upsert по объекту и ранжирование по (kind, object_id)
+        ]
+
+    def __str__(self):
+        return f"{self.kind}:{self.object_id} {self.title}"
+
+
 class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="comments", verbose_name="Пост")
     user = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="Автор")
@@ -212,6 +317,7 @@ class Comment(models.Model):
     parent = models.ForeignKey('self', null=True, blank=True, on_delete=models.CASCADE, related_name='replies', verbose_name="Родительский комментарий")
     image = models.ImageField(upload_to='comment_images/', blank=True, null=True, verbose_name="Изображение")
     liked_by = models.ManyToManyField(User, through='Reaction', related_name='liked_comments', blank=True)
+    like_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Лайков")
 
     class Meta:
         verbose_name = "Комментарий"
@@ -250,8 +356,8 @@ class Reaction(models.Model):
 class IPChangeLog(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     ip = models.CharField(max_length=45)                                            # IPv4 или IPv6
-    timestamp = models.DateTimeField(auto_now_add=True)
-    bytes_uploaded = models.BigIntegerField(default=0)                              # можно пополнять если нужно учитывать байты
+    timestamp = models.DateTimeField(default=timezone.now)                          # Время события, а не записи: пишется пачкой (services/ip_log.py)
+    bytes_uploaded = models.BigIntegerField(default=0)                              # Сколько байт тела запроса реально прочитано
 
     class Meta:
         indexes = [
@@ -260,4 +366,104 @@ class IPChangeLog(models.Model):
         ]
 
     def __str__(self):
-        return f"({self.user_id} @ {self.ip} at {self.timestamp.isoformat()})"
\ No newline at end of file
+        return f"({self.user_id} @ {self.ip} at {self.timestamp.isoformat()})"
+
+
+class Job(models.Model):
+    """Фоновая задача в БД (очередь services/jobs.py, воркер - команда run_jobs)."""
+
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'В очереди'
+        RUNNING = 'running', 'Выполняется'
+        DONE = 'done', 'Выполнена'
+        FAILED = 'failed', 'Ошибка'
+
+    kind = models.CharField(max_length=100, verbose_name="Тип задачи")                              # Имя обработчика, например 'track.enrich'
+    payload = models.JSONField(default=dict, blank=True, verbose_name="Параметры")
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED, verbose_name="Статус")
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Попыток")
+    max_attempts = models.PositiveSmallIntegerField(default=5, verbose_name="Максимум попыток")
+    run_after = models.DateTimeField(default=timezone.now, verbose_name="Не раньше")                # Отложенный запуск / backoff после ошибки
+    locked_by = models.CharField(max_length=100, blank=True, verbose_name="Воркер")
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name="Взята в работу")
+    last_error = models.TextField(blank=True, verbose_name="Последняя ошибка")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Завершена")
+
+    class Meta:
+        verbose_name = "Фоновая задача"
+        verbose_name_plural = "Фоновые задачи"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=["status", "run_after"]),      # Выборка готовых к запуску задач
+            models.Index(fields=["kind", "status"]),           # Лимит параллельности по типу
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+
+class TelegramOutbox(models.Model):
+    """Исходящее сообщение Telegram. Пишется в запросе, отправляется диспетчером (services/telegram_outbox.py)."""
+
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'В очереди'
+        SENDING = 'sending', 'Отправляется'
+        SENT = 'sent', 'Отправлено'
+        FAILED = 'failed', 'Ошибка'
+
+    chat_id = models.CharField(max_length=64, verbose_name="Чат")                                  # Числовой id или @username канала
+    text = models.TextField(verbose_name="Текст")
+    parse_mode = models.CharField(max_length=16, blank=True, default='Markdown', verbose_name="Разметка")
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED, verbose_name="Статус")
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Попыток")
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name="Следующая попытка")   # Backoff и retry_after от Telegram
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name="Взято диспетчером")
+    last_error = models.TextField(blank=True, verbose_name="Последняя ошибка")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name="Отправлено")
+
+    class Meta:
+        verbose_name = "Сообщение Telegram"
+        verbose_name_plural = "Исходящие Telegram"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"]),    # Выборка готовых к отправке
+            models.Index(fields=["chat_id", "status"]),            # Есть ли в чате более раннее неотправленное
+        ]
+
+    def __str__(self):
+        return f"→ {self.chat_id}: {self.text[:40]} ({self.status})"
+
+
+class UploadSession(models.Model):
+    """Докачиваемая загрузка трека кусками (API v1 uploads/, services/chunked_uploads.py)."""
+
+    class Status(models.TextChoices):
+        OPEN = 'open', 'Загружается'
+        COMPLETE = 'complete', 'Завершена'
+        ABORTED = 'aborted', 'Отменена'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)                       # Идентификатор в URL - не угадать чужую сессию
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions', verbose_name="Пользователь")
+    filename = models.CharField(max_length=255, verbose_name="Имя файла")
+    title = models.CharField(max_length=200, blank=True, verbose_name="Название трека")
+    size = models.BigIntegerField(verbose_name="Размер, байт")
+    chunk_size = models.PositiveIntegerField(verbose_name="Размер куска, байт")
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.OPEN, verbose_name="Статус")
+    track = models.ForeignKey(Track, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name="Трек")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+
+    class Meta:
+        verbose_name = "Сессия загрузки"
+        verbose_name_plural = "Сессии загрузки"
+        indexes = [
+            models.Index(fields=["status", "created_at"]),    # Поиск брошенных сессий для очистки
+        ]
+
+    @property
+    def chunk_count(self) -> int:
+        return -(-self.size // self.chunk_size)
+
+    def __str__(self):
+        return f"{self.filename} ({self.status})"
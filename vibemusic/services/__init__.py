@@ -0,0 +1,2 @@
+# vibemusic/services/__init__.py
+# Сервисный слой: бизнес-логика, вынесенная из views/models.
@@ -0,0 +1,107 @@
+# vibemusic/services/api_cache.py
+"""
+Кэш готовых ответов API v1 для анонимных GET (списки и карточки постов и треков).
+
+- ключ - хост (в ответе абсолютные ссылки), путь и отсортированные непустые параметры запроса, класс аутентификации и формат ответа;
+- запись помечена тегами объектов, которые в неё попали ("post:12", "artist:3", "genre:5", "track:7")
+  и тегом коллекции ("post:list") - новые и удалённые объекты меняют списки;
+- у каждого тега в кэше своя версия - время смены (time_ns, по нему services/conditional.py считает Last-Modified);
+  запись хранит версии тегов на момент записи и при чтении сверяет их одним get_many - смена версии (invalidate) делает недействительными
+  ровно записи с этим тегом, без перебора ключей;
+- версии меняют сигналы (signals.py), сброс буфера счётчиков (services/counters.py) - лайки и комментарии,
+  и поисковый индекс (services/search.py) - выдача ?search= по типу;
+- API_CACHE_TTL ограничивает жизнь записи, даже если инвалидация где-то не сработала.
+"""
+from __future__ import annotations
+
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import Iterable, Optional
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+ENTRY_KEY = "api_cache:entry:{digest}"
+TAG_KEY = "api_cache:tag:v2:{tag}"                          # v2: версия - int time_ns (в v1 были строки uuid4().hex)
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    content: bytes
+    content_type: str
+    status: int
+    tags: dict                                              # {тег: версия на момент записи}
+
+
+def _ttl() -> int:
+    return int(getattr(settings, "API_CACHE_TTL", 300))
+
+
+def enabled() -> bool:
+    return bool(getattr(settings, "API_CACHE_ENABLED", True))
+
+
+def cache_key(request, auth_label: str, media_type: str) -> str:
+    """Нормализованный ключ: порядок параметров и пустые значения не плодят копий."""
+    params = sorted((name, value) for name, values in request.GET.lists() for value in values if value != "")
+    raw = "|".join([request.get_host(), request.path, urlencode(params), auth_label, media_type])
+    return ENTRY_KEY.format(digest=hashlib.sha1(raw.encode()).hexdigest())
+
+
+def tag_versions(tags: Iterable[str]) -> dict[str, int]:
+    """Текущие версии тегов; у тега без версии она появляется (первая запись с ним)."""
+    keys = {TAG_KEY.format(tag=tag): tag for tag in tags}
+    found = {key: version for key, version in cache.get_many(list(keys)).items() if isinstance(version, int)}
+    missing = {key: time.time_ns() for key in keys if key not in found}
+    for key, token in missing.items():
+        if not cache.add(key, token, None):                 # Параллельно создали - берём их версию
+            existing = cache.get(key)
+            if isinstance(existing, int):
+                token = existing
+            else:                                           # Чужой формат под ключом - считаем, что версии нет
+                cache.set(key, token, None)
+        found[key] = token
+    return {keys[key]: version for key, version in found.items()}
+
+
+def get(key: str) -> Optional[CachedResponse]:
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    current = cache.get_many([TAG_KEY.format(tag=tag) for tag in entry.tags])
+    if any(current.get(TAG_KEY.format(tag=tag)) != version for tag, version in entry.tags.items()):
+        return None                                         # Один из объектов менялся после записи
+    return entry
+
+
+def store(key: str, content: bytes, content_type: str, status: int, versions: dict[str, int]) -> None:
+    """versions - из tag_versions сразу после чтения объектов: правка между чтением и записью не останется незамеченной."""
+    cache.set(key, CachedResponse(content, content_type, status, versions), _ttl())
+
+
+def _bump(tags: set[str]) -> None:
+    version = time.time_ns()
+    cache.set_many({TAG_KEY.format(tag=tag): version for tag in tags}, None)
+
+
+def invalidate(tags: Iterable[str]) -> None:
+    """
+    Сменить версии тегов: сразу и ещё раз после коммита - запрос, успевший прочитать
+    старые данные до коммита, не оставит в кэше запись с новой версией.
+    """
+    tags = set(tags)
+    if not tags:
+        return
+    _bump(tags)
+    transaction.on_commit(lambda: _bump(tags))
+
+
+def object_tags(kind: str, pks: Iterable[int]) -> set[str]:
+    return {f"{kind}:{pk}" for pk in pks if pk}
+
+
+__all__ = ["CachedResponse", "cache_key", "get", "store", "invalidate", "object_tags", "tag_versions", "enabled"]
@@ -0,0 +1,105 @@
+# vibemusic/services/audio_dedupe.py
+"""
+Дедупликация аудио по отпечатку без тегов (utils/audio_hash.py).
+
+Вызывается из Track.save для нового трека с ещё не сохранённым файлом. Если трек с тем же
+Track.audio_hash уже есть, новый трек ссылается на его файл (второй копии в media/ нет),
+а готовое обогащение (исполнитель, альбом, обложка) копируется - задача track.enrich
+и запросы в Spotify для этого трека не нужны.
+
+Общий у треков только файл: строки Track остаются разными (свои название, лайки, посты).
+Файлы треков при удалении нигде не удаляются, так что общий файл не пропадёт у второго трека.
+"""
+from __future__ import annotations
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from vibemusic.models import Track
+from vibemusic.utils.audio_hash import fingerprint_file
+
+
+logger = logging.getLogger(__name__)
+
+
+def hash_upload(file) -> str:
+    """Отпечаток загружаемого файла: готовый от StreamingHashUploadHandler или по содержимому."""
+    precomputed = getattr(file, "audio_hash", None)
+    if precomputed:
+        return precomputed
+    file.seek(0)
+    try:
+        return fingerprint_file(file)
+    finally:
+        file.seek(0)                                        # Storage будет читать файл с начала
+
+
+def reuse_existing(track: Track) -> bool:
+    """
+    Заполнить track.audio_hash и, если такой звук уже есть, подставить существующий файл.
+    Возвращает True, если скопировано готовое обогащение и track.enrich не нужен.
+    """
+    track.audio_hash = hash_upload(track.audio_file.file)
+    original = (Track.objects.filter(audio_hash=track.audio_hash).exclude(audio_file="")
+                .order_by("pk").first())
+    if original is None:
+        return False
+
+    track.audio_file.name = original.audio_file.name
+    track.audio_file._committed = True                      # FileField.pre_save не будет сохранять файл повторно
+    logger.info(f"Аудио совпадает с треком {original.pk}, используется файл {original.audio_file.name}")
+
+    if original.enrichment_status != Track.EnrichmentStatus.DONE:
+        return False                                        # Исходный трек ещё не обогащён - обогащаем как обычно
+    if not track.artist_id:
+        track.artist_id = original.artist_id
+    if not track.album_name:
+        track.album_name = original.album_name
+    if not track.album_image:
+        track.album_image = original.album_image.name or None
+    track.enrichment_status = Track.EnrichmentStatus.DONE
+    return True
+
+
+def _hash_path(item: tuple[int, str]) -> tuple[int, Optional[str]]:
+    """Воркер пула процессов: отпечаток файла по пути (без Django и БД)."""
+    pk, path = item
+    try:
+        with open(path, "rb") as f:
+            return pk, fingerprint_file(f)
+    except OSError:
+        return pk, None
+
+
+def backfill_hashes(workers: Optional[int] = None, batch_size: int = 500) -> tuple[int, int]:
+    """
+    Посчитать audio_hash у треков, где его нет (загружены до дедупликации).
+    Чтение и sha256 - в пуле процессов, запись - bulk_update пачками. Возвращает (посчитано, пропущено).
+    Уже лежащие копии не объединяются: отпечаток нужен, чтобы новые загрузки находили старые файлы.
+    """
+    workers = workers or os.cpu_count() or 1
+    hashed = missing = 0
+    last_pk = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            batch = list(Track.objects.filter(audio_hash="", pk__gt=last_pk).exclude(audio_file="")
+                         .order_by("pk").only("pk", "audio_file")[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            items = [(track.pk, track.audio_file.path) for track in batch]
+            updates = []
+            for pk, digest in pool.map(_hash_path, items, chunksize=max(1, len(items) // (workers * 4))):
+                if digest is None:
+                    missing += 1
+                    logger.warning(f"Файл трека {pk} не найден, отпечаток не посчитан")
+                    continue
+                updates.append(Track(pk=pk, audio_hash=digest))
+            Track.objects.bulk_update(updates, ["audio_hash"])
+            hashed += len(updates)
+    return hashed, missing
+
+
+__all__ = ["hash_upload", "reuse_existing", "backfill_hashes"]
@@ -0,0 +1,255 @@
+# vibemusic/services/autocomplete.py
+"""
+Автодополнение исполнителей, жанров и треков (форма поста, строка поиска) без запросов к БД на каждое нажатие.
+
+Индекс - utils/prefix_index.PrefixIndex в памяти воркера. Общее состояние в кэше:
+  - autocomplete:base:<версия> - снимок индекса, строится из БД целиком (build) и больше не меняется;
+  - autocomplete:state - версия снимка и дельта {(тип, id): запись или None} изменений после него.
+Сигналы (signals.py) ставят задачу autocomplete.update; она (по одной за раз) дописывает запись в дельту,
+а когда дельта вырастает до COMPACT_AT - строит новый снимок под новой версией.
+Воркер сверяет состояние с кэшем не чаще CHECK_INTERVAL секунд: снимок перечитывается только при смене версии,
+дельта накладывается при поиске - изменённые записи снимка пропускаются, записи дельты проверяются напрямую.
+
+Запрос пользователя индекс из БД не строит. Нет снимка (холодный кэш, вытеснение) - отвечаем по прежней копии
+процесса или пустым списком, а снимок строится в фоне: задачей autocomplete.rebuild (одна на всех, лок в кэше).
+С LocMemCache (не CACHE_SHARED) кэш у каждого процесса свой, и ни задача из run_jobs, ни её дельты
+до веб-воркеров не дошли бы. Там снимок строит фоновый поток самого процесса, изменения дописываются
+в дельту этого же процесса после коммита, а снимок старше AUTOCOMPLETE_LOCAL_TTL секунд перестраивается -
+правки из других процессов видны не позже.
+
+Популярность: лайки исполнителя и трека, число постов жанра. Лайки меняются мимо сигналов (буфер
+services/counters.py), поэтому порядок уточняется при следующем снимке (compaction или команда rebuild_autocomplete).
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.db.models import Count
+
+from vibemusic.models import Job
+from vibemusic.services import jobs
+from vibemusic.utils.prefix_index import Entry, PrefixIndex, matches, rank_key
+from vibemusic.utils.translit import normalize
+
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("artist", "genre", "track")                        # Код типа в индексе - позиция в кортеже
+STATE_KEY = "autocomplete:state"
+BASE_KEY = "autocomplete:base:{version}"
+BUILD_LOCK_KEY = "autocomplete:building"
+REBUILD_QUEUED_KEY = "autocomplete:rebuild-queued"
+CHECK_INTERVAL = 1.0                                        # Как часто воркер сверяет версию и дельту с кэшем (сек)
+COMPACT_AT = 1000                                           # Размер дельты, после которого строится новый снимок
+OLD_BASE_TTL = 600                                          # Сколько живёт предыдущий снимок после публикации нового (сек)
+MAX_LIMIT = 20
+
+_lock = threading.Lock()
+_process: dict = {"version": None, "index": None, "delta": {}, "checked_at": 0.0}   # Копия в памяти процесса
+_builder: dict = {"thread": None}                           # Фоновая сборка снимка без общего кэша
+
+
+def kind_code(name: str) -> int:
+    return KINDS.index(name)
+
+
+# ---------- Записи из БД ----------
+
+def _querysets():
+    from vibemusic.models import Artist, Genre, Track
+    return {
+        "artist": Artist.objects.values_list("pk", "name", "like_count"),
+        "genre": Genre.objects.annotate(score=Count("post_links")).values_list("pk", "name", "score"),
+        "track": Track.objects.values_list("pk", "title", "like_count"),
+    }
+
+
+def _entries(kind: str, ids: Optional[list[int]] = None) -> list[Entry]:
+    queryset = _querysets()[kind]
+    if ids is not None:
+        queryset = queryset.filter(pk__in=ids)
+    code = kind_code(kind)
+    return [Entry(code, pk, label, score or 0) for pk, label, score in queryset.iterator(chunk_size=5000) if label]
+
+
+def build() -> PrefixIndex:
+    return PrefixIndex.build(entry for kind in KINDS for entry in _entries(kind))
+
+
+# ---------- Снимок и дельта в кэше ----------
+
+def publish() -> int:
+    """Построить снимок из БД, положить в кэш под новой версией и сбросить дельту. Возвращает версию."""
+    index = build()
+    version = time.time_ns()
+    previous = cache.get(STATE_KEY)
+    cache.set(BASE_KEY.format(version=version), index, None)
+    cache.set(STATE_KEY, {"version": version, "delta": {}}, None)
+    if previous:
+        cache.touch(BASE_KEY.format(version=previous["version"]), OLD_BASE_TTL)   # Дочитать старый снимок ещё успеют
+    logger.info(f"Индекс автодополнения построен: {len(index)} записей, версия {version}")
+    return version
+
+
+def _publish_once() -> Optional[dict]:
+    """Снимок строит один процесс; остальные получают None и пока живут со своей копией."""
+    if cache.add(BUILD_LOCK_KEY, 1, 300):
+        try:
+            publish()
+        finally:
+            cache.delete(BUILD_LOCK_KEY)
+    return cache.get(STATE_KEY)
+
+
+def _shared() -> bool:
+    return getattr(settings, "CACHE_SHARED", False)
+
+
+def _expired(state: dict) -> bool:
+    """Без общего кэша снимок устаревает сам: правки из других процессов в дельту этого не попадают."""
+    ttl = getattr(settings, "AUTOCOMPLETE_LOCAL_TTL", 300)
+    return not _shared() and time.time_ns() - state["version"] > ttl * 1e9
+
+
+def _build_in_background() -> None:
+    try:
+        _publish_once()
+    except Exception:                                       # Следующая проверка попробует снова
+        logger.exception("Не удалось построить индекс автодополнения")
+    finally:
+        close_old_connections()
+
+
+def request_rebuild() -> None:
+    """Построить снимок вне запроса: задачей (общий кэш) или потоком этого процесса (LocMemCache)."""
+    if _shared():
+        if cache.add(REBUILD_QUEUED_KEY, 1, 300):           # Одна задача на все воркеры
+            jobs.enqueue("autocomplete.rebuild")
+        return
+    with _lock:
+        thread = _builder["thread"]
+        if thread is None or not thread.is_alive():
+            thread = threading.Thread(target=_build_in_background, name="autocomplete-build", daemon=True)
+            _builder["thread"] = thread
+            thread.start()
+
+
+def current() -> tuple[PrefixIndex, dict]:
+    """
+    Индекс и дельта текущей версии: из памяти процесса, сверяясь с кэшем не чаще CHECK_INTERVAL.
+    Снимка нет - прежняя копия процесса (или пустой индекс) и сборка в фоне.
+    """
+    now = time.monotonic()
+    if _process["index"] is not None and now - _process["checked_at"] < CHECK_INTERVAL:
+        return _process["index"], _process["delta"]
+
+    state = cache.get(STATE_KEY)                            # Маленький ключ: версия и дельта; снимок - только при смене версии
+    index = _process["index"]
+    if state is not None and (state["version"] != _process["version"] or index is None):
+        fresh = cache.get(BASE_KEY.format(version=state["version"]))
+        if fresh is None:                                   # Снимок вытеснен из кэша
+            state = None
+        else:
+            index = fresh
+    if state is None or _expired(state):
+        request_rebuild()
+    if state is None:
+        state = {"version": _process["version"], "delta": _process["delta"]}
+    if index is None:
+        index = PrefixIndex.build([])                       # Первый снимок ещё строится - подсказок пока нет
+        state = {"version": None, "delta": {}}
+    with _lock:
+        _process.update(version=state["version"], index=index, delta=state["delta"], checked_at=now)
+    return index, state["delta"]
+
+
+def apply(kind: str, ids: list[int]) -> None:
+    """
+    Дописать текущее состояние объектов (или их удаление) в дельту; большая дельта - новый снимок.
+    С общим кэшем вызывается задачей autocomplete.update и строит снимок сама; без него - после коммита
+    запроса, и снимок строится в фоне.
+    """
+    state = cache.get(STATE_KEY)
+    if state is None:                                       # Новый снимок и так увидит эти изменения
+        if _shared():
+            _publish_once()
+        else:
+            request_rebuild()
+        return
+    code = kind_code(kind)
+    delta = dict(state["delta"])
+    found = {entry.id: entry for entry in _entries(kind, ids)}
+    for pk in ids:
+        delta[(code, pk)] = found.get(pk)
+    if len(delta) >= COMPACT_AT and _shared():
+        publish()
+        return
+    cache.set(STATE_KEY, {"version": state["version"], "delta": delta}, None)
+    if len(delta) >= COMPACT_AT:
+        request_rebuild()
+
+
+@jobs.handler("autocomplete.update", concurrency=1, max_attempts=3)    # По одной: дельта - read-modify-write одного ключа
+def update_job(job: Job) -> None:
+    apply(job.payload["kind"], job.payload.get("ids", []))
+
+
+@jobs.handler("autocomplete.rebuild", concurrency=1, max_attempts=3)
+def rebuild_job(job: Job) -> None:
+    try:
+        _publish_once()
+    finally:
+        cache.delete(REBUILD_QUEUED_KEY)
+
+
+def enqueue(kind: str, pk: int) -> None:
+    if _shared():
+        jobs.enqueue("autocomplete.update", {"kind": kind, "ids": [pk]})
+    else:                                                   # Дельта задачи из run_jobs осталась бы в его LocMemCache
+        transaction.on_commit(lambda: apply(kind, [pk]))
+
+
+# ---------- Поиск ----------
+
+def search(query: str, *, kinds: Optional[list[str]] = None, limit: int = 10) -> list[Entry]:
+    """До limit лучших записей, у которых одно из слов названия (или его транслитерация) начинается с query."""
+    prefix = normalize(query)
+    limit = min(max(limit, 1), MAX_LIMIT)
+    if not prefix:
+        return []
+    codes = {kind_code(kind) for kind in kinds} if kinds else None
+    index, delta = current()
+
+    skip = (lambda code, pk: (code, pk) in delta) if delta else None
+    found = index.search(prefix, limit, kinds=codes, skip=skip)
+    for entry in delta.values():                            # Дельта маленькая - проверяем каждую запись
+        if entry is not None and (codes is None or entry.kind in codes) and matches(entry.label, prefix):
+            found.append(entry)
+    return sorted(found, key=rank_key)[:limit]
+
+
+def as_dict(entry: Entry) -> dict:
+    return {"type": KINDS[entry.kind], "id": entry.id, "label": entry.label}
+
+
+def warm() -> None:
+    """Прогрев при старте воркера (gunicorn post_worker_init): снимок читается из кэша до первого запроса."""
+    try:
+        current()
+    except Exception as e:                                  # БД или кэш могут быть ещё недоступны - прогреемся на первом запросе
+        logger.warning(f"Не удалось прогреть индекс автодополнения: {e}")
+
+
+def reset() -> None:
+    """Забыть копию процесса (тесты, после publish в том же процессе)."""
+    with _lock:
+        _process.update(version=None, index=None, delta={}, checked_at=0.0)
+
+
+__all__ = ["KINDS", "search", "as_dict", "publish", "apply", "enqueue", "request_rebuild", "current", "warm", "reset"]
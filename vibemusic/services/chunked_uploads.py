@@ -0,0 +1,183 @@
+# vibemusic/services/chunked_uploads.py
+"""
+Докачиваемая загрузка треков кусками.
+
+Клиент создаёт сессию (имя, размер), шлёт куски PUT'ом с offset - в любом порядке
+и параллельно, повторно при обрыве - и завершает сессию. Каждый кусок лежит отдельным
+файлом <UPLOAD_SESSION_ROOT>/<id>/<offset>.part (запись через временный файл + os.replace,
+так что повтор куска безопасен). При завершении куски склеиваются через os.copy_file_range
+(копирование внутри ядра, без чтения в память процесса), и трек создаётся как при обычной
+загрузке: Track.save ищет тот же звук по audio_hash и ставит задачу track.enrich.
+
+Байты кусков учитываются в IPChangeLog: для сессии - LogIPMiddleware (UPLOAD_API_PREFIX),\nдля JWT/Basic - UploadAccountingMixin вьюхи после аутентификации DRF.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import uuid
+from datetime import timedelta
+from typing import BinaryIO, Optional
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from vibemusic.models import Track, UploadSession
+from vibemusic.utils.upload_handlers import policy_for, sniff
+
+
+logger = logging.getLogger(__name__)
+
+READ_SIZE = 64 * 1024
+
+
+class ChunkedUploadError(Exception):
+    """Неверный запрос к сессии загрузки (размер, offset, состояние)."""
+
+
+class AssembledFile(File):
+    """Склеенный файл на диске: FileSystemStorage переместит его (rename), а не скопирует."""
+
+    def temporary_file_path(self) -> str:
+        return self.file.name
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+def session_dir(session: UploadSession) -> str:
+    return os.path.join(str(_setting("UPLOAD_SESSION_ROOT", settings.BASE_DIR / "cache" / "uploads")), str(session.id))
+
+
+def _part_path(session: UploadSession, offset: int) -> str:
+    return os.path.join(session_dir(session), f"{offset:020d}.part")   # Нули слева - сортировка имён = порядок в файле
+
+
+def create_session(user, filename: str, size: int, chunk_size: Optional[int] = None, title: str = "") -> UploadSession:
+    _, max_bytes = policy_for("add_post", "tracks")                     # Тот же лимит, что у треков в PostForm
+    if size <= 0 or size > max_bytes:
+        raise ChunkedUploadError(f"Размер файла должен быть от 1 байта до {max_bytes} байт.")
+    if not filename.lower().endswith((".mp3", ".wav", ".ogg", ".flac")):
+        raise ChunkedUploadError("Поддерживаются только MP3, WAV, OGG и FLAC файлы.")
+    chunk_size = chunk_size or _setting("UPLOAD_CHUNK_SIZE", 5 * 1024 * 1024)
+    if not _setting("UPLOAD_CHUNK_MIN", 256 * 1024) <= chunk_size <= _setting("UPLOAD_CHUNK_MAX", 32 * 1024 * 1024):
+        raise ChunkedUploadError("Недопустимый размер куска.")
+    session = UploadSession.objects.create(
+        user=user, filename=os.path.basename(filename), title=title, size=size, chunk_size=chunk_size,
+    )
+    os.makedirs(session_dir(session), exist_ok=True)
+    return session
+
+
+def received_offsets(session: UploadSession) -> list[int]:
+    """Уже принятые куски - по файлам на диске, без записи в БД на каждый кусок."""
+    try:
+        names = os.listdir(session_dir(session))
+    except FileNotFoundError:
+        return []
+    return sorted(int(name[:-5]) for name in names if name.endswith(".part"))
+
+
+def write_chunk(session: UploadSession, offset: int, stream: BinaryIO, length: Optional[int]) -> int:
+    """Принять кусок с offset. Возвращает число записанных байт."""
+    if session.status != UploadSession.Status.OPEN:
+        raise ChunkedUploadError("Сессия уже завершена или отменена.")
+    if offset < 0 or offset >= session.size or offset % session.chunk_size:
+        raise ChunkedUploadError(f"offset должен быть кратен {session.chunk_size} и меньше {session.size}.")
+    expected = min(session.chunk_size, session.size - offset)
+    if length is not None and length != expected:
+        raise ChunkedUploadError(f"Кусок с offset {offset} должен быть {expected} байт, получено {length}.")
+
+    target = _part_path(session, offset)
+    tmp = f"{target}.{uuid.uuid4().hex}.tmp"                           # Свой временный файл - параллельный повтор того же куска не мешает
+    written = 0
+    try:
+        with open(tmp, "wb") as out:
+            while written <= expected:
+                data = stream.read(min(READ_SIZE, expected + 1 - written))
+                if not data:
+                    break
+                if offset == 0 and not written and sniff(data[:16], "audio") is None:
+                    raise ChunkedUploadError("Файл не является аудиофайлом (MP3, WAV, OGG, FLAC).")
+                written += len(data)
+                if written > expected:
+                    break
+                out.write(data)
+        if written != expected:
+            raise ChunkedUploadError(f"Кусок с offset {offset} должен быть {expected} байт, получено {written}.")
+        os.replace(tmp, target)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return written
+
+
+def _concat(src_path: str, dst: BinaryIO) -> None:
+    """Дописать src в конец dst: copy_file_range (в ядре), иначе обычное копирование."""
+    with open(src_path, "rb") as src:
+        remaining = os.fstat(src.fileno()).st_size
+        try:
+            while remaining:
+                copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                if not copied:
+                    break
+                remaining -= copied
+        except (AttributeError, OSError):                                  # Не Linux или ФС не умеет - копируем через userspace
+            src.seek(os.fstat(src.fileno()).st_size - remaining)
+            dst.seek(0, os.SEEK_END)
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+            remaining = 0
+    if remaining:
+        raise ChunkedUploadError(f"Не удалось склеить кусок {src_path}.")
+
+
+def complete(session: UploadSession) -> Track:
+    """Склеить куски и создать трек. Повторный вызов для завершённой сессии вернёт тот же трек."""
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().get(pk=session.pk)   # Два параллельных complete не склеят файл дважды
+        if session.status == UploadSession.Status.COMPLETE and session.track_id:
+            return session.track
+        if session.status != UploadSession.Status.OPEN:
+            raise ChunkedUploadError("Сессия отменена.")
+        expected = list(range(0, session.size, session.chunk_size))
+        missing = sorted(set(expected) - set(received_offsets(session)))
+        if missing:
+            raise ChunkedUploadError(f"Не хватает кусков: {len(missing)} (первый offset {missing[0]}).")
+
+        assembled = os.path.join(session_dir(session), "assembled")
+        with open(assembled, "wb") as out:
+            for offset in expected:
+                _concat(_part_path(session, offset), out)
+
+        track = Track(title=session.title or os.path.splitext(session.filename)[0])
+        with open(assembled, "rb") as f:
+            track.audio_file = AssembledFile(f, name=session.filename)
+            track.save()                                                    # Как обычная загрузка: дедупликация по audio_hash и track.enrich
+        session.status = UploadSession.Status.COMPLETE
+        session.track = track
+        session.save(update_fields=["status", "track"])
+    shutil.rmtree(session_dir(session), ignore_errors=True)
+    logger.info(f"Загрузка {session.pk} завершена: трек {track.pk}, {session.size} байт")
+    return track
+
+
+def abort(session: UploadSession) -> None:
+    UploadSession.objects.filter(pk=session.pk, status=UploadSession.Status.OPEN).update(status=UploadSession.Status.ABORTED)
+    shutil.rmtree(session_dir(session), ignore_errors=True)
+
+
+def expire_stale() -> int:
+    """Отменить и удалить с диска сессии старше UPLOAD_SESSION_TTL секунд."""
+    cutoff = timezone.now() - timedelta(seconds=_setting("UPLOAD_SESSION_TTL", 24 * 3600))
+    stale = list(UploadSession.objects.filter(status=UploadSession.Status.OPEN, created_at__lt=cutoff))
+    for session in stale:
+        abort(session)
+    return len(stale)
+
+
+__all__ = ["ChunkedUploadError", "create_session", "write_chunk", "received_offsets", "complete", "abort", "expire_stale"]
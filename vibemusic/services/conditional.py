@@ -0,0 +1,80 @@
+# vibemusic/services/conditional.py
+"""
+Условные GET (ETag / Last-Modified, ответ 304) для страниц и API-карточек постов, исполнителей, жанров и треков.
+
+Валидаторы считаются без загрузки графа объектов:
+  - одна выборка по уникальному индексу (slug/pk): updated_at, денормализованные счётчики и id связей самой строки;
+  - версии тегов services/api_cache.py - из кэша: их меняют сигналы при правке связанных объектов
+    (исполнитель, жанр, треки, комментарии, фотографии) и сброс буфера счётчиков.
+ETag - хэш строки, версий и того, что зависит от запроса (пользователь, версия обвязки сайта).
+Last-Modified - самое позднее из updated_at и времени смены версий тегов.
+If-None-Match / If-Modified-Since сверяет django.utils.cache.get_conditional_response.
+
+Работает только с общим кэшем (CACHE_SHARED, Redis): с LocMemCache версии тегов, сменённые другим воркером
+или run_jobs, сюда не доходят, и клиент получал бы 304 на изменившуюся страницу. Тогда валидаторов нет - полный ответ.
+"""
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from vibemusic.services import api_cache
+
+
+@dataclass(frozen=True)
+class Validators:
+    etag: str
+    last_modified: Optional[datetime]
+
+
+def enabled() -> bool:
+    return getattr(settings, "CACHE_SHARED", False)
+
+
+def lookup(queryset, fields: Iterable[str], **filters) -> Optional[dict]:
+    """Только нужные колонки одной строки; None - объекта нет (дальше вьюха ответит 404 как обычно)."""
+    try:
+        rows = list(queryset.filter(**filters).order_by().values(*fields)[:1])
+    except (TypeError, ValueError, ValidationError):        # /tracks/abc/ - тоже 404, но от самой вьюхи
+        return None
+    return rows[0] if rows else None
+
+
+def compute(row: dict, tags: Iterable[str], extra: Iterable = ()) -> Validators:
+    versions = api_cache.tag_versions(set(tags))
+    payload = repr((sorted(row.items()), sorted(versions.items()), tuple(extra)))
+    etag = f'W/"{hashlib.sha1(payload.encode()).hexdigest()}"'       # Слабый: тело страницы отличается CSRF-токеном
+
+    stamps = [datetime.fromtimestamp(version / 1e9, tz=dt_timezone.utc) for version in versions.values()]
+    if row.get("updated_at"):
+        stamps.append(row["updated_at"])
+    return Validators(etag, max(stamps) if stamps else None)
+
+
+def not_modified(request, validators: Validators):
+    """Ответ 304 (412 для If-Match), если у клиента актуальная версия; иначе None."""
+    last_modified = int(validators.last_modified.timestamp()) if validators.last_modified else None
+    return get_conditional_response(request, etag=validators.etag, last_modified=last_modified)
+
+
+def apply(response, validators: Validators, *, private: bool = False):
+    """Валидаторы в полный ответ; no-cache - браузер каждый раз переспрашивает, а не угадывает свежесть."""
+    if response.status_code == 200:
+        response.headers.setdefault("ETag", validators.etag)
+        if validators.last_modified:
+            response.headers.setdefault("Last-Modified", http_date(validators.last_modified.timestamp()))
+        if private:                                         # Ответ зависит от пользователя - общим кэшам не хранить
+            patch_cache_control(response, no_cache=True, private=True)
+        else:
+            patch_cache_control(response, no_cache=True)
+    return response
+
+
+__all__ = ["Validators", "enabled", "lookup", "compute", "not_modified", "apply"]
@@ -0,0 +1,260 @@
+# vibemusic/services/counters.py
+"""
+Денормализованные счётчики (лайки, комментарии) с буферизованной записью.
+
+Инкременты копятся в кэше (cache.incr) и раз в COUNTER_FLUSH_INTERVAL секунд
+сбрасываются в БД пачкой UPDATE ... SET field = field + delta: при очередном инкременте
+и фоновым потоком воркера (start_flusher из gunicorn post_worker_init) - тихий воркер
+не держит дельты бесконечно; при остановке воркера остаток дописывает хук worker_exit.
+Команда `reconcile_counters` пересчитывает значения из Reaction/Comment и чинит дрейф.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from collections import defaultdict
+from typing import Iterable
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, close_old_connections, transaction
+from django.db.models import Count, F, Model, OuterRef, Subquery, IntegerField, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from vibemusic.services import api_cache, search
+from vibemusic.utils.cache_sets import cache_set
+
+
+logger = logging.getLogger(__name__)
+
+BUFFER_PREFIX = "counters:buf"
+DIRTY_KEY = "counters:dirty"
+FLUSH_LOCK_KEY = "counters:flush-lock"
+FLUSHING_KEY = "counters:flushing"
+FLUSHING_TIMEOUT = 60                                       # Страховка: упавший процесс не блокирует сброс навсегда
+
+# Какие модели и поля пересчитываются: (модель, поле-счётчик) -> (исходная модель, FK на цель)
+COUNTER_SOURCES = {
+    ("vibemusic.Post", "like_count"): ("vibemusic.Reaction", "post"),
+    ("vibemusic.Track", "like_count"): ("vibemusic.Reaction", "track"),
+    ("vibemusic.Comment", "like_count"): ("vibemusic.Reaction", "comment"),
+    ("vibemusic.Artist", "like_count"): ("vibemusic.Reaction", "artist"),
+    ("vibemusic.Post", "comment_count"): ("vibemusic.Comment", "post"),
+}
+
+
+def _buffer_key(label: str, field: str, pk) -> str:
+    return f"{BUFFER_PREFIX}:{label}:{field}:{pk}"
+
+
+def _parse_buffer_key(key: str) -> tuple[str, str, int]:
+    _, _, label, field, pk = key.split(":")
+    return label, field, int(pk)
+
+
+def bump(model_or_obj, pk, field: str, delta: int = 1) -> None:
+    """
+    Отложенно изменить счётчик `field` у объекта на delta.
+    Запись в БД произойдёт при ближайшем flush_counters().
+    """
+    if not pk or not delta:
+        return
+    label = model_or_obj._meta.label                        # 'vibemusic.Post'
+    key = _buffer_key(label, field, pk)
+    try:
+        cache.incr(key, delta)
+    except ValueError:                                      # Ключа ещё нет - создаём (add не перетрёт параллельный инкремент)
+        cache.add(key, 0, None)
+        cache.incr(key, delta)
+    cache_set.add(DIRTY_KEY, key)
+    maybe_flush()
+
+
+def pending(model, pks: Iterable, field: str) -> dict[int, int]:
+    """Ещё не сброшенные в БД дельты для набора объектов - одним get_many."""
+    label = model._meta.label
+    keys = {_buffer_key(label, field, pk): pk for pk in pks if pk}
+    if not keys:
+        return {}
+    found = cache.get_many(list(keys))
+    return {keys[k]: int(v) for k, v in found.items() if v}
+
+
+def current(obj: Model, field: str) -> int:
+    """
+    Актуальное значение: колонка в БД + ещё не сброшенная дельта.
+    Колонку перечитываем (один SELECT по pk): буфер мог быть сброшен после загрузки obj.
+    """
+    obj.refresh_from_db(fields=[field])
+    stored = getattr(obj, field) or 0
+    return max(stored + pending(type(obj), [obj.pk], field).get(obj.pk, 0), 0)
+
+
+def maybe_flush() -> None:
+    """
+    Сбросить буфер, если с прошлого сброса прошло COUNTER_FLUSH_INTERVAL секунд.
+    Лок через cache.add - один сброс на интервал на все воркеры.
+    """
+    interval = int(getattr(settings, "COUNTER_FLUSH_INTERVAL", 5))
+    if interval <= 0 or cache.add(FLUSH_LOCK_KEY, 1, interval):
+        flush_counters()
+
+
+def flush_counters() -> int:
+    """
+    Сбросить накопленные дельты в БД. Возвращает число обновлённых счётчиков.
+    Одинаковые дельты одной модели/поля группируются в один UPDATE ... WHERE pk IN (...).
+    Буфер уменьшается только после успешной записи: если UPDATE упал, ключи возвращаются
+    в DIRTY_KEY и дельты применит следующий сброс.
+    """
+    if not cache.add(FLUSHING_KEY, 1, FLUSHING_TIMEOUT):
+        return 0                                            # Сброс уже идёт: забранные им дельты ещё не вычтены из буфера
+    try:
+        return _flush_dirty()
+    finally:
+        cache.delete(FLUSHING_KEY)
+
+
+def _flush_dirty() -> int:
+    keys = sorted(cache_set.pop_all(DIRTY_KEY))
+    if not keys:
+        return 0
+
+    taken: dict[str, int] = {}
+    grouped: dict[tuple[str, str, int], list[int]] = defaultdict(list)
+    for key, delta in cache.get_many(keys).items():
+        delta = int(delta or 0)
+        if not delta:
+            continue
+        taken[key] = delta
+        label, field, pk = _parse_buffer_key(key)
+        grouped[(label, field, delta)].append(pk)
+
+    updated = 0
+    try:
+        with transaction.atomic():
+            for (label, field, delta), pks in grouped.items():
+                model = apps.get_model(label)
+                updated += model.objects.filter(pk__in=pks).update(**{field: Greatest(F(field) + delta, Value(0))})   # Greatest: не уходим ниже нуля при дрейфе
+                if field == 'like_count':
+                    search.bump_like_count(model, pks, delta)   # Копия в поисковых документах - для ранжирования общего поиска
+    except Exception:
+        if taken:
+            cache_set.add(DIRTY_KEY, *taken)                # Буфер не тронут - вернуть ключи в очередь сброса
+        raise
+
+    for key, delta in taken.items():
+        cache.decr(key, delta)                              # Вычитаем ровно то, что записали: параллельные инкременты не теряются
+    for (label, field, delta), pks in grouped.items():
+        _invalidate_responses(apps.get_model(label), pks)   # UPDATE мимо сигналов - ответы и ETag с этими счётчиками
+    if updated:
+        logger.debug(f"Сброшено счётчиков: {updated}")
+    return updated
+
+
+_flusher: dict = {"thread": None, "stop": None}
+_flusher_lock = threading.Lock()
+
+
+def _flush_loop(interval: int, stop: threading.Event) -> None:
+    while not stop.wait(interval):
+        try:
+            maybe_flush()
+        except DatabaseError:                               # БД недоступна - ключи вернулись в DIRTY_KEY, дельты применит следующий сброс
+            logger.exception("Не удалось сбросить буфер счётчиков")
+        finally:
+            close_old_connections()
+
+
+def start_flusher() -> None:
+    """
+    Фоновый сброс раз в COUNTER_FLUSH_INTERVAL в этом процессе (после fork - у каждого воркера свой поток).
+    С LocMemCache буфер у каждого воркера свой, и без потока он сбрасывался бы только при следующем лайке.
+    """
+    interval = int(getattr(settings, "COUNTER_FLUSH_INTERVAL", 5))
+    if interval <= 0:
+        return                                              # Сбрасывается сразу при инкременте
+    with _flusher_lock:
+        thread = _flusher["thread"]
+        if thread is None or not thread.is_alive():
+            stop = threading.Event()
+            thread = threading.Thread(target=_flush_loop, args=(interval, stop), name="counters-flusher", daemon=True)
+            _flusher.update(thread=thread, stop=stop)
+            thread.start()
+
+
+def stop_flusher() -> None:
+    """Остановить поток (worker_exit - перед последним сбросом)."""
+    with _flusher_lock:
+        if _flusher["stop"] is not None:
+            _flusher["stop"].set()
+        _flusher.update(thread=None, stop=None)
+
+
+def _invalidate_responses(model, pks: list[int]) -> None:
+    """Теги объектов и "<модель>:counts" - версия счётчиков для страниц, где они показаны списком."""
+    if pks:
+        kind = model._meta.model_name
+        api_cache.invalidate(api_cache.object_tags(kind, pks) | {f"{kind}:counts"})
+
+
+def _actual_count_subquery(source_label: str, fk: str):
+    source = apps.get_model(source_label)
+    return Coalesce(
+        Subquery(
+            source.objects.filter(**{fk: OuterRef("pk")})
+            .order_by()
+            .values(fk)
+            .annotate(c=Count("pk"))
+            .values("c")[:1],
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def reconcile_counters(batch_size: int = 1000) -> dict[str, int]:
+    """
+    Пересчитать все счётчики из исходных таблиц и исправить расхождения.
+    Возвращает {'Post.like_count': исправлено, ...}.
+    """
+    flush_counters()
+    report = {}
+    for (label, field), (source_label, fk) in COUNTER_SOURCES.items():
+        model = apps.get_model(label)
+        drifted = (
+            model.objects.annotate(actual=_actual_count_subquery(source_label, fk))
+            .exclude(**{field: F("actual")})
+            .only("pk", field)
+        )
+        fixed = []
+        for obj in drifted.iterator(chunk_size=batch_size):
+            setattr(obj, field, obj.actual)
+            fixed.append(obj)
+        model.objects.bulk_update(fixed, [field], batch_size=batch_size)
+        _invalidate_responses(model, [obj.pk for obj in fixed])
+        report[f"{model.__name__}.{field}"] = len(fixed)
+    return report
+
+
+def reaction_target(reaction) -> tuple[type[Model], int] | None:
+    """К какому объекту относится Reaction: (модель, pk) или None."""
+    for fk in ("post", "track", "comment", "artist"):
+        pk = getattr(reaction, f"{fk}_id")
+        if pk:
+            return reaction._meta.get_field(fk).related_model, pk
+    return None
+
+
+__all__ = [
+    "bump",
+    "pending",
+    "current",
+    "maybe_flush",
+    "flush_counters",
+    "start_flusher",
+    "stop_flusher",
+    "reconcile_counters",
+    "reaction_target",
+]
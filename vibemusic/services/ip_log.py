@@ -0,0 +1,107 @@
+# vibemusic/services/ip_log.py
+"""
+Буферизованная запись IPChangeLog.
+
+Middleware только кладёт событие в очередь процесса (без похода в БД).
+Фоновый поток сбрасывает очередь одним bulk_create, когда набралось
+IP_LOG_BATCH_SIZE событий или прошло IP_LOG_FLUSH_INTERVAL секунд.
+При остановке воркера остаток дописывается (atexit и хук gunicorn worker_exit).
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import DatabaseError, InterfaceError, OperationalError, close_old_connections
+from django.utils import timezone
+
+from vibemusic.models import IPChangeLog
+
+
+logger = logging.getLogger(__name__)
+
+
+class IPEvent(NamedTuple):
+    user_id: int
+    ip: str
+    bytes_uploaded: int
+    timestamp: datetime
+
+
+class IPLogBuffer:
+    def __init__(self) -> None:
+        self.events: deque[IPEvent] = deque(maxlen=getattr(settings, "IP_LOG_MAX_BUFFER", 50_000))  # БД недоступна - старые события вытесняются, память не растёт
+        self.wakeup = threading.Event()
+        self.flush_lock = threading.Lock()
+        self.thread: threading.Thread | None = None
+        self.start_lock = threading.Lock()
+
+    def add(self, user_id: int, ip: str, bytes_uploaded: int = 0) -> None:
+        """Положить событие в очередь. deque.append потокобезопасен - лок на пути запроса не нужен."""
+        self.events.append(IPEvent(user_id, ip, bytes_uploaded, timezone.now()))
+        self._ensure_thread()
+        if len(self.events) >= getattr(settings, "IP_LOG_BATCH_SIZE", 500):
+            self.wakeup.set()
+
+    def flush(self) -> int:
+        """Записать всё накопленное. Возвращает число записанных строк."""
+        with self.flush_lock:
+            batch = []
+            while self.events:
+                batch.append(self.events.popleft())
+            if not batch:
+                return 0
+            try:
+                IPChangeLog.objects.bulk_create(
+                    [IPChangeLog(user_id=e.user_id, ip=e.ip, bytes_uploaded=e.bytes_uploaded, timestamp=e.timestamp) for e in batch],
+                    batch_size=getattr(settings, "IP_LOG_BATCH_SIZE", 500),
+                )
+            except (OperationalError, InterfaceError):            # БД недоступна - вернём в очередь до следующего сброса
+                logger.exception(f"Не удалось записать {len(batch)} событий IPChangeLog, вернём в очередь")
+                self.events.extendleft(reversed(batch))
+                return 0
+            except DatabaseError:                                  # Например, пользователя уже удалили - пачку не повторяем
+                logger.exception(f"Пачка из {len(batch)} событий IPChangeLog отброшена")
+                return 0
+            return len(batch)
+
+    def _ensure_thread(self) -> None:
+        # Поток стартует лениво: после fork gunicorn у каждого воркера свой
+        if self.thread is not None and self.thread.is_alive():
+            return
+        with self.start_lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name="ip-log-flusher", daemon=True)
+                self.thread.start()
+
+    def _run(self) -> None:
+        interval = getattr(settings, "IP_LOG_FLUSH_INTERVAL", 2.0)
+        while True:
+            self.wakeup.wait(interval)
+            self.wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+
+buffer = IPLogBuffer()
+
+
+def log_upload(user_id: int, ip: str, bytes_uploaded: int = 0) -> None:
+    buffer.add(user_id, ip, bytes_uploaded)
+
+
+def flush() -> int:
+    return buffer.flush()
+
+
+atexit.register(flush)                                     # Остановка процесса (в т.ч. manage.py runserver) - не теряем хвост
+
+
+__all__ = ["log_upload", "flush", "IPLogBuffer"]
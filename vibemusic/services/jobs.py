@@ -0,0 +1,184 @@
+# vibemusic/services/jobs.py
+"""
+Очередь фоновых задач в БД (модель Job).
+
+    @jobs.handler('track.enrich', concurrency=2)
+    def enrich(job): ...
+
+    jobs.enqueue('track.enrich', {'track_id': 1})
+
+Воркер - `python manage.py run_jobs`. Задача берётся оптимистично
+(UPDATE ... WHERE status='queued' - кто обновил строку, тот и выполняет),
+при ошибке возвращается в очередь с экспоненциальной задержкой, после max_attempts - FAILED.
+Задачи, чей воркер умер, возвращаются в очередь через JOBS_LOCK_TIMEOUT секунд.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import random
+import socket
+import traceback
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable, Iterable, Optional
+
+from django.conf import settings
+from django.db.models import Count, F
+from django.utils import timezone
+
+from vibemusic.models import Job
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class HandlerSpec:
+    func: Callable[[Job], None]
+    concurrency: Optional[int]                              # Сколько задач этого типа одновременно на все воркеры (None - без лимита)
+    max_attempts: int
+
+
+_handlers: dict[str, HandlerSpec] = {}
+
+
+def handler(kind: str, *, concurrency: Optional[int] = None, max_attempts: int = 5):
+    """Декоратор: зарегистрировать обработчик задач типа kind. Обработчик получает объект Job."""
+    def decorator(func):
+        _handlers[kind] = HandlerSpec(func, concurrency, max_attempts)
+        return func
+    return decorator
+
+
+def registered_kinds() -> list[str]:
+    return sorted(_handlers)
+
+
+def enqueue(kind: str, payload: Optional[dict] = None, *, delay: float = 0, max_attempts: Optional[int] = None) -> Job:
+    """
+    Поставить задачу в очередь. Строка пишется в текущей транзакции:
+    если запрос откатится, задача тоже исчезнет, а воркер увидит её только после коммита.
+    """
+    spec = _handlers.get(kind)
+    return Job.objects.create(
+        kind=kind,
+        payload=payload or {},
+        run_after=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or (spec.max_attempts if spec else 5),
+    )
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Задержка перед повтором: base * 2^(n-1), не больше JOBS_BACKOFF_MAX, с джиттером ±20%."""
+    base = getattr(settings, "JOBS_BACKOFF_BASE", 30)
+    cap = getattr(settings, "JOBS_BACKOFF_MAX", 3600)
+    delay = min(base * 2 ** max(attempts - 1, 0), cap)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def recover_stale(now=None) -> int:
+    """Вернуть в очередь задачи, которые «выполняются» дольше JOBS_LOCK_TIMEOUT (воркер упал или убит)."""
+    now = now or timezone.now()
+    timeout = getattr(settings, "JOBS_LOCK_TIMEOUT", 600)
+    recovered = Job.objects.filter(status=Job.Status.RUNNING, locked_at__lt=now - timedelta(seconds=timeout)).update(
+        status=Job.Status.QUEUED, locked_by="", locked_at=None, run_after=now,
+        last_error="Задача возвращена в очередь: истёк JOBS_LOCK_TIMEOUT",
+    )
+    if recovered:
+        logger.warning(f"Возвращено в очередь зависших задач: {recovered}")
+    return recovered
+
+
+def _available_kinds(kinds: Optional[Iterable[str]]) -> list[str]:
+    """Типы, у которых не исчерпан лимит параллельности."""
+    kinds = [k for k in (kinds or _handlers) if k in _handlers]
+    limited = [k for k in kinds if _handlers[k].concurrency]
+    if not limited:
+        return kinds
+    running = dict(
+        Job.objects.filter(status=Job.Status.RUNNING, kind__in=limited)
+        .values("kind").annotate(n=Count("pk")).values_list("kind", "n")
+    )
+    return [k for k in kinds if not _handlers[k].concurrency or running.get(k, 0) < _handlers[k].concurrency]
+
+
+def claim(worker_id: str, kinds: Optional[Iterable[str]] = None, batch: int = 10) -> Optional[Job]:
+    """
+    Взять одну готовую задачу. Кандидаты читаются без блокировок, захват - условный UPDATE:
+    если другой воркер успел раньше, обновится 0 строк и берём следующего кандидата.
+    Лимит concurrency проверяется перед захватом и может кратковременно превыситься на число воркеров.
+    """
+    now = timezone.now()
+    available = _available_kinds(kinds)
+    if not available:
+        return None
+    candidates = (
+        Job.objects.filter(status=Job.Status.QUEUED, run_after__lte=now, kind__in=available)
+        .order_by("run_after", "pk")
+        .values_list("pk", flat=True)[:batch]
+    )
+    for pk in candidates:
+        taken = Job.objects.filter(pk=pk, status=Job.Status.QUEUED).update(
+            status=Job.Status.RUNNING, locked_by=worker_id, locked_at=now, attempts=F("attempts") + 1,
+        )
+        if taken:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def run(job: Job) -> bool:
+    """Выполнить захваченную задачу и записать результат. True - успешно."""
+    spec = _handlers.get(job.kind)
+    try:
+        if spec is None:
+            raise LookupError(f"Нет обработчика для задачи '{job.kind}'")
+        spec.func(job)
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts >= job.max_attempts or spec is None:
+            Job.objects.filter(pk=job.pk).update(status=Job.Status.FAILED, last_error=error, finished_at=timezone.now(), locked_by="", locked_at=None)
+            logger.error(f"Задача {job} окончательно провалилась после {job.attempts} попыток")
+        else:
+            delay = backoff_seconds(job.attempts)
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.Status.QUEUED, last_error=error, locked_by="", locked_at=None,
+                run_after=timezone.now() + timedelta(seconds=delay),
+            )
+            logger.warning(f"Задача {job} упала (попытка {job.attempts}/{job.max_attempts}), повтор через {delay:.0f} с")
+        return False
+
+    Job.objects.filter(pk=job.pk).update(status=Job.Status.DONE, finished_at=timezone.now(), locked_by="", locked_at=None, last_error="")
+    logger.debug(f"Задача {job} выполнена")
+    return True
+
+
+def run_pending(worker_id: Optional[str] = None, kinds: Optional[Iterable[str]] = None, limit: Optional[int] = None) -> int:
+    """Выполнить готовые задачи до опустошения очереди (или limit штук). Возвращает число выполненных."""
+    worker_id = worker_id or default_worker_id()
+    recover_stale()
+    done = 0
+    while limit is None or done < limit:
+        job = claim(worker_id, kinds)
+        if job is None:
+            break
+        run(job)
+        done += 1
+    return done
+
+
+__all__ = [
+    "handler",
+    "enqueue",
+    "claim",
+    "run",
+    "run_pending",
+    "recover_stale",
+    "backoff_seconds",
+    "registered_kinds",
+    "default_worker_id",
+]
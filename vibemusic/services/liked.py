@@ -0,0 +1,86 @@
+# vibemusic/services/liked.py
+"""
+Кэш «что лайкнул пользователь»: по одному множеству id на (пользователь, тип объекта).
+
+Вместо obj.liked_by.filter(id=user.id).exists() на каждую строку страница проверяет
+все свои id одним походом в кэш (Redis SET или frozenset в локальном кэше).
+Множества обновляются сигналами Reaction (в т.ч. из LikeViewSet._toggle) только если уже прогреты.
+"""
+from __future__ import annotations
+
+from typing import Iterable, Mapping
+
+from django.conf import settings
+from django.db.models import Model
+
+from vibemusic.utils.cache_sets import cache_set
+
+
+TARGET_FIELDS = ("post", "track", "comment", "artist")         # FK в Reaction, на которые бывает лайк
+
+
+def _ttl() -> int:
+    return int(getattr(settings, "LIKED_SET_TTL", 24 * 3600))
+
+
+def _key(user_pk: int, model: type[Model]) -> str:
+    return f"liked:{model._meta.model_name}:{user_pk}"
+
+
+def _load_from_db(user_pk: int, model: type[Model]) -> set[str]:
+    from vibemusic.models import Reaction
+    fk = model._meta.model_name                                 # 'post' / 'track' / ...
+    ids = Reaction.objects.filter(user_id=user_pk, **{f"{fk}__isnull": False}).values_list(f"{fk}_id", flat=True)
+    members = {str(pk) for pk in ids}
+    cache_set.load(_key(user_pk, model), members, timeout=_ttl())
+    return members
+
+
+def liked_ids(user, pks_by_model: Mapping[type[Model], Iterable[int]]) -> dict[type[Model], set[int]]:
+    """
+    Какие из переданных id пользователь лайкнул.
+    liked_ids(user, {Post: [1, 2], Track: [7]}) -> {Post: {2}, Track: set()}
+    Все типы проверяются одним походом в кэш; холодные множества догружаются из БД.
+    """
+    pks_by_model = {model: [pk for pk in pks if pk] for model, pks in pks_by_model.items()}
+    if not user or not getattr(user, "is_authenticated", False):
+        return {model: set() for model in pks_by_model}
+
+    keys = {model: _key(user.pk, model) for model in pks_by_model}
+    found = cache_set.members_many(list(keys.values()))
+    result = {}
+    for model, pks in pks_by_model.items():
+        members = found.get(keys[model])
+        if members is None:                                     # Холодный кэш - один SELECT по Reaction на тип
+            members = _load_from_db(user.pk, model)
+        result[model] = {pk for pk in pks if str(pk) in members}
+    return result
+
+
+def annotate_liked(user, *objects_by_model: Iterable[Model]) -> None:
+    """
+    Проставить obj.liked_by_me для нескольких списков объектов одной проверкой.
+    annotate_liked(user, page_posts, post.tracks.all(), comments_page)
+    """
+    groups: dict[type[Model], list[Model]] = {}
+    for objects in objects_by_model:
+        for obj in objects:
+            groups.setdefault(type(obj), []).append(obj)
+    if not groups:
+        return
+    liked = liked_ids(user, {model: [o.pk for o in objs] for model, objs in groups.items()})
+    for model, objs in groups.items():
+        for obj in objs:
+            obj.liked_by_me = obj.pk in liked[model]
+
+
+def mark(user_pk: int, model: type[Model], pk: int, is_liked: bool) -> None:
+    """Отразить лайк/снятие лайка в прогретом множестве (холодное не трогаем)."""
+    key = _key(user_pk, model)
+    if is_liked:
+        cache_set.add(key, pk, only_if_exists=True, timeout=_ttl())
+    else:
+        cache_set.discard(key, pk, timeout=_ttl())
+
+
+__all__ = ["liked_ids", "annotate_liked", "mark"]
@@ -0,0 +1,143 @@
+# vibemusic/services/post_genres.py
+"""
+Материализованная связь «пост - жанр» (PostGenre).
+
+Прямые жанры поста D = {post.genre} ∪ artist.genres.
+Пост входит в жанр G, если G ∈ D (is_direct=True) или G.related_genres ∩ D ≠ ∅ (is_direct=False).
+Раньше это считалось на каждый запрос четырьмя OR-джойнами с DISTINCT,
+теперь фильтр по жанру - один джойн по уникальному индексу (genre, post).
+
+Таблица поддерживается сигналами (signals.py) и пересобирается командой `rebuild_post_genres`.
+"""
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from typing import Iterable
+
+from django.apps import apps as global_apps
+from django.db import transaction
+from django.db.models import Q
+
+
+logger = logging.getLogger(__name__)
+
+
+def _models(apps):
+    return (
+        apps.get_model("vibemusic", "Post"),
+        apps.get_model("vibemusic", "Genre"),
+        apps.get_model("vibemusic", "Artist"),
+        apps.get_model("vibemusic", "PostGenre"),
+    )
+
+
+def expected_memberships(post_ids: Iterable[int], apps=global_apps) -> dict[int, dict[int, bool]]:
+    """{post_id: {genre_id: is_direct}} - как должна выглядеть таблица для этих постов (3 запроса на пачку)."""
+    Post, Genre, Artist, _ = _models(apps)
+    posts = list(Post.objects.filter(pk__in=list(post_ids)).values_list("pk", "genre_id", "artist_id"))
+
+    artist_genres: dict[int, set[int]] = defaultdict(set)
+    artist_ids = {artist_id for _, _, artist_id in posts if artist_id}
+    if artist_ids:
+        rows = Artist.genres.through.objects.filter(artist_id__in=artist_ids).values_list("artist_id", "genre_id")
+        for artist_id, genre_id in rows:
+            artist_genres[artist_id].add(genre_id)
+
+    direct: dict[int, set[int]] = {}
+    for pk, genre_id, artist_id in posts:
+        direct[pk] = ({genre_id} if genre_id else set()) | artist_genres.get(artist_id, set())
+
+    # Обратный индекс related_genres: прямой жанр X -> жанры G, у которых X среди связанных
+    related_to: dict[int, set[int]] = defaultdict(set)
+    all_direct = set().union(*direct.values()) if direct else set()
+    if all_direct:
+        rows = Genre.related_genres.through.objects.filter(to_genre_id__in=all_direct).values_list("to_genre_id", "from_genre_id")
+        for to_genre, from_genre in rows:
+            related_to[to_genre].add(from_genre)
+
+    result = {}
+    for pk, genres in direct.items():
+        membership = {genre_id: False for x in genres for genre_id in related_to.get(x, ())}
+        membership.update({genre_id: True for genre_id in genres})          # Прямая связь важнее связанной
+        result[pk] = membership
+    return result
+
+
+def rebuild_for_posts(post_ids: Iterable[int], apps=global_apps) -> int:
+    """
+    Привести строки PostGenre для постов к ожидаемым. Пишем только разницу.
+    Возвращает число изменённых строк.
+    """
+    post_ids = {pk for pk in post_ids if pk}
+    if not post_ids:
+        return 0
+    *_, PostGenre = _models(apps)
+    expected = expected_memberships(post_ids, apps=apps)
+
+    with transaction.atomic():
+        existing = {
+            (post_id, genre_id): (pk, is_direct)
+            for pk, post_id, genre_id, is_direct in PostGenre.objects.filter(post_id__in=post_ids)
+            .values_list("pk", "post_id", "genre_id", "is_direct")
+        }
+        wanted = {(post_id, genre_id): is_direct for post_id, genres in expected.items() for genre_id, is_direct in genres.items()}
+
+        stale = [pk for key, (pk, _) in existing.items() if key not in wanted]
+        to_create = [PostGenre(post_id=p, genre_id=g, is_direct=d) for (p, g), d in wanted.items() if (p, g) not in existing]
+        flip = defaultdict(list)                                            # is_direct изменился - обновляем пачкой по значению
+        for key, is_direct in wanted.items():
+            if key in existing and existing[key][1] != is_direct:
+                flip[is_direct].append(existing[key][0])
+
+        if stale:
+            PostGenre.objects.filter(pk__in=stale).delete()
+        PostGenre.objects.bulk_create(to_create, ignore_conflicts=True)     # ignore_conflicts: параллельная пересборка того же поста
+        for is_direct, pks in flip.items():
+            PostGenre.objects.filter(pk__in=pks).update(is_direct=is_direct)
+    return len(stale) + len(to_create) + sum(len(pks) for pks in flip.values())
+
+
+def posts_for_artists(artist_ids: Iterable[int], apps=global_apps) -> set[int]:
+    Post, *_ = _models(apps)
+    return set(Post.objects.filter(artist_id__in=list(artist_ids)).values_list("pk", flat=True))
+
+
+def posts_for_genres(genre_ids: Iterable[int], apps=global_apps) -> set[int]:
+    """
+    Посты, чья принадлежность жанрам genre_ids может измениться при правке их related_genres:
+    уже привязанные к ним и те, у кого прямой жанр входит в их related_genres.
+    """
+    Post, Genre, _, PostGenre = _models(apps)
+    genre_ids = list(genre_ids)
+    related = set(Genre.related_genres.through.objects.filter(from_genre_id__in=genre_ids).values_list("to_genre_id", flat=True))
+    linked = set(PostGenre.objects.filter(genre_id__in=genre_ids).values_list("post_id", flat=True))
+    if related:
+        linked |= set(
+            Post.objects.filter(Q(genre_id__in=related) | Q(artist__genres__in=related)).values_list("pk", flat=True)
+        )
+    return linked
+
+
+def rebuild_all(batch_size: int = 500, apps=global_apps) -> int:
+    """Полная пересборка таблицы пачками (команда rebuild_post_genres, миграция)."""
+    Post, *_ = _models(apps)
+    changed = 0
+    batch = []
+    for pk in Post.objects.order_by("pk").values_list("pk", flat=True).iterator(chunk_size=batch_size):
+        batch.append(pk)
+        if len(batch) >= batch_size:
+            changed += rebuild_for_posts(batch, apps=apps)
+            batch = []
+    changed += rebuild_for_posts(batch, apps=apps)
+    logger.info(f"PostGenre пересобрана, изменено строк: {changed}")
+    return changed
+
+
+__all__ = [
+    "expected_memberships",
+    "rebuild_for_posts",
+    "posts_for_artists",
+    "posts_for_genres",
+    "rebuild_all",
+]
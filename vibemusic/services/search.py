@@ -0,0 +1,460 @@
+# vibemusic/services/search.py
+"""
+Полнотекстовый поиск по постам, трекам, исполнителям и жанрам вместо ILIKE '%...%' (SearchFilter).
+
+Тексты объектов денормализованы в таблицу SearchDocument (kind, object_id, title, body):
+пост - заголовок, текст и имя исполнителя; трек - название, исполнитель и альбом; исполнитель - имя и биография;
+жанр - название и описание. Рядом лежат slug, лайки, дата и прямые жанры - для общего поиска (search_all).
+Индекс над ней строит движок БД:
+
+- PostgresEngine - генерируемая колонка vector = tsvector по конфигурациям russian и english
+  (заголовок с весом A, текст - B) и GIN-индекс; ранг - ts_rank_cd;
+- SqliteEngine (локальная разработка) - FTS5-таблица с внешним содержимым, которую ведут триггеры; ранг - bm25.
+
+Каждое слово запроса ищется как префикс, все слова обязательны.
+Документы обновляются сигналами (signals.py), переименование исполнителя или смена его жанров
+переиндексирует его треки и посты фоновой задачей search.reindex; лайки копируются при сбросе буфера
+счётчиков (services/counters.py); полная пересборка - команда rebuild_search_index.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from django.apps import apps as global_apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import F, QuerySet, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Greatest
+from django.urls import reverse
+from django.utils import timezone
+
+from vibemusic.models import Job
+from vibemusic.services import api_cache, jobs
+
+
+logger = logging.getLogger(__name__)
+
+TABLE = "vibemusic_searchdocument"
+MAX_TERMS = 8                                               # Длиннее - почти наверняка вставили текст целиком
+REINDEX_CHUNK = 500
+
+KIND_MODELS = {"post": "Post", "track": "Track", "artist": "Artist", "genre": "Genre"}
+INDEXED_FIELDS = {                                          # save(update_fields=...) без этих полей документ не меняет
+    "post": {"title", "content", "artist", "genre", "slug"},
+    "track": {"title", "artist", "album_name"},
+    "artist": {"name", "bio", "slug"},
+    "genre": {"name", "description", "slug"},
+}
+DEFAULT_RANK_WEIGHTS = {"text": 0.6, "likes": 0.25, "recency": 0.15}
+
+
+def terms(query: str) -> list[str]:
+    """Слова запроса в нижнем регистре; знаки препинания и операторы движков отбрасываются."""
+    return re.findall(r"\w+", (query or "").lower())[:MAX_TERMS]
+
+
+# ---------- Движки ----------
+
+class SearchEngine:
+    vendor = ""
+
+    def install(self, schema_editor) -> None:
+        """Создать индекс над таблицей документов (миграция)."""
+        raise NotImplementedError
+
+    def uninstall(self, schema_editor) -> None:
+        raise NotImplementedError
+
+    def match(self, kind: str, words: list[str]) -> tuple[str, list]:
+        """SQL, возвращающий object_id подходящих документов типа kind."""
+        raise NotImplementedError
+
+    def rank(self, kind: str, words: list[str], outer_pk: str) -> tuple[str, list]:
+        """Коррелированный подзапрос: ранг документа для строки внешнего запроса (чем больше, тем лучше)."""
+        raise NotImplementedError
+
+    def match_documents(self, words: list[str]) -> tuple[str, list]:
+        """SQL, возвращающий id подходящих документов всех типов."""
+        raise NotImplementedError
+
+    def rank_document(self, words: list[str], outer_id: str) -> tuple[str, list]:
+        """Ранг документа по его id (для выборки из самой SearchDocument)."""
+        raise NotImplementedError
+
+    def optimize(self) -> None:
+        """Обслуживание индекса после полной пересборки."""
+
+
+class PostgresEngine(SearchEngine):
+    vendor = "postgresql"
+    CONFIGS = ("russian", "english")                        # LANGUAGE_CODE = 'ru', но названия и имена часто английские
+
+    def install(self, schema_editor):
+        vector = " || ".join(
+            f"setweight(to_tsvector('{config}'::regconfig, {column}), '{weight}')"
+            for column, weight in (("title", "A"), ("body", "B")) for config in self.CONFIGS
+        )
+        schema_editor.execute(f"ALTER TABLE {TABLE} ADD COLUMN vector tsvector GENERATED ALWAYS AS ({vector}) STORED")
+        schema_editor.execute(f"CREATE INDEX {TABLE}_vector_gin ON {TABLE} USING GIN (vector)")
+
+    def uninstall(self, schema_editor):
+        schema_editor.execute(f"ALTER TABLE {TABLE} DROP COLUMN IF EXISTS vector")   # Индекс удаляется вместе с колонкой
+
+    def _tsquery(self, words):
+        expression = " || ".join(f"to_tsquery('{config}'::regconfig, %s)" for config in self.CONFIGS)
+        return f"({expression})", [" & ".join(f"{word}:*" for word in words)] * len(self.CONFIGS)
+
+    def match(self, kind, words):
+        tsquery, params = self._tsquery(words)
+        return f"SELECT d.object_id FROM {TABLE} d WHERE d.kind = %s AND d.vector @@ {tsquery}", [kind, *params]
+
+    def rank(self, kind, words, outer_pk):
+        tsquery, params = self._tsquery(words)
+        return (f"SELECT ts_rank_cd(d.vector, {tsquery}) FROM {TABLE} d WHERE d.kind = %s AND d.object_id = {outer_pk}",
+                [*params, kind])
+
+    def match_documents(self, words):
+        tsquery, params = self._tsquery(words)
+        return f"SELECT d.id FROM {TABLE} d WHERE d.vector @@ {tsquery}", params
+
+    def rank_document(self, words, outer_id):
+        tsquery, params = self._tsquery(words)
+        return f"SELECT ts_rank_cd(d.vector, {tsquery}) FROM {TABLE} d WHERE d.id = {outer_id}", params
+
+    def optimize(self):
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.execute(f"ANALYZE {TABLE}")
+
+
+class SqliteEngine(SearchEngine):
+    vendor = "sqlite"
+    FTS = f"{TABLE}_fts"
+    WEIGHTS = "10.0, 1.0"                                   # bm25: вес title и body
+
+    def install(self, schema_editor):
+        fts = self.FTS
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {fts} USING fts5(title, body, content='{TABLE}', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {TABLE} BEGIN "
+            f"INSERT INTO {fts}(rowid, title, body) VALUES (new.id, new.title, new.body); END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {TABLE} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {fts}_au AFTER UPDATE ON {TABLE} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); "
+            f"INSERT INTO {fts}(rowid, title, body) VALUES (new.id, new.title, new.body); END"
+        )
+        schema_editor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")   # Документы, уже лежащие в таблице
+
+    def uninstall(self, schema_editor):
+        for suffix in ("ai", "ad", "au"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {self.FTS}_{suffix}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {self.FTS}")
+
+    @staticmethod
+    def _expression(words):
+        return " ".join(f'"{word}"*' for word in words)     # \w+ без кавычек - безопасно внутри строки FTS5
+
+    def match(self, kind, words):
+        return (f"SELECT d.object_id FROM {self.FTS} f JOIN {TABLE} d ON d.id = f.rowid "
+                f"WHERE {self.FTS} MATCH %s AND d.kind = %s", [self._expression(words), kind])
+
+    def rank(self, kind, words, outer_pk):
+        return (f"SELECT -bm25({self.FTS}, {self.WEIGHTS}) FROM {self.FTS} WHERE {self.FTS} MATCH %s AND rowid = "
+                f"(SELECT d.id FROM {TABLE} d WHERE d.kind = %s AND d.object_id = {outer_pk})",
+                [self._expression(words), kind])
+
+    def match_documents(self, words):
+        return f"SELECT rowid FROM {self.FTS} WHERE {self.FTS} MATCH %s", [self._expression(words)]
+
+    def rank_document(self, words, outer_id):
+        return (f"SELECT -bm25({self.FTS}, {self.WEIGHTS}) FROM {self.FTS} WHERE {self.FTS} MATCH %s AND rowid = {outer_id}",
+                [self._expression(words)])
+
+    def optimize(self):
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.execute(f"INSERT INTO {self.FTS}({self.FTS}) VALUES ('optimize')")
+
+
+ENGINES = {engine.vendor: engine for engine in (PostgresEngine(), SqliteEngine())}
+
+
+def get_engine(connection=None) -> SearchEngine:
+    vendor = (connection or connections[DEFAULT_DB_ALIAS]).vendor
+    try:
+        return ENGINES[vendor]
+    except KeyError:
+        raise ImproperlyConfigured(f"Полнотекстовый поиск не поддерживается для БД {vendor!r}")
+
+
+# ---------- Поиск ----------
+
+def filter_queryset(queryset: QuerySet, kind: str, query: str) -> QuerySet:
+    """
+    Оставить объекты, подходящие под запрос, и добавить аннотацию search_rank.
+    Сортировка - по рангу, затем по id (ключ keyset-пагинации ('-search_rank', '-id')).
+    """
+    words = terms(query)
+    if not words:
+        return queryset
+    engine = get_engine(connections[queryset.db])
+    meta = queryset.model._meta
+    quote = connections[queryset.db].ops.quote_name
+    match_sql, match_params = engine.match(kind, words)
+    rank_sql, rank_params = engine.rank(kind, words, f"{quote(meta.db_table)}.{quote(meta.pk.column)}")
+    return (queryset.filter(pk__in=RawSQL(match_sql, match_params))
+            .annotate(search_rank=RawSQL(rank_sql, rank_params))
+            .order_by("-search_rank", "-id"))
+
+
+@dataclass
+class SearchHit:
+    kind: str
+    object_id: int
+    title: str
+    url: str
+    like_count: int
+    created_at: Optional[object]
+    score: float
+
+
+@dataclass
+class SearchResults:
+    hits: list[SearchHit] = field(default_factory=list)
+    total: int = 0                                          # Сколько документов прошло фильтры (из просмотренных)
+    truncated: bool = False                                 # Совпадений больше SEARCH_MAX_MATCHES - фасеты по лучшим из них
+    type_facets: dict[str, int] = field(default_factory=dict)
+    genre_facets: dict[int, int] = field(default_factory=dict)
+
+
+def document_url(kind: str, object_id: int, slug: str) -> str:
+    if kind == "track":
+        return reverse("vibemusic:track_stream", kwargs={"pk": object_id})
+    if not slug:
+        return ""
+    return reverse(f"vibemusic:{kind}_detail", kwargs={f"{kind}_slug": slug})
+
+
+def _weights() -> dict[str, float]:
+    return {**DEFAULT_RANK_WEIGHTS, **getattr(settings, "SEARCH_RANK_WEIGHTS", {})}
+
+
+def search_all(query: str, *, kinds: Optional[set[str]] = None, genre: Optional[int] = None,
+               limit: int = 20, offset: int = 0) -> SearchResults:
+    """
+    Общий поиск по всем типам одним запросом к SearchDocument: до SEARCH_MAX_MATCHES лучших по тексту документов
+    со слагом, лайками, датой и жанрами. Итоговый ранг, фасеты и страница считаются по ним в памяти:
+    score = text * релевантность/лучшая + likes * log(1+лайки)/log(1+макс) + recency * 0.5^(возраст/полураспад).
+    Фасеты по типам учитывают фильтр жанра, фасеты по жанрам - фильтр типов (каждый не сужает сам себя).
+    """
+    words = terms(query)
+    if not words:
+        return SearchResults()
+    from vibemusic.models import SearchDocument
+    engine = get_engine()
+    quote = connections[DEFAULT_DB_ALIAS].ops.quote_name
+    match_sql, match_params = engine.match_documents(words)
+    rank_sql, rank_params = engine.rank_document(words, f"{quote(TABLE)}.{quote('id')}")
+    cap = getattr(settings, "SEARCH_MAX_MATCHES", 1000)
+    rows = list(
+        SearchDocument.objects.filter(id__in=RawSQL(match_sql, match_params))
+        .annotate(text_rank=RawSQL(rank_sql, rank_params))
+        .order_by("-text_rank", "-id")
+        .values_list("kind", "object_id", "title", "slug", "like_count", "created_at", "genres", "text_rank")[:cap + 1]
+    )
+    truncated = len(rows) > cap
+    rows = rows[:cap]
+
+    weights = _weights()
+    half_life = getattr(settings, "SEARCH_RECENCY_HALF_LIFE_DAYS", 30) * 86400
+    best_text = max((row[7] for row in rows), default=0) or 1.0
+    most_likes = math.log1p(max((row[4] for row in rows), default=0)) or 1.0
+    now = timezone.now()
+
+    type_facets, genre_facets = Counter(), Counter()
+    scored = []
+    for kind, object_id, title, slug, likes, created, genres, text_rank in rows:
+        genre_ids = {int(pk) for pk in genres.split()}
+        in_genre = genre is None or genre in genre_ids
+        in_kinds = not kinds or kind in kinds
+        if in_genre:
+            type_facets[kind] += 1
+        if in_kinds:
+            genre_facets.update(genre_ids)
+        if not (in_genre and in_kinds):
+            continue
+        recency = 0.5 ** (max((now - created).total_seconds(), 0) / half_life) if created else 0.0
+        score = (weights["text"] * text_rank / best_text + weights["likes"] * math.log1p(likes) / most_likes
+                 + weights["recency"] * recency)
+        scored.append((score, kind, object_id, title, slug, likes, created))
+
+    scored.sort(key=lambda item: (-item[0], item[1], -item[2]))
+    hits = [
+        SearchHit(kind, object_id, title, document_url(kind, object_id, slug), likes, created, round(score, 4))
+        for score, kind, object_id, title, slug, likes, created in scored[offset:offset + limit]
+    ]
+    return SearchResults(hits=hits, total=len(scored), truncated=truncated,
+                         type_facets=dict(type_facets), genre_facets=dict(genre_facets.most_common()))
+
+
+# ---------- Индексация ----------
+
+def _model(kind: str, apps=global_apps):
+    return apps.get_model("vibemusic", KIND_MODELS[kind])
+
+
+def _join(*parts) -> str:
+    return "\n".join(part for part in parts if part)
+
+
+def _genre_map(queryset, column: str, ids) -> dict[int, set[int]]:
+    """{id владельца: {genre_id}} по through-таблице."""
+    result: dict[int, set[int]] = {}
+    for owner, genre_id in queryset.filter(**{f"{column}__in": list(ids)}).values_list(column, "genre_id"):
+        result.setdefault(owner, set()).add(genre_id)
+    return result
+
+
+def _documents(kind: str, ids: list[int], apps=global_apps) -> dict[int, dict]:
+    """{object_id: поля SearchDocument} для существующих объектов (по запросу на тип плюс запрос жанров)."""
+    model = _model(kind, apps)
+    artist_genres = apps.get_model("vibemusic", "Artist").genres.through.objects.all()
+    if kind == "genre":
+        rows = model.objects.filter(pk__in=ids).values_list("pk", "name", "description", "slug")
+        return {pk: dict(title=name, body=description, slug=slug, like_count=0, created_at=None, genres={pk})
+                for pk, name, description, slug in rows}
+    if kind == "artist":
+        rows = list(model.objects.filter(pk__in=ids).values_list("pk", "name", "bio", "slug", "like_count", "created_at"))
+        genres = _genre_map(artist_genres, "artist_id", [row[0] for row in rows])
+        return {pk: dict(title=name, body=bio, slug=slug, like_count=likes, created_at=created, genres=genres.get(pk, set()))
+                for pk, name, bio, slug, likes, created in rows}
+    if kind == "track":
+        rows = list(model.objects.filter(pk__in=ids).values_list(
+            "pk", "title", "artist__name", "album_name", "like_count", "created_at", "artist_id"))
+        genres = _genre_map(artist_genres, "artist_id", {row[-1] for row in rows if row[-1]})
+        return {pk: dict(title=title, body=_join(artist, album), slug="", like_count=likes, created_at=created,
+                         genres=genres.get(artist_id, set()))
+                for pk, title, artist, album, likes, created, artist_id in rows}
+    rows = list(model.objects.filter(pk__in=ids).values_list(
+        "pk", "title", "content", "artist__name", "slug", "like_count", "created_at"))
+    direct_genres = apps.get_model("vibemusic", "PostGenre").objects.filter(is_direct=True)   # Для фасетов - без related_genres
+    genres = _genre_map(direct_genres, "post_id", [row[0] for row in rows])
+    return {pk: dict(title=title, body=_join(content, artist), slug=slug, like_count=likes, created_at=created,
+                     genres=genres.get(pk, set()))
+            for pk, title, content, artist, slug, likes, created in rows}
+
+
+def _pack_genres(genre_ids: Iterable[int]) -> str:
+    packed = f" {' '.join(str(pk) for pk in sorted(genre_ids))} " if genre_ids else ""
+    return packed if len(packed) <= 255 else packed[:packed.rindex(" ", 0, 255) + 1]
+
+
+def index(kind: str, ids: Iterable[int], apps=global_apps) -> int:
+    """Привести документы объектов к их текущему состоянию: upsert существующих, удаление пропавших."""
+    ids = list({pk for pk in ids if pk})
+    if not ids:
+        return 0
+    SearchDocument = apps.get_model("vibemusic", "SearchDocument")
+    documents = _documents(kind, ids, apps)
+    with transaction.atomic():
+        SearchDocument.objects.bulk_create(
+            [SearchDocument(kind=kind, object_id=pk, title=doc["title"][:255], body=doc["body"], slug=doc["slug"],
+                            like_count=doc["like_count"], created_at=doc["created_at"], genres=_pack_genres(doc["genres"]))
+             for pk, doc in documents.items()],
+            update_conflicts=True, unique_fields=["kind", "object_id"],
+            update_fields=["title", "body", "slug", "like_count", "created_at", "genres"],
+        )
+        missing = set(ids) - set(documents)
+        if missing:
+            SearchDocument.objects.filter(kind=kind, object_id__in=missing).delete()
+    if apps is global_apps:                                 # Не из миграции: кэш ответов ?search= по этому типу устарел
+        api_cache.invalidate({f"{kind}:list"})
+    return len(documents)
+
+
+def remove(kind: str, ids: Iterable[int]) -> None:
+    from vibemusic.models import SearchDocument
+    SearchDocument.objects.filter(kind=kind, object_id__in=list(ids)).delete()
+    api_cache.invalidate({f"{kind}:list"})
+
+
+def kind_for(model) -> Optional[str]:
+    return {name: kind for kind, name in KIND_MODELS.items()}.get(model.__name__)
+
+
+def artist_dependents(artist_id: int) -> dict[str, list[int]]:
+    """Треки и посты исполнителя: имя исполнителя входит в их документы."""
+    return {
+        kind: list(_model(kind).objects.filter(artist_id=artist_id).values_list("pk", flat=True))
+        for kind in ("track", "post")
+    }
+
+
+def enqueue_reindex(dependents: dict[str, list[int]]) -> None:
+    for kind, ids in dependents.items():
+        for start in range(0, len(ids), REINDEX_CHUNK):
+            jobs.enqueue("search.reindex", {"kind": kind, "ids": ids[start:start + REINDEX_CHUNK]})
+
+
+def bump_like_count(model, pks: list[int], delta: int) -> None:
+    """Копия лайков в документах - вызывается при сбросе буфера счётчиков тем же дельтой."""
+    from vibemusic.models import SearchDocument
+    kind = kind_for(model)
+    if kind:
+        SearchDocument.objects.filter(kind=kind, object_id__in=pks).update(like_count=Greatest(F("like_count") + delta, Value(0)))
+
+
+@jobs.handler("search.reindex", concurrency=1, max_attempts=3)
+def reindex_job(job: Job) -> None:
+    index(job.payload["kind"], job.payload.get("ids", []))
+
+
+def rebuild_all(batch_size: int = 500, apps=global_apps) -> int:
+    """Полная пересборка документов пачками (команда rebuild_search_index, миграция)."""
+    SearchDocument = apps.get_model("vibemusic", "SearchDocument")
+    total = 0
+    for kind in KIND_MODELS:
+        model = _model(kind, apps)
+        batch = []
+        for pk in model.objects.order_by("pk").values_list("pk", flat=True).iterator(chunk_size=batch_size):
+            batch.append(pk)
+            if len(batch) >= batch_size:
+                total += index(kind, batch, apps)
+                batch = []
+        total += index(kind, batch, apps)
+        SearchDocument.objects.filter(kind=kind).exclude(object_id__in=model.objects.values("pk")).delete()   # Удалённые мимо сигналов
+    logger.info(f"Поисковый индекс пересобран, документов: {total}")
+    return total
+
+
+__all__ = [
+    "SearchEngine",
+    "PostgresEngine",
+    "SqliteEngine",
+    "get_engine",
+    "terms",
+    "filter_queryset",
+    "index",
+    "remove",
+    "kind_for",
+    "artist_dependents",
+    "enqueue_reindex",
+    "bump_like_count",
+    "rebuild_all",
+    "search_all",
+    "SearchHit",
+    "SearchResults",
+]
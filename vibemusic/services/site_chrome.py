@@ -0,0 +1,117 @@
+# vibemusic/services/site_chrome.py
+"""
+«Обвязка» сайта, нужная почти каждой странице: жанры для меню и SiteSettings.
+
+Три уровня:
+  - запрос: результат запоминается на объекте request (шаблон, миксины и контекст-процессор берут одно и то же);
+  - процесс: копия в памяти воркера, пока не сменилась версия;
+  - общий кэш: данные под ключом с версией, версия - случайный токен.
+Сохранение/удаление Genre или SiteSettings меняет версию (signals.py) - до правки в админке БД не трогаем.
+
+Смену версии видят все процессы, только если кэш общий (Redis, CACHE_SHARED). С LocMemCache у каждого
+воркера своя версия: там она живёт SITE_CHROME_LOCAL_TTL секунд - правка из другого процесса видна не позже.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "site_chrome:version"
+DATA_KEY = "site_chrome:data:{version}"
+REQUEST_ATTR = "_site_chrome"
+
+_lock = threading.Lock()
+_process: dict = {"version": None, "chrome": None}         # Копия в памяти процесса
+
+
+@dataclass(frozen=True)
+class SiteChrome:
+    genres: tuple                                           # Жанры для меню (в порядке Genre.Meta.ordering)
+    site_settings: Optional[object]                         # Первая запись SiteSettings или None
+
+
+def _build() -> SiteChrome:
+    from vibemusic.models import Genre, SiteSettings
+    return SiteChrome(genres=tuple(Genre.objects.all()), site_settings=SiteSettings.objects.first())
+
+
+def _version_timeout():
+    """Общий кэш - версия бессрочна (её меняет invalidate); кэш процесса - устаревает сама."""
+    return None if getattr(settings, "CACHE_SHARED", False) else getattr(settings, "SITE_CHROME_LOCAL_TTL", 60)
+
+
+def _current_version() -> str:
+    version = cache.get(VERSION_KEY)
+    if version is None:                                     # Ключ вытеснен, истёк или кэш пуст - новый токен (старые данные под ним не переиспользуются)
+        cache.add(VERSION_KEY, uuid.uuid4().hex, _version_timeout())
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def load() -> SiteChrome:
+    """Данные текущей версии: из памяти процесса, из кэша или из БД (два запроса)."""
+    version = _current_version()
+    chrome = _process["chrome"]
+    if chrome is not None and _process["version"] == version:
+        return chrome
+
+    key = DATA_KEY.format(version=version)
+    chrome = cache.get(key)
+    if chrome is None:
+        chrome = _build()
+        cache.set(key, chrome, _version_timeout())
+        logger.debug(f"Site chrome загружен из БД, версия {version}")
+    with _lock:
+        _process.update(version=version, chrome=chrome)
+    return chrome
+
+
+def get(request=None) -> SiteChrome:
+    """Обвязка для запроса: повторные вызовы в рамках одного request не ходят даже в кэш."""
+    if request is None:
+        return load()
+    chrome = getattr(request, REQUEST_ATTR, None)
+    if chrome is None:
+        chrome = load()
+        setattr(request, REQUEST_ATTR, chrome)
+    return chrome
+
+
+def genres(request=None) -> tuple:
+    return get(request).genres
+
+
+def site_settings(request=None):
+    return get(request).site_settings
+
+
+def version() -> str:
+    """Текущая версия обвязки - часть ETag страниц (services/conditional.py): меню жанров и настройки есть на каждой."""
+    return _current_version()
+
+
+def invalidate() -> None:
+    """Сменить версию: все процессы перечитают данные при следующем запросе."""
+    cache.set(VERSION_KEY, uuid.uuid4().hex, _version_timeout())
+    with _lock:
+        _process.update(version=None, chrome=None)
+
+
+def warm() -> None:
+    """Прогрев при старте воркера (gunicorn post_worker_init)."""
+    try:
+        load()
+    except Exception as e:                                  # БД может быть ещё недоступна - прогреемся на первом запросе
+        logger.warning(f"Не удалось прогреть site chrome: {e}")
+
+
+__all__ = ["SiteChrome", "get", "load", "genres", "site_settings", "version", "invalidate", "warm"]
@@ -0,0 +1,177 @@
+# vibemusic/services/telegram_outbox.py
+"""
+Исходящие сообщения Telegram через таблицу TelegramOutbox.
+
+Запрос только пишет строку (enqueue) - в той же транзакции, что и бизнес-данные.
+Отправляет диспетчер (`python manage.py run_telegram_outbox`):
+  - ограниченный пул потоков вместо потока на сообщение;
+  - ведро токенов на чат (1/с, для групп 20/мин) и общее (30/с) - лимиты Bot API;
+  - 429 → пауза чата на retry_after, 5xx и сетевые ошибки → повтор с экспоненциальной задержкой;
+  - порядок внутри чата: берётся только голова чата (самое раннее неотправленное сообщение),
+    пока она ждёт повтора, остальные сообщения этого чата тоже ждут;
+  - одна requests.Session коннектора с пулом соединений по размеру пула потоков.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from threading import BoundedSemaphore, Event
+from typing import Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+
+from vibemusic.models import TelegramOutbox
+from vibemusic.utils.rate_limit import TokenBucket
+from vibemusic.utils.telegram import SendResult, TelegramConnector, default_connector
+
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(chat_id, text: str, parse_mode: str = "Markdown") -> Optional[TelegramOutbox]:
+    """Поставить сообщение в очередь. Пустой chat_id (не настроен) - ничего не делаем."""
+    if not chat_id:
+        logger.warning("Не указан chat_id для Telegram сообщения.")
+        return None
+    return TelegramOutbox.objects.create(chat_id=str(chat_id), text=text, parse_mode=parse_mode or "")
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+def _is_group(chat_id: str) -> bool:
+    return chat_id.startswith("-") or chat_id.startswith("@")         # Группы/каналы: отрицательный id или @username
+
+
+class OutboxDispatcher:
+    """Диспетчер очереди: берёт готовые сообщения пачками и отправляет их с учётом лимитов."""
+
+    def __init__(self, connector: Optional[TelegramConnector] = None, workers: Optional[int] = None) -> None:
+        self.connector = connector or default_connector()
+        self.workers = workers or _setting("TELEGRAM_OUTBOX_WORKERS", 8)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.workers)   # Keep-alive на каждый поток пула
+        self.connector.session.mount("https://", adapter)
+        self.connector.session.mount("http://", adapter)
+
+        self.global_bucket = TokenBucket(_setting("TELEGRAM_GLOBAL_RATE", 30), _setting("TELEGRAM_GLOBAL_RATE", 30))
+        self.chat_buckets: dict[str, TokenBucket] = {}
+        self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="tg-outbox")
+        self.slots = BoundedSemaphore(self.workers)                     # Не набираем больше сообщений, чем потоков
+        self.stop_event = Event()
+
+    def chat_bucket(self, chat_id: str) -> TokenBucket:
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            rate = _setting("TELEGRAM_GROUP_RATE", 20 / 60) if _is_group(chat_id) else _setting("TELEGRAM_CHAT_RATE", 1.0)
+            bucket = self.chat_buckets[chat_id] = TokenBucket(rate, 1)
+        return bucket
+
+    # ---------- Очередь ----------
+
+    def recover_stale(self) -> int:
+        """Сообщения, «зависшие» в отправке (диспетчер упал), возвращаем в очередь - доставка at-least-once."""
+        cutoff = timezone.now() - timedelta(seconds=_setting("TELEGRAM_OUTBOX_LOCK_TIMEOUT", 300))
+        return TelegramOutbox.objects.filter(status=TelegramOutbox.Status.SENDING, locked_at__lt=cutoff).update(
+            status=TelegramOutbox.Status.QUEUED, locked_at=None,
+        )
+
+    def dispatch_once(self) -> tuple[int, float]:
+        """
+        Один проход: отправить всё, на что есть токены. Возвращает (сколько отдано в пул, через сколько секунд
+        стоит прийти снова). Сообщения чатов без токена не захватываются и ждут следующего прохода.
+        """
+        now = timezone.now()
+        earlier = TelegramOutbox.objects.filter(
+            chat_id=OuterRef("chat_id"), pk__lt=OuterRef("pk"),
+            status__in=[TelegramOutbox.Status.QUEUED, TelegramOutbox.Status.SENDING],
+        )
+        due = list(
+            TelegramOutbox.objects.filter(status=TelegramOutbox.Status.QUEUED, next_attempt_at__lte=now)
+            .filter(~Exists(earlier))                                   # Только головы чатов: голова в backoff держит весь чат
+            .order_by("next_attempt_at", "pk")[: self.workers * 4]
+        )
+        submitted, wait = 0, _setting("TELEGRAM_OUTBOX_POLL_INTERVAL", 1.0)
+        for message in due:                                             # Голова у чата одна - одно сообщение чата за проход
+            bucket = self.chat_bucket(message.chat_id)
+            if not bucket.try_acquire():
+                wait = min(wait, bucket.wait_time())
+                continue
+            if not self.global_bucket.try_acquire():
+                bucket.refund()                                         # Токен чата не потрачен - вернём
+                wait = min(wait, self.global_bucket.wait_time())
+                break
+            claimed = TelegramOutbox.objects.filter(pk=message.pk, status=TelegramOutbox.Status.QUEUED).update(
+                status=TelegramOutbox.Status.SENDING, locked_at=now,
+            )
+            if not claimed:                                             # Взял другой диспетчер
+                continue
+            self.slots.acquire()
+            self.pool.submit(self._send, message)
+            submitted += 1
+        if len(due) >= self.workers * 4 and submitted:
+            wait = 0                                                    # Очередь длинная - сразу следующий проход
+        return submitted, wait
+
+    def _send(self, message: TelegramOutbox) -> None:
+        try:
+            result = self.connector.send_message_result(message.chat_id, message.text, parse_mode=message.parse_mode)
+            self._record(message, result)
+        except Exception as e:                                          # Не теряем сообщение из-за бага в обработке
+            logger.exception(f"Сбой отправки сообщения {message.pk}")
+            self._record(message, SendResult(ok=False, error=str(e)))
+        finally:
+            close_old_connections()
+            self.slots.release()
+
+    def _record(self, message: TelegramOutbox, result: SendResult) -> None:
+        attempts = message.attempts + 1
+        queryset = TelegramOutbox.objects.filter(pk=message.pk)
+        if result.ok:
+            queryset.update(status=TelegramOutbox.Status.SENT, attempts=attempts, sent_at=timezone.now(), locked_at=None, last_error="")
+            return
+
+        if result.status == 429 and result.retry_after:
+            self.chat_bucket(message.chat_id).block(float(result.retry_after))
+        if not result.retryable or attempts >= _setting("TELEGRAM_OUTBOX_MAX_ATTEMPTS", 8):
+            queryset.update(status=TelegramOutbox.Status.FAILED, attempts=attempts, locked_at=None, last_error=result.error)
+            logger.error(f"Сообщение Telegram {message.pk} не отправлено: {result.error}")
+            return
+        delay = result.retry_after or min(2 ** attempts, _setting("TELEGRAM_OUTBOX_BACKOFF_MAX", 600))
+        queryset.update(
+            status=TelegramOutbox.Status.QUEUED, attempts=attempts, locked_at=None, last_error=result.error,
+            next_attempt_at=timezone.now() + timedelta(seconds=delay),
+        )
+
+    # ---------- Цикл ----------
+
+    def run(self, once: bool = False) -> None:
+        self.recover_stale()
+        idle_since = time.monotonic()
+        try:
+            while not self.stop_event.is_set():
+                close_old_connections()
+                submitted, wait = self.dispatch_once()
+                if submitted:
+                    idle_since = time.monotonic()
+                elif once:
+                    break
+                elif time.monotonic() - idle_since > 60:
+                    self.recover_stale()
+                    idle_since = time.monotonic()
+                if wait:
+                    self.stop_event.wait(wait)
+        finally:
+            self.pool.shutdown(wait=True)                               # Дожидаемся отправок в полёте
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+
+__all__ = ["enqueue", "OutboxDispatcher"]
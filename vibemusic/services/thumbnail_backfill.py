@@ -0,0 +1,161 @@
+# vibemusic/services/thumbnail_backfill.py
+"""
+Пакетная перегенерация миниатюр (команда regenerate_thumbnails): после смены пресетов
+или для первоначального заполнения thumbs/ по уже загруженным изображениям.
+
+- обходит поля из thumbnails.FIELD_PRESETS пачками по pk;
+- копия считается актуальной, если она есть и не старше исходника (mtime) - такие пропускаются;
+- Pillow работает в пуле процессов (ProcessPoolExecutor) на всех ядрах; воркер получает
+  пути на диске и пишет файл через временный + os.replace, без Django и БД;
+- после каждой пачки прогресс (последний pk по каждому полю) пишется в файл-чекпойнт:
+  прерванный запуск продолжается с того же места. Ключ записи - поле, набор пресетов и --force
+  (_checkpoint_key): запуск с другим отбором не подхватывает чужой прогресс, а завершившись,
+  убирает из файла только свои записи.
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+from vibemusic.services import thumbnails
+
+
+@dataclass
+class BackfillStats:
+    sources: int = 0
+    written: int = 0
+    skipped: int = 0                                        # Копия уже актуальна
+    failed: int = 0                                         # Исходника нет на диске или он не открывается
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def rate(self) -> float:
+        return self.written / self.elapsed if self.elapsed else 0.0
+
+
+def _render_to_path(item: tuple) -> tuple[str, Optional[str]]:
+    """Воркер пула: исходник -> копия на диске. Возвращает (статус, ошибка)."""
+    source_path, target_path, preset, fmt, quality = item
+    try:
+        data = thumbnails.render(source_path, thumbnails.Preset(*preset), fmt, quality)
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        tmp = f"{target_path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as out:
+            out.write(data)
+        os.replace(tmp, target_path)                        # Читатели видят либо старую копию, либо новую целиком
+        return "written", None
+    except Exception as e:                                  # Битый файл не должен останавливать весь проход
+        return "failed", f"{source_path}: {e}"
+
+
+def _load_checkpoint(path: str) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_checkpoint(path: str, state: dict) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def _checkpoint_key(field_key: str, preset_names: tuple[str, ...], force: bool) -> str:
+    return f"{field_key}|{','.join(sorted(preset_names))}|{'force' if force else 'stale'}"
+
+
+def _finish_checkpoint(path: str, keys: set[str]) -> None:
+    """Проход завершён - убрать свои записи; прогресс прерванных запусков с другим отбором остаётся."""
+    state = {key: pk for key, pk in _load_checkpoint(path).items() if key not in keys}
+    if state:
+        _save_checkpoint(path, state)
+    elif os.path.exists(path):
+        os.unlink(path)                                     # Следующий проход начнётся с начала
+
+
+def _pending(names: list[str], preset_names: tuple[str, ...], force: bool, stats: BackfillStats) -> list[tuple]:
+    presets = thumbnails.presets()
+    fmt = thumbnails.output_format()
+    quality = getattr(settings, "THUMBNAIL_QUALITY", 82)
+    items = []
+    for name in names:
+        source_path = default_storage.path(name)
+        try:
+            source_mtime = os.stat(source_path).st_mtime
+        except OSError:
+            stats.failed += len(preset_names)
+            continue
+        for preset_name in preset_names:
+            target_path = default_storage.path(thumbnails.variant_name(name, preset_name))
+            try:
+                if not force and os.stat(target_path).st_mtime >= source_mtime:
+                    stats.skipped += 1
+                    continue
+            except OSError:
+                pass                                        # Копии нет
+            items.append((source_path, target_path, tuple(presets[preset_name]), fmt, quality))
+    return items
+
+
+def regenerate(*, workers: Optional[int] = None, batch_size: int = 500, force: bool = False,
+               only_presets: Optional[set[str]] = None, only_fields: Optional[set[str]] = None,
+               checkpoint: Optional[str] = None, progress: Optional[Callable[[str, BackfillStats], None]] = None,
+               errors: Optional[Callable[[str], None]] = None) -> BackfillStats:
+    """Перегенерировать копии для всех (или выбранных) полей и пресетов. Возвращает статистику."""
+    workers = workers or os.cpu_count() or 1
+    state = _load_checkpoint(checkpoint) if checkpoint else {}
+    stats = BackfillStats()
+    own_keys = set()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for model, field_name, preset_names in thumbnails.image_fields():
+            key = f"{model.__name__}.{field_name}"
+            preset_names = tuple(p for p in preset_names if not only_presets or p in only_presets)
+            if (only_fields and key not in only_fields) or not preset_names:
+                continue
+            state_key = _checkpoint_key(key, preset_names, force)
+            own_keys.add(state_key)
+            last_pk = state.get(state_key, 0)
+            while True:
+                rows = list(model.objects.filter(pk__gt=last_pk).exclude(**{field_name: ""}).exclude(**{f"{field_name}__isnull": True})
+                            .order_by("pk").values_list("pk", field_name)[:batch_size])
+                if not rows:
+                    break
+                names = list(dict.fromkeys(name for _, name in rows))   # Одна обложка у многих треков - строим один раз
+                stats.sources += len(names)
+                items = _pending(names, preset_names, force, stats)
+                for status, error in pool.map(_render_to_path, items, chunksize=max(1, len(items) // (workers * 4))):
+                    if status == "written":
+                        stats.written += 1
+                    else:
+                        stats.failed += 1
+                        if errors:
+                            errors(error)
+                last_pk = rows[-1][0]
+                state[state_key] = last_pk
+                if checkpoint:
+                    _save_checkpoint(checkpoint, state)
+                if progress:
+                    progress(key, stats)
+
+    if checkpoint:
+        _finish_checkpoint(checkpoint, own_keys)
+    return stats
+
+
+__all__ = ["BackfillStats", "regenerate"]
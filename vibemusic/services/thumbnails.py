@@ -0,0 +1,188 @@
+# vibemusic/services/thumbnails.py
+"""
+Уменьшенные копии изображений по именованным пресетам (Pillow, WebP или JPEG).
+
+Копия лежит в thumbs/<пресет>/<ab>/<ключ>.<ext>, ключ - sha1 от имени исходного файла и
+параметров пресета. Storage не перезаписывает файлы (новая загрузка - новое имя), поэтому
+имя исходника однозначно задаёт содержимое; после смены размеров пресета ключ тоже меняется.
+
+- thumbnail_url() для шаблонов и API: URL готовой копии, а если её ещё нет - подписанный URL
+  представления thumbnail/, которое построит копию при первом запросе и перенаправит на неё
+  (подпись - пара пресет/исходник, выданная сайтом: произвольные имена, в том числе сами копии
+  из thumbs/, представление не принимает, и число файлов не растёт от перебора URL);
+- после сохранения модели с изображением (signals.py) ставится задача thumbnails.generate;
+- FIELD_PRESETS - какие пресеты нужны каким полям (по нему же работает пакетная перегенерация).
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+from typing import Iterable, NamedTuple, Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.core import signing
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare
+from PIL import Image, ImageOps, features
+
+from vibemusic.models import Job
+from vibemusic.services import jobs
+
+
+logger = logging.getLogger(__name__)
+
+
+class Preset(NamedTuple):
+    width: int
+    height: int
+    crop: bool                                              # True - заполнить рамку с обрезкой, False - вписать без увеличения
+
+
+PRESETS = {
+    "icon": Preset(48, 48, True),                           # Иконки жанров, аватар в меню
+    "avatar": Preset(128, 128, True),                       # Профили, комментарии
+    "cover": Preset(300, 300, True),                        # Обложки альбомов в плеере
+    "card": Preset(640, 640, True),                         # Карточки постов в ленте
+    "comment": Preset(240, 240, False),                     # Картинка в комментарии
+    "admin": Preset(240, 240, False),                       # Превью в админке
+    "header": Preset(1600, 900, False),                     # Фоны жанров, шапка сайта
+}
+
+FIELD_PRESETS = {                                           # "Модель.поле" -> пресеты, которые строятся заранее
+    "PostImage.image": ("card", "admin"),
+    "Track.album_image": ("cover", "admin"),
+    "Artist.photo": ("avatar", "card", "admin"),
+    "Genre.icon": ("icon",),
+    "Genre.background_image": ("header",),
+    "Profile.photo": ("avatar", "icon"),
+    "Comment.image": ("comment",),
+    "SiteSettings.header_image": ("header",),
+}
+
+SOURCE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".webp")
+VARIANTS_DIR = "thumbs/"
+
+
+class ThumbnailError(Exception):
+    """Неизвестный пресет или исходник, который не открывается как изображение."""
+
+
+def presets() -> dict[str, Preset]:
+    return {name: Preset(*spec) for name, spec in getattr(settings, "THUMBNAIL_PRESETS", PRESETS).items()}
+
+
+def output_format() -> str:
+    wanted = getattr(settings, "THUMBNAIL_FORMAT", "webp").lower()
+    return "webp" if wanted == "webp" and features.check("webp") else "jpeg"
+
+
+def variant_name(source_name: str, preset_name: str) -> str:
+    preset = presets().get(preset_name)
+    if preset is None:
+        raise ThumbnailError(f"Неизвестный пресет {preset_name!r}")
+    fmt = output_format()
+    quality = getattr(settings, "THUMBNAIL_QUALITY", 82)
+    key = hashlib.sha1(f"{source_name}|{preset.width}x{preset.height}|{int(preset.crop)}|{fmt}|{quality}".encode()).hexdigest()[:24]
+    return f"thumbs/{preset_name}/{key[:2]}/{key}.{'webp' if fmt == 'webp' else 'jpg'}"
+
+
+def render(source, preset: Preset, fmt: str, quality: int) -> bytes:
+    """Байты уменьшенной копии. source - путь или открытый файл."""
+    with Image.open(source) as image:
+        if image.format == "JPEG":
+            image.draft("RGB", (preset.width * 2, preset.height * 2))   # Декодер JPEG сразу уменьшает в 2-8 раз - меньше работы и памяти
+        image = ImageOps.exif_transpose(image)              # Фото с телефона: поворот по EXIF
+        has_alpha = image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info)
+        image = image.convert("RGBA" if has_alpha else "RGB")
+        if preset.crop:
+            image = ImageOps.fit(image, (preset.width, preset.height), Image.Resampling.LANCZOS)
+        else:
+            image.thumbnail((preset.width, preset.height), Image.Resampling.LANCZOS)
+        if fmt == "jpeg" and has_alpha:                     # У JPEG нет прозрачности - кладём на белый фон
+            background = Image.new("RGB", image.size, "white")
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        out = io.BytesIO()
+        if fmt == "webp":
+            image.save(out, "WEBP", quality=quality, method=4)
+        else:
+            image.save(out, "JPEG", quality=quality, optimize=True, progressive=True)
+    return out.getvalue()
+
+
+def generate(source_name: str, preset_name: str, *, force: bool = False) -> str:
+    """Построить копию (если её нет или force) и вернуть её имя в storage."""
+    if not source_name.lower().endswith(SOURCE_EXTENSIONS):
+        raise ThumbnailError(f"Не изображение: {source_name}")
+    if source_name.startswith(VARIANTS_DIR):               # Копия копии - новый файл на каждое имя
+        raise ThumbnailError(f"Исходник - сама уменьшенная копия: {source_name}")
+    name = variant_name(source_name, preset_name)
+    if not force and default_storage.exists(name):
+        return name
+    try:
+        with default_storage.open(source_name, "rb") as source:
+            data = render(source, presets()[preset_name], output_format(), getattr(settings, "THUMBNAIL_QUALITY", 82))
+    except (OSError, Image.DecompressionBombError, SyntaxError) as e:   # SyntaxError - так Pillow сообщает о битых PNG
+        raise ThumbnailError(f"Не удалось обработать {source_name}: {e}") from e
+    if default_storage.exists(name):
+        default_storage.delete(name)                        # force или параллельная генерация: storage не перезаписывает сам
+    return default_storage.save(name, ContentFile(data))
+
+
+def _signature(source_name: str, preset_name: str) -> str:
+    return signing.Signer(salt="vibemusic.thumbnails").signature(f"{preset_name}:{source_name}")
+
+
+def check_signature(source_name: str, preset_name: str, signature: str) -> bool:
+    """URL представления thumbnail/ выдан thumbnail_url(), а не собран вручную."""
+    return constant_time_compare(signature or "", _signature(source_name, preset_name))
+
+
+def thumbnail_url(fieldfile, preset_name: str) -> str:
+    """URL копии для шаблона/API: готовый файл или представление, которое построит его при первом запросе."""
+    if not fieldfile:
+        return ""
+    name = variant_name(fieldfile.name, preset_name)
+    if default_storage.exists(name):
+        return default_storage.url(name)
+    url = reverse("vibemusic:thumbnail", kwargs={"preset": preset_name, "name": fieldfile.name})
+    return f"{url}?s={_signature(fieldfile.name, preset_name)}"
+
+
+def field_presets(model, field_name: str) -> tuple[str, ...]:
+    return getattr(settings, "THUMBNAIL_FIELD_PRESETS", FIELD_PRESETS).get(f"{model.__name__}.{field_name}", ())
+
+
+def image_fields() -> Iterable[tuple[type, str, tuple[str, ...]]]:
+    """(модель, поле, пресеты) для всех полей из FIELD_PRESETS."""
+    for key, names in getattr(settings, "THUMBNAIL_FIELD_PRESETS", FIELD_PRESETS).items():
+        model_name, field_name = key.split(".")
+        yield apps.get_model("vibemusic", model_name), field_name, names
+
+
+def enqueue_for_instance(instance) -> Optional[Job]:
+    """Поставить построение недостающих копий всех изображений объекта (после сохранения)."""
+    wanted = []
+    for field in instance._meta.fields:
+        names = field_presets(type(instance), field.name)
+        fieldfile = getattr(instance, field.name) if names else None
+        if fieldfile:
+            wanted += [[fieldfile.name, name] for name in names if not default_storage.exists(variant_name(fieldfile.name, name))]
+    return jobs.enqueue("thumbnails.generate", {"variants": wanted}) if wanted else None
+
+
+@jobs.handler("thumbnails.generate", concurrency=2, max_attempts=3)
+def generate_job(job: Job) -> None:
+    for source_name, preset_name in job.payload.get("variants", []):
+        try:
+            generate(source_name, preset_name)
+        except ThumbnailError as e:                         # Битый исходник - повтор не поможет
+            logger.warning(str(e))
+
+
+__all__ = ["PRESETS", "FIELD_PRESETS", "ThumbnailError", "variant_name", "render", "generate", "thumbnail_url",
+           "check_signature", "image_fields", "enqueue_for_instance"]
@@ -0,0 +1,87 @@
+# vibemusic/services/track_enrichment.py
+"""
+Обогащение трека после загрузки: ID3-метаданные, исполнитель, обложка из Spotify.
+Выполняется воркером очереди (задача 'track.enrich'), а не в Track.save внутри запроса.
+"""
+from __future__ import annotations
+
+import logging
+
+from django.conf import settings
+from django.utils.text import slugify
+
+from vibemusic.core_utils import extract_metadata
+from vibemusic.models import Artist, Job, Track
+from vibemusic.services import jobs
+from vibemusic.spotify_utils import search_track, download_image
+
+
+logger = logging.getLogger(__name__)
+
+
+def enrich_track(track: Track, *, final_attempt: bool = True) -> list[str]:
+    """
+    Заполнить пустые поля трека. Возвращает список изменённых полей.
+    Ошибки Spotify на не последней попытке пробрасываются - задача повторится с задержкой;
+    на последней ставим дефолтную обложку, как раньше делал Track.save.
+    """
+    changed = []
+    metadata = extract_metadata(track.audio_file)                                       # Теги (title/artist/album) и технические параметры
+    if not track.codec:                                                                 # Треки, загруженные до чтения параметров при загрузке
+        changed += track.read_audio_info(metadata)
+
+    if not track.title and metadata.get('title'):
+        track.title = metadata['title']
+        changed.append('title')
+    if not track.album_name and metadata.get('album'):
+        track.album_name = metadata['album']
+        changed.append('album_name')
+    if metadata.get('artist') and not track.artist_id:
+        artist_name = metadata['artist']
+        track.artist, _ = Artist.objects.get_or_create(
+            name=artist_name,
+            defaults={'slug': slugify(artist_name, allow_unicode=True)},
+        )
+        changed.append('artist')
+        logger.debug(f"Автоматически создан/найден исполнитель: {track.artist.name}")
+
+    if track.album_image or not (metadata.get('title') and metadata.get('artist')):
+        return changed
+
+    logger.debug(f"Поиск в Spotify: {metadata['title']} - {metadata['artist']}")
+    try:
+        spotify_data = search_track(metadata['title'], metadata['artist'])
+        image_path = None
+        if spotify_data and spotify_data.get('album_image_url'):
+            image_path = download_image(spotify_data['album_image_url'])               # images/ab/cd/<sha256>.jpg - одна копия на одинаковую обложку
+        if image_path:
+            track.album_image = image_path
+            if not track.album_name and spotify_data.get('album_name'):
+                track.album_name = spotify_data['album_name']
+                changed.append('album_name')
+            logger.debug(f"Обложка из Spotify сохранена: {image_path}")
+        else:
+            track.album_image = getattr(settings, 'DEFAULT_ALBUM_IMAGE', None)
+            logger.warning(f"Трек не найден в Spotify, используется дефолт: {track.album_image}")
+    except Exception as e:
+        if not final_attempt:
+            raise
+        logger.error(f"Ошибка при поиске в Spotify: {e}")
+        track.album_image = getattr(settings, 'DEFAULT_ALBUM_IMAGE', None)
+    changed.append('album_image')
+    return changed
+
+
+@jobs.handler('track.enrich', concurrency=2, max_attempts=5)                              # Не больше двух параллельных запросов к Spotify
+def enrich_track_job(job: Job) -> None:
+    track = Track.objects.select_related('artist').filter(pk=job.payload.get('track_id')).first()
+    if track is None:                                                                   # Трек удалили, пока задача ждала
+        return
+    try:
+        changed = enrich_track(track, final_attempt=job.attempts >= job.max_attempts)
+    except Exception:
+        if job.attempts >= job.max_attempts:
+            Track.objects.filter(pk=track.pk).update(enrichment_status=Track.EnrichmentStatus.FAILED)
+        raise
+    track.enrichment_status = Track.EnrichmentStatus.DONE
+    track.save(update_fields=[*dict.fromkeys(changed), 'enrichment_status'])
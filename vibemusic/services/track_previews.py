@@ -0,0 +1,89 @@
+# vibemusic/services/track_previews.py
+"""
+30-секундные превью треков для карточек: фрагмент MP3, вырезанный по границам кадров (utils/mpeg.py),
+без перекодирования.
+
+Строится задачей track.preview после загрузки или при первом запросе track/<pk>/preview/.
+Файл previews/<audio_hash>-<offset>-<seconds>.mp3 общий для треков с одинаковым звуком
+(см. services/audio_dedupe.py); после смены TRACK_PREVIEW_* имя меняется и превью строится заново.
+Для WAV/OGG/FLAC превью не строится - отдаётся полный трек.
+Файл пишется во временный рядом и переименовывается (os.replace): два первых запроса одновременно
+строят одно и то же имя, а не previews/<...>_AbCdEf.mp3 с суффиксом от storage.
+"""
+from __future__ import annotations
+
+import io
+import logging
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+from vibemusic.models import Job, Track
+from vibemusic.services import api_cache, jobs
+from vibemusic.utils.mpeg import slice_clip
+from vibemusic.utils.upload_handlers import sniff
+
+
+logger = logging.getLogger(__name__)
+
+
+def preview_name(track: Track) -> str:
+    offset = getattr(settings, "TRACK_PREVIEW_OFFSET", 30)
+    seconds = getattr(settings, "TRACK_PREVIEW_SECONDS", 30)
+    key = track.audio_hash[:32] if track.audio_hash else f"track-{track.pk}"
+    return f"previews/{key}-{offset}-{seconds}.mp3"
+
+
+def _write_atomic(name: str, data: bytes) -> None:
+    path = default_storage.path(name)                       # Превью отдаёт stream_response по пути - storage файловый
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".preview-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            out.write(data)
+        os.replace(tmp, path)                               # Параллельная сборка того же превью просто перезапишет его тем же
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def build_preview(track: Track) -> bool:
+    """
+    Построить (или найти готовое) превью и записать в track.preview_file. False - не MP3.
+    FileNotFoundError - файла трека нет в storage.
+    """
+    name = preview_name(track)
+    if track.preview_file.name == name:
+        return True
+    if not default_storage.exists(name):
+        with track.audio_file.open("rb") as src:
+            if sniff(src.read(16), "audio") != "audio/mpeg":
+                return False
+            clip = io.BytesIO()                             # 30 с MP3 - не больше ~1.2 МБ даже на 320 кбит/с
+            seconds = slice_clip(src, clip, getattr(settings, "TRACK_PREVIEW_OFFSET", 30),
+                                 getattr(settings, "TRACK_PREVIEW_SECONDS", 30))
+        if not seconds:
+            logger.warning(f"В файле трека {track.pk} не найдено MPEG-кадров, превью не построено")
+            return False
+        _write_atomic(name, clip.getvalue())
+        logger.debug(f"Превью трека {track.pk}: {seconds:.1f} с, {clip.tell()} байт")
+    track.preview_file.name = name
+    Track.objects.filter(pk=track.pk).update(preview_file=name)
+    api_cache.invalidate(api_cache.object_tags("track", [track.pk]))   # UPDATE мимо сигналов - версия track:<id> для кэша ответов и ETag
+    return True
+
+
+@jobs.handler('track.preview', concurrency=2, max_attempts=3)
+def build_preview_job(job: Job) -> None:
+    track = Track.objects.filter(pk=job.payload.get('track_id')).only('id', 'audio_file', 'audio_hash', 'preview_file').first()
+    if track is None or not track.audio_file:
+        return
+    try:
+        build_preview(track)
+    except FileNotFoundError:                               # Файл удалён - повторять бесполезно
+        logger.warning(f"Файл трека {track.pk} не найден, превью не построено")
+
+
+__all__ = ["preview_name", "build_preview"]
@@ -0,0 +1,138 @@
+# vibemusic/services/track_streaming.py
+"""
+Отдача аудио трека с поддержкой Range (перемотка без скачивания с нуля).
+
+- If-None-Match / If-Range / Range: 304, 206 с Content-Range, 416 на диапазон за концом файла;
+- если задан MEDIA_ACCEL_REDIRECT_PREFIX, байты отдаёт nginx (X-Accel-Redirect на internal-location,
+  Range он обрабатывает сам), воркер Django только проверяет доступ;
+- иначе FileResponse: под gunicorn файл уходит через sendfile (wsgi.file_wrapper) ровно
+  Content-Length байт с позиции начала диапазона, без чтения в память процесса.
+
+ETag - размер и mtime файла: audio_hash не учитывает ID3-теги и не годится в сильный ETag для байтов.
+"""
+from __future__ import annotations
+
+import mimetypes
+import os
+import re
+from typing import Optional
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date, parse_http_date_safe, parse_etags
+
+from vibemusic.models import Track
+
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class FileRange:
+    """Окно [start, start+length) открытого файла: read() не выходит за границу, fileno() - для sendfile."""
+
+    def __init__(self, file, start: int, length: int) -> None:
+        self.file = file
+        self.remaining = length
+        file.seek(start)                                    # gunicorn берёт offset для sendfile из текущей позиции файла
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size) if size else b""
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self) -> int:
+        return self.file.fileno()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def can_stream(user, track: Track) -> bool:
+    """Доступ к треку. Треки публичны; TRACK_STREAM_LOGIN_REQUIRED закрывает их для анонимов."""
+    if getattr(settings, "TRACK_STREAM_LOGIN_REQUIRED", False) and not user.is_authenticated:
+        return False
+    return bool(track.audio_file)
+
+
+def parse_range(header: str, size: int) -> Optional[tuple[int, int]]:
+    """
+    Один диапазон 'bytes=a-b' / 'bytes=a-' / 'bytes=-n' -> (start, end) включительно.
+    None - заголовок не понят или диапазонов несколько: отдаём файл целиком (так разрешает RFC 9110).
+    (size, size) - диапазон за концом файла, ответ 416.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if not first:                                           # bytes=-n: последние n байт
+        length = int(last)
+        return (max(size - length, 0), size - 1) if length else (size, size)
+    start = int(first)
+    if start >= size:
+        return size, size
+    end = min(int(last), size - 1) if last else size - 1
+    if end < start:
+        return None
+    return start, end
+
+
+def _validators(path: str) -> tuple[str, float, int]:
+    stat = os.stat(path)
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"', stat.st_mtime, stat.st_size
+
+
+def _if_range_matches(value: str, etag: str, mtime: float) -> bool:
+    if value.startswith(('"', 'W/')):
+        return value == etag                                # If-Range сравнивает ETag строго
+    since = parse_http_date_safe(value)
+    return since is not None and since == int(mtime)
+
+
+def stream_response(request, fieldfile, *, cache_control: str = "private, max-age=86400"):
+    """Ответ с файлом поля модели (audio_file, preview_file); ETag и Last-Modified - по размеру и mtime."""
+    path = fieldfile.path
+    etag, mtime, size = _validators(path)
+    content_type = mimetypes.guess_type(fieldfile.name)[0] or "audio/mpeg"
+    headers = {"ETag": etag, "Last-Modified": http_date(mtime), "Accept-Ranges": "bytes", "Cache-Control": cache_control}
+
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match and (etag in parse_etags(if_none_match) or if_none_match.strip() == "*"):
+        response = HttpResponseNotModified()
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    prefix = getattr(settings, "MEDIA_ACCEL_REDIRECT_PREFIX", "")
+    if prefix:                                              # Range, If-Range и сами байты - на стороне nginx
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = prefix.rstrip("/") + "/" + quote(fieldfile.name)
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    byte_range = None
+    range_header = request.headers.get("Range")
+    if range_header and _if_range_matches(request.headers.get("If-Range", etag), etag, mtime):
+        byte_range = parse_range(range_header, size)
+
+    if byte_range == (size, size):
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1
+    response = FileResponse(FileRange(open(path, "rb"), start, length), content_type=content_type,
+                            status=206 if byte_range else 200)
+    response["Content-Length"] = str(length)                # По нему gunicorn ограничивает sendfile
+    if byte_range:
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+__all__ = ["can_stream", "parse_range", "stream_response", "FileRange"]
@@ -0,0 +1,71 @@
+# vibemusic/services/track_waveform.py
+"""
+Волна трека для плеера: пики min/max в нескольких разрешениях (utils/waveform.py) файлом
+waveforms/<audio_hash>.bin и Track.loudness за тот же проход (Track.duration - если её не дал заголовок).
+
+Задача track.waveform ставится при загрузке (Track.save). NumPy нужен только воркеру -
+импортируется внутри задачи. MP3 без локального декодера: волны нет, длительность
+считается по заголовкам кадров (utils/mpeg.py).
+"""
+from __future__ import annotations
+
+import logging
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from vibemusic.models import Job, Track
+from vibemusic.services import jobs
+from vibemusic.utils import mpeg
+
+
+logger = logging.getLogger(__name__)
+
+
+def waveform_name(track: Track) -> str:
+    key = track.audio_hash[:32] if track.audio_hash else f"track-{track.pk}"
+    return f"waveforms/{key}.bin"
+
+
+def build_waveform(track: Track) -> list[str]:
+    """Посчитать волну, длительность и громкость. Возвращает список изменённых полей."""
+    from vibemusic.utils import waveform                                    # NumPy - только в воркере
+
+    resolutions = tuple(getattr(settings, "WAVEFORM_RESOLUTIONS", (64, 256, 1024)))
+    try:
+        seconds, loudness, peaks = waveform.analyze(track.audio_file.path, resolutions,
+                                                    decoder=getattr(settings, "WAVEFORM_DECODER", None))
+    except waveform.UnsupportedAudio as e:
+        logger.info(f"Волна трека {track.pk} не построена: {e}")
+        if track.duration:
+            return []
+        with track.audio_file.open("rb") as f:
+            seconds = mpeg.duration(f)                                      # 0 для не-MP3
+        if not seconds:
+            return []
+        track.duration = round(seconds, 3)
+        return ["duration"]
+
+    name = waveform_name(track)
+    if not default_storage.exists(name):                                    # Тот же звук уже разобран (общий audio_hash) - файл тот же
+        name = default_storage.save(name, ContentFile(waveform.pack(peaks)))
+    track.waveform.name = name
+    track.loudness = loudness
+    if track.duration:                                                      # Уже прочитана из заголовка при загрузке
+        return ["waveform", "loudness"]
+    track.duration = round(seconds, 3)
+    return ["waveform", "duration", "loudness"]
+
+
+@jobs.handler('track.waveform', concurrency=2, max_attempts=3)                # Декодирование тяжёлое - не больше двух одновременно
+def build_waveform_job(job: Job) -> None:
+    track = Track.objects.filter(pk=job.payload.get('track_id')).only('id', 'audio_file', 'audio_hash', 'duration').first()
+    if track is None or not track.audio_file:
+        return
+    changed = build_waveform(track)
+    if changed:
+        track.save(update_fields=changed)
+
+
+__all__ = ["waveform_name", "build_waveform"]
@@ -1,14 +1,12 @@
 # signals.py
-from django.db.models.signals import post_save           # Импортируем сигнал, который срабатывает после сохранения объекта модели
+from django.db.models.signals import post_save, pre_delete, post_delete, m2m_changed   # Сигналы сохранения/удаления объекта и изменения M2M-связей
 from django.dispatch import receiver                       # Декоратор для подписки функции на сигнал
 from django.contrib.auth.models import User               # Встроенная модель пользователя Django
-from .models import Profile, Post                         # Импортируем свои модели Profile и Post
+from .models import Profile, Post, PostImage, Comment, Reaction, Artist, Genre, SiteSettings, Track   # Импортируем свои модели
 from django.conf import settings                           # Доступ к настройкам проекта (например, SITE_URL)
 from .core_utils import render_telegram_new_post_message  # Функции для отправки сообщений в Telegram
-import threading                                           # Для создания отдельного потока, чтобы не блокировать сервер
-from vibemusic.utils.telegram import (
-    send_telegram_message,
-)
+from django.db import transaction                         # on_commit - действия после фиксации транзакции
+from vibemusic.services import api_cache, autocomplete, counters, liked, post_genres, search, site_chrome, telegram_outbox, thumbnails   # Кэш ответов API, автодополнение, счётчики, кэш лайков, таблица PostGenre, поисковый индекс, кэш обвязки сайта, очередь Telegram, миниатюры
 import logging
 
 logger = logging.getLogger(__name__)                     # Настраиваем логгер для этого модуля
@@ -44,10 +42,271 @@ def notify_new_post_to_telegram(sender, instance, created, **kwargs):
     # Формируем текст сообщения для Telegram, используя объект нового поста (instance) и базовый URL сайта (settings.SITE_URL), чтобы в сообщении была информация о заголовке, ссылке на пост и других данных, и чтобы сообщение сразу можно было отправлять в Telegram
     message = render_telegram_new_post_message(instance, settings.SITE_URL)  
 
-    def send():
-        if send_telegram_message(settings.TELEGRAM_GROUP_CHAT_ID, message):  # Отправляем сообщение в Telegram
-            logger.info(f"Уведомление о посте '{instance.title}' отправлено")  # Логируем успешную отправку
-        else:
-            logger.error(f"Не удалось отправить уведомление о '{instance.title}'")  # Логируем ошибку отправки
-        
-    threading.Thread(target=send, daemon=True).start()  # Запускаем отправку в отдельном потоке, чтобы не блокировать сервер
+    # Пишем в outbox в той же транзакции, что и пост: откатился пост - не будет и сообщения; отправит run_telegram_outbox
+    telegram_outbox.enqueue(settings.TELEGRAM_GROUP_CHAT_ID, message)
+
+
+# === 3. Денормализованные счётчики лайков и комментариев, кэш лайков пользователя ===
+@receiver(post_save, sender=Reaction)
+def reaction_created(sender, instance, created, **kwargs):
+    """Новый лайк → +1 к like_count цели (через буфер) и id цели в liked-множество пользователя."""
+    target = counters.reaction_target(instance) if created else None
+    if target:
+        counters.bump(target[0], target[1], 'like_count', +1)
+        liked.mark(instance.user_id, target[0], target[1], True)
+
+
+@receiver(post_delete, sender=Reaction)
+def reaction_deleted(sender, instance, **kwargs):
+    """Удалённый лайк (в т.ч. liked_by.remove/clear и каскад) → -1."""
+    target = counters.reaction_target(instance)
+    if target:
+        counters.bump(target[0], target[1], 'like_count', -1)
+        liked.mark(instance.user_id, target[0], target[1], False)
+
+
+@receiver(m2m_changed, sender=Reaction)                 # through-модель у всех liked_by общая - Reaction
+def liked_by_added(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """
+    liked_by.add() создаёт Reaction через bulk_create - post_save не вызывается,
+    поэтому прибавляем здесь. Удаления ловит post_delete выше.
+    """
+    if action != 'post_add' or not pk_set:
+        return
+    if reverse:                                         # user.liked_posts.add(post1, post2) - instance это User
+        for pk in pk_set:
+            counters.bump(model, pk, 'like_count', +1)
+            liked.mark(instance.pk, model, pk, True)
+    else:                                               # post.liked_by.add(user1, user2)
+        counters.bump(type(instance), instance.pk, 'like_count', len(pk_set))
+        for user_pk in pk_set:
+            liked.mark(user_pk, type(instance), instance.pk, True)
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, **kwargs):
+    if created:
+        counters.bump(Post, instance.post_id, 'comment_count', +1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.bump(Post, instance.post_id, 'comment_count', -1)
+
+
+# === 4. Материализованная связь пост-жанр (PostGenre) ===
+@receiver(post_save, sender=Post)
+def post_genres_on_save(sender, instance, update_fields=None, **kwargs):
+    """Жанр или исполнитель поста мог измениться - пересобираем его строки."""
+    if update_fields is not None and not {'genre', 'artist'} & set(update_fields):
+        return
+    post_genres.rebuild_for_posts([instance.pk])
+
+
+@receiver(m2m_changed, sender=Artist.genres.through)
+def post_genres_on_artist_genres(sender, instance, action, reverse, pk_set, **kwargs):
+    """artist.genres.add/remove/clear и обратное genre.artists.* → пересобрать посты затронутых исполнителей."""
+    if action == 'pre_clear' and reverse:                 # genre.artists.clear(): после очистки исполнителей уже не найти
+        instance._post_genres_artists = set(instance.artists.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        artist_ids = {instance.pk}
+    else:
+        artist_ids = pk_set if action != 'post_clear' else getattr(instance, '_post_genres_artists', set())
+    post_genres.rebuild_for_posts(post_genres.posts_for_artists(artist_ids))
+
+
+@receiver(m2m_changed, sender=Genre.related_genres.through)
+def post_genres_on_related_genres(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Изменились related_genres жанра G → меняется только «связанная» принадлежность G.
+    При reverse (X.genre_set.*) затронуты жанры из pk_set.
+    """
+    if action == 'pre_clear' and reverse:
+        instance._post_genres_genres = set(instance.genre_set.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        genre_ids = {instance.pk}
+    else:
+        genre_ids = pk_set if action != 'post_clear' else getattr(instance, '_post_genres_genres', set())
+    post_genres.rebuild_for_posts(post_genres.posts_for_genres(genre_ids))
+
+
+@receiver(pre_delete, sender=Artist)
+@receiver(pre_delete, sender=Genre)
+def post_genres_before_delete(sender, instance, **kwargs):
+    """SET_NULL у Post.artist/Post.genre делается UPDATE'ом без сигналов - запоминаем затронутые посты заранее."""
+    if sender is Artist:
+        instance._post_genres_posts = post_genres.posts_for_artists([instance.pk])
+    else:
+        instance._post_genres_posts = set(instance.post_links.values_list('post_id', flat=True))
+
+
+@receiver(post_delete, sender=Artist)
+@receiver(post_delete, sender=Genre)
+def post_genres_after_delete(sender, instance, **kwargs):
+    post_genres.rebuild_for_posts(getattr(instance, '_post_genres_posts', ()))
+
+
+# === 5. Сброс кэша обвязки сайта (жанры меню, SiteSettings) ===
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=SiteSettings)
+@receiver(post_delete, sender=SiteSettings)
+def site_chrome_changed(sender, **kwargs):
+    """Сразу - для текущего процесса, и после коммита - если кто-то успел закэшировать старое состояние до него."""
+    site_chrome.invalidate()
+    transaction.on_commit(site_chrome.invalidate)
+
+
+# === 6. Миниатюры изображений (services/thumbnails.py) ===
+@receiver(post_save, sender=PostImage)
+@receiver(post_save, sender=Track)
+@receiver(post_save, sender=Artist)
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Profile)
+@receiver(post_save, sender=Comment)
+@receiver(post_save, sender=SiteSettings)
+def thumbnails_on_save(sender, instance, update_fields=None, **kwargs):
+    """Недостающие копии строятся фоновой задачей; до её выполнения их построит первый запрос."""
+    if update_fields and not any(thumbnails.field_presets(sender, name) for name in update_fields):
+        return                                              # Сохранили только счётчики/статус - изображения не менялись
+    thumbnails.enqueue_for_instance(instance)
+
+
+# === 7. Полнотекстовый поисковый индекс (services/search.py) ===
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Track)
+@receiver(post_save, sender=Artist)
+@receiver(post_save, sender=Genre)
+def search_on_save(sender, instance, created, update_fields=None, **kwargs):
+    """Документ объекта - в той же транзакции; при переименовании исполнителя - его треки и посты фоновой задачей."""
+    kind = search.kind_for(sender)
+    if update_fields is not None and not search.INDEXED_FIELDS[kind] & set(update_fields):
+        return                                              # Счётчики, превью, метаданные - текст не менялся
+    search.index(kind, [instance.pk])
+    if sender is Artist and not created:
+        search.enqueue_reindex(search.artist_dependents(instance.pk))
+
+
+@receiver(pre_delete, sender=Artist)
+def search_before_artist_delete(sender, instance, **kwargs):
+    """SET_NULL у Post.artist/Track.artist - UPDATE без сигналов: запоминаем, чьи документы содержат имя исполнителя."""
+    instance._search_dependents = search.artist_dependents(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Track)
+@receiver(post_delete, sender=Artist)
+@receiver(post_delete, sender=Genre)
+def search_on_delete(sender, instance, **kwargs):
+    search.remove(search.kind_for(sender), [instance.pk])
+    if sender is Artist:
+        search.enqueue_reindex(getattr(instance, '_search_dependents', {}))
+
+
+@receiver(m2m_changed, sender=Artist.genres.through)
+def search_on_artist_genres(sender, instance, action, reverse, pk_set, **kwargs):
+    """Жанры исполнителя - в документах его самого, его треков и постов (фасеты общего поиска)."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        artist_ids = {instance.pk}
+    else:                                                   # genre.artists.*; перед clear список запомнил post_genres_on_artist_genres
+        artist_ids = pk_set if action != 'post_clear' else getattr(instance, '_post_genres_artists', set())
+    search.index('artist', artist_ids)
+    for artist_id in artist_ids:
+        search.enqueue_reindex(search.artist_dependents(artist_id))
+
+
+# === 8. Индекс автодополнения (services/autocomplete.py) ===
+AUTOCOMPLETE_FIELDS = {Artist: ('artist', 'name'), Genre: ('genre', 'name'), Track: ('track', 'title')}
+
+
+@receiver(post_save, sender=Artist)
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Track)
+def autocomplete_on_save(sender, instance, update_fields=None, **kwargs):
+    kind, field = AUTOCOMPLETE_FIELDS[sender]
+    if update_fields is not None and field not in update_fields:
+        return                                              # Название не менялось
+    autocomplete.enqueue(kind, instance.pk)
+
+
+@receiver(post_delete, sender=Artist)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Track)
+def autocomplete_on_delete(sender, instance, **kwargs):
+    autocomplete.enqueue(AUTOCOMPLETE_FIELDS[sender][0], instance.pk)
+
+
+# === 9. Кэш ответов API и валидаторы условных GET (services/api_cache.py, services/conditional.py) ===
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Track)
+@receiver(post_delete, sender=Track)
+@receiver(post_save, sender=Artist)
+@receiver(post_delete, sender=Artist)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def api_cache_on_change(sender, instance, **kwargs):
+    """
+    Сам объект и коллекции его типа (новый/удалённый объект, другой порядок; страницы со списками).
+    Исполнитель и жанр - ещё и внутри ответов о постах и треках: SET_NULL при их удалении идёт без сигналов.
+    """
+    kind = sender._meta.model_name
+    api_cache.invalidate({f'{kind}:{instance.pk}', f'{kind}:list'})
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def api_cache_on_user_change(sender, instance, **kwargs):
+    api_cache.invalidate({f'user:{instance.pk}'})          # Автор в ответе поста
+
+
+@receiver(post_save, sender=PostImage)
+@receiver(pre_delete, sender=PostImage)
+def api_cache_on_post_image(sender, instance, **kwargs):
+    """Фотографии - в ответе поста; после удаления связи с постами уже не найти - поэтому pre_delete."""
+    api_cache.invalidate(api_cache.object_tags('post', instance.posts.values_list('pk', flat=True)) | {'post:list'})
+
+
+POST_RELATIONS_REVERSE = {Post.images.through: 'posts', Post.tracks.through: 'related_posts'}
+
+
+@receiver(m2m_changed, sender=Post.images.through)
+@receiver(m2m_changed, sender=Post.tracks.through)
+def api_cache_on_post_relations(sender, instance, action, reverse, pk_set, **kwargs):
+    """post.images/tracks.* меняют пост; image.posts.* и track.related_posts.* - посты из pk_set. Фото и треки есть и в лентах страниц."""
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            api_cache.invalidate({f'post:{instance.pk}', 'post:list'})
+    elif action in ('post_add', 'post_remove'):
+        api_cache.invalidate(api_cache.object_tags('post', pk_set) | {'post:list'})
+    elif action == 'pre_clear':                             # После clear связанные посты уже не найти
+        posts = getattr(instance, POST_RELATIONS_REVERSE[sender]).values_list('pk', flat=True)
+        api_cache.invalidate(api_cache.object_tags('post', posts) | {'post:list'})
+
+
+@receiver(m2m_changed, sender=Artist.genres.through)
+def api_cache_on_artist_genres(sender, instance, action, reverse, pk_set, **kwargs):
+    """Жанры исполнителя - на его странице, в фоне его постов и в составе постов жанра (PostGenre)."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        artist_ids = {instance.pk}
+    else:                                                   # Перед clear список запомнил post_genres_on_artist_genres
+        artist_ids = pk_set if action != 'post_clear' else getattr(instance, '_post_genres_artists', set())
+    api_cache.invalidate(api_cache.object_tags('artist', artist_ids) | {'artist:list'})
+
+
+@receiver(m2m_changed, sender=Genre.related_genres.through)
+def api_cache_on_related_genres(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        api_cache.invalidate({f'genre:{instance.pk}', 'genre:list'})   # Связанные жанры меняют состав постов жанра
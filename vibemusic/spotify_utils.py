@@ -1,44 +1,158 @@
 # spotify_utils.py
 import spotipy                                                                              # Импортирует библиотеку Spotipy для работы с Spotify API
 from spotipy.oauth2 import SpotifyClientCredentials                                         # Импортирует класс для аутентификации клиента Spotify
-import requests                                                                             # Импортирует библиотеку requests для выполнения HTTP-запросов
 from django.conf import settings                                                            # Импортирует настройки Django для доступа к конфигурации (например, SPOTIFY_CLIENT_ID)
-import os                                                                                   # Импортирует модуль os для работы с файловой системой
+import hashlib
+import logging
+import re
+import threading
+import unicodedata
+from django.core.cache import cache, caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from spotipy.cache_handler import CacheHandler
+from vibemusic.utils import image_download
+
+
+logger = logging.getLogger(__name__)
+
+_client = None                                                                              # Один клиент Spotify на процесс (потокобезопасно создаётся в get_spotify_client)
+_client_lock = threading.Lock()
+_backend = None
+NOT_FOUND = "__not_found__"                                                                 # Маркер негативного кэша: «искали - не нашли»
+
+class DjangoCacheHandler(CacheHandler):
+    """Токен client credentials в общем кэше Django - один токен на все воркеры gunicorn, а не запрос к OAuth на каждый трек."""
+    key = "spotify:token"
+
+    def get_cached_token(self):
+        return cache.get(self.key)
+
+    def save_token_to_cache(self, token_info):
+        timeout = max(int(token_info.get('expires_in', 3600)) - 60, 1)                     # Чуть раньше истечения: spotipy сам обновит токен
+        cache.set(self.key, token_info, timeout)
+
 
 def get_spotify_client():                                                                   # Определяет функцию для создания клиента Spotify
-    """Инициализация клиента Spotify с использованием учетных данных."""                    
-    return spotipy.Spotify(auth_manager=SpotifyClientCredentials(                           # Создаёт и возвращает объект клиента Spotify
-        client_id=settings.SPOTIFY_CLIENT_ID,                                               # Использует ID клиента из настроек Django
-        client_secret=settings.SPOTIFY_CLIENT_SECRET                                        # Использует секретный ключ клиента из настроек Django
-    ))                                                                                      
+    """Клиент Spotify на процесс: HTTP-сессия и токен переиспользуются между вызовами."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = spotipy.Spotify(
+                    auth_manager=SpotifyClientCredentials(
+                        client_id=settings.SPOTIFY_CLIENT_ID,                               # Использует ID клиента из настроек Django
+                        client_secret=settings.SPOTIFY_CLIENT_SECRET,                       # Использует секретный ключ клиента из настроек Django
+                        cache_handler=DjangoCacheHandler(),
+                    ),
+                    requests_timeout=getattr(settings, 'SPOTIFY_TIMEOUT', 5),
+                )
+    return _client
+
+
+class SpotipyBackend:
+    """Настоящий поиск через Spotify Web API."""
+
+    def search_track(self, track_name, artist_name):
+        sp = get_spotify_client()                                                           # Общий клиент процесса
+        query = f"track:{track_name} artist:{artist_name}"                                  # Формирует строку запроса для поиска (например, "track:Shape of You artist:Ed Sheeran")
+        results = sp.search(q=query, type='track', limit=1)                                 # Выполняет поиск трека с лимитом 1 результат
+        tracks = results['tracks']['items']                                                 # Извлекает список треков из результатов поиска
+        if tracks:                                                                          # Проверяет, найдены ли треки
+            track = tracks[0]                                                               # Берёт первый трек из списка
+            album = track['album']                                                          # Извлекает данные альбома из трека
+            return {                                                                        # Возвращает словарь с метаданными трека
+                'track_id': track['id'],                                                    # ID трека в Spotify
+                'track_name': track['name'],                                                # Название трека
+                'artist_name': track['artists'][0]['name'],                                 # Имя первого исполнителя трека
+                'album_name': album['name'],                                                # Название альбома
+                'album_image_url': album['images'][0]['url'] if album['images'] else None   # URL обложки альбома или None, если изображение отсутствует
+            }
+        return None                                                                         # Возвращает None, если трек не найден
+
+
+class FakeSpotifyBackend:
+    """
+    Офлайн-бэкенд для тестов и бенчмарков: детерминированный ответ без сети.
+    Треки с названием из SPOTIFY_FAKE_MISSING «не находятся».
+    """
+    calls = 0
+
+    def search_track(self, track_name, artist_name):
+        type(self).calls += 1
+        if track_name in getattr(settings, 'SPOTIFY_FAKE_MISSING', ()):
+            return None
+        digest = hashlib.sha1(f"{track_name}|{artist_name}".encode()).hexdigest()
+        return {
+            'track_id': digest[:22],
+            'track_name': track_name,
+            'artist_name': artist_name,
+            'album_name': f"{track_name} (single)",
+            'album_image_url': None,                                                        # Без обложки - скачивать нечего
+        }
+
+
+def get_backend():
+    """Бэкенд поиска из настройки SPOTIFY_BACKEND (путь к классу)."""
+    global _backend
+    if _backend is None:
+        _backend = import_string(getattr(settings, 'SPOTIFY_BACKEND', 'vibemusic.spotify_utils.SpotipyBackend'))()
+    return _backend
+
+
+@receiver(setting_changed)
+def _reset_backend(setting, **kwargs):
+    """override_settings в тестах подменяет бэкенд и кэш - сбрасываем закэшированные объекты."""
+    global _backend, _client
+    if setting in ('SPOTIFY_BACKEND', 'SPOTIFY_CLIENT_ID', 'SPOTIFY_CLIENT_SECRET'):
+        _backend = None
+        _client = None
+
+
+def _search_cache():
+    return caches['spotify'] if 'spotify' in settings.CACHES else cache
+
+
+def _search_key(track_name, artist_name):
+    """Нормализованный ключ: регистр, пробелы и юникод-формы не влияют на попадание в кэш."""
+    def normalize(value):
+        value = unicodedata.normalize('NFKC', value or '').casefold()
+        return re.sub(r'\s+', ' ', value).strip()
+    raw = f"{normalize(track_name)}\x1f{normalize(artist_name)}"
+    return "spotify:search:" + hashlib.sha1(raw.encode()).hexdigest()
+
 
 def search_track(track_name, artist_name):                                                  # Определяет функцию для поиска трека по названию и исполнителю
-    """Поиск трека в Spotify по названию и исполнителю."""                                  
-    sp = get_spotify_client()                                                               # Получает клиент Spotify через функцию get_spotify_client
-    query = f"track:{track_name} artist:{artist_name}"                                      # Формирует строку запроса для поиска (например, "track:Shape of You artist:Ed Sheeran")
-    results = sp.search(q=query, type='track', limit=1)                                     # Выполняет поиск трека с лимитом 1 результат
-    tracks = results['tracks']['items']                                                     # Извлекает список треков из результатов поиска
-    if tracks:                                                                              # Проверяет, найдены ли треки
-        track = tracks[0]                                                                   # Берёт первый трек из списка
-        album = track['album']                                                              # Извлекает данные альбома из трека
-        return {                                                                            # Возвращает словарь с метаданными трека
-            'track_id': track['id'],                                                        # ID трека в Spotify
-            'track_name': track['name'],                                                    # Название трека
-            'artist_name': track['artists'][0]['name'],                                     # Имя первого исполнителя трека
-            'album_name': album['name'],                                                    # Название альбома
-            'album_image_url': album['images'][0]['url'] if album['images'] else None       # URL обложки альбома или None, если изображение отсутствует
-        }                                                                                   # Завершает формирование словаря
-    return None                                                                             # Возвращает None, если трек не найден
-
-def download_image(url, filename):                                                          # Определяет функцию для скачивания изображения по URL
-    """Скачивание изображения по URL и сохранение в media."""  
+    """
+    Поиск трека в Spotify по названию и исполнителю, с кэшем результатов.
+    Найденное хранится SPOTIFY_SEARCH_TTL, «не найдено» - SPOTIFY_NEGATIVE_TTL.
+    Ошибки API не кэшируются - задача обогащения повторит поиск.
+    """
+    store = _search_cache()
+    key = _search_key(track_name, artist_name)
+    cached = store.get(key)
+    if cached is not None:
+        return None if cached == NOT_FOUND else cached
+
+    result = get_backend().search_track(track_name, artist_name)
+    if result is None:
+        store.set(key, NOT_FOUND, getattr(settings, 'SPOTIFY_NEGATIVE_TTL', 24 * 3600))
+    else:
+        store.set(key, result, getattr(settings, 'SPOTIFY_SEARCH_TTL', 30 * 24 * 3600))
+    return result
+
+
+def download_image(url, filename=None):                                                     # Определяет функцию для скачивания изображения по URL
+    """
+    Скачивание изображения по URL в media (см. utils/image_download.py).
+    Имя файла - хэш содержимого (images/ab/cd/<sha256>.jpg), filename оставлен для совместимости и не используется.
+    Возвращает относительный путь или None, если скачать не удалось.
+    """
     if not url:                                                                             # Проверяет, не пустой ли URL
         return None                                                                         # Возвращает None, если URL пустой
-    response = requests.get(url)                                                            # Выполняет HTTP GET-запрос для загрузки изображения
-    if response.status_code == 200:                                                         # Проверяет, успешен ли запрос (код 200)
-        media_path = os.path.join(settings.MEDIA_ROOT, 'images', filename)                  # Формирует путь для сохранения файла (media/images/filename)
-        os.makedirs(os.path.dirname(media_path), exist_ok=True)                             # Создаёт директорию images, если она не существует
-        with open(media_path, 'wb') as f:                                                   # Открывает файл в режиме записи бинарных данных
-            f.write(response.content)                                                       # Записывает содержимое ответа (изображение) в файл
-        return os.path.join('images', filename)                                             # Возвращает относительный путь к файлу (images/filename)
-    return None                                                                             # Возвращает None, если загрузка не удалась
\ No newline at end of file
+    try:
+        return image_download.download(url)
+    except image_download.ImageDownloadError as e:
+        logger.warning(f"Обложка не скачана: {e}")
+        return None
@@ -0,0 +1,13 @@
+# vibemusic/templatetags/thumbnails.py
+from django import template
+
+from vibemusic.services.thumbnails import thumbnail_url
+
+
+register = template.Library()
+
+
+@register.filter
+def thumbnail(fieldfile, preset):
+    """{{ artist.photo|thumbnail:"avatar" }} - URL уменьшенной копии (services/thumbnails.py) или пустая строка."""
+    return thumbnail_url(fieldfile, preset)
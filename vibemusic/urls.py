@@ -33,6 +33,9 @@ urlpatterns = [
     path('post/add/', views.PostCreateView.as_view(), name='add_post'),
 
     path('upload_track/', views.TrackUploadView.as_view(), name='upload_track'),
+    path('track/<int:pk>/stream/', views.TrackStreamView.as_view(), name='track_stream'),
+    path('track/<int:pk>/preview/', views.TrackPreviewView.as_view(), name='track_preview'),
+    path('thumbnail/<slug:preset>/<path:name>', views.ThumbnailView.as_view(), name='thumbnail'),
     path('telegram/webhook/', views.TelegramWebhookView.as_view(), name='telegram_webhook'),
     path('about/', views.AboutView.as_view(), name='about'),
     path('contact/', views.contact, name='contact'),
@@ -0,0 +1,89 @@
+# vibemusic/utils/audio_hash.py
+"""
+Отпечаток аудио без тегов: sha256 по содержимому файла без ID3v2 в начале и ID3v1 (+ TAG+) в конце.
+
+Одна и та же запись с разными тегами (название, обложка в APIC) даёт один отпечаток -
+по нему Track находит уже сохранённый файл (services/audio_dedupe.py).
+Считается потоково: update() кусками по мере приёма, конец файла придерживается
+в буфере, пока не станет ясно, не ID3v1 ли это.
+"""
+from __future__ import annotations
+
+import hashlib
+from typing import BinaryIO, Iterable
+
+
+ID3V1_SIZE = 128
+ID3V1_EXT_SIZE = 227                                        # Расширенный тег "TAG+" перед ID3v1
+TAIL_SIZE = ID3V1_SIZE + ID3V1_EXT_SIZE
+
+
+def id3v2_size(header: bytes) -> int:
+    """Полный размер тега ID3v2 по 10-байтному заголовку или 0, если это не ID3v2."""
+    if len(header) < 10 or header[:3] != b"ID3" or header[3] == 0xFF or header[4] == 0xFF:
+        return 0
+    size_bytes = header[6:10]
+    if any(b & 0x80 for b in size_bytes):                   # synchsafe: старший бит каждого байта - 0
+        return 0
+    size = (size_bytes[0] << 21) | (size_bytes[1] << 14) | (size_bytes[2] << 7) | size_bytes[3]
+    footer = 10 if header[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+class AudioFingerprint:
+    def __init__(self) -> None:
+        self._sha = hashlib.sha256()
+        self._head = b""                                    # Начало файла, пока идут теги ID3v2
+        self._skip = 0                                      # Сколько байт текущего тега ещё пропустить
+        self._in_tags = True
+        self._tail = b""                                    # Последние TAIL_SIZE байт - возможный ID3v1
+
+    def update(self, data: bytes) -> None:
+        if self._in_tags:
+            self._head += data
+            while True:
+                if self._skip:
+                    dropped = min(self._skip, len(self._head))
+                    self._head = self._head[dropped:]
+                    self._skip -= dropped
+                    if self._skip:
+                        return
+                if len(self._head) < 10:
+                    return                                  # Ждём заголовок целиком
+                size = id3v2_size(self._head[:10])
+                if not size:
+                    break
+                self._skip = size                           # Бывает несколько тегов подряд - проверим и следующий
+            self._in_tags = False
+            data, self._head = self._head, b""
+        buffered = self._tail + data
+        if len(buffered) > TAIL_SIZE:
+            self._sha.update(buffered[:-TAIL_SIZE])
+            self._tail = buffered[-TAIL_SIZE:]
+        else:
+            self._tail = buffered
+
+    def hexdigest(self) -> str:
+        tail = self._tail + (self._head if self._in_tags and not self._skip else b"")
+        if len(tail) >= ID3V1_SIZE and tail[-ID3V1_SIZE:-ID3V1_SIZE + 3] == b"TAG":
+            tail = tail[:-ID3V1_SIZE]
+            if len(tail) >= ID3V1_EXT_SIZE and tail[-ID3V1_EXT_SIZE:-ID3V1_EXT_SIZE + 4] == b"TAG+":
+                tail = tail[:-ID3V1_EXT_SIZE]
+        sha = self._sha.copy()
+        sha.update(tail)
+        return sha.hexdigest()
+
+
+def fingerprint_chunks(chunks: Iterable[bytes]) -> str:
+    fingerprint = AudioFingerprint()
+    for chunk in chunks:
+        fingerprint.update(chunk)
+    return fingerprint.hexdigest()
+
+
+def fingerprint_file(fileobj: BinaryIO, chunk_size: int = 1024 * 1024) -> str:
+    """Отпечаток открытого файла (читается с текущей позиции до конца)."""
+    return fingerprint_chunks(iter(lambda: fileobj.read(chunk_size), b""))
+
+
+__all__ = ["AudioFingerprint", "fingerprint_chunks", "fingerprint_file", "id3v2_size"]
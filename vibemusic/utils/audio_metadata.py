@@ -0,0 +1,72 @@
+# vibemusic/utils/audio_metadata.py
+"""
+Теги и технические параметры аудио через mutagen.File: MP3, FLAC, OGG (Vorbis/Opus), M4A, WAV.
+
+mutagen читает только заголовки и теги (seek по файлу), весь файл в память не загружается.
+Принимает путь или открытый файл (UploadedFile до сохранения трека).
+"""
+from __future__ import annotations
+
+import logging
+import os
+from typing import BinaryIO, Union
+
+import mutagen
+
+
+logger = logging.getLogger(__name__)
+
+CODECS = {                                                  # Класс mutagen -> кодек
+    "MP3": "mp3", "EasyMP3": "mp3", "FLAC": "flac", "OggVorbis": "vorbis", "OggOpus": "opus",
+    "OggFLAC": "flac", "WAVE": "pcm", "AIFF": "pcm",
+}
+MP4_CODECS = {"mp4a.40.2": "aac", "mp4a.40.5": "aac", "mp4a.40.29": "aac", "alac": "alac"}
+
+EMPTY = {"title": "", "artist": "", "album": "", "duration": None, "bitrate": None,
+         "sample_rate": None, "channels": None, "codec": ""}
+
+
+def _first(tags, key: str) -> str:
+    try:
+        values = tags.get(key) if tags is not None else None
+    except (KeyError, ValueError):
+        return ""
+    return str(values[0]) if values else ""
+
+
+def _codec(audio) -> str:
+    name = type(audio).__name__
+    if name in ("MP4", "EasyMP4"):
+        codec = getattr(audio.info, "codec", "") or ""
+        return MP4_CODECS.get(codec, codec[:16])
+    return CODECS.get(name, name.lower()[:16])
+
+
+def read_metadata(source: Union[str, os.PathLike, BinaryIO]) -> dict:
+    """Словарь как EMPTY с заполненными полями; нечитаемый файл - пустые значения. Позиция файла возвращается в начало."""
+    try:
+        if hasattr(source, "seek"):
+            source.seek(0)                                  # Заголовок - в начале файла
+        audio = mutagen.File(source, easy=True)
+        if audio is None:
+            return dict(EMPTY)
+        info = audio.info
+        return {
+            "title": _first(audio.tags, "title"),
+            "artist": _first(audio.tags, "artist"),
+            "album": _first(audio.tags, "album"),
+            "duration": round(info.length, 3) if getattr(info, "length", None) else None,
+            "bitrate": getattr(info, "bitrate", None) or None,
+            "sample_rate": getattr(info, "sample_rate", None) or None,
+            "channels": getattr(info, "channels", None) or None,
+            "codec": _codec(audio),
+        }
+    except Exception as e:                                  # mutagen бросает разные ошибки на битых файлах
+        logger.warning(f"Не удалось прочитать метаданные аудио: {e}")
+        return dict(EMPTY)
+    finally:
+        if hasattr(source, "seek"):
+            source.seek(0)                                  # Файл загрузки дальше читает storage
+
+
+__all__ = ["read_metadata"]
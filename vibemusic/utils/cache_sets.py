@@ -0,0 +1,145 @@
+# vibemusic/utils/cache_sets.py
+from __future__ import annotations
+
+import threading
+from typing import Iterable, Optional
+
+from django.core.cache import cache as default_cache
+from django.core.cache.backends.base import BaseCache
+
+
+_local_lock = threading.Lock()                              # Защищает read-modify-write для нерадисовых бэкендов внутри процесса
+
+
+def _redis_client(cache: BaseCache):
+    """
+    Вернуть «сырой» клиент redis, если кэш - встроенный RedisCache Django.
+    Для остальных бэкендов (LocMem, File, Memcached) возвращает None.
+    """
+    inner = getattr(cache, "_cache", None)
+    get_client = getattr(inner, "get_client", None)
+    if get_client is None or not hasattr(cache, "make_and_validate_key"):
+        return None
+    return get_client(write=True)
+
+
+class CacheSet:
+    """
+    Множество в кэше: нативный SET в Redis или frozenset под ключом в остальных бэкендах.
+
+    Отличает «холодный» ключ (None - множества нет, надо загрузить из БД)
+    от пустого множества (set() - загружено, элементов нет).
+    """
+
+    def __init__(self, cache: Optional[BaseCache] = None) -> None:
+        self.cache = cache or default_cache
+
+    # ---------- Redis ----------
+
+    def _rkey(self, key: str) -> str:
+        return self.cache.make_and_validate_key(key)
+
+    @staticmethod
+    def _marker() -> str:
+        return "__loaded__"                                 # Служебный элемент: отличает пустое загруженное множество от отсутствующего ключа
+
+    # ---------- Публичное API ----------
+
+    def load(self, key: str, members: Iterable, timeout: Optional[int] = None) -> None:
+        """Записать множество целиком (прогрев из БД)."""
+        members = {str(m) for m in members}
+        client = _redis_client(self.cache)
+        if client is not None:
+            rkey = self._rkey(key)
+            pipe = client.pipeline()
+            pipe.delete(rkey)
+            pipe.sadd(rkey, self._marker(), *members)
+            if timeout:
+                pipe.expire(rkey, timeout)
+            pipe.execute()
+            return
+        self.cache.set(key, frozenset(members), timeout)
+
+    def members(self, key: str) -> Optional[set[str]]:
+        """Все элементы множества или None, если ключ холодный."""
+        return self.members_many([key]).get(key)
+
+    def members_many(self, keys: list[str]) -> dict[str, Optional[set[str]]]:
+        """Несколько множеств за один поход в кэш (pipeline / get_many)."""
+        client = _redis_client(self.cache)
+        if client is not None:
+            pipe = client.pipeline()
+            for key in keys:
+                pipe.smembers(self._rkey(key))
+            result = {}
+            for key, raw in zip(keys, pipe.execute()):
+                values = {m.decode() if isinstance(m, bytes) else m for m in raw}
+                if self._marker() in values:
+                    values.discard(self._marker())
+                    result[key] = values
+                else:
+                    result[key] = None
+            return result
+        found = self.cache.get_many(keys)
+        return {key: (set(found[key]) if key in found else None) for key in keys}
+
+    def add(self, key: str, *members, only_if_exists: bool = False, timeout: Optional[int] = None) -> None:
+        """
+        Добавить элементы. only_if_exists=True - не трогать холодный ключ
+        (иначе частичное множество будет выглядеть как полностью загруженное).
+        """
+        self._update(key, {str(m) for m in members}, set(), only_if_exists, timeout)
+
+    def discard(self, key: str, *members, only_if_exists: bool = True, timeout: Optional[int] = None) -> None:
+        """Удалить элементы (холодный ключ по умолчанию не создаём)."""
+        self._update(key, set(), {str(m) for m in members}, only_if_exists, timeout)
+
+    def pop_all(self, key: str) -> set[str]:
+        """Атомарно забрать и очистить множество (для очередей «грязных» ключей)."""
+        client = _redis_client(self.cache)
+        if client is not None:
+            rkey = self._rkey(key)
+            pipe = client.pipeline()
+            pipe.smembers(rkey)
+            pipe.delete(rkey)
+            raw, _ = pipe.execute()
+            values = {m.decode() if isinstance(m, bytes) else m for m in raw}
+            values.discard(self._marker())
+            return values
+        with _local_lock:
+            values = self.cache.get(key)
+            self.cache.delete(key)
+        return set(values or ())
+
+    def delete(self, *keys: str) -> None:
+        self.cache.delete_many(list(keys))
+
+    def _update(self, key: str, to_add: set[str], to_remove: set[str], only_if_exists: bool, timeout: Optional[int]) -> None:
+        client = _redis_client(self.cache)
+        if client is not None:
+            rkey = self._rkey(key)
+            if only_if_exists and not client.exists(rkey):
+                return
+            pipe = client.pipeline()
+            if to_add:
+                pipe.sadd(rkey, *to_add)
+            if to_remove:
+                pipe.srem(rkey, *to_remove)
+            if not only_if_exists:
+                pipe.sadd(rkey, self._marker())
+            if timeout:
+                pipe.expire(rkey, timeout)
+            pipe.execute()
+            return
+        with _local_lock:
+            current = self.cache.get(key)
+            if current is None and only_if_exists:
+                return
+            updated = (set(current or ()) | to_add) - to_remove
+            self.cache.set(key, frozenset(updated), timeout)
+
+
+cache_set = CacheSet()
+
+
+__all__ = ["CacheSet", "cache_set"]
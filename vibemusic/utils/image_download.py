@@ -0,0 +1,130 @@
+# vibemusic/utils/image_download.py
+"""
+Скачивание картинок (обложки альбомов) в MEDIA_ROOT.
+
+- одна requests.Session с пулом соединений и ретраями на процесс;
+- таймауты на соединение и чтение;
+- тело пишется потоково во временный файл рядом с целевым, затем os.replace (атомарно);
+- проверка Content-Type, сигнатуры файла и размера (до и во время скачивания);
+- имя файла - sha256 содержимого, раскладка images/ab/cd/<sha256>.<ext>:
+  одинаковая обложка хранится один раз, в одном каталоге не бывает сотен тысяч файлов.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from typing import Optional
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+ALLOWED_TYPES = {                                           # Content-Type -> (расширение, сигнатуры начала файла)
+    "image/jpeg": ("jpg", (b"\xff\xd8\xff",)),
+    "image/png": ("png", (b"\x89PNG\r\n\x1a\n",)),
+    "image/webp": ("webp", (b"RIFF",)),
+    "image/gif": ("gif", (b"GIF87a", b"GIF89a")),
+}
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+class ImageDownloadError(Exception):
+    """Картинку не удалось скачать или она не прошла проверку."""
+
+
+def get_session() -> requests.Session:
+    """Общая сессия процесса: keep-alive и пул соединений к CDN вместо нового TCP/TLS на каждую обложку."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                retry = Retry(total=2, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504), allowed_methods=("GET",))
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=getattr(settings, "IMAGE_DOWNLOAD_POOL_SIZE", 10), max_retries=retry)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def hashed_path(digest: str, ext: str, prefix: str = "images") -> str:
+    """images/ab/cd/abcd....jpg - относительный путь внутри MEDIA_ROOT."""
+    return os.path.join(prefix, digest[:2], digest[2:4], f"{digest}.{ext}")
+
+
+def download(url: str, prefix: str = "images") -> str:
+    """
+    Скачать картинку и вернуть путь относительно MEDIA_ROOT.
+    Бросает ImageDownloadError при сетевой ошибке, неподходящем типе или превышении размера.
+    """
+    max_bytes = getattr(settings, "IMAGE_DOWNLOAD_MAX_BYTES", 10 * 1024 * 1024)
+    timeout = getattr(settings, "IMAGE_DOWNLOAD_TIMEOUT", (3.05, 10))
+
+    try:
+        response = get_session().get(url, stream=True, timeout=timeout)
+    except requests.RequestException as e:
+        raise ImageDownloadError(f"Ошибка запроса {url}: {e}") from e
+
+    with response:
+        if response.status_code != 200:
+            raise ImageDownloadError(f"{url}: HTTP {response.status_code}")
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if content_type not in ALLOWED_TYPES:
+            raise ImageDownloadError(f"{url}: неподдерживаемый Content-Type '{content_type}'")
+        length = response.headers.get("Content-Length")
+        if length and length.isdigit() and int(length) > max_bytes:
+            raise ImageDownloadError(f"{url}: {length} байт больше лимита {max_bytes}")
+        ext, signatures = ALLOWED_TYPES[content_type]
+
+        tmp_dir = os.path.join(settings.MEDIA_ROOT, prefix)
+        os.makedirs(tmp_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        head, head_size = b"", max(len(signature) for signature in signatures)   # Сигнатура может прийти в нескольких кусках
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir, prefix=".download-")   # Та же ФС, что и у цели - os.replace атомарен
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    if len(head) < head_size:
+                        head += chunk[:head_size - len(head)]
+                        if len(head) == head_size and not head.startswith(signatures):
+                            raise ImageDownloadError(f"{url}: содержимое не похоже на {content_type}")
+                    size += len(chunk)
+                    if size > max_bytes:                    # Content-Length мог врать или отсутствовать
+                        raise ImageDownloadError(f"{url}: больше лимита {max_bytes} байт")
+                    digest.update(chunk)
+                    tmp.write(chunk)
+            if not size:
+                raise ImageDownloadError(f"{url}: пустой ответ")
+            if not head.startswith(signatures):             # Файл короче самой длинной сигнатуры
+                raise ImageDownloadError(f"{url}: содержимое не похоже на {content_type}")
+        except requests.RequestException as e:
+            os.unlink(tmp_path)
+            raise ImageDownloadError(f"Обрыв при скачивании {url}: {e}") from e
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    relative = hashed_path(digest.hexdigest(), ext, prefix)
+    target = os.path.join(settings.MEDIA_ROOT, relative)
+    if os.path.exists(target):                              # Такая картинка уже есть - второй копии не храним
+        os.unlink(tmp_path)
+        logger.debug(f"Картинка {url} уже сохранена как {relative}")
+        return relative
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    os.chmod(tmp_path, 0o644)                               # mkstemp создаёт 0600 - веб-сервер должен читать файл
+    os.replace(tmp_path, target)
+    return relative
+
+
+__all__ = ["download", "get_session", "hashed_path", "ImageDownloadError"]
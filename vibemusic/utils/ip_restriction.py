@@ -1,29 +1,114 @@
 # from __future__ import annotations
+"""
+Ограничение загрузок при частой смене IP.
+
+Правило: IP_CHANGE_THRESHOLD разных IP за IP_CHANGE_WINDOW_HOURS часов (или больше
+UPLOAD_WINDOW_MAX_BYTES байт за то же окно) - загрузки закрыты на IP_CHANGE_RESTRICTION_SECONDS.
+
+Скользящее окно хранится в кэше, а не считается по IPChangeLog на каждый запрос:
+окно разбито на IP_CHANGE_BUCKETS корзин, у каждой корзины - множество IP (utils/cache_sets.py)
+и счётчик байт. Проверка = один get_many/pipeline по фиксированному числу ключей, O(1) от истории.
+В БД идём только при холодном кэше (рестарт Redis, вытеснение) - один раз на окно.
+"""
+import time
 from typing import Tuple
 from django.contrib.auth.models import AbstractBaseUser
 from django.core.cache import cache                     # Кэш Django: даёт get/set ключей (Redis/Memcached/локальный бэкенд) для хранения флагов и TTL ограничений
-from django.utils import timezone
 from django.conf import settings                        # Доступ к конфигурации Django (настройки проекта: TIME_ZONE, кэш/БД, наши IP_CHANGE_* константы и т.п.)
-from datetime import timedelta
+from datetime import datetime, timezone as dt_timezone
+from .cache_sets import cache_set                       # Множества в кэше: нативный SET в Redis, frozenset в остальных бэкендах
 from ..models import IPChangeLog                        # Импортируем модель логов IP-адресов из родительского пакета (на уровень выше текущего модуля)
 
 
+def _restriction_key(user_pk) -> str:
+    return f"upload_restriction_user_{user_pk}"
+
+
+def _window() -> Tuple[int, int]:
+    """(длина окна в секундах, длина корзины в секундах)."""
+    window = int(getattr(settings, "IP_CHANGE_WINDOW_HOURS", 1)) * 3600
+    buckets = max(int(getattr(settings, "IP_CHANGE_BUCKETS", 12)), 1)
+    return window, max(window // buckets, 1)
+
+
+def _bucket_keys(user_pk, now: float) -> list[Tuple[str, str]]:
+    """Ключи (множество IP, счётчик байт) для всех корзин текущего окна, от старой к новой."""
+    window, step = _window()
+    current = int(now // step)
+    return [
+        (f"ipwin:{user_pk}:{idx}:ips", f"ipwin:{user_pk}:{idx}:bytes")
+        for idx in range(current - window // step + 1, current + 1)
+    ]
+
+
+def _warm_from_db(user_pk, now: float) -> None:
+    """
+    Холодный кэш: восстановить корзины окна из IPChangeLog (один запрос по индексу (user, timestamp)).
+    Пишем объединением (add) - события, попавшие в кэш параллельно, не теряются.
+    """
+    window, step = _window()
+    timeout = window + step
+    if not cache.add(f"ipwin:{user_pk}:warm", 1, window):      # Уже прогрето (или прогревает другой запрос)
+        return
+    since = datetime.fromtimestamp(now - window, tz=dt_timezone.utc)
+    ips: dict[int, set[str]] = {}
+    sizes: dict[int, int] = {}
+    rows = IPChangeLog.objects.filter(user_id=user_pk, timestamp__gte=since).values_list("ip", "timestamp", "bytes_uploaded")
+    for ip, stamp, size in rows.iterator():
+        idx = int(stamp.timestamp() // step)
+        ips.setdefault(idx, set()).add(ip)
+        sizes[idx] = sizes.get(idx, 0) + (size or 0)
+    for idx, members in ips.items():
+        cache_set.add(f"ipwin:{user_pk}:{idx}:ips", *members, timeout=timeout)
+    for idx, total in sizes.items():
+        if total:
+            cache.add(f"ipwin:{user_pk}:{idx}:bytes", total, timeout)
+
+
+def window_stats(user: AbstractBaseUser, now: float | None = None) -> Tuple[set[str], int]:
+    """Разные IP и сумма загруженных байт пользователя за окно."""
+    now = now or time.time()
+    _warm_from_db(user.pk, now)
+    keys = _bucket_keys(user.pk, now)
+    ip_sets = cache_set.members_many([ips for ips, _ in keys])
+    sizes = cache.get_many([size for _, size in keys])
+    distinct = set().union(*(members for members in ip_sets.values() if members))
+    return distinct, sum(int(v or 0) for v in sizes.values())
+
+
+def record_upload_bytes(user: AbstractBaseUser, bytes_uploaded: int, now: float | None = None) -> None:
+    """Добавить загруженные байты в текущую корзину окна."""
+    if not bytes_uploaded:
+        return
+    window, step = _window()
+    _, size_key = _bucket_keys(user.pk, now or time.time())[-1]
+    try:
+        cache.incr(size_key, bytes_uploaded)
+    except ValueError:                                      # Ключа ещё нет - создаём (add не перетрёт параллельный инкремент)
+        cache.add(size_key, 0, window + step)
+        cache.incr(size_key, bytes_uploaded)
+
+
+def restrict(user: AbstractBaseUser, seconds: int | None = None) -> int:
+    """Закрыть загрузки на seconds секунд. В значении - время окончания: TTL читается на любом бэкенде кэша."""
+    seconds = int(seconds or getattr(settings, "IP_CHANGE_RESTRICTION_SECONDS", 5 * 3600))
+    cache.set(_restriction_key(user.pk), time.time() + seconds, timeout=seconds)
+    return seconds
+
+
 def user_has_active_restriction(user: AbstractBaseUser) -> tuple[bool, int]:
     """
     Проверяем: "Может ли пользователь сейчас загружать файлы?"
     Если — "Нет",  возвращает, сколько секунд осталось до разблокировки.
     - ключ в кэше для флага ограничения загрузки:
-        срабатывает при превышении лимита по МБ; по нему читаем TTL (оставшееся время блокировки).
+        ставится при превышении порога по IP или по байтам; в значении - время окончания блокировки.
     - cache.get(key) - берём значение из кэша по ключу key.
     - если ключ истёк, возвращаем (False, 0).
     """
-    key = f"upload_restricton_user_{user.pk}"                   # Уникальный ключь                            
-    val = cache.get(key)                                                        
-    if val is None:                                                                
+    expires_at = cache.get(_restriction_key(user.pk))
+    if expires_at is None:
         return False, 0
-    # Узнаём оставшийся TTL ключа (в секундах), если бэкенд кэша поддерживает метод .ttl; иначе используем заглушку, которая возвращает 0
-    ttl = getattr(cache, "ttl", lambda _k: 0)(key)
-    return True, max(int(ttl or 0), 0)                      # ttl or 0 → если ttl равен None/0/пустому значению — подставляем 0; int(...) → приводим к целому числу; max(..., 0) → не даём уйти в отрицательные значения
+    return True, max(int(expires_at - time.time()), 0)
 
 
 def check_id_changes_and_maybe_restrict(
@@ -31,36 +116,24 @@ def check_id_changes_and_maybe_restrict(
         current_ip: str | None,
 ) -> tuple[bool, int]:
     """
-    Проверить изменения IP-адреса и, возможно, ограничить.
+    Учесть текущий IP в окне и, если порог превышен, включить ограничение.
+    Возвращает (ограничение активно, секунд до снятия).
     """
     restricted, ttl = user_has_active_restriction((user))       # Узнаём, есть ли уже активное ограничение для этого пользователя и сколько секунд осталось (ttl)
     if restricted:                                              # Если ограничение уже действует -
         return True, ttl                                        # сразу выходим и возвращаем (True, оставшиеся_секунды)
-    
-    window_hours: int = int(getattr(settings, "IP_CHANGE_WINDOW_HOURS", 1))                 # Размер «окна» в часах для подсчёта уникальных IP; берём из настроек, по умолчанию 1 час
+
     threshold: int = int(getattr(settings, "IP_CHANGE_THRESHOLD", 3))                       # Порог уникальных IP в окне: если их >= threshold, включаем ограничение (по умолчанию 3)
-    restriction_seconds: int = int(getattr(settings, "IP_CHANGE_RESTRICTION_SECONDS", 5 * 3600))    # Длительность ограничения в секундах; берём из настроек, по умолчанию 5 часов (18000 сек)
+    max_bytes: int = int(getattr(settings, "UPLOAD_WINDOW_MAX_BYTES", 0))                   # Лимит байт за окно; 0 - без лимита
 
-    
-    """
-    Вычисляем now - этот промежуток.
-    Если сейчас 21:30, то при window_hours=1 получится 20:30.
-    """
-    since = timezone.now() - timedelta(hours=window_hours)          # Метка начала окна: текущее (tz-aware) время минус window_hours часов; всё, что новее since, попадает в расчёт
- 
-
-    unique_ips_qs = (
-        IPChangeLog.objects                             # берём таблицу логов IP-адресов
-        .filter(user=user, timestamp__gte=since)        # фильтруем по текущему пользователю и по дате: только записи новее/равные since (началу окна)
-        .values_list("ip", flat=True)                   # Берём только значения поля "ip" как плоский список (без кортежей flat=True), например ['1.2.3.4', '5.6.7.8', ...]
-        .distinct()                                     # Убираем дубликаты IP в результирующем queryset/списке — оставляем только уникальные значения
-    )
-
-    if current_ip and current_ip not in set(unique_ips_qs): # Если current_ip существует И его ещё нет в списке уникальных IP — тогда...
-        unique_count += 1
-
-    if unique_count >= threshold:                           # Если уникальных IP больше установленного порога:
-        key = f"upload_restriction_user_{user.pk}"       
-        cache.set(key, True, timeout=restriction_seconds)   # Поставить блокировку пользователю: ключ = True, на restriction_seconds секунд. Через это время - блокировка автоматически снимется
-        return True, restriction_seconds                    # Возвращаем кортеж: True - ограничение активно, restriction_seconds - длительность блокировки в секундах
-    return False, 0                                         # Ограничение не активно; 0 - нет оставшегося времени блокировки
\ No newline at end of file
+    now = time.time()
+    window, step = _window()
+    _warm_from_db(user.pk, now)                                 # До записи текущего IP: иначе тёплым посчитается неполное окно
+    if current_ip:
+        ips_key, _ = _bucket_keys(user.pk, now)[-1]
+        cache_set.add(ips_key, current_ip, timeout=window + step)   # Текущий IP - в корзину «сейчас»
+    unique_ips, uploaded = window_stats(user, now)
+
+    if len(unique_ips) >= threshold or (max_bytes and uploaded >= max_bytes):
+        return True, restrict(user)                             # True - ограничение активно, длительность блокировки в секундах
+    return False, 0                                             # Ограничение не активно; 0 - нет оставшегося времени блокировки
@@ -0,0 +1,165 @@
+# vibemusic/utils/keyset.py
+"""
+Keyset-пагинация (seek method) по составному ключу, по умолчанию (created_at, id).
+
+Вместо OFFSET страница выбирается условием WHERE (created_at, id) < (:c, :id)
+по составному индексу - страница N стоит столько же, сколько первая.
+COUNT(*) не выполняется: общее число - опционально и приблизительно (estimate_count).
+"""
+from __future__ import annotations
+
+import base64
+import json
+from dataclasses import dataclass, field
+from typing import Any, Optional, Sequence
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connections
+from django.db.models import Q, QuerySet
+
+
+DEFAULT_ORDERING = ("-created_at", "-id")
+ESTIMATE_MIN_ROWS = 10_000                                  # Меньше - статистика планировщика неточна, дешевле посчитать честно
+
+
+class InvalidCursor(ValueError):
+    """Курсор повреждён или не соответствует сортировке."""
+
+
+@dataclass
+class KeysetPage:
+    """Страница keyset-пагинации. Итерируется как список объектов."""
+    object_list: list
+    has_next: bool
+    has_previous: bool
+    next_cursor: Optional[str] = None
+    previous_cursor: Optional[str] = None
+    paginator: Any = field(default=None, repr=False)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_other_pages(self) -> bool:
+        return self.has_next or self.has_previous
+
+
+class KeysetPaginator:
+    """
+    Пагинатор по составному ключу.
+
+    ordering - поля одного направления, последнее должно быть уникальным (id),
+    например ('-created_at', '-id') или ('-search_rank', '-id').
+    """
+
+    def __init__(self, queryset: QuerySet, per_page: int, ordering: Sequence[str] = DEFAULT_ORDERING) -> None:
+        ordering = tuple(ordering)
+        descending = {name.startswith("-") for name in ordering}
+        if len(descending) != 1:
+            raise ValueError("Все поля keyset-сортировки должны иметь одно направление")
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = ordering
+        self.descending = descending.pop()
+        self.fields = [name.lstrip("-") for name in ordering]
+
+    # ---------- Курсор ----------
+
+    def encode_cursor(self, obj, backwards: bool = False) -> str:
+        values = [self._dump(getattr(obj, name)) for name in self.fields]
+        raw = json.dumps({"v": values, "b": int(backwards)}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor: str) -> tuple[list, bool]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            data = json.loads(raw)
+            values = data["v"]
+            if not isinstance(values, list) or len(values) != len(self.fields):
+                raise InvalidCursor("Длина курсора не совпадает с сортировкой")
+            return [self._load(name, value) for name, value in zip(self.fields, values)], bool(data.get("b"))
+        except InvalidCursor:
+            raise
+        except (ValueError, TypeError, KeyError, ValidationError) as e:
+            raise InvalidCursor(str(e)) from e
+
+    @staticmethod
+    def _dump(value):
+        if hasattr(value, "isoformat"):                     # datetime/date - в ISO, остальное (int, float, str) как есть
+            return value.isoformat()
+        return value
+
+    def _load(self, name: str, value):
+        try:
+            model_field = self.queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:                           # Аннотация (например, search_rank) - значение из JSON как есть
+            return value
+        return model_field.to_python(value)
+
+    # ---------- Выборка ----------
+
+    def _seek(self, values: list, backwards: bool) -> Q:
+        """
+        (f1, f2, ...) < (v1, v2, ...) в виде, понятном любому бэкенду:
+        f1 < v1 OR (f1 = v1 AND f2 < v2) OR ...
+        """
+        op = "lt" if self.descending != backwards else "gt"
+        condition = Q()
+        for i, name in enumerate(self.fields):
+            step = Q(**{f"{name}__{op}": values[i]})
+            for prev_name, prev_value in zip(self.fields[:i], values[:i]):
+                step &= Q(**{prev_name: prev_value})
+            condition |= step
+        return condition
+
+    def page(self, cursor: Optional[str] = None) -> KeysetPage:
+        values, backwards = self.decode_cursor(cursor) if cursor else (None, False)
+        ordering = self.ordering
+        if backwards:                                       # Назад - идём в обратном порядке от курсора и разворачиваем результат
+            ordering = tuple(name[1:] if name.startswith("-") else f"-{name}" for name in ordering)
+
+        queryset = self.queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, backwards))
+
+        rows = list(queryset[: self.per_page + 1])         # +1 строка - узнать, есть ли следующая страница, без COUNT
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if backwards:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+
+        return KeysetPage(
+            object_list=rows,
+            has_next=has_next and bool(rows),
+            has_previous=has_previous and bool(rows),
+            next_cursor=self.encode_cursor(rows[-1]) if has_next and rows else None,
+            previous_cursor=self.encode_cursor(rows[0], backwards=True) if has_previous and rows else None,
+            paginator=self,
+        )
+
+
+def estimate_count(queryset: QuerySet) -> int:
+    """
+    Приблизительное число строк без полного COUNT(*).
+    Для нефильтрованной таблицы в PostgreSQL - pg_class.reltuples (статистика ANALYZE),
+    иначе и для маленьких таблиц - обычный count().
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == "postgresql" and not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+        if row and row[0] >= ESTIMATE_MIN_ROWS:
+            return int(row[0])
+    return queryset.count()
+
+
+__all__ = ["KeysetPaginator", "KeysetPage", "InvalidCursor", "estimate_count", "DEFAULT_ORDERING"]
@@ -0,0 +1,157 @@
+# vibemusic/utils/mpeg.py
+"""
+Разбор MP3 по заголовкам MPEG-кадров: длительность и вырезка фрагмента без перекодирования.
+
+Кадр MPEG audio начинается 4-байтным заголовком, из которого известны длина кадра
+и число сэмплов в нём. Идём по заголовкам (seek, без чтения звука), а фрагмент -
+это непрерывный отрезок байт от начала одного кадра до конца другого.
+"""
+from __future__ import annotations
+
+import os
+from typing import BinaryIO, Iterator, NamedTuple, Optional
+
+from vibemusic.utils.audio_hash import id3v2_size
+
+
+BITRATES = {                                                # (MPEG-1?, слой) -> кбит/с по индексу 1..14
+    (True, 1): (32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}   # По битам версии: 1, 2, 2.5
+RESYNC_WINDOW = 64 * 1024                                   # Сколько байт мусора между кадрами готовы пропустить
+
+
+class Frame(NamedTuple):
+    offset: int
+    length: int
+    samples: int
+    sample_rate: int
+
+    @property
+    def duration(self) -> float:
+        return self.samples / self.sample_rate
+
+
+def parse_header(header: bytes) -> Optional[tuple[int, int, int]]:
+    """(длина кадра, сэмплов, частота) по 4 байтам заголовка или None."""
+    if len(header) < 4 or header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return None
+    version = (header[1] >> 3) & 3
+    layer = 4 - ((header[1] >> 1) & 3)                      # Биты 11/10/01 -> слой I/II/III
+    bitrate_index = header[2] >> 4
+    rate_index = (header[2] >> 2) & 3
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+        return None                                         # reserved / free format / неверные индексы
+    mpeg1 = version == 3
+    bitrate = BITRATES[(mpeg1, layer)][bitrate_index - 1] * 1000
+    sample_rate = SAMPLE_RATES[version][rate_index]
+    padding = (header[2] >> 1) & 1
+    if layer == 1:
+        return (12 * bitrate // sample_rate + padding) * 4, 384, sample_rate
+    samples = 1152 if layer == 2 or mpeg1 else 576
+    return samples // 8 * bitrate // sample_rate + padding, samples, sample_rate
+
+
+def _valid_at(f: BinaryIO, offset: int, size: int) -> bool:
+    if offset >= size:
+        return True
+    f.seek(offset)
+    head = f.read(4)
+    return parse_header(head) is not None or head[:3] == b"TAG"
+
+
+def iter_frames(f: BinaryIO) -> Iterator[Frame]:
+    """Кадры файла по порядку. Теги ID3v2 в начале и ID3v1 в конце пропускаются."""
+    size = f.seek(0, os.SEEK_END)
+    pos = 0
+    while pos + 10 <= size:                                 # Теги ID3v2 (бывает несколько подряд)
+        f.seek(pos)
+        tag = id3v2_size(f.read(10))
+        if not tag:
+            break
+        pos += tag
+
+    while pos + 4 <= size:
+        f.seek(pos)
+        head = f.read(4)
+        if head[:3] == b"TAG":
+            return
+        parsed = parse_header(head)
+        if parsed and parsed[0] > 4:
+            yield Frame(pos, *parsed)
+            pos += parsed[0]
+            continue
+        pos = _resync(f, pos + 1, size)                     # Мусор между кадрами - ищем следующий заголовок
+        if pos is None:
+            return
+
+
+def _resync(f: BinaryIO, start: int, size: int) -> Optional[int]:
+    """Следующий заголовок, за которым тоже идёт заголовок (чтобы не принять за кадр случайные 0xFF)."""
+    f.seek(start)
+    window = f.read(RESYNC_WINDOW)
+    index = window.find(b"\xff")
+    while index != -1:
+        parsed = parse_header(window[index:index + 4])
+        if parsed and parsed[0] > 4 and _valid_at(f, start + index + parsed[0], size):
+            return start + index
+        index = window.find(b"\xff", index + 1)
+    return None
+
+
+def is_info_frame(f: BinaryIO, frame: Frame) -> bool:
+    """Служебный кадр Xing/Info/VBRI в начале VBR-файла: для фрагмента его данные неверны."""
+    f.seek(frame.offset)
+    return any(marker in f.read(min(frame.length, 64)) for marker in (b"Xing", b"Info", b"VBRI"))
+
+
+def duration(f: BinaryIO) -> float:
+    return sum(frame.duration for frame in iter_frames(f))
+
+
+def slice_clip(src: BinaryIO, dst: BinaryIO, start: float, length: float) -> float:
+    """
+    Записать в dst кадры src с start по start+length секунд. Если трек короче,
+    фрагмент сдвигается к концу (или это весь трек). Возвращает длительность фрагмента.
+    """
+    frames = list(iter_frames(src))
+    if frames and is_info_frame(src, frames[0]):
+        frames = frames[1:]
+    if not frames:
+        return 0.0
+    total = sum(frame.duration for frame in frames)
+    start = max(0.0, min(start, total - length))
+
+    elapsed = 0.0
+    first = last = None
+    clip = 0.0
+    for index, frame in enumerate(frames):
+        if elapsed >= start and first is None:
+            first = index
+        if first is not None:
+            if clip >= length:
+                break
+            clip += frame.duration
+            last = index
+        elapsed += frame.duration
+    if first is None:                                       # length короче последнего кадра
+        first = last = len(frames) - 1
+
+    begin, end = frames[first].offset, frames[last].offset + frames[last].length
+    src.seek(begin)
+    remaining = end - begin
+    while remaining:
+        data = src.read(min(remaining, 1024 * 1024))
+        if not data:
+            break
+        dst.write(data)
+        remaining -= len(data)
+    return clip
+
+
+__all__ = ["Frame", "parse_header", "iter_frames", "duration", "slice_clip"]
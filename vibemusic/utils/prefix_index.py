@@ -0,0 +1,166 @@
+# vibemusic/utils/prefix_index.py
+"""
+Компактный неизменяемый индекс для автодополнения по началу слова.
+
+- ключи - хвосты названия с начала каждого слова («звезда по имени солнце», «солнце», ...) в нормализованной
+  и транслитерированной форме (utils/translit.py), обрезанные до key_length символов;
+- все ключи склеены в одну строку с массивом смещений, ссылки на записи - array('I'): миллион названий -
+  несколько десятков МБ вместо миллионов отдельных str, снимок быстро сериализуется в кэш;
+- записи отсортированы по (-популярность, длина, название), поэтому ранг записи - её номер:
+  лучшие результаты префикса - наименьшие номера в диапазоне ключей;
+- для коротких префиксов (до top_prefix символов) и для любого префикса, чей диапазон длиннее max_scan,
+  лучшие top_k номеров посчитаны заранее - широкий диапазон не просматривается на каждый запрос
+  и не обрезается по алфавиту (популярная запись в конце диапазона не теряется).
+"""
+from __future__ import annotations
+
+import heapq
+from array import array
+from typing import Callable, Iterable, NamedTuple, Optional
+
+from vibemusic.utils.translit import normalize, variants
+
+
+KEY_LENGTH = 24                                             # Длиннее - проверяем по названию целиком
+TOP_PREFIX = 2
+TOP_K = 32
+MAX_SCAN = 20_000                                           # Диапазоны длиннее - с заготовленным топом: запрос без фильтров не просматривает их целиком
+
+
+class Entry(NamedTuple):
+    kind: int
+    id: int
+    label: str
+    score: int
+
+
+def rank_key(entry: Entry) -> tuple:
+    return (-entry.score, len(entry.label), entry.label)
+
+
+def index_keys(label: str, key_length: int = KEY_LENGTH) -> set[str]:
+    """Ключи записи: хвосты с начала каждого слова во всех формах названия."""
+    keys = set()
+    for form in variants(label):
+        words = form.split(" ")
+        for i in range(len(words)):
+            keys.add(" ".join(words[i:])[:key_length])
+    keys.discard("")
+    return keys
+
+
+def matches(label: str, prefix: str) -> bool:
+    """Полная проверка без обрезки ключей: префикс длиннее key_length, записи дельты."""
+    return any(key.startswith(prefix) for key in index_keys(label, key_length=10_000))
+
+
+class PrefixIndex:
+    def __init__(self, entries: list[Entry], keys: str, key_offsets: array, refs: array,
+                 top: dict[str, tuple[int, ...]], key_length: int = KEY_LENGTH, top_prefix: int = TOP_PREFIX,
+                 top_k: int = TOP_K):
+        self.kinds = array("B", (entry.kind for entry in entries))
+        self.ids = array("I", (entry.id for entry in entries))
+        self.scores = array("I", (entry.score for entry in entries))
+        self.labels = "".join(entry.label for entry in entries)
+        self.label_offsets = array("I", [0])
+        for entry in entries:
+            self.label_offsets.append(self.label_offsets[-1] + len(entry.label))
+        self.keys = keys
+        self.key_offsets = key_offsets
+        self.refs = refs
+        self.top = top
+        self.key_length = key_length
+        self.top_prefix = top_prefix
+        self.top_k = top_k
+
+    @classmethod
+    def build(cls, entries: Iterable[Entry], *, key_length: int = KEY_LENGTH, top_prefix: int = TOP_PREFIX,
+              top_k: int = TOP_K, max_scan: int = MAX_SCAN) -> "PrefixIndex":
+        entries = sorted(entries, key=rank_key)
+        pairs = sorted((key, i) for i, entry in enumerate(entries) for key in index_keys(entry.label, key_length))
+
+        keys = "".join(key for key, _ in pairs)
+        key_offsets = array("I", [0])
+        for key, _ in pairs:
+            key_offsets.append(key_offsets[-1] + len(key))
+        refs = array("I", (i for _, i in pairs))
+
+        top: dict[str, tuple[int, ...]] = {}
+        ranges = [(0, len(pairs))]                          # Ключи отсортированы - у каждого префикса свой сплошной отрезок
+        for length in range(1, key_length + 1):
+            wide = []
+            for lo, hi in ranges:
+                start = lo
+                while start < hi:
+                    prefix = pairs[start][0][:length]
+                    end = start
+                    while end < hi and pairs[end][0].startswith(prefix):
+                        end += 1
+                    if len(prefix) == length and (length <= top_prefix or end - start > max_scan):
+                        top[prefix] = tuple(heapq.nsmallest(top_k, set(refs[start:end])))
+                        if end - start > max_scan:
+                            wide.append((start, end))       # Длиннее префиксы ищем только внутри широких отрезков
+                    start = end
+            if length >= top_prefix:
+                ranges = wide
+                if not ranges:
+                    break
+        return cls(entries, keys, key_offsets, refs, top, key_length, top_prefix, top_k)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def entry(self, i: int) -> Entry:
+        label = self.labels[self.label_offsets[i]:self.label_offsets[i + 1]]
+        return Entry(self.kinds[i], self.ids[i], label, self.scores[i])
+
+    def _key(self, i: int) -> str:
+        return self.keys[self.key_offsets[i]:self.key_offsets[i + 1]]
+
+    def _bounds(self, prefix: str) -> tuple[int, int]:
+        """Отрезок ключей, начинающихся с prefix (два бинарных поиска по склеенной строке)."""
+        lo, hi = 0, len(self.refs)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < prefix:
+                lo = mid + 1
+            else:
+                hi = mid
+        start, hi = lo, len(self.refs)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid)[:len(prefix)] <= prefix:
+                lo = mid + 1
+            else:
+                hi = mid
+        return start, lo
+
+    def search(self, query: str, limit: int = 10, *, kinds: Optional[set[int]] = None,
+               skip: Optional[Callable[[int, int], bool]] = None) -> list[Entry]:
+        """Лучшие записи, у которых одно из слов (или последовательность слов) начинается с query."""
+        prefix = normalize(query)
+        if not prefix or limit <= 0:
+            return []
+        short = prefix[:self.key_length]
+        long_query = len(prefix) > self.key_length
+
+        def accept(i: int) -> bool:
+            if kinds is not None and self.kinds[i] not in kinds:
+                return False
+            if skip is not None and skip(self.kinds[i], self.ids[i]):
+                return False
+            return not long_query or matches(self.entry(i).label, prefix)
+
+        found = []
+        ranked = self.top.get(short)
+        if ranked is not None:
+            found = [i for i in ranked if accept(i)][:limit]
+            if len(found) == limit or len(ranked) < self.top_k:      # Заготовки хватило или в ней весь отрезок
+                return [self.entry(i) for i in found]
+
+        start, end = self._bounds(short)                    # Без заготовки отрезок не длиннее max_scan; с ней - фильтр отсеял топ, читаем весь
+        found = heapq.nsmallest(limit, (i for i in set(self.refs[start:end]) if accept(i)))
+        return [self.entry(i) for i in found]
+
+
+__all__ = ["Entry", "PrefixIndex", "index_keys", "matches", "rank_key", "KEY_LENGTH"]
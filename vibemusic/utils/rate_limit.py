@@ -0,0 +1,58 @@
+# vibemusic/utils/rate_limit.py
+from __future__ import annotations
+
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Ведро токенов: rate токенов в секунду, не больше capacity подряд.
+    Потокобезопасно, время - time.monotonic().
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0                            # Пауза по требованию сервера (HTTP 429 retry_after)
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Взять токен, если он есть прямо сейчас."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                return False
+            self._refill(now)
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            return False
+
+    def refund(self, tokens: float = 1.0) -> None:
+        """Вернуть взятый, но не потраченный токен."""
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + tokens)
+
+    def wait_time(self, tokens: float = 1.0) -> float:
+        """Через сколько секунд появится токен."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            refill = max(tokens - self.tokens, 0) / self.rate if self.rate else float("inf")
+            return max(refill, self.blocked_until - now, 0.0)
+
+    def block(self, seconds: float) -> None:
+        """Не выдавать токены seconds секунд."""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0
+
+
+__all__ = ["TokenBucket"]
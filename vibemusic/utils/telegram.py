@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import logging
+from dataclasses import dataclass
 from functools import lru_cache
 from typing import Optional, Union, TYPE_CHECKING
 
@@ -14,6 +15,19 @@ if TYPE_CHECKING:
     from ..models import User  # noqa: F401
 
 
+@dataclass
+class SendResult:
+    """Результат вызова sendMessage: нужен диспетчеру, чтобы решить - повторять или нет."""
+    ok: bool
+    status: Optional[int] = None                    # HTTP-статус, None - сетевая ошибка
+    retry_after: Optional[float] = None             # Секунды из 429 (parameters.retry_after или Retry-After)
+    error: str = ""
+
+    @property
+    def retryable(self) -> bool:
+        return not self.ok and (self.status is None or self.status == 429 or self.status >= 500)
+
+
 class TelegramConnector:
     """
     Делает:
@@ -29,8 +43,10 @@ class TelegramConnector:
         signer: Optional[TimestampSigner] = None,
         session: Optional[requests.Session] = None,
         logger: Optional[logging.Logger] = None,
+        api_base: str = "https://api.telegram.org",
     ) -> None:
         self.bot_token = bot_token
+        self.api_base = api_base.rstrip("/")
         self.token_ttl_seconds = token_ttl_seconds
         self.signer = signer or TimestampSigner()
         self.session = session or requests.Session()
@@ -77,26 +93,54 @@ class TelegramConnector:
         """
         Отправить сообщение в Telegram. Вернёт True/False.
         """
+        return self.send_message_result(chat_id, text, parse_mode, disable_web_page_preview, timeout).ok
+
+    def send_message_result(
+        self,
+        chat_id: Union[int, str],
+        text: str,
+        parse_mode: str = "Markdown",
+        disable_web_page_preview: bool = True,
+        timeout: int = 10,
+    ) -> SendResult:
+        """
+        Отправить сообщение и вернуть подробный результат (статус, retry_after).
+        """
         if not chat_id:
             self.logger.warning("Не указан chat_id для Telegram сообщения.")
-            return False
+            return SendResult(ok=False, error="empty chat_id")
 
-        url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
+        url = f"{self.api_base}/bot{self.bot_token}/sendMessage"
         payload = {
             "chat_id": chat_id,
             "text": text,
-            "parse_mode": parse_mode,
             "disable_web_page_preview": disable_web_page_preview,
         }
+        if parse_mode:
+            payload["parse_mode"] = parse_mode
 
         try:
             resp = self.session.post(url, json=payload, timeout=timeout)
-            resp.raise_for_status()
-            self.logger.info("Сообщение отправлено: chat_id=%s", chat_id)
-            return True
         except requests.RequestException as e:
             self.logger.error("Ошибка отправки в Telegram: %s", e)
-            return False
+            return SendResult(ok=False, error=str(e))
+
+        if resp.ok:
+            self.logger.info("Сообщение отправлено: chat_id=%s", chat_id)
+            return SendResult(ok=True, status=resp.status_code)
+
+        retry_after = None
+        description = resp.text[:500]
+        try:
+            body = resp.json()
+            description = body.get("description", description)
+            retry_after = (body.get("parameters") or {}).get("retry_after")
+        except ValueError:
+            pass
+        if retry_after is None and resp.headers.get("Retry-After", "").isdigit():
+            retry_after = int(resp.headers["Retry-After"])
+        self.logger.error("Ошибка отправки в Telegram: HTTP %s %s", resp.status_code, description)
+        return SendResult(ok=False, status=resp.status_code, retry_after=retry_after, error=f"HTTP {resp.status_code}: {description}")
 
     # ---------- Фабрика из settings ----------
 
@@ -114,6 +158,7 @@ class TelegramConnector:
             bot_token=settings.TELEGRAM_BOT_TOKEN,
             token_ttl_seconds=token_ttl_seconds,
             logger=logger,
+            api_base=getattr(settings, "TELEGRAM_API_BASE", "https://api.telegram.org"),
         )
 
 
@@ -124,6 +169,11 @@ def _default_connector() -> TelegramConnector:
     return TelegramConnector.from_settings()
 
 
+def default_connector() -> TelegramConnector:
+    """Общий коннектор процесса (одна requests.Session на все отправки)."""
+    return _default_connector()
+
+
 def make_telegram_connect_token(user_or_pk: Union[int, "User"]) -> str:
     """
     Совместимая обёртка для старого импорта.
@@ -160,6 +210,8 @@ def send_telegram_message(
 __all__ = [
     # Класс
     "TelegramConnector",
+    "SendResult",
+    "default_connector",
     # Функции-обёртки (для существующего кода)
     "make_telegram_connect_token",
     "unsign_telegram_connect_token",
@@ -0,0 +1,101 @@
+# vibemusic/utils/telegram_standin.py
+"""
+Локальная замена Bot API для нагрузочных тестов очереди Telegram.
+
+Принимает POST /bot<token>/sendMessage, соблюдает те же лимиты, что и Telegram
+(на чат и на бота), и при превышении отвечает 429 с parameters.retry_after.
+Можно подмешать случайные 5xx (fail_rate), чтобы проверить повторы.
+"""
+from __future__ import annotations
+
+import json
+import math
+import random
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from vibemusic.utils.rate_limit import TokenBucket
+
+
+class TelegramStandin(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), *, global_rate=30.0, chat_rate=1.0, group_rate=20 / 60,
+                 retry_after=1, fail_rate=0.0) -> None:
+        super().__init__(address, _Handler)
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.chat_rate, self.group_rate = chat_rate, group_rate
+        self.retry_after = retry_after
+        self.fail_rate = fail_rate
+        self.chat_buckets: dict[str, TokenBucket] = {}
+        self.delivered: list[tuple[str, str]] = []                  # (chat_id, text) в порядке приёма
+        self.stats = Counter()                                      # ok / 429 / 5xx
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "TelegramStandin":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def chat_bucket(self, chat_id: str) -> TokenBucket:
+        with self.lock:
+            if chat_id not in self.chat_buckets:
+                rate = self.group_rate if chat_id.startswith(("-", "@")) else self.chat_rate
+                self.chat_buckets[chat_id] = TokenBucket(rate, 1)
+            return self.chat_buckets[chat_id]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: TelegramStandin
+    protocol_version = "HTTP/1.1"                                   # Keep-alive, как у настоящего API
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._reply(400, {"ok": False, "error_code": 400, "description": "Bad Request: invalid JSON"})
+        if not self.path.endswith("/sendMessage"):
+            return self._reply(404, {"ok": False, "error_code": 404, "description": "Not Found"})
+        chat_id = str(payload.get("chat_id") or "")
+        if not chat_id:
+            return self._reply(400, {"ok": False, "error_code": 400, "description": "Bad Request: chat not found"})
+        if not payload.get("text"):
+            return self._reply(400, {"ok": False, "error_code": 400, "description": "Bad Request: message text is empty"})
+
+        server = self.server
+        if server.fail_rate and random.random() < server.fail_rate:
+            server.stats["5xx"] += 1
+            return self._reply(502, {"ok": False, "error_code": 502, "description": "Bad Gateway"})
+        bucket = server.chat_bucket(chat_id)
+        if not bucket.try_acquire() or not server.global_bucket.try_acquire():
+            server.stats["429"] += 1
+            retry_after = max(server.retry_after, math.ceil(bucket.wait_time()))
+            return self._reply(429, {
+                "ok": False, "error_code": 429,
+                "description": f"Too Many Requests: retry after {retry_after}",
+                "parameters": {"retry_after": retry_after},
+            })
+        with server.lock:
+            server.delivered.append((chat_id, payload.get("text", "")))
+            server.stats["ok"] += 1
+        self._reply(200, {"ok": True, "result": {"message_id": server.stats["ok"], "chat": {"id": chat_id}}})
+
+    def _reply(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+__all__ = ["TelegramStandin"]
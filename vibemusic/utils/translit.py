@@ -0,0 +1,46 @@
+# vibemusic/utils/translit.py
+"""
+Нормализация названий для поиска по префиксу: регистр, ё/е, диакритика, пунктуация,
+и транслитерация кириллицы в латиницу - «kino» находит «Кино», «sektor» - «Сектор Газа».
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+
+
+CYRILLIC_TO_LATIN = str.maketrans({
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ж": "zh", "з": "z", "и": "i",
+    "й": "y", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o", "п": "p", "р": "r", "с": "s",
+    "т": "t", "у": "u", "ф": "f", "х": "kh", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "shch",
+    "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "yu", "я": "ya",
+    "і": "i", "ї": "yi", "є": "ye", "ґ": "g",               # Украинские буквы
+})
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize(text: str) -> str:
+    """Нижний регистр, ё -> е, без диакритики (é -> e) и знаков препинания, слова через один пробел."""
+    text = (text or "").casefold().replace("ё", "е")
+    text = "".join(
+        char for char in unicodedata.normalize("NFKD", text)
+        if not unicodedata.combining(char) or char == "\u0306"   # Бреве оставляем - иначе й превратится в и
+    )
+    text = unicodedata.normalize("NFC", text)
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def transliterate(text: str) -> str:
+    """Кириллица -> латиница (упрощённая схема, как в адресах и логинах). Текст должен быть уже нормализован."""
+    return text.translate(CYRILLIC_TO_LATIN)
+
+
+def variants(text: str) -> tuple[str, ...]:
+    """Формы названия для индекса: нормализованная и (если отличается) транслитерированная."""
+    normalized = normalize(text)
+    latin = transliterate(normalized)
+    return (normalized,) if latin == normalized else (normalized, latin)
+
+
+__all__ = ["normalize", "transliterate", "variants"]
@@ -0,0 +1,120 @@
+# vibemusic/utils/upload_handlers.py
+"""
+Обработчик загрузок: файл сразу пишется кусками во временный файл на диске.
+
+По ходу приёма:
+  - считается sha256 и размер (file.sha256, file.size) - повторно читать файл не нужно;
+  - для аудио - ещё и отпечаток без ID3-тегов (file.audio_hash) для дедупликации в Track.save;
+  - по первым байтам проверяется тип (file.detected_type): mp3/wav/ogg/flac или jpeg/png/gif/webp;
+  - при превышении лимита или чужом типе запись прекращается сразу (SkipFile), а не после
+    буферизации всего тела в памяти воркера.
+
+Лимиты и ожидаемый тип задаются по имени маршрута и поля формы (FIELD_POLICIES, переопределяется
+settings.UPLOAD_FIELD_POLICIES). Причины отказа складываются в request.upload_rejections
+({поле: сообщение}) - формы этих вьюх показывают их как ошибки поля (UploadRejectionsMixin в forms.py).
+Остальные загрузки (админка, профиль) проверяются только общим лимитом MAX_UPLOAD_MB: их формы
+о request.upload_rejections не знают, и отброшенный файл выглядел бы как незаполненное поле.
+"""
+from __future__ import annotations
+
+import hashlib
+from typing import Optional
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+
+from vibemusic.utils.audio_hash import AudioFingerprint
+
+
+MB = 1024 * 1024
+
+SIGNATURES = {                                              # Тип -> проверка первых байт файла
+    "audio/mpeg": lambda head: head.startswith(b"ID3") or (len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0),
+    "audio/wav": lambda head: head.startswith(b"RIFF") and head[8:12] == b"WAVE",
+    "audio/ogg": lambda head: head.startswith(b"OggS"),
+    "audio/flac": lambda head: head.startswith(b"fLaC"),
+    "image/jpeg": lambda head: head.startswith(b"\xff\xd8\xff"),
+    "image/png": lambda head: head.startswith(b"\x89PNG\r\n\x1a\n"),
+    "image/gif": lambda head: head.startswith((b"GIF87a", b"GIF89a")),
+    "image/webp": lambda head: head.startswith(b"RIFF") and head[8:12] == b"WEBP",
+}
+
+FIELD_POLICIES = {                                          # Маршрут -> поле формы -> (ожидаемый тип, лимит байт; None - MAX_UPLOAD_MB)
+    "upload_track": {"audio_file": ("audio", 10 * MB)},     # TrackUploadForm
+    "add_post": {"tracks": ("audio", None), "images": ("image", None)},   # PostForm
+    "add_comment": {"image": ("image", 5 * MB)},            # CommentForm
+}
+
+KIND_LABELS = {"audio": "аудиофайлом (MP3, WAV, OGG, FLAC)", "image": "изображением (JPEG, PNG, GIF, WebP)"}
+
+
+def sniff(head: bytes, kind: Optional[str] = None) -> Optional[str]:
+    """MIME-тип по сигнатуре или None. kind='audio'/'image' - искать только среди них."""
+    for mime, matches in SIGNATURES.items():
+        if (kind is None or mime.startswith(kind + "/")) and matches(head):
+            return mime
+    return None
+
+
+def policy_for(url_name: Optional[str], field_name: str) -> tuple[Optional[str], int]:
+    policies = getattr(settings, "UPLOAD_FIELD_POLICIES", FIELD_POLICIES)
+    kind, limit = policies.get(url_name, {}).get(field_name, (None, None))
+    return kind, limit or getattr(settings, "MAX_UPLOAD_MB", 300 * MB)
+
+
+class StreamingHashUploadHandler(FileUploadHandler):
+    chunk_size = 64 * 1024                                  # Память на загрузку - один кусок, а не весь файл
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        self.__dict__.pop("file", None)                     # Парсер закрывает handler.file при SkipFile - не трогаем уже принятый файл
+        match = getattr(self.request, "resolver_match", None)      # FILES разбирает вьюха - маршрут уже известен
+        self.kind, self.max_bytes = policy_for(match.url_name if match else None, field_name)
+        if content_length and content_length > self.max_bytes:
+            self._reject(f"Файл «{file_name}» больше {self.max_bytes // MB} МБ.")
+        self.file = TemporaryUploadedFile(file_name, content_type, 0, charset, content_type_extra)
+        self.digest = hashlib.sha256()
+        self.fingerprint = AudioFingerprint() if self.kind == "audio" else None
+        self.received = 0
+        self.detected_type = None
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.received:
+            self.detected_type = sniff(raw_data[:16], self.kind)
+            if self.kind and self.detected_type is None:
+                self._reject(f"Файл «{self.file_name}» не является {KIND_LABELS[self.kind]}.")
+        self.received += len(raw_data)
+        if self.received > self.max_bytes:                  # Content-Length части мог отсутствовать или врать
+            self._reject(f"Файл «{self.file_name}» больше {self.max_bytes // MB} МБ.")
+        self.digest.update(raw_data)
+        if self.fingerprint is not None:
+            self.fingerprint.update(raw_data)
+        self.file.write(raw_data)
+        return None                                         # Дальше по цепочке обработчиков кусок не передаём
+
+    def file_complete(self, file_size):
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.sha256 = self.digest.hexdigest()
+        self.file.detected_type = self.detected_type
+        self.file.audio_hash = self.fingerprint.hexdigest() if self.fingerprint is not None else None
+        return self.__dict__.pop("file")                    # Файл отдан парсеру - SkipFile следующего поля его не закроет
+
+    def upload_interrupted(self):
+        self._discard()
+
+    def _reject(self, message: str):
+        if not hasattr(self.request, "upload_rejections"):
+            self.request.upload_rejections = {}
+        self.request.upload_rejections.setdefault(self.field_name, message)
+        self._discard()
+        raise SkipFile(message)                             # Остаток файла парсер дочитает из сокета, но никуда не запишет
+
+    def _discard(self):
+        file = self.__dict__.pop("file", None)
+        if file is not None:
+            file.close()                                    # NamedTemporaryFile удаляется при закрытии
+
+
+__all__ = ["StreamingHashUploadHandler", "sniff", "policy_for", "FIELD_POLICIES"]
@@ -0,0 +1,185 @@
+# vibemusic/utils/waveform.py
+"""
+Пики волны и громкость трека (NumPy).
+
+Звук декодируется в моно float32: WAV (PCM 8/16/24/32 бит) - стандартным wave, остальное -
+локальным декодером (WAVEFORM_DECODER, по умолчанию ffmpeg из PATH), если он есть.
+Декодирование идёт блоками, для каждого блока min/max по корзинам считаются векторно
+(ufunc.reduceat), так что весь трек в памяти не держится. Вывод декодера читается из трубы
+по BLOCK_FRAMES сэмплов; число сэмплов для корзин - по длительности из заголовка (mutagen).
+
+Формат файла пиков (little-endian):
+    b"VMWF", версия (uint8), число разрешений (uint8),
+    для каждого разрешения: число корзин (uint32) и корзины * (min, max) в int8 (-127..127).
+"""
+from __future__ import annotations
+
+import shutil
+import struct
+import subprocess
+import time
+import wave
+from typing import BinaryIO, Iterator, Optional
+
+import numpy as np
+
+from vibemusic.utils.audio_metadata import read_metadata
+
+
+MAGIC = b"VMWF"
+VERSION = 1
+BLOCK_FRAMES = 256 * 1024                                   # Сэмплов на блок декодирования
+DECODE_RATE = 22050                                         # Частота, в которой отдаёт PCM внешний декодер
+DECODE_TIMEOUT = 300                                        # Секунд на весь трек
+
+
+class UnsupportedAudio(Exception):
+    """Формат не декодируется без внешнего декодера (или декодер не справился)."""
+
+
+class PeakAccumulator:
+    """Min/max по buckets равным корзинам и сумма квадратов для RMS; total - число сэмплов трека."""
+
+    def __init__(self, total: int, buckets: int) -> None:
+        self.total = max(total, 1)
+        self.buckets = buckets
+        self.mins = np.full(buckets, np.inf, dtype=np.float32)
+        self.maxs = np.full(buckets, -np.inf, dtype=np.float32)
+        self.count = 0
+        self.sum_squares = 0.0
+
+    def update(self, samples: np.ndarray) -> None:
+        if not len(samples):
+            return
+        positions = np.arange(self.count, self.count + len(samples), dtype=np.int64)
+        index = np.minimum(positions * self.buckets // self.total, self.buckets - 1)
+        starts = np.flatnonzero(np.r_[True, index[1:] != index[:-1]])   # Начала отрезков одной корзины внутри блока
+        ids = index[starts]
+        self.mins[ids] = np.minimum(self.mins[ids], np.minimum.reduceat(samples, starts))
+        self.maxs[ids] = np.maximum(self.maxs[ids], np.maximum.reduceat(samples, starts))
+        self.sum_squares += float(np.dot(samples.astype(np.float64), samples))
+        self.count += len(samples)
+
+    def peaks(self, buckets: int) -> np.ndarray:
+        """(buckets, 2) int8 - min/max; buckets должно делить исходное число корзин."""
+        mins = np.where(np.isfinite(self.mins), self.mins, 0).reshape(buckets, -1).min(axis=1)
+        maxs = np.where(np.isfinite(self.maxs), self.maxs, 0).reshape(buckets, -1).max(axis=1)
+        pairs = np.stack([mins, maxs], axis=1)
+        return np.clip(np.round(pairs * 127), -127, 127).astype(np.int8)
+
+    def rms_dbfs(self) -> Optional[float]:
+        if not self.count:
+            return None
+        rms = (self.sum_squares / self.count) ** 0.5
+        return round(20 * np.log10(rms), 2) if rms > 0 else -120.0
+
+
+def _pcm_to_float(raw: bytes, width: int, channels: int) -> np.ndarray:
+    if width == 1:
+        data = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        data = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768
+    elif width == 3:                                        # 24 бит: дописываем младший нулевой байт до int32
+        triples = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+        padded = np.zeros((len(triples), 4), dtype=np.uint8)
+        padded[:, 1:] = triples
+        data = padded.view("<i4").ravel().astype(np.float32) / 2 ** 31
+    elif width == 4:
+        data = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2 ** 31
+    else:
+        raise UnsupportedAudio(f"PCM {width * 8} бит не поддерживается")
+    if channels > 1:
+        data = data[: len(data) // channels * channels].reshape(-1, channels).mean(axis=1)
+    return data
+
+
+def _wav_blocks(f: BinaryIO) -> tuple[int, int, Iterator[np.ndarray]]:
+    try:
+        reader = wave.open(f, "rb")
+    except (wave.Error, EOFError) as e:                     # Float/extensible WAV - пусть разбирает декодер
+        raise UnsupportedAudio(str(e)) from e
+    rate, width, channels = reader.getframerate(), reader.getsampwidth(), reader.getnchannels()
+
+    def blocks():
+        while raw := reader.readframes(BLOCK_FRAMES):
+            yield _pcm_to_float(raw, width, channels)
+
+    return reader.getnframes(), rate, blocks()
+
+
+def _decoder_blocks(path: str, decoder: str) -> Iterator[np.ndarray]:
+    """Моно PCM от декодера блоками по BLOCK_FRAMES сэмплов; процесс завершается и при досрочном выходе."""
+    command = [decoder, "-v", "error", "-nostdin", "-i", path, "-f", "s16le", "-ac", "1", "-ar", str(DECODE_RATE), "-"]
+    try:
+        process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError as e:
+        raise UnsupportedAudio(f"Декодер не запустился: {e}") from e
+    deadline = time.monotonic() + DECODE_TIMEOUT
+    try:
+        while raw := process.stdout.read(BLOCK_FRAMES * 2):
+            if time.monotonic() > deadline:
+                raise UnsupportedAudio(f"Декодер не уложился в {DECODE_TIMEOUT} с")
+            yield np.frombuffer(raw[: len(raw) // 2 * 2], dtype="<i2").astype(np.float32) / 32768
+        error = process.stderr.read().decode(errors="replace").strip()   # С -v error - несколько строк, труба не переполнится
+        if process.wait() != 0:
+            raise UnsupportedAudio(f"Декодер не справился (код {process.returncode}): {error[:200]}")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+
+def analyze(path: str, resolutions: tuple[int, ...], decoder: Optional[str] = None) -> tuple[float, Optional[float], dict[int, np.ndarray]]:
+    """
+    (длительность в секундах, RMS в dBFS, {корзин: пики}) для файла по пути.
+    Разрешения должны делить наибольшее из них. UnsupportedAudio - нечем декодировать.
+    """
+    finest = max(resolutions)
+    with open(path, "rb") as f:
+        is_wav = f.read(12)[8:12] == b"WAVE"
+        f.seek(0)
+        try:
+            if not is_wav:
+                raise UnsupportedAudio("не WAV")
+            total, rate, blocks = _wav_blocks(f)
+            accumulator = PeakAccumulator(total, finest)
+            for block in blocks:
+                accumulator.update(block)
+        except UnsupportedAudio:
+            decoder = decoder or shutil.which("ffmpeg")
+            if not decoder:
+                raise
+            duration = read_metadata(path)["duration"]
+            if not duration:                                # Корзины делятся по длине трека - без неё не разложить поток
+                raise UnsupportedAudio("длительность трека неизвестна")
+            rate = DECODE_RATE
+            accumulator = PeakAccumulator(round(duration * rate), finest)   # Хвост сверх оценки попадёт в последнюю корзину
+            for block in _decoder_blocks(path, decoder):
+                accumulator.update(block)
+    return accumulator.count / rate, accumulator.rms_dbfs(), {n: accumulator.peaks(n) for n in resolutions}
+
+
+def pack(peaks: dict[int, np.ndarray]) -> bytes:
+    parts = [MAGIC, struct.pack("<BB", VERSION, len(peaks))]
+    for buckets in sorted(peaks):
+        parts.append(struct.pack("<I", buckets))
+        parts.append(peaks[buckets].tobytes())
+    return b"".join(parts)
+
+
+def unpack(data: bytes) -> dict[int, np.ndarray]:
+    if data[:4] != MAGIC:
+        raise ValueError("Не файл пиков VMWF")
+    _, count = struct.unpack_from("<BB", data, 4)
+    offset, result = 6, {}
+    for _ in range(count):
+        (buckets,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        result[buckets] = np.frombuffer(data, dtype=np.int8, count=buckets * 2, offset=offset).reshape(buckets, 2)
+        offset += buckets * 2
+    return result
+
+
+__all__ = ["UnsupportedAudio", "PeakAccumulator", "analyze", "pack", "unpack"]
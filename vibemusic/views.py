@@ -4,10 +4,11 @@
 import json
 import logging
 import re
-import threading
 
 # django
 from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
 from django.contrib import messages
 from django.contrib.auth import logout
 from django.contrib.auth.decorators import login_required
@@ -23,7 +24,7 @@ from django.views.generic import (
 )
 
 from django.db.models import Q, Count, Exists, OuterRef, Value, BooleanField, Prefetch
-from django.http import HttpResponse, HttpResponseRedirect, JsonResponse, HttpRequest
+from django.http import HttpResponse, HttpResponseRedirect, JsonResponse, HttpRequest, Http404
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse, reverse_lazy
 from django.utils.encoding import force_bytes
@@ -37,10 +38,11 @@ from .forms import (
     RegisterForm, CommentForm, LoginViewForm,
     TrackUploadForm, ProfileForm, PostForm,
 )
-from .core_utils import DataMixin, ProfileContextMixin
+from .core_utils import ConditionalGetMixin, DataMixin, ProfileContextMixin
+from .services import api_cache, counters, liked, site_chrome, telegram_outbox, thumbnails, track_previews, track_streaming
+from vibemusic.utils.keyset import KeysetPaginator, InvalidCursor, estimate_count
 from vibemusic.utils.telegram import (
     unsign_telegram_connect_token,
-    send_telegram_message,
     TelegramConnector,
 )
 
@@ -51,8 +53,8 @@ logger = logging.getLogger(__name__)
 class PostListView(DataMixin, ProfileContextMixin, ListView):
     model = Post
     template_name = 'vibemusic/index.html'
-    context_object_name = 'page_obj'
-    paginate_by = 10
+    context_object_name = 'posts'
+    paginate_by = 10                                                      # Keyset-пагинация по (created_at, id), см. paginate_queryset
 
     def get_queryset(self):
         queryset = Post.objects.prefetch_related('artist', 'genre', 'images', 'tracks')
@@ -62,36 +64,27 @@ class PostListView(DataMixin, ProfileContextMixin, ListView):
         if genre_slug:
             try:
                 genre = Genre.objects.get(slug=genre_slug)
-                related_genre_names = genre.related_genres.values_list('name', flat=True)
-                queryset = queryset.filter(
-                    Q(genre=genre) |
-                    Q(artist__genres=genre) |
-                    Q(genre__name__in=related_genre_names) |
-                    Q(artist__genres__name__in=related_genre_names)
-                ).distinct()
+                # PostGenre уже содержит прямые жанры, жанры исполнителя и связанные жанры - один джойн, без DISTINCT
+                queryset = queryset.filter(genre_links__genre=genre)
             except Genre.DoesNotExist:
                 logger.warning(f"Genre with slug {genre_slug} not found")
 
-        # Добавляем like_count и liked_by_me
-        if self.request.user.is_authenticated:
-            queryset = queryset.annotate(
-                like_count=Count('liked_by'),
-                liked_by_me=Exists(
-                    Post.objects.filter(
-                        id=OuterRef('pk'),
-                        liked_by=self.request.user
-                    )
-                )
-            )
-        else:
-            queryset = queryset.annotate(like_count=Count('liked_by'))
+        # like_count - денормализованная колонка Post, liked_by_me проставляется после пагинации (см. get_context_data)
+        return queryset.order_by('-created_at', '-id')
 
-        return queryset.order_by('-created_at')
+    def paginate_queryset(self, queryset, page_size):
+        """Страница по ?cursor= вместо ?page=: без OFFSET и COUNT(*), глубокие страницы не медленнее первой."""
+        paginator = KeysetPaginator(queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET.get('cursor'))
+        except InvalidCursor:
+            raise Http404("Неверный курсор страницы")
+        return paginator, page, page.object_list, page.has_other_pages()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['genres'] = Genre.objects.all()
-        context['site_settings'] = SiteSettings.objects.first()
+        liked.annotate_liked(self.request.user, context['page_obj'])      # liked_by_me для всей страницы - один поход в кэш
+        context['site_settings'] = site_chrome.site_settings(self.request)   # Жанры меню добавляет get_context_menu - из того же кэша
         genre_slug = self.request.GET.get('genre')
         if genre_slug:
             try:
@@ -103,64 +96,37 @@ class PostListView(DataMixin, ProfileContextMixin, ListView):
         extra_context = self.get_context_menu(title="Главная")
         context.update(extra_context)
         context['current_date'] = timezone.now()
-        context['post_count'] = Post.objects.count()
+        context['post_count'] = estimate_count(Post.objects.all())           # Приблизительно: reltuples в PostgreSQL вместо COUNT(*)
         return context
 
 
 
-class PostDetailView(DataMixin, ProfileContextMixin, DetailView):
+class PostDetailView(ConditionalGetMixin, DataMixin, ProfileContextMixin, DetailView):
     model = Post
     template_name = 'vibemusic/post_detail.html'
     slug_url_kwarg = "post_slug"
     context_object_name = 'post'
+    conditional_fields = ('pk', 'updated_at', 'artist_id', 'genre_id', 'author_id', 'comment_count')   # ETag: строка поста без JOIN
 
-    def get_queryset(self):
-        queryset = super().get_queryset()
-
-        # === АННОТАЦИИ ДЛЯ ПОСТА ===
-        if self.request.user.is_authenticated:
-            queryset = queryset.annotate(
-                like_count=Count('liked_by'),
-                liked_by_me=Exists(
-                    Post.objects.filter(id=OuterRef('pk'), liked_by=self.request.user)
-                )
-            )
-        else:
-            queryset = queryset.annotate(like_count=Count('liked_by'))
-
-        # === АННОТАЦИИ ДЛЯ ТРЕКОВ ===
-        track_queryset = Track.objects.annotate(like_count=Count('liked_by'))
-        if self.request.user.is_authenticated:
-            track_queryset = track_queryset.annotate(
-                liked_by_me=Exists(
-                    Track.objects.filter(id=OuterRef('pk'), liked_by=self.request.user)
-                )
-            )
-
-        track_prefetch = Prefetch('tracks', queryset=track_queryset)
-
-        # === АННОТАЦИИ ДЛЯ КОММЕНТАРИЕВ ===
-        comment_queryset = Comment.objects.annotate(like_count=Count('liked_by'))
-        if self.request.user.is_authenticated:
-            comment_queryset = comment_queryset.annotate(
-                liked_by_me=Exists(
-                    Comment.objects.filter(id=OuterRef('pk'), liked_by=self.request.user)
-                )
-            )
-        comment_queryset = comment_queryset.prefetch_related('replies')
-        comment_prefetch = Prefetch('comments', queryset=comment_queryset)
+    def get_validator_tags(self, row):
+        # Исполнитель (био, жанры для фона), жанр, автор; треки и комментарии с их лайками - по тегам коллекций и счётчиков
+        return ({f"post:{row['pk']}", f"user:{row['author_id']}", "track:list", "track:counts", "comment:list", "comment:counts"}
+                | api_cache.object_tags('artist', [row['artist_id']]) | api_cache.object_tags('genre', [row['genre_id']]))
 
-        # === ПРИМЕНЯЕМ prefetch_related ===
-        queryset = queryset.prefetch_related(track_prefetch, comment_prefetch)
-        return queryset
+    def get_queryset(self):
+        # like_count у Post/Track/Comment - денормализованные колонки, Count('liked_by') не нужен;
+        # liked_by_me для поста, треков и страницы комментариев проставляется одним походом в кэш в get_context_data
+        queryset = super().get_queryset().select_related('artist', 'genre')
+        return queryset.prefetch_related('tracks')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         extra_context = self.get_context_menu(title=context['post'].title)
 
         # Комментарии с пагинацией
-        comments = self.object.comments.all().order_by('-created_at')
+        comments = self.object.comments.select_related('user__profile').prefetch_related('replies').order_by('-created_at')
         context['page_obj'] = self.get_paginated_comments(comments, self.request)
+        liked.annotate_liked(self.request.user, [self.object], self.object.tracks.all(), context['page_obj'])
         context['form'] = CommentForm()
         context['artist_bio'] = self.object.artist.bio if self.object.artist else ""
 
@@ -174,7 +140,7 @@ class PostDetailView(DataMixin, ProfileContextMixin, DetailView):
         else:
             context['background_image'] = None
 
-        context['site_settings'] = SiteSettings.objects.first()
+        context['site_settings'] = site_chrome.site_settings(self.request)
         return {**context, **extra_context}
     
 
@@ -185,6 +151,11 @@ class TrackUploadView(LoginRequiredMixin, ProfileContextMixin, CreateView):
     template_name = 'vibemusic/track_upload.html'                              # Задаём шаблон для страницы загрузки трека
     success_url = '/'                                                          # Устанавливаем URL перенаправления на главную
 
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['upload_rejections'] = getattr(self.request, 'upload_rejections', None)  # Файлы, отброшенные при приёме (лимит/тип)
+        return kwargs
+
     def form_valid(self, form):
         try:
             track = form.save(commit=False)                                    # Создаём объект Track без сохранения в БД
@@ -203,6 +174,57 @@ class TrackUploadView(LoginRequiredMixin, ProfileContextMixin, CreateView):
         messages.error(self.request, "Ошибка при загрузке трека.")         # Добавляем сообщение об ошибке
         return self.render_to_response(self.get_context_data(form=form))   # Рендерим шаблон с формой и ошибками
 
+class TrackStreamView(View):
+    """Аудио трека для плеера: Range/206 для перемотки, отдача через nginx (X-Accel-Redirect) или sendfile."""
+
+    def get(self, request, pk):
+        track = get_object_or_404(Track.objects.only('id', 'audio_file'), pk=pk)
+        if not track_streaming.can_stream(request.user, track):
+            raise Http404("Трек недоступен")
+        try:
+            return track_streaming.stream_response(request, track.audio_file)
+        except FileNotFoundError:
+            logger.error(f"Файл трека {pk} отсутствует: {track.audio_file.name}")
+            raise Http404("Файл трека не найден")
+
+    head = get
+
+
+class TrackPreviewView(View):
+    """30-секундное превью для карточек; строится при первом запросе, если фоновая задача ещё не успела."""
+
+    def get(self, request, pk):
+        track = get_object_or_404(Track.objects.only('id', 'audio_file', 'audio_hash', 'preview_file'), pk=pk)
+        if not track_streaming.can_stream(request.user, track):
+            raise Http404("Трек недоступен")
+        try:
+            built = track_previews.build_preview(track)
+        except FileNotFoundError:                                                      # Запись есть, файла в storage нет
+            raise Http404("Файл трека не найден")
+        if not built:                                                                  # Не MP3 - превью нет, играем трек целиком
+            return redirect('vibemusic:track_stream', pk=pk)
+        return track_streaming.stream_response(request, track.preview_file,
+                                               cache_control=f"public, max-age={settings.TRACK_PREVIEW_MAX_AGE}")
+
+    head = get
+
+
+class ThumbnailView(View):
+    """Уменьшенная копия изображения: строится при первом запросе, дальше шаблоны ссылаются прямо на файл."""
+
+    def get(self, request, preset, name):
+        if not thumbnails.check_signature(name, preset, request.GET.get('s')):        # Только пары, выданные thumbnail_url()
+            raise Http404("Изображение не найдено")
+        try:
+            variant = thumbnails.generate(name, preset)
+        except (thumbnails.ThumbnailError, SuspiciousFileOperation) as e:
+            logger.info(f"Миниатюра {preset} для {name} недоступна: {e}")
+            raise Http404("Изображение не найдено")
+        response = redirect(default_storage.url(variant))
+        response['Cache-Control'] = 'public, max-age=3600'                        # Копия уже есть - следующие страницы сошлются на неё напрямую
+        return response
+
+
 class RegisterView(DataMixin, CreateView):
     form_class = RegisterForm                                                  # Указываем форму RegisterForm для регистрации
     template_name = 'vibemusic/register.html'                                  # Задаём шаблон для страницы регистрации
@@ -222,7 +244,7 @@ class RegisterView(DataMixin, CreateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)                           # Получаем базовый контекст
         extra_context = self.get_context_menu(title="Регистрация")            # Получаем контекст меню
-        context['site_settings'] = SiteSettings.objects.first()                # Добавляем настройки сайта
+        context['site_settings'] = site_chrome.site_settings(self.request)     # Добавляем настройки сайта
         return {**context, **extra_context}                                    # Объединяем контексты и возвращаем
 
 class LoginView(DataMixin, LoginView):
@@ -232,7 +254,7 @@ class LoginView(DataMixin, LoginView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)                           # Получаем базовый контекст
         extra_context = self.get_context_menu(title='Авторизация')            # Получаем контекст меню
-        site_settings = SiteSettings.objects.first()                           # Получаем первую запись настроек сайта
+        site_settings = site_chrome.site_settings(self.request)                # Настройки сайта из кэша обвязки
         if not site_settings:                                                  # Проверяем, существует ли SiteSettings
             logger.warning("Объект SiteSettings не найден в базе данных")      # Логируем предупреждение, если не найден
             extra_context['site_settings'] = None                              # Устанавливаем None для site_settings
@@ -254,11 +276,19 @@ def logout_user(request):
     logout(request)                                                            # Выполняем выход пользователя
     return redirect('login')                                                   # Перенаправляем на страницу входа
 
-class GenreDetailView(DataMixin, ProfileContextMixin, DetailView):
+class GenreDetailView(ConditionalGetMixin, DataMixin, ProfileContextMixin, DetailView):
     model = Genre                                                              # Указываем модель Genre для представления
     template_name = 'vibemusic/genre_detail.html'                              # Задаём шаблон для страницы жанра
     context_object_name = 'genre'                                              # Имя объекта жанра в шаблоне
 
+    def get_validator_filters(self):
+        identifier = str(self.kwargs.get("genre_slug"))                        # Как в get_object: число - id, иначе slug
+        return {'id': int(identifier)} if identifier.isdigit() else {'slug': identifier}
+
+    def get_validator_tags(self, row):
+        # Посты жанра - через PostGenre: меняются постами, жанрами исполнителей и связанными жанрами
+        return {f"genre:{row['pk']}", "post:list", "artist:list", "genre:list"}
+
     def get_object(self):
         identifier = self.kwargs.get("genre_slug")                             # Извлекаем параметр genre_slug из URL
         if str(identifier).isdigit():                                          # Проверяем, является ли идентификатор числом
@@ -271,14 +301,13 @@ class GenreDetailView(DataMixin, ProfileContextMixin, DetailView):
         context = super().get_context_data(**kwargs)                           # Получаем базовый контекст
         genre = self.get_object()                                              # Получаем объект жанра
         context['posts'] = (
-            Post.objects.filter(Q(genre=genre) | Q(artist__genres=genre))      # Выбираем посты, связанные с жанром
+            Post.objects.filter(genre_links__genre=genre, genre_links__is_direct=True)  # Жанр поста или его исполнителя - через PostGenre, без DISTINCT
             .select_related('artist', 'genre')                                 # Оптимизируем запрос для artist и genre
             .prefetch_related('images', 'tracks')                              # Оптимизируем загрузку изображений и треков
             .order_by('-created_at')                                           # Сортируем по дате создания
-            .distinct()                                                        # Устраняем дубликаты
         )
         logger.info(f"Получено {context['posts'].count()} постов для жанра {genre.name}")  # Логируем количество постов
-        context['site_settings'] = SiteSettings.objects.first()                # Добавляем настройки сайта
+        context['site_settings'] = site_chrome.site_settings(self.request)     # Добавляем настройки сайта
         if genre.background_image:                                             # Проверяем наличие фонового изображения
             context['background_image'] = genre.background_image.url           # Устанавливаем фоновое изображение
             logger.info(f"Genre background: {context['background_image']}")    # Логируем использование фона
@@ -288,16 +317,19 @@ class GenreDetailView(DataMixin, ProfileContextMixin, DetailView):
         extra_context = self.get_context_menu(title=f"Жанр: {genre.name}")     # Получаем контекст меню
         return {**context, **extra_context}                                    # Объединяем контексты и возвращаем
 
-class ArtistDetailView(DataMixin, ProfileContextMixin, DetailView):
+class ArtistDetailView(ConditionalGetMixin, DataMixin, ProfileContextMixin, DetailView):
     model = Artist                                                             # Указываем модель Artist для представления
     template_name = 'vibemusic/artist_detail.html'                             # Задаём шаблон для страницы исполнителя
     slug_url_kwarg = "artist_slug"                                             # Указываем имя параметра slug в URL
     context_object_name = 'artist'                                             # Имя объекта исполнителя в шаблоне
 
+    def get_validator_tags(self, row):
+        return {f"artist:{row['pk']}", "track:list", "post:list", "genre:list"}   # Треки, посты и жанры исполнителя - по тегам коллекций
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)                           # Получаем базовый контекст
         extra_context = self.get_context_menu(title="Исполнитель: " + context['artist'].name)  # Получаем контекст меню
-        context['site_settings'] = SiteSettings.objects.first()                # Добавляем настройки сайта
+        context['site_settings'] = site_chrome.site_settings(self.request)     # Добавляем настройки сайта
         return {**context, **extra_context}                                    # Объединяем контексты и возвращаем
 
 class PostCreateView(DataMixin, LoginRequiredMixin, ProfileContextMixin, CreateView):
@@ -306,6 +338,11 @@ class PostCreateView(DataMixin, LoginRequiredMixin, ProfileContextMixin, CreateV
     template_name = 'vibemusic/post_form.html'                                 # Задаём шаблон для формы создания поста
     success_url = reverse_lazy('vibemusic:home')                               # Устанавливаем URL перенаправления
 
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['upload_rejections'] = getattr(self.request, 'upload_rejections', None)  # Файлы, отброшенные при приёме (лимит/тип)
+        return kwargs
+
     def form_valid(self, form):
         form.instance.author = self.request.user                               # Устанавливаем текущего пользователя как автора
         logger.info(f"Пользователь {self.request.user.username} создал пост: {form.cleaned_data['title']}")  # Логируем создание поста
@@ -320,7 +357,7 @@ class PostCreateView(DataMixin, LoginRequiredMixin, ProfileContextMixin, CreateV
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)                           # Получаем базовый контекст
         extra_context = self.get_context_menu(title="Создание поста")          # Получаем контекст меню
-        context['site_settings'] = SiteSettings.objects.first()                # Добавляем настройки сайта
+        context['site_settings'] = site_chrome.site_settings(self.request)     # Добавляем настройки сайта
         return {**context, **extra_context}                                    # Объединяем контексты и возвращаем
 
 
@@ -330,7 +367,7 @@ from django.template.loader import render_to_string
 class AddCommentView(LoginRequiredMixin, View):
     def post(self, request, post_slug, *args, **kwargs):
         post = get_object_or_404(Post, slug=post_slug)
-        form = CommentForm(request.POST, request.FILES)
+        form = CommentForm(request.POST, request.FILES, upload_rejections=getattr(request, 'upload_rejections', None))
 
         # ← ВСЕГДА AJAX (или обычная форма)
         is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest' or request.POST.get('ajax')
@@ -341,7 +378,7 @@ class AddCommentView(LoginRequiredMixin, View):
             comment.user = request.user
             comment.save()
 
-            comment_count = post.comments.count()
+            comment_count = counters.current(post, 'comment_count')             # Колонка + ещё не сброшенная дельта, без COUNT(*)
             comment_html = render_to_string(
                 'vibemusic/partials/comment_item.html',
                 {'comment': comment, 'user': request.user},
@@ -400,15 +437,9 @@ class TelegramWebhookView(View):
                 profile.telegram_chat_id = chat_id                             # Устанавливаем ID чата Telegram
                 profile.telegram_username = f"@{username}" if username else None  # Устанавливаем имя пользователя Telegram
                 profile.save()                                                 # Сохраняем изменения в профиле
-                threading.Thread(                                              # Запускаем отправку сообщения в отдельном потоке
-                    target=send_telegram_message,
-                    args=(chat_id, "Ваш аккаунт успешно привязан к Telegram!")
-                ).start()                                                      # Асинхронная отправка сообщения
+                telegram_outbox.enqueue(chat_id, "Ваш аккаунт успешно привязан к Telegram!")  # Ставим в очередь, отправит диспетчер
             else:                                                              # Если токен недействителен
-                threading.Thread(                                              # Запускаем отправку сообщения об ошибке
-                    target=send_telegram_message,
-                    args=(chat_id, "Неверный или просроченный токен.")
-                ).start()                                                      # Асинхронная отправка сообщения
+                telegram_outbox.enqueue(chat_id, "Неверный или просроченный токен.")         # Ставим в очередь сообщение об ошибке
 
     def _handle_unsubscribe_command(self, chat_id):                            # Метод для обработки команды /unsubscribe
         try:
@@ -416,15 +447,9 @@ class TelegramWebhookView(View):
             profile.telegram_chat_id = None                                    # Сбрасываем ID чата
             profile.telegram_username = None                                   # Сбрасываем имя пользователя
             profile.save()                                                     # Сохраняем изменения
-            threading.Thread(                                                  # Запускаем отправку сообщения об успехе
-                target=send_telegram_message,
-                args=(chat_id, "Ваш аккаунт отвязан от Telegram.")
-            ).start()                                                          # Асинхронная отправка сообщения
+            telegram_outbox.enqueue(chat_id, "Ваш аккаунт отвязан от Telegram.")             # Ставим в очередь сообщение об успехе
         except Profile.DoesNotExist:                                           # Обрабатываем случай, если профиль не найден
-            threading.Thread(                                                  # Запускаем отправку сообщения об ошибке
-                target=send_telegram_message,
-                args=(chat_id, "Ошибка: профиль не найден.")
-            ).start()                                                          # Асинхронная отправка сообщения
+            telegram_outbox.enqueue(chat_id, "Ошибка: профиль не найден.")                   # Ставим в очередь сообщение об ошибке
 
 class CustomPasswordResetView(PasswordResetView):
     template_name = 'vibemusic/password_reset.html'                            # Задаём шаблон для сброса пароля
@@ -448,7 +473,7 @@ class CustomPasswordResetView(PasswordResetView):
                         f"Ссылки: {reset_url}\n\n"
                         "Если не вы - игнорируйте."
                     )                                                          # Формируем сообщение для Telegram
-                    threading.Thread(target=send_telegram_message, args=(profile.telegram_chat_id, message)).start()  # Отправляем сообщение асинхронно
+                    telegram_outbox.enqueue(profile.telegram_chat_id, message)  # Ставим в очередь, отправит диспетчер
             except Profile.DoesNotExist:
                 pass                                                           # Пропускаем, если профиль не найден
         return response                                                    # Возвращаем ответ
@@ -501,13 +526,13 @@ class AboutView(DataMixin, ProfileContextMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)                           # Получаем базовый контекст
         extra_context = self.get_context_menu(title='О нас')                   # Получаем контекст меню
-        context['site_settings'] = SiteSettings.objects.first()                # Добавляем настройки сайта
+        context['site_settings'] = site_chrome.site_settings(self.request)     # Добавляем настройки сайта
         return {**context, **extra_context}                                    # Объединяем контексты и возвращаем
 
 def contact(request):
     mixin = DataMixin()                                                       # Создаём экземпляр DataMixin
     context = mixin.get_context_menu(title="Обратная связь")                   # Получаем контекст меню
-    context['site_settings'] = SiteSettings.objects.first()                    # Добавляем настройки сайта
+    context['site_settings'] = site_chrome.site_settings(request)              # Добавляем настройки сайта (кэш, см. services/site_chrome.py)
     if request.user.is_authenticated:                                          # Проверяем, авторизован ли пользователь
         try:
             profile = Profile.objects.get(user=request.user)                   # Получаем профиль текущего пользователя
@@ -530,7 +555,7 @@ class ProfileView(DataMixin, ProfileContextMixin, DetailView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)                           # Получаем базовый контекст
         extra_context = self.get_context_menu(title=f'Профиль {self.object.username}')  # Получаем контекст меню
-        context['site_settings'] = SiteSettings.objects.first()                # Добавляем настройки сайта
+        context['site_settings'] = site_chrome.site_settings(self.request)     # Добавляем настройки сайта
         context['user_posts'] = Post.objects.filter(author=self.object)        # Добавляем посты пользователя
         context['following'] = self.object.profile.following.all()             # Добавляем список подписок
         context['profile'] = self.object.profile                              # Добавляем объект профиля
@@ -604,7 +629,7 @@ class MyProfileView(LoginRequiredMixin, ProfileContextMixin, DataMixin, Template
         context['edit_form'] = ProfileForm(instance=user_profile)
         context['title'] = "Мой профиль"
         context['current_datetime'] = timezone.now()
-        context['site_settings'] = SiteSettings.objects.first()
+        context['site_settings'] = site_chrome.site_settings(self.request)
         return context
 
     def post(self, request, *args, **kwargs):
@@ -649,7 +674,7 @@ class TelegramSettingsView(LoginRequiredMixin, ProfileContextMixin, DataMixin, T
         context['telegram_token'] = TelegramConnector(self.request.user)
         context['TELEGRAM_BOT_USERNAME'] = getattr(settings, 'TELEGRAM_BOT_USERNAME', None)
         context['title'] = "Настройки Telegram"
-        context['site_settings'] = SiteSettings.objects.first()
+        context['site_settings'] = site_chrome.site_settings(self.request)
         return context
 
 